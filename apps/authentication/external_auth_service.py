@@ -2,9 +2,13 @@ import requests
 import logging
 from django.conf import settings
 from typing import Dict, Optional, Tuple
+from apps.core.circuit_breaker import CircuitOpenError, get_breaker
+from apps.core.deadline import DeadlineExceeded, zaman_asimi_mesaji, zaman_asimlari
 
 logger = logging.getLogger(__name__)
 
+DEVRE_KESICI = 'kimlik'
+
 
 class ExternalAuthService:
     """Harici kimlik yönetim servisi entegrasyonu"""
@@ -13,6 +17,12 @@ class ExternalAuthService:
         self.base_url = getattr(settings, 'EXTERNAL_AUTH_BASE_URL', 'https://yenikysdevapi.dsi.gov.tr')
         self.application_id = getattr(settings, 'EXTERNAL_AUTH_APP_ID', '1021')
         self.timeout = getattr(settings, 'EXTERNAL_AUTH_TIMEOUT', 30)
+        self.baglanti_timeout = getattr(settings, 'EXTERNAL_AUTH_BAGLANTI_TIMEOUT', 5)
+    
+    @property
+    def breaker(self):
+        """Kimlik yönetim servisi devre kesicisi"""
+        return get_breaker(DEVRE_KESICI)
     
     def authenticate_user(self, username_or_email: str, password: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
@@ -51,11 +61,13 @@ class ExternalAuthService:
             # Session oluştur ve cookie'leri yönet
             session = requests.Session()
             
-            response = session.post(
-                url, 
+            response = self.breaker.call(
+                session.post,
+                url,
                 json=payload, 
                 headers=headers, 
-                timeout=self.timeout
+                timeout=zaman_asimlari(self.timeout, self.baglanti_timeout, 'Kimlik doğrulama servisi'),
+                etiket='Kimlik doğrulama servisi'
             )
             
 
@@ -85,9 +97,12 @@ class ExternalAuthService:
                 logger.error(f"Kimlik doğrulama hatası: {response.status_code} - {response.text}")
                 return False, None, f"Kimlik doğrulama servisi hatası: {response.status_code} - {response.text[:200]}"
                 
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"Kimlik doğrulama isteği gönderilmedi ({username_or_email}): {str(e)}")
+            return False, None, str(e)
         except requests.exceptions.Timeout:
             logger.error(f"Kimlik doğrulama servisi zaman aşımı: {username_or_email}")
-            return False, None, "Kimlik doğrulama servisi zaman aşımı"
+            return False, None, zaman_asimi_mesaji("Kimlik doğrulama servisi zaman aşımı", 'Kimlik doğrulama servisi')
         except requests.exceptions.ConnectionError:
             logger.error(f"Kimlik doğrulama servisi bağlantı hatası: {username_or_email}")
             return False, None, "Kimlik doğrulama servisi bağlantı hatası"
@@ -113,10 +128,12 @@ class ExternalAuthService:
                 'Authorization': f'Bearer {token}'
             }
             
-            response = requests.get(
-                url, 
+            response = self.breaker.call(
+                requests.get,
+                url,
                 headers=headers, 
-                timeout=self.timeout
+                timeout=zaman_asimlari(self.timeout, self.baglanti_timeout, 'Kimlik doğrulama servisi'),
+                etiket='Kimlik doğrulama servisi'
             )
             
             if response.status_code == 200:
@@ -126,6 +143,9 @@ class ExternalAuthService:
                 logger.error(f"Kullanıcı bilgisi alma hatası: {response.status_code} - {response.text}")
                 return False, None, f"Kullanıcı bilgisi alma hatası: {response.status_code}"
                 
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"Kullanıcı bilgisi alma isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except Exception as e:
             logger.error(f"Kullanıcı bilgisi alma hatası: {str(e)}")
             return False, None, "Kullanıcı bilgisi alma hatası"
@@ -152,11 +172,13 @@ class ExternalAuthService:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.post(
-                url, 
+            response = self.breaker.call(
+                requests.post,
+                url,
                 json=payload, 
                 headers=headers, 
-                timeout=self.timeout
+                timeout=zaman_asimlari(self.timeout, self.baglanti_timeout, 'Kimlik doğrulama servisi'),
+                etiket='Kimlik doğrulama servisi'
             )
             
             if response.status_code == 200:
@@ -166,6 +188,9 @@ class ExternalAuthService:
                 logger.error(f"Token yenileme hatası: {response.status_code} - {response.text}")
                 return False, None, f"Token yenileme hatası: {response.status_code}"
                 
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"Token yenileme isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except Exception as e:
             logger.error(f"Token yenileme hatası: {str(e)}")
             return False, None, "Token yenileme hatası"
@@ -2,11 +2,15 @@ import requests
 import logging
 from django.conf import settings
 from typing import Dict, Optional, Tuple
+from apps.core.circuit_breaker import CircuitOpenError, get_breaker
+from apps.core.deadline import DeadlineExceeded, zaman_asimlari
 import jwt
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+DEVRE_KESICI = 'kimlik'
+
 
 class ExternalTokenService:
     """Harici kimlik yönetim servisi token yönetimi"""
@@ -14,6 +18,12 @@ class ExternalTokenService:
     def __init__(self):
         self.base_url = getattr(settings, 'EXTERNAL_AUTH_BASE_URL', 'https://yenikysdevapi.dsi.gov.tr')
         self.timeout = getattr(settings, 'EXTERNAL_AUTH_TIMEOUT', 30)
+        self.baglanti_timeout = getattr(settings, 'EXTERNAL_AUTH_BAGLANTI_TIMEOUT', 5)
+    
+    @property
+    def breaker(self):
+        """Kimlik yönetim servisi devre kesicisi"""
+        return get_breaker(DEVRE_KESICI)
     
     def validate_external_token(self, token: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
@@ -36,10 +46,12 @@ class ExternalTokenService:
                 'content-type': 'application/json'
             }
             
-            response = requests.get(
-                url, 
+            response = self.breaker.call(
+                requests.get,
+                url,
                 headers=headers, 
-                timeout=self.timeout
+                timeout=zaman_asimlari(self.timeout, self.baglanti_timeout, 'Kimlik doğrulama servisi'),
+                etiket='Kimlik doğrulama servisi'
             )
             
             if response.status_code == 200:
@@ -49,6 +61,9 @@ class ExternalTokenService:
                 logger.warning(f"Token doğrulama hatası: {response.status_code}")
                 return False, None, f"Token doğrulama hatası: {response.status_code}"
                 
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"Token doğrulama isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except Exception as e:
             logger.error(f"Token doğrulama hatası: {str(e)}")
             return False, None, f"Token doğrulama hatası: {str(e)}"
@@ -72,10 +87,12 @@ class ExternalTokenService:
                 'content-type': 'application/json'
             }
             
-            response = requests.get(
-                url, 
+            response = self.breaker.call(
+                requests.get,
+                url,
                 headers=headers, 
-                timeout=self.timeout
+                timeout=zaman_asimlari(self.timeout, self.baglanti_timeout, 'Kimlik doğrulama servisi'),
+                etiket='Kimlik doğrulama servisi'
             )
             
             if response.status_code == 200:
@@ -85,6 +102,9 @@ class ExternalTokenService:
                 logger.warning(f"Kullanıcı bilgisi alma hatası: {response.status_code}")
                 return False, None, f"Kullanıcı bilgisi alma hatası: {response.status_code}"
                 
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"Kullanıcı bilgisi alma isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except Exception as e:
             logger.error(f"Kullanıcı bilgisi alma hatası: {str(e)}")
             return False, None, f"Kullanıcı bilgisi alma hatası: {str(e)}"
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login
 from .serializers import LoginSerializer, RegisterSerializer, ChangePasswordSerializer, ExternalLoginSerializer
 from .external_auth_service import ExternalAuthService
+from apps.core.upstream_errors import http_durumu
 from apps.users.models import User
 
 
@@ -27,7 +28,7 @@ def external_login_view(request):
     if not success:
         return Response({
             'error': error_message or 'Kimlik doğrulama başarısız'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+        }, status=http_durumu(error_message, status.HTTP_401_UNAUTHORIZED))
     
     # Kullanıcıyı yerel veritabanında bul veya oluştur
     try:
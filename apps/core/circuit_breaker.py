@@ -0,0 +1,268 @@
+"""
+Harici servisler için devre kesici (circuit breaker)
+
+Durum tüm worker ve sunucular arasında Django cache (Redis) üzerinden paylaşılır:
+
+- closed: İstekler geçer; kayan pencerede en az min_requests çağrı yapılmış ve
+  hata oranı failure_rate'e ulaşmışsa devre açılır.
+- open: İstekler upstream'e gitmeden hemen reddedilir.
+- half_open: Bekleme süresi dolunca tek bir deneme isteğine izin verilir; başarılı
+  olursa devre kapanır, başarısız olursa yeniden açılır.
+
+Her call() bir mantıksal çağrı sayılır; yeniden denemeler devre kesicinin içinde
+yapılmalıdır ki geçici hatalar deneme sayısı kadar hata sayılmasın. Devre
+açılmadan önce gönderilmiş isteklerin sonuçları devreyi kapatmaz ve açılış
+zamanını ilerletmez; durumu yalnızca deneme isteğinin sonucu değiştirir.
+
+Kayan pencere iki sabit dilimle yaklaşık hesaplanır: önceki dilimin sayıları,
+pencereyle örtüşen oranı kadar ağırlıkla eklenir.
+"""
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Tuple, Type
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .upstream_errors import DEVRE_ACIK, hata_mesaji
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Devre açıkken yapılan çağrılarda fırlatılır"""
+
+    kod = DEVRE_ACIK
+
+    def __init__(self, name: str, etiket: str = None):
+        self.name = name
+        super().__init__(hata_mesaji(
+            DEVRE_ACIK,
+            f"{etiket or name} geçici olarak kullanılamıyor, lütfen daha sonra tekrar deneyin"
+        ))
+
+
+class CircuitBreaker:
+    """Redis üzerinde durum paylaşan, hata oranına göre açılan devre kesici"""
+
+    def __init__(self, name: str, failure_rate: float = None, min_requests: int = None,
+                 window: int = None, reset_timeout: int = None):
+        self.name = name
+        self.failure_rate = failure_rate or getattr(settings, 'CIRCUIT_BREAKER_FAILURE_RATE', 0.5)
+        self.min_requests = min_requests or getattr(settings, 'CIRCUIT_BREAKER_MIN_REQUESTS', 20)
+        self.window = window or getattr(settings, 'CIRCUIT_BREAKER_WINDOW', 30)
+        self.reset_timeout = reset_timeout or getattr(settings, 'CIRCUIT_BREAKER_RESET_TIMEOUT', 30)
+        self._prefix = f"circuit:{name}"
+
+    @property
+    def _state_key(self):
+        return f"{self._prefix}:durum"
+
+    @property
+    def _opened_key(self):
+        return f"{self._prefix}:acilis"
+
+    @property
+    def _probe_key(self):
+        return f"{self._prefix}:deneme"
+
+    def _sayac_key(self, tur: str, dilim: int) -> str:
+        return f"{self._prefix}:{tur}:{dilim}"
+
+    def state(self) -> str:
+        """Güncel devre durumunu döndür"""
+        try:
+            values = cache.get_many([self._state_key, self._opened_key])
+        except Exception as e:
+            logger.warning(f"Devre kesici durumu okunamadı ({self.name}): {str(e)}")
+            return CLOSED
+        state = values.get(self._state_key, CLOSED)
+        if state == OPEN and time.time() - values.get(self._opened_key, 0) >= self.reset_timeout:
+            return HALF_OPEN
+        return state
+
+    def _izin(self) -> Tuple[bool, bool]:
+        """
+        İsteğin upstream'e gönderilip gönderilemeyeceğini belirle
+
+        Returns:
+            Tuple[bool, bool]: (izin verildi mi, deneme isteği mi)
+        """
+        state = self.state()
+        if state == CLOSED:
+            return True, False
+        if state == HALF_OPEN:
+            # Tüm worker'lar arasında sadece bir deneme isteğine izin ver
+            try:
+                deneme = cache.add(self._probe_key, 1, timeout=self.reset_timeout)
+            except Exception:
+                return True, False
+            return deneme, deneme
+        return False, False
+
+    def allow_request(self) -> bool:
+        """İsteğin upstream'e gönderilip gönderilemeyeceğini belirle"""
+        return self._izin()[0]
+
+    def _say(self, tur: str, dilim: int) -> None:
+        anahtar = self._sayac_key(tur, dilim)
+        try:
+            cache.incr(anahtar)
+        except ValueError:
+            # Dilimin ilk kaydı; aynı anda ekleyen olursa artır
+            if not cache.add(anahtar, 1, timeout=self.window * 2 + 1):
+                cache.incr(anahtar)
+
+    def _oran_asildi(self, dilim: int, simdi: float) -> bool:
+        """Kayan penceredeki çağrı sayısı ve hata oranı eşiği aşıyor mu"""
+        degerler = cache.get_many([self._sayac_key(tur, d) for tur in ('istek', 'hata') for d in (dilim - 1, dilim)])
+        onceki_agirlik = 1 - (simdi % self.window) / self.window
+
+        def toplam(tur):
+            return (degerler.get(self._sayac_key(tur, dilim), 0)
+                    + degerler.get(self._sayac_key(tur, dilim - 1), 0) * onceki_agirlik)
+
+        istekler = toplam('istek')
+        return istekler >= self.min_requests and toplam('hata') / istekler >= self.failure_rate
+
+    def _open(self, deneme: bool = False) -> None:
+        try:
+            if deneme:
+                # Deneme başarısız: bekleme süresi yeniden başlar
+                cache.set_many({self._state_key: OPEN, self._opened_key: time.time()}, timeout=None)
+            elif cache.add(self._state_key, OPEN, timeout=None):
+                cache.set(self._opened_key, time.time(), timeout=None)
+            else:
+                # Başka bir worker açmış; açılış zamanı ilerletilmez
+                return
+            cache.delete(self._probe_key)
+        except Exception as e:
+            logger.warning(f"Devre kesici açılamadı ({self.name}): {str(e)}")
+            return
+        logger.error(f"Devre kesici açıldı: {self.name}")
+
+    def _close(self) -> None:
+        dilim = int(time.time() // self.window)
+        try:
+            cache.delete_many([self._state_key, self._opened_key, self._probe_key] + [
+                self._sayac_key(tur, d) for tur in ('istek', 'hata') for d in (dilim - 1, dilim)
+            ])
+        except Exception as e:
+            logger.warning(f"Devre kesici kapatılamadı ({self.name}): {str(e)}")
+            return
+        logger.info(f"Devre kesici kapandı: {self.name}")
+
+    def record_success(self, deneme: bool = False) -> None:
+        """
+        Başarılı çağrıyı kaydet
+
+        Args:
+            deneme: Çağrı half_open durumunda izin verilen deneme isteği mi
+        """
+        if deneme:
+            self._close()
+            return
+        try:
+            self._say('istek', int(time.time() // self.window))
+        except Exception as e:
+            logger.warning(f"Devre kesici sayacı güncellenemedi ({self.name}): {str(e)}")
+
+    def record_failure(self, deneme: bool = False) -> None:
+        """
+        Başarısız çağrıyı kaydet; gerekirse devreyi aç
+
+        Args:
+            deneme: Çağrı half_open durumunda izin verilen deneme isteği mi
+        """
+        if deneme:
+            self._open(deneme=True)
+            return
+        simdi = time.time()
+        dilim = int(simdi // self.window)
+        try:
+            self._say('istek', dilim)
+            self._say('hata', dilim)
+            asildi = self._oran_asildi(dilim, simdi)
+        except Exception as e:
+            logger.warning(f"Devre kesici hata sayacı güncellenemedi ({self.name}): {str(e)}")
+            return
+        if asildi:
+            self._open()
+
+    def _record_status(self, status_code: int, deneme: bool = False) -> None:
+        if status_code >= 500:
+            self.record_failure(deneme)
+        else:
+            self.record_success(deneme)
+
+    def _denemeyi_birak(self) -> None:
+        """Sonuçsuz biten (ör. gönderilmeyen) deneme isteğinin yerini başka çağrıya bırak"""
+        try:
+            cache.delete(self._probe_key)
+        except Exception:
+            pass
+
+    def call(self, func: Callable[..., requests.Response], *args, etiket: str = None,
+             failure_exceptions: Tuple[Type[BaseException], ...] = (requests.exceptions.RequestException,),
+             **kwargs) -> requests.Response:
+        """
+        HTTP çağrısını devre kesici üzerinden yap
+
+        Zaman aşımı, bağlantı hataları ve 5xx yanıtlar hata olarak sayılır.
+        func yeniden denemeleri içerebilir; sonuç tek çağrı olarak kaydedilir.
+
+        Raises:
+            CircuitOpenError: Devre açıkken
+        """
+        izin, deneme = self._izin()
+        if not izin:
+            raise CircuitOpenError(self.name, etiket)
+        try:
+            response = func(*args, **kwargs)
+        except failure_exceptions:
+            self.record_failure(deneme)
+            raise
+        except BaseException:
+            if deneme:
+                self._denemeyi_birak()
+            raise
+        self._record_status(response.status_code, deneme)
+        return response
+
+    async def acall(self, func: Callable[..., Awaitable], *args, etiket: str = None,
+                    failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,), **kwargs):
+        """call() metodunun asenkron karşılığı (ör. httpx.AsyncClient ile)"""
+        izin, deneme = await sync_to_async(self._izin, thread_sensitive=False)()
+        if not izin:
+            raise CircuitOpenError(self.name, etiket)
+        try:
+            response = await func(*args, **kwargs)
+        except failure_exceptions:
+            await sync_to_async(self.record_failure, thread_sensitive=False)(deneme)
+            raise
+        except BaseException:
+            if deneme:
+                await sync_to_async(self._denemeyi_birak, thread_sensitive=False)()
+            raise
+        await sync_to_async(self._record_status, thread_sensitive=False)(response.status_code, deneme)
+        return response
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """İsimle devre kesici döndür (süreç başına tek örnek)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
@@ -0,0 +1,414 @@
+"""
+Harici servis çağrıları için uyarlanır eşzamanlılık sınırlayıcı
+
+Upstream'e aynı anda gönderilen istek sayısı tüm worker ve sunucular arasında
+Django cache (Redis) üzerinden sınırlanır. Her istek sınır kadar slottan birini
+kiralar; slot anahtarları kira süresi sonunda kendiliğinden düştüğünden çöken
+bir worker kapasite sızdırmaz.
+
+Sınır AIMD ile ayarlanır:
+
+- Olağan sürede biten başarılı her çağrı sınırı 1/sınır kadar artırır
+  (sınır dolu kullanılırken her "tur" başına +1). Sınırın yarısı bile
+  kullanılmıyorsa artış yapılmaz; düşük trafikte sınır boşuna şişmez.
+- Zaman aşımı, bağlantı hatası, 429/5xx veya uç noktanın olağan gecikmesini
+  belirgin aşan süre sınırı çarpanla küçültür. Aynı tıkanmaya ait hata
+  yağmuru sınırı sıfıra indirmesin diye azaltma aralığı içinde en fazla bir
+  kez küçültülür.
+
+Uç noktaların olağan gecikmeleri birbirinden çok farklıdır (liste saniyeler,
+detay milisaniyeler sürebilir); bu yüzden yavaşlık sabit bir hedefe göre
+değil, her uç noktanın bu süreçte gözlenen uzun dönem gecikme ortalamasına
+(taban) göre ölçülür. Süre tabanın latency_tolerance katını aşarsa yavaş
+sayılır; taban yeterli gözlem birikmeden kullanılmaz. Uç nokta bilinmeyen
+çağrılarda yalnızca hatalar sınırı küçültür.
+
+Öncelik şeritleri sınırın ne kadarını kullanabileceğini belirler: etkileşimli
+istekler sınırın tamamını, arka plan ve toplu işler yalnızca bir payını
+kullanabilir. Upstream doyduğunda önce düşük öncelikli işler bekler; kullanıcı
+isteklerine her zaman yer kalır. Şerit oncelik() bağlam yöneticisiyle
+contextvar üzerinden seçilir, servis katmanına parametre olarak taşınmaz.
+"""
+import asyncio
+import contextlib
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .deadline import DeadlineExceeded, son_an as istek_son_ani
+from .upstream_errors import KAPASITE_DOLU, hata_mesaji
+
+logger = logging.getLogger(__name__)
+
+ETKILESIMLI = 'etkilesimli'
+NORMAL = 'normal'
+ARKA_PLAN = 'arka_plan'
+TOPLU = 'toplu'
+# Yavaş denemeler için gönderilen yedek istekler (hedging.py); slot hemen yoksa gönderilmez
+YEDEK = 'yedek'
+
+# Şerit -> (sınırdan kullanabileceği pay, slot için en fazla bekleme (saniye))
+VARSAYILAN_SERITLER = {
+    ETKILESIMLI: (1.0, 2),
+    NORMAL: (0.8, 5),
+    ARKA_PLAN: (0.5, 20),
+    TOPLU: (0.3, 20),
+    YEDEK: (0.5, 0),
+}
+
+# Upstream'in aşırı yüklendiğini gösteren durum kodları
+ASIRI_YUK_DURUMLARI = frozenset({429, 500, 502, 503, 504})
+
+ASIRI_YUK_HATALARI = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+)
+
+# Sınır cache'te binde bir hassasiyetle tamsayı olarak tutulur (atomik incr için)
+_OLCEK = 1000
+
+# Uç nokta gecikme tabanında son gözlemin ağırlığı (uzun dönem ortalaması)
+TABAN_AGIRLIGI = 0.05
+# Tabana göre yavaşlık ölçülmeden önce gereken başarılı gözlem sayısı
+TABAN_ASGARI_GOZLEM = 20
+
+_serit: contextvars.ContextVar[str] = contextvars.ContextVar('upstream_oncelik', default=NORMAL)
+_slot_bildirimi: contextvars.ContextVar[Optional[Callable[[], None]]] = contextvars.ContextVar(
+    'upstream_slot_bildirimi', default=None
+)
+
+
+@contextlib.contextmanager
+def oncelik(serit: str):
+    """
+    Blok içindeki upstream çağrılarının öncelik şeridini belirle
+
+    Örnek:
+        with oncelik(ARKA_PLAN):
+            servis.tahsilat_listele_akisi(...)
+    """
+    token = _serit.set(serit)
+    try:
+        yield
+    finally:
+        _serit.reset(token)
+
+
+def aktif_serit() -> str:
+    """Çağıran bağlamın öncelik şeridi"""
+    return _serit.get()
+
+
+@contextlib.contextmanager
+def slot_alininca(bildirim: Callable[[], None]):
+    """
+    Blok içinde slot kiralandığında bildirim fonksiyonunu çağır
+
+    İsteğin upstream'e gerçekten gönderildiğini (şeritten reddedilmediğini)
+    bilmesi gereken katmanlar içindir (ör. yedek istek sayacı).
+    """
+    token = _slot_bildirimi.set(bildirim)
+    try:
+        yield
+    finally:
+        _slot_bildirimi.reset(token)
+
+
+def _kiralandi(kira: '_Kira') -> '_Kira':
+    bildirim = _slot_bildirimi.get()
+    if bildirim is not None:
+        bildirim()
+    return kira
+
+
+class ConcurrencyLimitError(Exception):
+    """Şeridin payına düşen slotlar bekleme süresi içinde boşalmadığında fırlatılır"""
+
+    kod = KAPASITE_DOLU
+
+    def __init__(self, name: str, serit: str, etiket: str = None):
+        self.name = name
+        self.serit = serit
+        super().__init__(hata_mesaji(
+            KAPASITE_DOLU,
+            f"{etiket or name} şu anda yoğun, lütfen daha sonra tekrar deneyin"
+        ))
+
+
+class _Kira:
+    """Kiralanmış slot"""
+
+    def __init__(self, anahtar: Optional[str], token: str, kullanim: int, sinir: int):
+        self.anahtar = anahtar
+        self.token = token
+        # Slot alınırken dolu olan slot sayısı (bu istek dahil) ve sınır
+        self.kullanim = kullanim
+        self.sinir = sinir
+
+
+class _Taban:
+    """Uç noktanın bu süreçte gözlenen olağan gecikmesi"""
+
+    __slots__ = ('gecikme', 'gozlem')
+
+    def __init__(self, gecikme: float):
+        self.gecikme = gecikme
+        self.gozlem = 1
+
+
+class AdaptiveConcurrencyLimiter:
+    """Redis üzerinde slot kiralayan, sınırı AIMD ile ayarlanan eşzamanlılık sınırlayıcı"""
+
+    def __init__(self, name: str, initial_limit: int = None, min_limit: int = None, max_limit: int = None,
+                 latency_tolerance: float = None, decrease_interval: float = None,
+                 decrease_factor: float = None, lease_timeout: float = None):
+        self.name = name
+        self.min_limit = max(1, min_limit or getattr(settings, 'CONCURRENCY_LIMIT_MIN', 2))
+        self.max_limit = max(self.min_limit, max_limit or getattr(settings, 'CONCURRENCY_LIMIT_MAX', 64))
+        initial_limit = initial_limit or getattr(settings, 'CONCURRENCY_LIMIT_INITIAL', 16)
+        self.initial_limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.latency_tolerance = latency_tolerance or getattr(settings, 'CONCURRENCY_LIMIT_LATENCY_TOLERANCE', 2.0)
+        self.decrease_interval = decrease_interval or getattr(settings, 'CONCURRENCY_LIMIT_DECREASE_INTERVAL', 2.0)
+        self.decrease_factor = decrease_factor or getattr(settings, 'CONCURRENCY_LIMIT_DECREASE_FACTOR', 0.7)
+        # Slot, sahibi bırakmadan çökerse bu süre sonunda düşer; en uzun istekten uzun olmalı
+        self.lease_timeout = lease_timeout or getattr(settings, 'DSI_API_TIMEOUT', 30) + 10
+        self.seritler = {**VARSAYILAN_SERITLER, **getattr(settings, 'CONCURRENCY_LIMIT_LANES', {})}
+        self._prefix = f"limiter:{name}"
+        self._slot_keys = [f"{self._prefix}:slot:{i}" for i in range(self.max_limit)]
+        self._tabanlar: Dict[str, _Taban] = {}
+        self._taban_kilidi = threading.Lock()
+
+    @property
+    def _limit_key(self):
+        return f"{self._prefix}:sinir"
+
+    @property
+    def _decrease_key(self):
+        return f"{self._prefix}:azaltma"
+
+    def limit(self) -> float:
+        """Güncel eşzamanlılık sınırı"""
+        try:
+            deger = cache.get(self._limit_key)
+            if deger is None:
+                cache.add(self._limit_key, self.initial_limit * _OLCEK, timeout=None)
+                deger = cache.get(self._limit_key, self.initial_limit * _OLCEK)
+        except Exception as e:
+            logger.warning(f"Eşzamanlılık sınırı okunamadı ({self.name}): {str(e)}")
+            return float(self.initial_limit)
+        return min(max(deger / _OLCEK, self.min_limit), self.max_limit)
+
+    def _serit_ayari(self, serit: str) -> Tuple[float, float]:
+        return self.seritler.get(serit, self.seritler[NORMAL])
+
+    def _bekleme_son_ani(self, serit: str) -> Tuple[float, bool]:
+        """Slot beklemesinin bitiş anı ve bu anı istek süre sınırının belirleyip belirlemediği"""
+        _, bekleme = self._serit_ayari(serit)
+        son_an = time.monotonic() + bekleme
+        istek_siniri = istek_son_ani()
+        if istek_siniri is not None and istek_siniri < son_an:
+            return istek_siniri, True
+        return son_an, False
+
+    def _dene(self, serit: str, token: str) -> Optional[_Kira]:
+        """Boş slot kiralamayı bir kez dene; şeridin payı doluysa None"""
+        sinir = int(self.limit())
+        pay, _ = self._serit_ayari(serit)
+        # Sınır küçülürken üstteki slotlar da dolu sayılsın diye tüm slotlara bakılır
+        dolu = cache.get_many(self._slot_keys)
+        if len(dolu) >= max(1, math.floor(sinir * pay)):
+            return None
+        bos = [anahtar for anahtar in self._slot_keys[:sinir] if anahtar not in dolu]
+        random.shuffle(bos)
+        for anahtar in bos:
+            if cache.add(anahtar, token, timeout=self.lease_timeout):
+                return _Kira(anahtar, token, len(dolu) + 1, sinir)
+        return None
+
+    def acquire(self, etiket: str = None) -> _Kira:
+        """
+        Aktif şerit için slot kirala; gerekirse şeridin bekleme süresi kadar bekle
+
+        Raises:
+            ConcurrencyLimitError: Bekleme süresi içinde slot boşalmazsa
+            DeadlineExceeded: Bekleme sırasında istek süre sınırı dolarsa
+        """
+        serit = aktif_serit()
+        son_an, istek_siniri = self._bekleme_son_ani(serit)
+        token = uuid.uuid4().hex
+        aralik = 0.02
+        while True:
+            try:
+                kira = self._dene(serit, token)
+            except Exception as e:
+                # Paylaşılan durum yoksa sınırlamadan devam et
+                logger.warning(f"Eşzamanlılık slotu alınamadı, sınırsız devam ediliyor ({self.name}): {str(e)}")
+                return _kiralandi(_Kira(None, token, 0, 0))
+            if kira is not None:
+                return _kiralandi(kira)
+            kalan = son_an - time.monotonic()
+            if kalan <= 0:
+                logger.warning(f"Eşzamanlılık sınırı dolu ({self.name}, {serit} şeridi)")
+                if istek_siniri:
+                    raise DeadlineExceeded(etiket or self.name)
+                raise ConcurrencyLimitError(self.name, serit, etiket)
+            time.sleep(min(aralik, kalan) * random.uniform(0.5, 1))
+            aralik = min(aralik * 2, 0.25)
+
+    def _yavas_mi(self, uc: Optional[str], sure: float) -> bool:
+        """Süre uç noktanın olağan gecikmesini belirgin aşıyor mu; tabanı günceller"""
+        if uc is None:
+            return False
+        with self._taban_kilidi:
+            taban = self._tabanlar.get(uc)
+            if taban is None:
+                self._tabanlar[uc] = _Taban(sure)
+                return False
+            yavas = taban.gozlem >= TABAN_ASGARI_GOZLEM and sure > taban.gecikme * self.latency_tolerance
+            # Upstream kalıcı olarak yavaşlarsa taban da yavaşça yeni düzeye gelir
+            taban.gecikme += (sure - taban.gecikme) * TABAN_AGIRLIGI
+            taban.gozlem += 1
+        return yavas
+
+    def release(self, kira: _Kira, sure: float = 0.0, asiri_yuk: bool = None, uc: str = None) -> None:
+        """
+        Slotu bırak ve sonucu sınıra yansıt
+
+        Args:
+            kira: acquire() ile alınan slot
+            sure: Çağrının süresi (saniye)
+            asiri_yuk: Upstream aşırı yük belirtisi gösterdiyse True, sonuç
+                upstream hakkında bilgi vermiyorsa None (ör. slot beklerken süre sınırı doldu)
+            uc: Çağrılan uç nokta; süre bu uç noktanın olağan gecikmesiyle karşılaştırılır
+        """
+        if kira.anahtar is None:
+            return
+        try:
+            if cache.get(kira.anahtar) == kira.token:
+                cache.delete(kira.anahtar)
+        except Exception as e:
+            logger.warning(f"Eşzamanlılık slotu bırakılamadı ({self.name}): {str(e)}")
+            return
+        if asiri_yuk is None:
+            return
+        if asiri_yuk or self._yavas_mi(uc, sure):
+            self._decrease()
+        elif kira.kullanim * 2 >= kira.sinir:
+            self._increase(kira.sinir)
+
+    def _increase(self, sinir: int) -> None:
+        try:
+            deger = cache.incr(self._limit_key, max(1, _OLCEK // max(sinir, 1)))
+            if deger > self.max_limit * _OLCEK:
+                cache.set(self._limit_key, self.max_limit * _OLCEK, timeout=None)
+        except ValueError:
+            # Anahtar düşmüşse limit() başlangıç değeriyle yeniden oluşturur
+            self.limit()
+        except Exception as e:
+            logger.warning(f"Eşzamanlılık sınırı artırılamadı ({self.name}): {str(e)}")
+
+    def _decrease(self) -> None:
+        try:
+            if not cache.add(self._decrease_key, 1, timeout=self.decrease_interval):
+                return
+            onceki = self.limit()
+            yeni = max(self.min_limit, onceki * self.decrease_factor)
+            cache.set(self._limit_key, int(yeni * _OLCEK), timeout=None)
+        except Exception as e:
+            logger.warning(f"Eşzamanlılık sınırı azaltılamadı ({self.name}): {str(e)}")
+            return
+        logger.warning(f"Eşzamanlılık sınırı azaltıldı ({self.name}): {onceki:.1f} -> {yeni:.1f}")
+
+    @staticmethod
+    def _asiri_yuk_mu(response=None, hata: BaseException = None) -> Optional[bool]:
+        if hata is not None:
+            return True if isinstance(hata, ASIRI_YUK_HATALARI) else None
+        return response.status_code in ASIRI_YUK_DURUMLARI
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Çağrıyı bir slot kiralayarak yap
+
+        kwargs içindeki etiket hata mesajında kullanılır ve çağrıya aynen geçirilir;
+        uc (uç nokta adı) çağrıya geçirilmez, gecikme tabanı için kullanılır.
+        Akış halinde açılan yanıtlarda slot başlıklar gelince bırakılır; DSİ (ABP)
+        yanıtı göndermeye başlamadan önce sonucu tamamen hazırlar.
+
+        Raises:
+            ConcurrencyLimitError: Şeridin payına düşen slot bulunamazsa
+        """
+        uc = kwargs.pop('uc', None)
+        kira = self.acquire(kwargs.get('etiket'))
+        baslangic = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+        except BaseException as e:
+            self.release(kira, time.perf_counter() - baslangic, self._asiri_yuk_mu(hata=e), uc)
+            raise
+        self.release(kira, time.perf_counter() - baslangic, self._asiri_yuk_mu(response), uc)
+        return response
+
+    async def acquire_async(self, etiket: str = None) -> _Kira:
+        """acquire() metodunun asenkron karşılığı"""
+        serit = aktif_serit()
+        son_an, istek_siniri = self._bekleme_son_ani(serit)
+        token = uuid.uuid4().hex
+        aralik = 0.02
+        dene = sync_to_async(self._dene, thread_sensitive=False)
+        while True:
+            try:
+                kira = await dene(serit, token)
+            except Exception as e:
+                logger.warning(f"Eşzamanlılık slotu alınamadı, sınırsız devam ediliyor ({self.name}): {str(e)}")
+                return _kiralandi(_Kira(None, token, 0, 0))
+            if kira is not None:
+                return _kiralandi(kira)
+            kalan = son_an - time.monotonic()
+            if kalan <= 0:
+                logger.warning(f"Eşzamanlılık sınırı dolu ({self.name}, {serit} şeridi)")
+                if istek_siniri:
+                    raise DeadlineExceeded(etiket or self.name)
+                raise ConcurrencyLimitError(self.name, serit, etiket)
+            await asyncio.sleep(min(aralik, kalan) * random.uniform(0.5, 1))
+            aralik = min(aralik * 2, 0.25)
+
+    async def acall(self, func: Callable[..., Awaitable], *args, **kwargs):
+        """call() metodunun asenkron karşılığı"""
+        uc = kwargs.pop('uc', None)
+        kira = await self.acquire_async(kwargs.get('etiket'))
+        birak = sync_to_async(self.release, thread_sensitive=False)
+        baslangic = time.perf_counter()
+        try:
+            response = await func(*args, **kwargs)
+        except BaseException as e:
+            await birak(kira, time.perf_counter() - baslangic, self._asiri_yuk_mu(hata=e), uc)
+            raise
+        await birak(kira, time.perf_counter() - baslangic, self._asiri_yuk_mu(response), uc)
+        return response
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> AdaptiveConcurrencyLimiter:
+    """İsimle eşzamanlılık sınırlayıcı döndür (süreç başına tek örnek)"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(name, AdaptiveConcurrencyLimiter(name))
+    return limiter
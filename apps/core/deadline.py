@@ -0,0 +1,157 @@
+"""
+İstek süre sınırı (deadline) yayılımı
+
+Gelen her istek için bir bitiş anı belirlenir ve contextvar ile servis
+katmanına taşınır. Harici servis çağrıları zaman aşımlarını bu andan kalan
+süreye göre kısaltır; süre dolmuşsa upstream'e hiç gidilmez ve [SURE_ASIMI]
+(HTTP 504) döner. Mobil istemci vazgeçtikten sonra yapılan iş boşa harcanan
+upstream kapasitesidir.
+
+Bitiş anı DeadlineMiddleware tarafından şu sırayla belirlenir:
+
+- View'ın sure_butcesi niteliği (DRF view sınıfında veya view fonksiyonunda),
+  yoksa ISTEK_SURE_BUTCESI
+- İstemci X-Request-Timeout (saniye) gönderdiyse bu ikisinin küçüğü
+
+Celery görevleri ve yönetim komutları gibi istek dışı bağlamlarda bitiş anı
+yoktur; yalnızca servislerin kendi zaman aşımları ve süre bütçeleri geçerlidir.
+"""
+import contextlib
+import contextvars
+import time
+from typing import Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from .upstream_errors import SURE_ASIMI, hata_mesaji
+
+# Kalan süre bundan azsa yeni upstream çağrısı başlatılmaz (saniye)
+ASGARI_KALAN_SURE = 0.25
+
+_son_an: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('istek_son_ani', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """İstek süre sınırı dolduktan sonra upstream çağrısı yapılmak istendiğinde fırlatılır"""
+
+    kod = SURE_ASIMI
+
+    def __init__(self, etiket: str = None):
+        super().__init__(hata_mesaji(
+            SURE_ASIMI,
+            f"{etiket or 'Harici servis'} çağrısı için istek süresi doldu"
+        ))
+
+
+@contextlib.contextmanager
+def sure_siniri(saniye: Optional[float]):
+    """
+    Blok için süre sınırı koy; dıştaki sınır daha yakınsa o geçerli kalır
+
+    Args:
+        saniye: Bloğun en fazla süresi (None ise sınır değişmez)
+    """
+    onceki = _son_an.get()
+    son_an = onceki
+    if saniye is not None:
+        yeni = time.monotonic() + saniye
+        son_an = yeni if onceki is None else min(onceki, yeni)
+    token = _son_an.set(son_an)
+    try:
+        yield
+    finally:
+        _son_an.reset(token)
+
+
+def son_an() -> Optional[float]:
+    """Bitiş anı (time.monotonic() cinsinden; sınır yoksa None)"""
+    return _son_an.get()
+
+
+def kalan_sure() -> Optional[float]:
+    """Bitiş anına kalan süre (saniye; sınır yoksa None)"""
+    bitis = _son_an.get()
+    return None if bitis is None else bitis - time.monotonic()
+
+
+def sure_doldu() -> bool:
+    """Süre sınırı varsa ve dolmuşsa True"""
+    kalan = kalan_sure()
+    return kalan is not None and kalan < ASGARI_KALAN_SURE
+
+
+def zaman_asimi_mesaji(mesaj: str, etiket: str = None) -> str:
+    """Zaman aşımı istek süre sınırından kaynaklandıysa [SURE_ASIMI] mesajı, değilse mesajın kendisi"""
+    return str(DeadlineExceeded(etiket)) if sure_doldu() else mesaj
+
+
+def zaman_asimlari(okuma: float, baglanti: float, etiket: str = None) -> Tuple[float, float]:
+    """
+    Kalan süreye göre kısaltılmış (bağlantı, okuma) zaman aşımları
+
+    requests'e doğrudan timeout=(bağlantı, okuma) olarak verilebilir.
+
+    Raises:
+        DeadlineExceeded: Süre sınırı dolmuşsa
+    """
+    kalan = kalan_sure()
+    if kalan is not None:
+        if kalan < ASGARI_KALAN_SURE:
+            raise DeadlineExceeded(etiket)
+        okuma = min(okuma, kalan)
+    return min(baglanti, okuma), okuma
+
+
+def _view_butcesi(request) -> Optional[float]:
+    try:
+        eslesme = resolve(request.path_info)
+    except Resolver404:
+        return None
+    view = eslesme.func
+    butce = getattr(view, 'sure_butcesi', None)
+    if butce is None:
+        # DRF as_view() ve api_view ile sarılmış view'larda sınıf niteliği
+        butce = getattr(getattr(view, 'cls', None), 'sure_butcesi', None)
+    return butce
+
+
+def _istemci_suresi(request) -> Optional[float]:
+    deger = request.headers.get('X-Request-Timeout')
+    if not deger:
+        return None
+    try:
+        saniye = float(deger)
+    except ValueError:
+        return None
+    return saniye if saniye > 0 else None
+
+
+class DeadlineMiddleware:
+    """Her istek için süre sınırını belirleyen middleware (WSGI ve ASGI)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def istek_suresi(self, request) -> float:
+        butce = _view_butcesi(request)
+        if butce is None:
+            butce = getattr(settings, 'ISTEK_SURE_BUTCESI', 14)
+        istemci = _istemci_suresi(request)
+        return butce if istemci is None else min(butce, istemci)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with sure_siniri(self.istek_suresi(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with sure_siniri(self.istek_suresi(request)):
+            return await self.get_response(request)
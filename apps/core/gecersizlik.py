@@ -0,0 +1,143 @@
+"""
+Süreç içi önbellekler için Redis pub/sub geçersiz kılma kanalı
+
+Bir worker paylaşılan önbelleğe (L2) yeni değer yazdığında değişen anahtarları
+kanala yayınlar; tüm worker ve sunuculardaki dinleyiciler kendi süreç içi
+(L1) kopyalarını siler. Yayını yapan süreç kendi mesajını yok sayar, çünkü
+yerel kopyasını zaten yeni değerle günceller.
+
+Mesajlar kalıcı değildir: bağlantı koptuğunda kaçan geçersiz kılmalar
+bilinemeyeceğinden dinleyiciler her (yeniden) abonelikte tüm yerel kopyaları
+atar ve abonelik yokken etkin() False döner; L1 kullanan kod bu durumda
+doğrudan L2'ye gider. Gunicorn/Celery fork'larında dinleyici thread'i her
+süreçte ilk kullanımda yeniden başlatılır.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KANAL_ON_EKI = 'dsi_mobil:gecersizlik'
+# Bağlantı koptuğunda en uzun yeniden deneme aralığı (saniye)
+AZAMI_BEKLEME = 30
+
+# Dinleyiciye None verilirse tüm yerel kopyalar atılmalıdır
+Dinleyici = Callable[[Optional[List[str]]], None]
+
+
+class GecersizlikKanali:
+    """Anahtar geçersiz kılmalarını süreçler arasında yayınlayan kanal"""
+
+    def __init__(self, ad: str):
+        self.ad = ad
+        self.kanal = f"{KANAL_ON_EKI}:{ad}"
+        self._dinleyiciler: List[Dinleyici] = []
+        self._kilit = threading.Lock()
+        self._pid = None
+        self._kaynak = None
+        self._istemci = None
+        self._abone = False
+
+    def _redis(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.REDIS_URL, health_check_interval=30)
+
+    def _baslat(self) -> None:
+        """Bu süreçte dinleyici thread'i yoksa başlat"""
+        if self._pid == os.getpid():
+            return
+        with self._kilit:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._kaynak = uuid.uuid4().hex
+            self._istemci = self._redis()
+            self._abone = False
+            threading.Thread(target=self._dinle, name=f'gecersizlik-{self.ad}', daemon=True).start()
+
+    def abone_ol(self, dinleyici: Dinleyici) -> None:
+        """Geçersiz kılınan anahtar listesiyle çağrılacak fonksiyonu kaydet"""
+        self._dinleyiciler.append(dinleyici)
+
+    def etkin(self) -> bool:
+        """Kanal dinleniyor mu (değilse yerel kopyalar kullanılmamalı)"""
+        self._baslat()
+        return self._abone
+
+    def yayinla(self, anahtarlar: List[str]) -> None:
+        """Anahtarları diğer süreçlerde geçersiz kıl"""
+        if not anahtarlar:
+            return
+        self._baslat()
+        try:
+            self._istemci.publish(self.kanal, json.dumps({'kaynak': self._kaynak, 'anahtarlar': anahtarlar}))
+        except Exception as e:
+            logger.warning(f"Geçersiz kılma yayınlanamadı ({self.ad}): {str(e)}")
+
+    def _bildir(self, anahtarlar: Optional[List[str]]) -> None:
+        for dinleyici in self._dinleyiciler:
+            try:
+                dinleyici(anahtarlar)
+            except Exception as e:
+                logger.error(f"Geçersiz kılma dinleyici hatası ({self.ad}): {str(e)}")
+
+    def _isle(self, veri) -> None:
+        try:
+            mesaj = json.loads(veri)
+        except (TypeError, ValueError):
+            logger.warning(f"Geçersiz kılma mesajı çözülemedi ({self.ad})")
+            return
+        if mesaj.get('kaynak') != self._kaynak:
+            self._bildir(mesaj.get('anahtarlar') or [])
+
+    def _dinle(self) -> None:
+        bekleme = 1
+        uyarildi = False
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._istemci.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.kanal)
+                # Abonelik yokken kaçan mesajlar bilinemez
+                self._bildir(None)
+                self._abone = True
+                bekleme, uyarildi = 1, False
+                logger.info(f"Geçersiz kılma kanalı dinleniyor: {self.kanal}")
+                for mesaj in pubsub.listen():
+                    if mesaj['type'] == 'message':
+                        self._isle(mesaj['data'])
+            except Exception as e:
+                # Redis erişilemezken her denemede değil, yalnızca ilk hatada uyar
+                (logger.debug if uyarildi else logger.warning)(
+                    f"Geçersiz kılma kanalı dinlenemiyor ({self.ad}): {str(e)}"
+                )
+                uyarildi = True
+            finally:
+                self._abone = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(bekleme)
+            bekleme = min(bekleme * 2, AZAMI_BEKLEME)
+
+
+_kanallar: Dict[str, GecersizlikKanali] = {}
+_kanallar_lock = threading.Lock()
+
+
+def get_kanal(ad: str) -> GecersizlikKanali:
+    """İsimle geçersiz kılma kanalı döndür (süreç başına tek örnek)"""
+    kanal = _kanallar.get(ad)
+    if kanal is None:
+        with _kanallar_lock:
+            kanal = _kanallar.setdefault(ad, GecersizlikKanali(ad))
+    return kanal
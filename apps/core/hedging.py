@@ -0,0 +1,279 @@
+"""
+İdempotent okumalar için yedek (hedged) istekler
+
+Uzun kuyruk gecikmesi çoğunlukla tek bir yavaş düğüm veya bağlantıdan
+kaynaklanır. İlk deneme gecikme eşiği içinde dönmezse aynı istek bir kez daha
+gönderilir; önce başarılı dönen yanıt kullanılır, diğeri bırakılır. Eşik
+HEDGE_DELAY ile sabitlenebilir; 0 ise uç noktanın bu süreçte gözlenen yanıt
+sürelerinin HEDGE_PERCENTILE. yüzdeliğidir (yeterli gözlem yokken yedek
+istek gönderilmez).
+
+Yedek istekler:
+
+- yalnızca idempotent okumalarda kullanılmalıdır,
+- servis başına dakikada HEDGE_BUDGET_PER_MINUTE ile sınırlıdır (sayaç Django
+  cache (Redis) üzerinden tüm worker'larda ortaktır),
+- eşzamanlılık sınırlayıcıda YEDEK şeridinden slot alır; slot hemen yoksa
+  gönderilmez, upstream zaten doluyken ek yük bindirilmez. Gönderilemeyen
+  yedek isteğin bütçe hakkı iade edilir; 'gonderildi' yalnızca slot
+  alındığında sayılır, şeritten reddedilenler 'serit_dolu' olarak sayılır.
+
+Senkron çağrılarda iki deneme de thread havuzunda çalışır. requests ile
+başlamış bir istek kesilemediğinden kaybeden deneme kendi zaman aşımı içinde
+tamamlanır ve yanıtı kapatılıp atılır. Asenkron çağrılarda kaybeden görev
+iptal edilir, bağlantısı hemen kapanır.
+"""
+import asyncio
+import collections
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, Optional
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .concurrency_limiter import YEDEK, ConcurrencyLimitError, oncelik, slot_alininca
+from .metrics import upstream_yedek
+
+logger = logging.getLogger(__name__)
+
+# Yüzdelik hesabında tutulan son gözlem sayısı
+GOZLEM_PENCERESI = 200
+# Bundan az gözlem varken eşik hesaplanmaz (yedek istek gönderilmez)
+ASGARI_GOZLEM = 20
+# Gözlenen yüzdelik ne kadar küçük olursa olsun eşik bundan kısa olmaz (saniye)
+ASGARI_GECIKME = 0.05
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_thread_semaforu: Optional[threading.BoundedSemaphore] = None
+
+
+def _havuz():
+    """Senkron denemeleri çalıştıran, süreç genelinde paylaşılan thread havuzu"""
+    global _executor, _thread_semaforu
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                boyut = getattr(settings, 'HEDGE_MAX_THREADS', 32)
+                _thread_semaforu = threading.BoundedSemaphore(boyut)
+                _executor = ThreadPoolExecutor(max_workers=boyut, thread_name_prefix='hedge')
+    return _executor, _thread_semaforu
+
+
+def _basarili_mi(gorev) -> bool:
+    """Deneme kullanılabilir bir yanıtla bitti mi (istisna ve 5xx değil)"""
+    if gorev.cancelled() or gorev.exception() is not None:
+        return False
+    return gorev.result().status_code < 500
+
+
+def _yaniti_kapat(gorev: Future) -> None:
+    if not gorev.cancelled() and gorev.exception() is None:
+        gorev.result().close()
+
+
+def _yaniti_kapat_async(gorev: asyncio.Future) -> None:
+    if not gorev.cancelled() and gorev.exception() is None:
+        asyncio.ensure_future(gorev.result().aclose())
+
+
+class HedgePolicy:
+    """Gecikme eşiğini aşan denemeler için bütçeli yedek istek politikası"""
+
+    def __init__(self, servis: str, endpoint: str, enabled: bool = None, delay: float = None,
+                 percentile: float = None, budget_per_minute: int = None):
+        self.servis = servis
+        self.endpoint = endpoint
+        self.name = f"{servis}:{endpoint}"
+        self.enabled = enabled if enabled is not None else getattr(settings, 'HEDGE_ENABLED', False)
+        self.delay = delay if delay is not None else getattr(settings, 'HEDGE_DELAY', 0)
+        self.percentile = percentile or getattr(settings, 'HEDGE_PERCENTILE', 95)
+        self.budget_per_minute = (
+            budget_per_minute if budget_per_minute is not None
+            else getattr(settings, 'HEDGE_BUDGET_PER_MINUTE', 60)
+        )
+        self._sureler = collections.deque(maxlen=GOZLEM_PENCERESI)
+        self._lock = threading.Lock()
+
+    def gecikme(self) -> Optional[float]:
+        """Yedek isteğin gönderileceği eşik (saniye); yeterli gözlem yoksa None"""
+        if self.delay > 0:
+            return self.delay
+        with self._lock:
+            if len(self._sureler) < ASGARI_GOZLEM:
+                return None
+            sirali = sorted(self._sureler)
+        sira = min(len(sirali) - 1, int(len(sirali) * self.percentile / 100))
+        return max(sirali[sira], ASGARI_GECIKME)
+
+    def _gozlemle(self, sure: float) -> None:
+        with self._lock:
+            self._sureler.append(sure)
+
+    def _butce_al(self) -> Optional[str]:
+        """Bu dakikanın yedek istek bütçesinden bir hak al; hak alındıysa iade için sayaç anahtarı"""
+        anahtar = f"hedge:{self.servis}:{int(time.time() // 60)}"
+        try:
+            cache.add(anahtar, 0, timeout=120)
+            kullanilan = cache.incr(anahtar)
+        except Exception as e:
+            logger.warning(f"Yedek istek bütçesi okunamadı ({self.servis}): {str(e)}")
+            return None
+        if kullanilan > self.budget_per_minute:
+            upstream_yedek.labels(self.servis, self.endpoint, 'butce_asildi').inc()
+            return None
+        return anahtar
+
+    def _butceyi_iade_et(self, anahtar: str) -> None:
+        try:
+            cache.decr(anahtar)
+        except Exception:
+            # Sayaç düşmüşse yeni dakikanın bütçesi zaten tam
+            pass
+
+    def _gonderildi(self, gecikme: float, etiket: Optional[str]) -> None:
+        upstream_yedek.labels(self.servis, self.endpoint, 'gonderildi').inc()
+        logger.info(f"{etiket or self.name} {gecikme:.2f} sn içinde yanıt vermedi, yedek istek gönderildi")
+
+    def _reddedildi(self, butce: str) -> None:
+        """Yedek istek şeritte slot bulamadı, gönderilmedi"""
+        self._butceyi_iade_et(butce)
+        upstream_yedek.labels(self.servis, self.endpoint, 'serit_dolu').inc()
+
+    def _sonuclandir(self, kazanan, ilk, baslangic: float) -> None:
+        # Kaybeden ilk denemenin süresi bilinmez; en az bu kadar sürdüğü gözlem olarak kaydedilir
+        self._gozlemle(time.perf_counter() - baslangic)
+        if kazanan is not ilk:
+            upstream_yedek.labels(self.servis, self.endpoint, 'kazandi').inc()
+
+    def _yedek(self, func: Callable, butce: str, gecikme: float, etiket: Optional[str]):
+        with oncelik(YEDEK), slot_alininca(lambda: self._gonderildi(gecikme, etiket)):
+            try:
+                return func()
+            except ConcurrencyLimitError:
+                self._reddedildi(butce)
+                raise
+
+    def call(self, func: Callable[[], requests.Response], etiket: str = None) -> requests.Response:
+        """
+        Denemeyi yap; eşik aşılırsa yedek istek gönder ve önce başarılı döneni kullan
+
+        Args:
+            func: Tek deneme yapıp yanıt döndüren fonksiyon
+            etiket: Log mesajlarında kullanılacak ad
+
+        Returns:
+            Kazanan yanıt; iki deneme de başarısızsa ilk denemenin yanıtı (veya istisnası)
+        """
+        gecikme = self.gecikme() if self.enabled else None
+        executor, semafor = _havuz()
+        baslangic = time.perf_counter()
+        if gecikme is None or not semafor.acquire(blocking=False):
+            response = func()
+            if self.enabled:
+                self._gozlemle(time.perf_counter() - baslangic)
+            return response
+
+        # Thread'ler çağıranın bağlamını (öncelik şeridi, süre sınırı) kopyasında çalıştırır
+        baglam = contextvars.copy_context()
+
+        def gonder(*args) -> Future:
+            gorev = executor.submit(baglam.copy().run, *args)
+            gorev.add_done_callback(lambda _: semafor.release())
+            return gorev
+
+        ilk = gonder(func)
+        wait([ilk], timeout=gecikme)
+        yedek = None
+        # Thread yoksa bütçe harcanmaz
+        if not ilk.done() and semafor.acquire(blocking=False):
+            butce = self._butce_al()
+            if butce:
+                yedek = gonder(self._yedek, func, butce, gecikme, etiket)
+            else:
+                semafor.release()
+        if yedek is None:
+            try:
+                return ilk.result()
+            finally:
+                self._gozlemle(time.perf_counter() - baslangic)
+
+        kazanan = None
+        bekleyenler = {ilk, yedek}
+        while bekleyenler and kazanan is None:
+            _, bekleyenler = wait(bekleyenler, return_when=FIRST_COMPLETED)
+            kazanan = next((g for g in (ilk, yedek) if g.done() and _basarili_mi(g)), None)
+        kazanan = kazanan or ilk
+        self._sonuclandir(kazanan, ilk, baslangic)
+        for gorev in (ilk, yedek):
+            if gorev is not kazanan:
+                gorev.add_done_callback(_yaniti_kapat)
+        return kazanan.result()
+
+    async def acall(self, func: Callable[[], Awaitable], etiket: str = None):
+        """call() metodunun asenkron karşılığı (kaybeden deneme iptal edilir)"""
+        gecikme = self.gecikme() if self.enabled else None
+        baslangic = time.perf_counter()
+        if gecikme is None:
+            response = await func()
+            if self.enabled:
+                self._gozlemle(time.perf_counter() - baslangic)
+            return response
+
+        ilk = asyncio.ensure_future(func())
+        gorevler = [ilk]
+        kazanan = None
+        try:
+            await asyncio.wait([ilk], timeout=gecikme)
+            if not ilk.done():
+                butce = await sync_to_async(self._butce_al, thread_sensitive=False)()
+                if butce:
+                    gorevler.append(asyncio.ensure_future(self._yedek_async(func, butce, gecikme, etiket)))
+            if len(gorevler) == 1:
+                kazanan = ilk
+                try:
+                    return await ilk
+                finally:
+                    self._gozlemle(time.perf_counter() - baslangic)
+
+            bekleyenler = set(gorevler)
+            while bekleyenler and kazanan is None:
+                _, bekleyenler = await asyncio.wait(bekleyenler, return_when=asyncio.FIRST_COMPLETED)
+                kazanan = next((g for g in gorevler if g.done() and _basarili_mi(g)), None)
+            kazanan = kazanan or ilk
+            self._sonuclandir(kazanan, ilk, baslangic)
+            return kazanan.result()
+        finally:
+            # Kaybeden (veya çağıran iptal edildiyse tüm) denemeler iptal edilir; bitmiş olanın yanıtı kapatılır
+            for gorev in gorevler:
+                if gorev is not kazanan:
+                    gorev.cancel()
+                    gorev.add_done_callback(_yaniti_kapat_async)
+
+    async def _yedek_async(self, func: Callable[[], Awaitable], butce: str, gecikme: float, etiket: Optional[str]):
+        with oncelik(YEDEK), slot_alininca(lambda: self._gonderildi(gecikme, etiket)):
+            try:
+                return await func()
+            except ConcurrencyLimitError:
+                await sync_to_async(self._reddedildi, thread_sensitive=False)(butce)
+                raise
+
+
+_hedgers: Dict[str, HedgePolicy] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(servis: str, endpoint: str) -> HedgePolicy:
+    """Servis uç noktasının yedek istek politikasını döndür (süreç başına tek örnek)"""
+    anahtar = f"{servis}:{endpoint}"
+    hedger = _hedgers.get(anahtar)
+    if hedger is None:
+        with _hedgers_lock:
+            hedger = _hedgers.setdefault(anahtar, HedgePolicy(servis, endpoint))
+    return hedger
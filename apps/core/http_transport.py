@@ -0,0 +1,180 @@
+"""
+Süreç genelinde paylaşılan HTTP transport katmanı
+
+Her harici servis için süreç başına tek bir HTTPAdapter (urllib3 bağlantı havuzu)
+oluşturulur. requests.Session nesneleri thread-safe olmadığından her thread kendi
+session'ını kullanır, ancak tüm session'lar aynı adapter'ı paylaştığı için TCP/TLS
+bağlantıları thread'ler arasında yeniden kullanılır.
+"""
+import os
+import socket
+import threading
+import logging
+from http.cookiejar import DefaultCookiePolicy
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Yük dengeleyici yapışkanlık (persistence) çerezlerinin önekleri (F5 BIG-IP)
+YAPISKANLIK_CEREZLERI = ('BIGipServer',)
+
+_lock = threading.Lock()
+_adapters: Dict[str, HTTPAdapter] = {}
+_session_hooks: Dict[str, Callable[[requests.Session], None]] = {}
+_local = threading.local()
+# Fork sonrası eski session'ları geçersiz kılmak için nesil sayacı
+_generation = 0
+
+
+class _KeepAliveHTTPAdapter(HTTPAdapter):
+    """TCP keep-alive soket seçeneklerini uygulayan adapter"""
+
+    def __init__(self, *args, tcp_keepalive: bool = True, **kwargs):
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.tcp_keepalive:
+            from urllib3.connection import HTTPConnection
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            kwargs['socket_options'] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class YapiskanlikCerezPolitikasi(DefaultCookiePolicy):
+    """
+    Yük dengeleyicinin düğüm yapışkanlığı çerezlerini saklamayan çerez politikası
+
+    Bu çerezler saklanırsa thread'in session'ı (ve tüm istekleri) ilk yanıt veren
+    arka uç düğüme bağlanır; upstream havuzundaki seçim ve dışlama işe yaramaz.
+    Diğer çerezler (ör. WAF oturum çerezleri) olduğu gibi saklanır.
+    """
+
+    def set_ok(self, cookie, request):
+        if cookie.name.startswith(YAPISKANLIK_CEREZLERI):
+            return False
+        return super().set_ok(cookie, request)
+
+
+def _adapter_olustur(pool_connections: int, pool_maxsize: int, max_retries: int,
+                     tcp_keepalive: bool) -> HTTPAdapter:
+    """Havuz ayarlarıyla yeni bir adapter oluştur"""
+    # Sadece bağlantı kurulumu hatalarında tekrar dene; istek gönderildikten sonra
+    # (okuma/status) tekrar denemek POST çağrılarında güvenli değil.
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=0.1,
+        raise_on_status=False,
+    )
+    return _KeepAliveHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=False,
+        tcp_keepalive=tcp_keepalive,
+    )
+
+
+def configure(name: str, pool_connections: int = 4, pool_maxsize: int = 10,
+              max_retries: int = 0, tcp_keepalive: bool = True,
+              session_hook: Optional[Callable[[requests.Session], None]] = None) -> None:
+    """
+    Bir transport profilini tanımla (süreç başına bir kez)
+
+    Args:
+        name: Profil adı (ör. 'dsi')
+        pool_connections: Önbelleğe alınacak host havuzu sayısı
+        pool_maxsize: Host başına tutulacak en fazla bağlantı sayısı
+        max_retries: Bağlantı kurulumu hatalarında tekrar deneme sayısı
+        tcp_keepalive: Soketlerde SO_KEEPALIVE kullanılsın mı
+        session_hook: Yeni oluşturulan her session'a uygulanacak fonksiyon
+    """
+    with _lock:
+        if name in _adapters:
+            return
+        _adapters[name] = _adapter_olustur(pool_connections, pool_maxsize, max_retries, tcp_keepalive)
+        if session_hook:
+            _session_hooks[name] = session_hook
+        logger.info(f"HTTP transport profili oluşturuldu: {name} (pool_maxsize={pool_maxsize})")
+
+
+def get_session(name: str) -> requests.Session:
+    """
+    Çağıran thread için profile ait session'ı döndür
+
+    Args:
+        name: configure() ile tanımlanmış profil adı
+
+    Returns:
+        requests.Session: Paylaşılan bağlantı havuzunu kullanan session
+    """
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None or getattr(_local, 'generation', None) != _generation:
+        sessions = _local.sessions = {}
+        _local.generation = _generation
+
+    session = sessions.get(name)
+    if session is not None:
+        return session
+
+    with _lock:
+        adapter = _adapters.get(name)
+        hook = _session_hooks.get(name)
+    if adapter is None:
+        raise KeyError(f"Tanımlanmamış HTTP transport profili: {name}")
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    session.headers['Connection'] = 'keep-alive'
+    if hook:
+        hook(session)
+    sessions[name] = session
+    return session
+
+
+def close_all() -> None:
+    """Tüm bağlantı havuzlarını kapat (worker kapanırken çağrılır)"""
+    global _generation
+    with _lock:
+        for adapter in _adapters.values():
+            try:
+                adapter.close()
+            except Exception as e:
+                logger.warning(f"HTTP adapter kapatma hatası: {str(e)}")
+        _generation += 1
+
+
+def reset_after_fork() -> None:
+    """
+    Fork sonrası çocuk süreçte havuzları sıfırla
+
+    Ebeveyn süreçten devralınan soketler paylaşılmamalıdır; adapter'lar aynı
+    ayarlarla yeniden oluşturulur ve eski session'lar geçersiz kılınır.
+    """
+    global _lock, _generation
+    _lock = threading.Lock()
+    for name, adapter in list(_adapters.items()):
+        retry = adapter.max_retries
+        _adapters[name] = _KeepAliveHTTPAdapter(
+            pool_connections=adapter._pool_connections,
+            pool_maxsize=adapter._pool_maxsize,
+            max_retries=retry,
+            pool_block=adapter._pool_block,
+            tcp_keepalive=adapter.tcp_keepalive,
+        )
+    _generation += 1
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
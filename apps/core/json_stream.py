@@ -0,0 +1,285 @@
+"""
+Artımlı (streaming) JSON tarayıcı
+
+Büyük JSON yanıtlarını tamamını belleğe almadan tarar. Hedef yoldaki string
+alanın içeriği (JsonAlanAkisi) veya dizinin elemanları (JsonDiziAkisi) parça
+parça dışarı verilir; diğer küçük skaler değerler yol bazında toplanır
+(ör. ('success',), ('error', 'message')).
+
+Tarayıcı doğrulayıcı değildir; upstream'in geçerli JSON döndürdüğü varsayılır.
+"""
+import codecs
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Hedef dışındaki string değerler için toplanacak en fazla karakter
+MAKS_DEGER_UZUNLUGU = 64 * 1024
+
+_BOSLUK = ' \t\r\n'
+_SKALER_SONU = ',}] \t\r\n'
+_DIZI_SKALER_SONU = ',] \t\r\n'
+_KACISLAR = {
+    '"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'
+}
+
+
+class JsonAkisHatasi(ValueError):
+    """JSON akışı beklenmedik şekilde bittiğinde fırlatılır"""
+
+
+class _DiziElemanlari:
+    """
+    Dizi içindeki elemanları tamamlandıkça çözer
+
+    Yalnızca henüz tamamlanmamış son eleman tamponda tutulur; tamamlanan
+    elemanlar json.JSONDecoder.raw_decode ile çözülür.
+    """
+
+    def __init__(self):
+        self._tampon = ''
+        self._cozucu = json.JSONDecoder()
+
+    def tara(self, metin: str, i: int, cikti: list) -> Tuple[int, bool]:
+        """
+        Returns:
+            Tuple[int, bool]: (metinde kalınan konum, dizi bitti mi)
+        """
+        tampon = self._tampon + metin[i:] if self._tampon else metin[i:]
+        konum, n = 0, len(tampon)
+        while True:
+            while konum < n and tampon[konum] in _BOSLUK + ',':
+                konum += 1
+            if konum >= n:
+                break
+            if tampon[konum] == ']':
+                # Dizi bitti; kalan metni temel tarayıcıya bırak
+                self._tampon = ''
+                return len(metin) - (n - konum - 1), True
+            try:
+                eleman, son = self._cozucu.raw_decode(tampon, konum)
+            except ValueError:
+                # Eleman henüz tamamlanmadı
+                break
+            if not isinstance(eleman, (dict, list, str)) and (son >= n or tampon[son] not in _DIZI_SKALER_SONU):
+                # Skaler ancak ayraçla biter; "10." gibi parça sonunda kesilmiş
+                # bir sayı "10" olarak çözülmesin diye devamı beklenir
+                break
+            cikti.append(eleman)
+            konum = son
+        self._tampon = tampon[konum:]
+        return len(metin), False
+
+
+class JsonAlanAkisi:
+    """Tek bir string alanı akış halinde çıkaran JSON tarayıcı"""
+
+    # True ise hedef yoldaki değer dizi olarak beklenir ve elemanları döndürülür
+    DIZI_HEDEFI = False
+
+    def __init__(self, hedef_yol: Tuple):
+        self.hedef_yol = tuple(hedef_yol)
+        self.degerler: Dict[Tuple, Any] = {}
+        self.hedef_basladi = False
+        self.hedef_bitti = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        # Her çerçeve [tip, anahtar/indeks]; tip 'o' (object) veya 'a' (array)
+        self._yigin: List[list] = []
+        self._anahtar_bekleniyor = False
+        self._dize: Optional[List[str]] = None
+        self._dize_uzunlugu = 0
+        self._dize_anahtar = False
+        self._hedefte = False
+        self._kacis: Optional[str] = None
+        self._vekil: Optional[str] = None
+        self._skaler: Optional[List[str]] = None
+        self._dizi: Optional[_DiziElemanlari] = None
+
+    def deger(self, *yol, varsayilan=None):
+        """Toplanan skaler değeri yol ile döndür"""
+        return self.degerler.get(tuple(yol), varsayilan)
+
+    def _yol(self) -> Tuple:
+        return tuple(cerceve[1] for cerceve in self._yigin)
+
+    def besle(self, veri: bytes) -> str:
+        """
+        Yeni bir parça işle
+
+        Returns:
+            str: Bu parçada görülen hedef alan içeriği (kaçışları çözülmüş)
+        """
+        metin = self._decoder.decode(veri)
+        cikti: List[str] = []
+        i, n = 0, len(metin)
+
+        while i < n:
+            if self._dize is not None:
+                i = self._dize_tara(metin, i, cikti)
+                continue
+
+            if self._dizi is not None:
+                i, bitti = self._dizi.tara(metin, i, cikti)
+                if bitti:
+                    self._dizi = None
+                    self.hedef_bitti = True
+                continue
+
+            if self._skaler is not None:
+                j = i
+                while j < n and metin[j] not in _SKALER_SONU:
+                    j += 1
+                self._skaler.append(metin[i:j])
+                i = j
+                if j < n:
+                    self._skaler_bitir()
+                continue
+
+            c = metin[i]
+            i += 1
+            if c in _BOSLUK or c == ':':
+                continue
+            if c == '{':
+                self._yigin.append(['o', None])
+                self._anahtar_bekleniyor = True
+            elif c == '[':
+                if self.DIZI_HEDEFI and not self._anahtar_bekleniyor and self._yol() == self.hedef_yol:
+                    self.hedef_basladi = True
+                    self._dizi = _DiziElemanlari()
+                else:
+                    self._yigin.append(['a', 0])
+            elif c in '}]':
+                self._yigin.pop()
+            elif c == ',':
+                cerceve = self._yigin[-1]
+                if cerceve[0] == 'o':
+                    self._anahtar_bekleniyor = True
+                else:
+                    cerceve[1] += 1
+            elif c == '"':
+                self._dize_anahtar = self._anahtar_bekleniyor
+                self._anahtar_bekleniyor = False
+                self._dize = []
+                self._dize_uzunlugu = 0
+                self._hedefte = not self._dize_anahtar and self._yol() == self.hedef_yol
+                if self._hedefte:
+                    self.hedef_basladi = True
+            else:
+                self._skaler = [c]
+
+        return self._sonuc(cikti)
+
+    def bitir(self) -> None:
+        """Akışın sonunu işle; yarım kalan JSON varsa hata fırlat"""
+        # Yarım kalmış UTF-8 dizisi varsa UnicodeDecodeError fırlatır
+        self._decoder.decode(b'', final=True)
+        if self._skaler is not None:
+            self._skaler_bitir()
+        if self._dize is not None or self._dizi is not None or self._yigin:
+            raise JsonAkisHatasi("JSON yanıtı beklenmedik şekilde bitti")
+
+    def _sonuc(self, cikti: list):
+        return ''.join(cikti)
+
+    def _dize_tara(self, metin: str, i: int, cikti: List[str]) -> int:
+        n = len(metin)
+        while i < n:
+            if self._kacis is not None:
+                if self._kacis == '':
+                    c = metin[i]
+                    i += 1
+                    if c == 'u':
+                        self._kacis = 'u'
+                        continue
+                    self._kacis = None
+                    self._dize_ekle(_KACISLAR.get(c, c), cikti)
+                else:
+                    eksik = 5 - len(self._kacis)
+                    self._kacis += metin[i:i + eksik]
+                    i = min(i + eksik, n)
+                    if len(self._kacis) == 5:
+                        kod = int(self._kacis[1:], 16)
+                        self._kacis = None
+                        self._kod_ekle(kod, cikti)
+                continue
+
+            # Hızlı yol: bir sonraki tırnak veya kaçış karakterine kadar toplu kopyala
+            tirnak = metin.find('"', i)
+            kacis = metin.find('\\', i, tirnak if tirnak != -1 else n)
+            son = kacis if kacis != -1 else (tirnak if tirnak != -1 else n)
+            if son > i:
+                self._dize_ekle(metin[i:son], cikti)
+            if son == n:
+                return n
+            if son == kacis:
+                self._kacis = ''
+                i = son + 1
+                continue
+            self._dize_bitir(cikti)
+            return son + 1
+        return i
+
+    def _kod_ekle(self, kod: int, cikti: List[str]) -> None:
+        # \uD83D\uDE00 gibi vekil çiftleri tek karaktere birleştirilir
+        if 0xDC00 <= kod <= 0xDFFF and self._vekil is not None:
+            yuksek, self._vekil = self._vekil, None
+            self._dize_ekle(chr(0x10000 + ((ord(yuksek) - 0xD800) << 10) + (kod - 0xDC00)), cikti)
+        elif 0xD800 <= kod <= 0xDBFF:
+            self._dize_ekle('', cikti)
+            self._vekil = chr(kod)
+        else:
+            self._dize_ekle(chr(kod), cikti)
+
+    def _dize_ekle(self, parca: str, cikti: List[str]) -> None:
+        if self._vekil is not None:
+            # Eşi gelmeyen vekil olduğu gibi bırakılır (json modülü gibi)
+            parca, self._vekil = self._vekil + parca, None
+        if not parca:
+            return
+        if self._hedefte:
+            cikti.append(parca)
+        elif self._dize_uzunlugu <= MAKS_DEGER_UZUNLUGU:
+            self._dize.append(parca)
+            self._dize_uzunlugu += len(parca)
+
+    def _dize_bitir(self, cikti: List[str]) -> None:
+        self._dize_ekle('', cikti)
+        deger = ''.join(self._dize)
+        if self._dize_anahtar:
+            self._yigin[-1][1] = deger
+        elif self._hedefte:
+            self.hedef_bitti = True
+        elif self._dize_uzunlugu <= MAKS_DEGER_UZUNLUGU:
+            self.degerler[self._yol()] = deger
+        self._dize = None
+        self._hedefte = False
+
+    def _skaler_bitir(self) -> None:
+        token = ''.join(self._skaler)
+        self._skaler = None
+        try:
+            self.degerler[self._yol()] = json.loads(token)
+        except ValueError:
+            raise JsonAkisHatasi(f"Geçersiz JSON değeri: {token[:50]}")
+
+
+class JsonDiziAkisi(JsonAlanAkisi):
+    """
+    Hedef yoldaki dizinin elemanlarını tek tek çözen JSON tarayıcı
+
+    Dizi içinde yalnızca henüz tamamlanmamış son eleman tamponda tutulur;
+    tamamlanan elemanlar json.JSONDecoder.raw_decode ile çözülüp döndürülür.
+    """
+
+    DIZI_HEDEFI = True
+
+    def besle(self, veri: bytes) -> List[Any]:
+        """
+        Yeni bir parça işle
+
+        Returns:
+            List[Any]: Bu parçada tamamlanan dizi elemanları
+        """
+        return super().besle(veri)
+
+    def _sonuc(self, cikti: list) -> List[Any]:
+        return cikti
@@ -0,0 +1,129 @@
+"""
+Harici servis çağrıları için Prometheus metrikleri
+
+Her HTTP denemesi (tekrar denemeler ayrı ayrı) için süre ve yanıt boyutu
+histogramları servis, uç nokta ve durum sınıfına göre etiketlenir. Durum
+sınıfı HTTP yanıtlarında '2xx'/'4xx'/'5xx', yanıt alınamayanlarda
+'zaman_asimi', 'baglanti_hatasi' veya 'hata' olur.
+Upstream yanıt önbelleklerinin katman bazlı isabetleri de burada sayılır.
+
+Gunicorn altında her worker ayrı süreç olduğundan PROMETHEUS_MULTIPROC_DIR
+ortam değişkeni prometheus_client import edilmeden önce tanımlanmalıdır
+(gunicorn.conf.py bunu yapar); /metrics tüm worker'ların değerlerini toplar.
+"""
+import os
+import time
+from typing import Awaitable, Callable
+
+import httpx
+import requests
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+SURE_ARALIKLARI = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60)
+# 512 B - 128 MB, 4'er kat
+BOYUT_ARALIKLARI = tuple(512 * 4 ** i for i in range(10))
+
+upstream_sure = Histogram(
+    'upstream_request_duration_seconds',
+    'Harici servis HTTP denemesi süresi (akışlı yanıtlarda başlıklar gelene kadar)',
+    ['service', 'endpoint', 'status_class'],
+    buckets=SURE_ARALIKLARI,
+)
+upstream_boyut = Histogram(
+    'upstream_response_size_bytes',
+    'Harici servis yanıt gövdesi boyutu',
+    ['service', 'endpoint', 'status_class'],
+    buckets=BOYUT_ARALIKLARI,
+)
+upstream_uygulama_hatasi = Counter(
+    'upstream_application_errors_total',
+    'HTTP 200 ile dönen ancak uygulama hatası içeren yanıtlar (ör. ABP success=false)',
+    ['service', 'endpoint'],
+)
+upstream_yedek = Counter(
+    'upstream_hedged_requests_total',
+    'Yavaş denemeler için yedek istekler (outcome: gonderildi, kazandi, butce_asildi, serit_dolu)',
+    ['service', 'endpoint', 'outcome'],
+)
+onbellek_okuma = Counter(
+    'cache_lookups_total',
+    'Upstream yanıt önbelleği okumaları (tier: l1 süreç içi, l2 Redis, miss)',
+    ['cache', 'tier'],
+)
+
+
+def _durum_sinifi(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def _hata_sinifi(hata: BaseException) -> str:
+    if isinstance(hata, (requests.exceptions.Timeout, httpx.TimeoutException)):
+        return 'zaman_asimi'
+    if isinstance(hata, (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                         httpx.TransportError)):
+        return 'baglanti_hatasi'
+    return 'hata'
+
+
+def _yanit_kaydet(servis: str, endpoint: str, response, sure: float, akis: bool) -> None:
+    sinif = _durum_sinifi(response.status_code)
+    upstream_sure.labels(servis, endpoint, sinif).observe(sure)
+    if akis:
+        # Gövde henüz okunmadı; varsa Content-Length kullanılır
+        uzunluk = response.headers.get('Content-Length')
+        boyut = int(uzunluk) if uzunluk and uzunluk.isdigit() else None
+    else:
+        boyut = len(response.content)
+    if boyut is not None:
+        upstream_boyut.labels(servis, endpoint, sinif).observe(boyut)
+
+
+def upstream_olc(servis: str, endpoint: str, func: Callable, *args, akis: bool = False, **kwargs):
+    """
+    HTTP çağrısını süre ve boyut metrikleriyle yap
+
+    Args:
+        servis: Servis adı (ör. 'dsi')
+        endpoint: Uç nokta/servis metodu adı
+        func: Yanıt döndüren çağrı (ör. session.post)
+        akis: Yanıt gövdesi akış halinde okunacaksa True (boyut Content-Length'ten alınır)
+    """
+    baslangic = time.perf_counter()
+    try:
+        response = func(*args, **kwargs)
+    except Exception as e:
+        upstream_sure.labels(servis, endpoint, _hata_sinifi(e)).observe(time.perf_counter() - baslangic)
+        raise
+    _yanit_kaydet(servis, endpoint, response, time.perf_counter() - baslangic, akis)
+    return response
+
+
+async def upstream_olc_async(servis: str, endpoint: str, func: Callable[..., Awaitable], *args,
+                             akis: bool = False, **kwargs):
+    """upstream_olc() fonksiyonunun asenkron karşılığı"""
+    baslangic = time.perf_counter()
+    try:
+        response = await func(*args, **kwargs)
+    except Exception as e:
+        upstream_sure.labels(servis, endpoint, _hata_sinifi(e)).observe(time.perf_counter() - baslangic)
+        raise
+    _yanit_kaydet(servis, endpoint, response, time.perf_counter() - baslangic, akis)
+    return response
+
+
+def uygulama_hatasi_kaydet(servis: str, endpoint: str) -> None:
+    """HTTP 200 ile gelen uygulama hatasını say"""
+    upstream_uygulama_hatasi.labels(servis, endpoint).inc()
+
+
+def metrikleri_uret() -> bytes:
+    """Prometheus metin formatında metrikler (çok süreçli modda tüm worker'lar)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
@@ -0,0 +1,145 @@
+"""
+Harici servis çağrıları için yeniden deneme politikaları
+
+Geçici hatalar (bağlantı kopması, yarım gövde, 502/503/504) jitter'lı üstel
+bekleme ile tekrar denenir. Tüm denemeler ve aradaki beklemeler tek bir süre
+bütçesine sığar: her denemenin zaman aşımı kalan bütçeyle sınırlanır, bütçe
+bittiğinde son hata/yanıt olduğu gibi döner. Böylece tekrar denemeler 30
+saniyelik zaman aşımlarını üst üste yığmaz. İstek süre sınırı (deadline.py)
+bütçeden önce doluyorsa bütçe o ana kadar kısalır; sınır dolmuşsa hiç deneme
+yapılmadan DeadlineExceeded fırlatılır.
+
+Yan etkili (idempotent olmayan) çağrılar için max_attempts=1 kullanılmalıdır.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional, Tuple, Type
+
+import requests
+
+from .deadline import DeadlineExceeded, son_an as istek_son_ani
+
+logger = logging.getLogger(__name__)
+
+# Bütçede bundan az süre kaldıysa yeni deneme başlatılmaz (saniye)
+ASGARI_DENEME_SURESI = 0.25
+
+REQUESTS_HATALARI = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    # Bağlantı gövde okunurken koparsa (IncompleteRead)
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class RetryPolicy:
+    """Jitter'lı üstel bekleme ve toplam süre bütçesiyle yeniden deneme politikası"""
+
+    def __init__(self, name: str, max_attempts: int = 3, base_delay: float = 0.2,
+                 max_delay: float = 2.0, budget: float = 30, attempt_timeout: float = 30,
+                 retry_statuses: Tuple[int, ...] = (502, 503, 504)):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.attempt_timeout = attempt_timeout
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def _bekleme(self, deneme: int, response=None) -> float:
+        """deneme. başarısız denemeden sonraki bekleme (full jitter)"""
+        bekleme = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (deneme - 1))))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            bekleme = max(bekleme, float(retry_after))
+        return bekleme
+
+    def _devam(self, deneme: int, son_an: float, bekleme: float) -> bool:
+        """Bekleme sonrası bütçede anlamlı bir deneme için yer var mı"""
+        if deneme >= self.max_attempts:
+            return False
+        return son_an - time.monotonic() - bekleme >= ASGARI_DENEME_SURESI
+
+    def _deneme_suresi(self, son_an: float) -> float:
+        return max(min(self.attempt_timeout, son_an - time.monotonic()), ASGARI_DENEME_SURESI)
+
+    def _son_an(self, etiket: Optional[str]) -> float:
+        """Bütçenin ve istek süre sınırının yakın olanı"""
+        son_an = time.monotonic() + self.budget
+        istek_siniri = istek_son_ani()
+        if istek_siniri is not None and istek_siniri < son_an:
+            if istek_siniri - time.monotonic() < ASGARI_DENEME_SURESI:
+                raise DeadlineExceeded(etiket or self.name)
+            son_an = istek_siniri
+        return son_an
+
+    def call(self, func: Callable[[float], requests.Response], etiket: str = None,
+             retry_exceptions: Tuple[Type[BaseException], ...] = REQUESTS_HATALARI) -> requests.Response:
+        """
+        Çağrıyı politikaya göre tekrar deneyerek yap
+
+        Args:
+            func: Deneme zaman aşımını (saniye) alıp yanıt döndüren fonksiyon
+            etiket: Log mesajlarında kullanılacak ad
+            retry_exceptions: Tekrar denenecek istisnalar
+
+        Returns:
+            Son denemenin yanıtı (tekrar denenebilir durum kodlu olabilir)
+
+        Raises:
+            DeadlineExceeded: İstek süre sınırı ilk denemeden önce dolmuşsa
+            Son denemenin istisnası
+        """
+        son_an = self._son_an(etiket)
+        deneme = 0
+        while True:
+            deneme += 1
+            try:
+                response = func(self._deneme_suresi(son_an))
+            except retry_exceptions as e:
+                bekleme = self._bekleme(deneme)
+                if not self._devam(deneme, son_an, bekleme):
+                    raise
+                self._logla(etiket, deneme, type(e).__name__, bekleme)
+            else:
+                if response.status_code not in self.retry_statuses:
+                    return response
+                bekleme = self._bekleme(deneme, response)
+                if not self._devam(deneme, son_an, bekleme):
+                    return response
+                # Akış halinde açılmış yanıtın bağlantısı havuza geri bırakılsın
+                response.close()
+                self._logla(etiket, deneme, f"HTTP {response.status_code}", bekleme)
+            time.sleep(bekleme)
+
+    async def acall(self, func: Callable[[float], Awaitable], etiket: str = None,
+                    retry_exceptions: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError)):
+        """call() metodunun asenkron karşılığı (httpx ile retry_exceptions=(httpx.TransportError,))"""
+        son_an = self._son_an(etiket)
+        deneme = 0
+        while True:
+            deneme += 1
+            try:
+                response = await func(self._deneme_suresi(son_an))
+            except retry_exceptions as e:
+                bekleme = self._bekleme(deneme)
+                if not self._devam(deneme, son_an, bekleme):
+                    raise
+                self._logla(etiket, deneme, type(e).__name__, bekleme)
+            else:
+                if response.status_code not in self.retry_statuses:
+                    return response
+                bekleme = self._bekleme(deneme, response)
+                if not self._devam(deneme, son_an, bekleme):
+                    return response
+                await response.aclose()
+                self._logla(etiket, deneme, f"HTTP {response.status_code}", bekleme)
+            await asyncio.sleep(bekleme)
+
+    def _logla(self, etiket: Optional[str], deneme: int, neden: str, bekleme: float) -> None:
+        logger.warning(
+            f"{etiket or self.name} {deneme}/{self.max_attempts}. deneme başarısız ({neden}), "
+            f"{bekleme:.2f} sn sonra tekrar denenecek"
+        )
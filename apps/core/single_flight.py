@@ -0,0 +1,152 @@
+"""
+Dağıtık single-flight (istek birleştirme)
+
+Aynı anahtarla eşzamanlı gelen çağrılardan yalnızca biri (lider) asıl işi yapar;
+diğerleri hangi worker veya sunucuda olursa olsun liderin sonucunu paylaşılan
+önbellekten okur. Kilit ve sonuç Django cache (Redis) üzerinde tutulur.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_BOS = object()
+
+
+def single_flight(key: str, func: Callable[[], Any], wait_timeout: float = 15,
+                  lock_timeout: float = 40, result_ttl: float = 10,
+                  poll_interval: float = 0.05) -> Tuple[Any, bool]:
+    """
+    Fonksiyonu anahtar başına tek seferde çalıştır
+
+    Args:
+        key: Birleştirme anahtarı (PII içermemeli)
+        func: Lider tarafından çalıştırılacak fonksiyon; dönüş değeri pickle edilebilir olmalı
+        wait_timeout: Takipçilerin lider sonucunu bekleyeceği en uzun süre (saniye)
+        lock_timeout: Lider çökerse kilidin kendiliğinden düşeceği süre (saniye)
+        result_ttl: Sonucun takipçiler için saklanacağı süre (saniye)
+        poll_interval: İlk bekleme aralığı (saniye); her turda artar
+
+    Returns:
+        Tuple[Any, bool]: (sonuç, lider_mi)
+    """
+    lock_key = f"{key}:kilit"
+    result_key = f"{key}:sonuc"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+    interval = poll_interval
+
+    while True:
+        try:
+            lider = cache.add(lock_key, token, timeout=lock_timeout)
+        except Exception as e:
+            # Paylaşılan kilit yoksa birleştirme yapmadan devam et
+            logger.warning(f"Single-flight kilidi alınamadı, doğrudan çalıştırılıyor: {str(e)}")
+            return func(), True
+
+        if lider:
+            try:
+                sonuc = func()
+                try:
+                    cache.set(result_key, sonuc, timeout=result_ttl)
+                except Exception as e:
+                    logger.warning(f"Single-flight sonucu yazılamadı: {str(e)}")
+                return sonuc, True
+            finally:
+                try:
+                    if cache.get(lock_key) == token:
+                        cache.delete(lock_key)
+                except Exception:
+                    pass
+
+        # Takipçi: lider sonucunu bekle
+        while True:
+            try:
+                sonuc = cache.get(result_key, _BOS)
+                kilit_var = sonuc is _BOS and cache.get(lock_key) is not None
+            except Exception as e:
+                logger.warning(f"Single-flight sonucu okunamadı: {str(e)}")
+                return func(), True
+
+            if sonuc is not _BOS:
+                return sonuc, False
+            if time.monotonic() >= deadline:
+                logger.warning(f"Single-flight bekleme süresi doldu, doğrudan çalıştırılıyor: {key}")
+                return func(), True
+            if not kilit_var:
+                # Lider sonuç yazmadan bıraktı (hata/çökme); liderliği yeniden dene
+                break
+
+            time.sleep(interval)
+            interval = min(interval * 2, 0.5)
+
+
+async def single_flight_async(key: str, func: Callable[[], Awaitable[Any]], wait_timeout: float = 15,
+                              lock_timeout: float = 40, result_ttl: float = 10,
+                              poll_interval: float = 0.05) -> Tuple[Any, bool]:
+    """
+    single_flight() fonksiyonunun asenkron karşılığı
+
+    Bekleme event loop'u bloklamadan yapılır; kilit ve sonuç senkron
+    fonksiyonla aynı anahtarları kullandığından WSGI ve ASGI worker'ları
+    aynı uçuşu paylaşır.
+
+    Returns:
+        Tuple[Any, bool]: (sonuç, lider_mi)
+    """
+    lock_key = f"{key}:kilit"
+    result_key = f"{key}:sonuc"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+    interval = poll_interval
+    cache_add = sync_to_async(cache.add, thread_sensitive=False)
+    cache_get = sync_to_async(cache.get, thread_sensitive=False)
+    cache_set = sync_to_async(cache.set, thread_sensitive=False)
+    cache_delete = sync_to_async(cache.delete, thread_sensitive=False)
+
+    while True:
+        try:
+            lider = await cache_add(lock_key, token, timeout=lock_timeout)
+        except Exception as e:
+            logger.warning(f"Single-flight kilidi alınamadı, doğrudan çalıştırılıyor: {str(e)}")
+            return await func(), True
+
+        if lider:
+            try:
+                sonuc = await func()
+                try:
+                    await cache_set(result_key, sonuc, timeout=result_ttl)
+                except Exception as e:
+                    logger.warning(f"Single-flight sonucu yazılamadı: {str(e)}")
+                return sonuc, True
+            finally:
+                try:
+                    if await cache_get(lock_key) == token:
+                        await cache_delete(lock_key)
+                except Exception:
+                    pass
+
+        while True:
+            try:
+                sonuc = await cache_get(result_key, _BOS)
+                kilit_var = sonuc is _BOS and await cache_get(lock_key) is not None
+            except Exception as e:
+                logger.warning(f"Single-flight sonucu okunamadı: {str(e)}")
+                return await func(), True
+
+            if sonuc is not _BOS:
+                return sonuc, False
+            if time.monotonic() >= deadline:
+                logger.warning(f"Single-flight bekleme süresi doldu, doğrudan çalıştırılıyor: {key}")
+                return await func(), True
+            if not kilit_var:
+                break
+
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, 0.5)
@@ -0,0 +1,89 @@
+"""
+İstemcinin kabul ettiği veri yaşı (Cache-Control: max-age / max-stale)
+
+Bazı ekranlar (ör. ödeme onayı) canlı bakiye ister, bazıları (ör. ana sayfa)
+birkaç dakikalık veriyle yetinir. İstemci kabul ettiği yaşı isteğin
+Cache-Control başlığıyla veya ?azami_yas=<saniye> parametresiyle bildirir:
+
+- max-age=N (veya azami_yas=N): en fazla N saniyelik veri; 0 ya da no-cache
+  her zaman upstream'e gidilmesi demektir
+- max-stale[=N]: sunucunun tazelik süresini en fazla N saniye aşmış veri
+  (değer verilmezse süresi ne kadar aşılmış olursa olsun saklanan veri)
+- ikisi birden verilirse ikisini de sağlayan veri kabul edilir
+- ipucu yoksa uç noktanın kendi varsayılanı geçerlidir
+
+Saklanan veri ancak saklama süresi dolmadıysa sunulabilir. Verinin yaşı
+yanıtta Age başlığıyla (saniye) döner.
+"""
+import math
+from typing import Optional
+
+# Sorgu parametresi (Cache-Control başlığı gönderemeyen istemciler için)
+SORGU_PARAMETRESI = 'azami_yas'
+
+
+def _saniye(deger: Optional[str]) -> Optional[float]:
+    try:
+        saniye = float(deger)
+    except (TypeError, ValueError):
+        return None
+    return saniye if saniye >= 0 else None
+
+
+class TazelikIstegi:
+    """İstemcinin kabul ettiği en büyük veri yaşı"""
+
+    def __init__(self, max_age: Optional[float] = None, max_stale: Optional[float] = None):
+        self.max_age = max_age
+        self.max_stale = max_stale
+
+    @classmethod
+    def istekten(cls, request) -> 'TazelikIstegi':
+        """Django/DRF isteğinin Cache-Control başlığından ve azami_yas parametresinden oku"""
+        max_age = max_stale = None
+        for yonerge in request.headers.get('Cache-Control', '').split(','):
+            ad, _, deger = yonerge.strip().partition('=')
+            ad = ad.lower()
+            if ad == 'no-cache':
+                max_age = 0.0
+            elif ad == 'max-age' and max_age is None:
+                max_age = _saniye(deger.strip('"'))
+            elif ad == 'max-stale':
+                max_stale = _saniye(deger.strip('"')) if deger else math.inf
+        parametre = _saniye(request.GET.get(SORGU_PARAMETRESI))
+        if parametre is not None:
+            max_age = parametre
+        return cls(max_age, max_stale)
+
+    @property
+    def ipucu_var(self) -> bool:
+        return self.max_age is not None or self.max_stale is not None
+
+    def sinir(self, tazelik_suresi: float = 0, bayat_suresi: float = 0) -> float:
+        """
+        Kabul edilen en büyük yaş (saniye)
+
+        Args:
+            tazelik_suresi: Uç noktanın verisinin taze sayıldığı süre
+            bayat_suresi: İpucu yoksa taze olmayan verinin de sunulduğu ek süre
+        """
+        if not self.ipucu_var:
+            return tazelik_suresi + bayat_suresi
+        sinir = math.inf
+        if self.max_age is not None:
+            sinir = self.max_age
+        if self.max_stale is not None:
+            sinir = min(sinir, tazelik_suresi + self.max_stale)
+        return sinir
+
+    def anahtar(self, tazelik_suresi: float = 0, bayat_suresi: float = 0) -> str:
+        """Aynı sınırı isteyenlerin paylaşabileceği anahtar parçası (ör. tek uçuş anahtarında)"""
+        sinir = self.sinir(tazelik_suresi, bayat_suresi)
+        return 'y' if sinir == math.inf else f"y{int(sinir)}"
+
+
+def yas_ekle(response, yas: Optional[float]):
+    """Yanıta verinin yaşını Age başlığıyla ekle"""
+    if yas is not None:
+        response['Age'] = str(max(0, int(yas)))
+    return response
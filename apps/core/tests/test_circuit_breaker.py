@@ -0,0 +1,132 @@
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Yanit:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def yanit(status_code):
+    return lambda: Yanit(status_code)
+
+
+def zaman_asimi():
+    raise requests.exceptions.ConnectTimeout()
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'breaker-test'}}
+)
+class DevreKesiciTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.simdi = 3000.0
+        saat = mock.patch('apps.core.circuit_breaker.time.time', side_effect=lambda: self.simdi)
+        saat.start()
+        self.addCleanup(saat.stop)
+        self.breaker = CircuitBreaker('test', failure_rate=0.5, min_requests=10, window=30, reset_timeout=30)
+
+    def cagir(self, func):
+        try:
+            return self.breaker.call(func)
+        except requests.exceptions.RequestException:
+            return None
+
+    def ac(self):
+        for _ in range(10):
+            self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), OPEN)
+
+
+class HataOraniTest(DevreKesiciTestCase):
+    def test_esik_hata_oraninda_acilir(self):
+        for _ in range(5):
+            self.cagir(yanit(200))
+        for _ in range(4):
+            self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(yanit(200))
+
+    def test_esigin_altinda_acilmaz(self):
+        for _ in range(6):
+            self.cagir(yanit(200))
+        for _ in range(5):
+            self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+    def test_asgari_cagri_sayisina_ulasmadan_acilmaz(self):
+        for _ in range(9):
+            self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), OPEN)
+
+    def test_pencereden_cikan_hatalar_sayilmaz(self):
+        for _ in range(9):
+            self.cagir(zaman_asimi)
+        self.simdi += 60
+        self.cagir(zaman_asimi)
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+    def test_5xx_hata_4xx_basari_sayilir(self):
+        for _ in range(10):
+            self.cagir(yanit(404))
+        self.assertEqual(self.breaker.state(), CLOSED)
+        for _ in range(10):
+            self.cagir(yanit(503))
+        self.assertEqual(self.breaker.state(), OPEN)
+
+
+class YariAcikTest(DevreKesiciTestCase):
+    def test_tek_deneme_istegine_izin_verilir(self):
+        self.ac()
+        self.simdi += 30
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertEqual(self.breaker._izin(), (True, True))
+        self.assertEqual(self.breaker._izin(), (False, False))
+
+    def test_basarili_deneme_devreyi_kapatir(self):
+        self.ac()
+        self.simdi += 30
+        self.breaker.call(yanit(200))
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+    def test_basarisiz_deneme_bekleme_suresini_yeniden_baslatir(self):
+        self.ac()
+        self.simdi += 30
+        self.cagir(yanit(500))
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.simdi += 29
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.simdi += 1
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+
+    def test_sonucsuz_biten_deneme_birakilir(self):
+        self.ac()
+        self.simdi += 30
+
+        def iptal():
+            raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.breaker.call(iptal)
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertEqual(self.breaker._izin(), (True, True))
+
+    def test_deneme_oncesi_gonderilen_istek_devreyi_kapatmaz(self):
+        self.ac()
+        self.simdi += 30
+        self.assertTrue(self.breaker.allow_request())
+        # Devre açılmadan önce gönderilmiş isteğin başarısı
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertFalse(self.breaker.allow_request())
@@ -0,0 +1,164 @@
+import requests
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.concurrency_limiter import (
+    ARKA_PLAN, ETKILESIMLI, TABAN_ASGARI_GOZLEM, TOPLU, AdaptiveConcurrencyLimiter, ConcurrencyLimitError, oncelik
+)
+
+SERITLER = {ETKILESIMLI: (1.0, 0), ARKA_PLAN: (0.5, 0), TOPLU: (0.3, 0)}
+
+
+class Yanit:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'limiter-test'}},
+    CONCURRENCY_LIMIT_LANES=SERITLER,
+)
+class LimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def limiter(self, **kwargs):
+        ayarlar = {'initial_limit': 10, 'min_limit': 1, 'max_limit': 10, 'decrease_interval': 60}
+        ayarlar.update(kwargs)
+        return AdaptiveConcurrencyLimiter('test', **ayarlar)
+
+    def dolu_slotlar(self, limiter):
+        return len(cache.get_many(limiter._slot_keys))
+
+
+class SeritPayiTest(LimiterTestCase):
+    def test_dusuk_oncelikli_seritler_payi_kadar_slot_alir(self):
+        limiter = self.limiter()
+        with oncelik(ARKA_PLAN):
+            kiralar = [limiter.acquire() for _ in range(5)]
+            with self.assertRaises(ConcurrencyLimitError):
+                limiter.acquire()
+        with oncelik(TOPLU), self.assertRaises(ConcurrencyLimitError):
+            limiter.acquire()
+
+        with oncelik(ETKILESIMLI):
+            kiralar += [limiter.acquire() for _ in range(5)]
+            with self.assertRaises(ConcurrencyLimitError):
+                limiter.acquire()
+        self.assertEqual(self.dolu_slotlar(limiter), 10)
+
+        for kira in kiralar:
+            limiter.release(kira)
+        self.assertEqual(self.dolu_slotlar(limiter), 0)
+
+    def test_toplu_serit_arka_plandan_once_reddedilir(self):
+        limiter = self.limiter()
+        with oncelik(TOPLU):
+            [limiter.acquire() for _ in range(3)]
+            with self.assertRaises(ConcurrencyLimitError):
+                limiter.acquire()
+        with oncelik(ARKA_PLAN):
+            limiter.acquire()
+            limiter.acquire()
+            with self.assertRaises(ConcurrencyLimitError):
+                limiter.acquire()
+
+
+class AimdTest(LimiterTestCase):
+    def cagir(self, limiter, sure, uc='detay', asiri_yuk=False):
+        limiter.release(limiter.acquire(), sure, asiri_yuk, uc)
+
+    def test_saglikli_cagri_sinira_bir_bolu_sinir_ekler(self):
+        limiter = self.limiter(initial_limit=2)
+        limiter.call(lambda: Yanit(200), uc='detay')
+        self.assertAlmostEqual(limiter.limit(), 2.5)
+        limiter.call(lambda: Yanit(404), uc='detay')
+        self.assertAlmostEqual(limiter.limit(), 3.0)
+
+    def test_yarisi_bos_sinir_artmaz(self):
+        limiter = self.limiter()
+        limiter.call(lambda: Yanit(200), uc='detay')
+        self.assertEqual(limiter.limit(), 10)
+
+    def test_asiri_yuk_durumu_sinir_azaltir(self):
+        limiter = self.limiter()
+        limiter.call(lambda: Yanit(503), uc='detay')
+        self.assertAlmostEqual(limiter.limit(), 7.0)
+        # Aynı azaltma aralığındaki ikinci hata sınırı tekrar küçültmez
+        limiter.call(lambda: Yanit(429), uc='detay')
+        self.assertAlmostEqual(limiter.limit(), 7.0)
+
+    def test_uc_noktanin_tabanini_asan_sure_sinir_azaltir(self):
+        limiter = self.limiter(initial_limit=1, latency_tolerance=2.0)
+        for _ in range(TABAN_ASGARI_GOZLEM):
+            self.cagir(limiter, 0.05)
+        once = limiter.limit()
+        self.cagir(limiter, 0.09)
+        self.assertEqual(limiter.limit(), once)
+        self.cagir(limiter, 0.5)
+        self.assertAlmostEqual(limiter.limit(), once * 0.7, places=2)
+
+    def test_yavaslik_her_uc_noktanin_kendi_tabanina_gore(self):
+        limiter = self.limiter(initial_limit=1)
+        for _ in range(TABAN_ASGARI_GOZLEM):
+            self.cagir(limiter, 3.0, uc='liste')
+            self.cagir(limiter, 0.05, uc='detay')
+        once = limiter.limit()
+        # Liste için olağan süre; detay tabanına göre ölçülseydi azaltırdı
+        self.cagir(limiter, 3.0, uc='liste')
+        self.assertEqual(limiter.limit(), once)
+        self.cagir(limiter, 3.0, uc='detay')
+        self.assertAlmostEqual(limiter.limit(), once * 0.7, places=2)
+
+    def test_taban_olusmadan_yavaslik_olculmez(self):
+        limiter = self.limiter(initial_limit=1)
+        self.cagir(limiter, 0.05)
+        once = limiter.limit()
+        self.cagir(limiter, 5.0)
+        self.assertGreaterEqual(limiter.limit(), once)
+
+
+class KiraBirakmaTest(LimiterTestCase):
+    def test_hata_firlatan_cagri_slotu_birakir(self):
+        limiter = self.limiter()
+
+        def bozuk():
+            self.assertEqual(self.dolu_slotlar(limiter), 1)
+            raise ValueError('bozuk')
+
+        with self.assertRaises(ValueError):
+            limiter.call(bozuk, uc='detay')
+        self.assertEqual(self.dolu_slotlar(limiter), 0)
+        # Upstream hakkında bilgi vermeyen hata sınırı değiştirmez
+        self.assertEqual(limiter.limit(), 10)
+
+    def test_zaman_asimi_slotu_birakir_ve_sinir_azaltir(self):
+        limiter = self.limiter()
+
+        def zaman_asimi():
+            raise requests.exceptions.ReadTimeout()
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            limiter.call(zaman_asimi, uc='detay')
+        self.assertEqual(self.dolu_slotlar(limiter), 0)
+        self.assertAlmostEqual(limiter.limit(), 7.0)
+
+    def test_asenkron_cagri_hatada_slotu_birakir(self):
+        limiter = self.limiter()
+
+        async def bozuk():
+            self.assertEqual(self.dolu_slotlar(limiter), 1)
+            raise ValueError('bozuk')
+
+        with self.assertRaises(ValueError):
+            async_to_sync(limiter.acall)(bozuk, uc='detay')
+        self.assertEqual(self.dolu_slotlar(limiter), 0)
+
+    def test_baskasinin_kirasi_silinmez(self):
+        limiter = self.limiter()
+        kira = limiter.acquire()
+        # Kira süresi dolup slot başka bir isteğe geçtiyse bırakılmaz
+        cache.set(kira.anahtar, 'baska')
+        limiter.release(kira)
+        self.assertEqual(cache.get(kira.anahtar), 'baska')
@@ -0,0 +1,191 @@
+import queue
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.gecersizlik import GecersizlikKanali
+from apps.core.yerel_onbellek import YerelOnbellek
+from apps.tahsilat.detay_cache import TahsilatDetayOnbellegi, detay_anahtari
+
+ANAHTAR = detay_anahtari(1)
+
+
+class SahteRedis:
+    """Süreç içinde mesaj dağıtan, bağlantısı koparılabilen pub/sub"""
+
+    def __init__(self):
+        self.aboneler = []
+        self.kapali = False
+
+    def publish(self, kanal, veri):
+        for abone_kanal, kuyruk in list(self.aboneler):
+            if abone_kanal == kanal:
+                kuyruk.put(veri)
+
+    def pubsub(self, **kwargs):
+        if self.kapali:
+            # Dinleyici thread'i test bitince sonlansın
+            raise SystemExit()
+        return SahtePubSub(self)
+
+    def kopar(self):
+        for _, kuyruk in list(self.aboneler):
+            kuyruk.put(None)
+
+
+class SahtePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.abonelik = None
+
+    def subscribe(self, kanal):
+        self.abonelik = (kanal, queue.Queue())
+        self.redis.aboneler.append(self.abonelik)
+
+    def listen(self):
+        while True:
+            veri = self.abonelik[1].get()
+            if veri is None:
+                raise ConnectionError('bağlantı koptu')
+            yield {'type': 'message', 'data': veri}
+
+    def close(self):
+        if self.abonelik in self.redis.aboneler:
+            self.redis.aboneler.remove(self.abonelik)
+
+
+def bekle(kosul, sure=2.0):
+    bitis = time.monotonic() + sure
+    while not kosul():
+        if time.monotonic() > bitis:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'gecersizlik-test'}},
+    DSI_DETAY_L1_BOYUTU=16,
+)
+class GecersizlikTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = SahteRedis()
+        for yama in (
+            mock.patch.object(GecersizlikKanali, '_redis', return_value=self.redis),
+            # Yeniden abonelik beklemesi kısalsın
+            mock.patch('apps.core.gecersizlik.time', SimpleNamespace(sleep=lambda _: time.sleep(0.01))),
+            # Her önbellek ayrı bir süreç gibi kendi kanalını dinler
+            mock.patch('apps.tahsilat.detay_cache.get_kanal', side_effect=GecersizlikKanali),
+        ):
+            yama.start()
+            self.addCleanup(yama.stop)
+        self.addCleanup(self.kapat)
+
+    def kapat(self):
+        self.redis.kapali = True
+        self.redis.kopar()
+
+    def onbellek(self):
+        onbellek = TahsilatDetayOnbellegi()
+        self.assertTrue(bekle(onbellek._yerel_etkin))
+        return onbellek
+
+
+class YayinTest(GecersizlikTestCase):
+    def test_yayin_diger_sureclerin_yerel_kopyasini_siler(self):
+        yazan, okuyan = self.onbellek(), self.onbellek()
+        cache.set(ANAHTAR, 'eski')
+        self.assertEqual(okuyan.coklu_oku([1]), {1: 'eski'})
+        self.assertEqual(okuyan._yerel.al(ANAHTAR), 'eski')
+
+        yazan.coklu_yaz({1: 'yeni'})
+        self.assertTrue(bekle(lambda: okuyan._yerel.al(ANAHTAR) is None))
+        self.assertEqual(okuyan.coklu_oku([1]), {1: 'yeni'})
+        # Yayını yapan kendi mesajını yok sayar; yerel kopyası yeni değerdir
+        self.assertEqual(yazan._yerel.al(ANAHTAR), 'yeni')
+
+    def test_yerel_kopya_l2ye_gitmeden_okunur(self):
+        onbellek = self.onbellek()
+        onbellek.coklu_yaz({1: 'deger'})
+        with mock.patch('apps.tahsilat.detay_cache.cache.get_many') as get_many:
+            self.assertEqual(onbellek.coklu_oku([1]), {1: 'deger'})
+        get_many.assert_not_called()
+
+
+class SurumTest(GecersizlikTestCase):
+    def test_okuma_sirasinda_gelen_gecersiz_kilma_eski_degeri_yerlestirmez(self):
+        onbellek = self.onbellek()
+        cache.set(ANAHTAR, 'eski')
+        get_many = cache.get_many
+
+        def yarisan_okuma(anahtarlar):
+            degerler = get_many(anahtarlar)
+            # L2 okunduktan sonra, L1'e yerleştirilmeden önce başka süreç yazar
+            onbellek._yerel_gecersiz_kil([ANAHTAR])
+            return degerler
+
+        with mock.patch('apps.tahsilat.detay_cache.cache.get_many', side_effect=yarisan_okuma):
+            self.assertEqual(onbellek.coklu_oku([1]), {1: 'eski'})
+        self.assertIsNone(onbellek._yerel.al(ANAHTAR))
+
+    def test_surum_degismediyse_deger_yerlesir(self):
+        yerel = YerelOnbellek(4, 60)
+        surum = yerel.surum
+        yerel.koy('a', 1, surum)
+        self.assertEqual(yerel.al('a'), 1)
+        yerel.sil(['b'])
+        yerel.koy('a', 2, surum)
+        self.assertEqual(yerel.al('a'), 1)
+        yerel.temizle()
+        self.assertNotEqual(yerel.surum, surum)
+
+
+class AbonelikTest(GecersizlikTestCase):
+    def test_abonelik_yokken_yerel_kopya_kullanilmaz(self):
+        onbellek = self.onbellek()
+        onbellek.coklu_yaz({1: 'eski'})
+        with mock.patch.object(onbellek._kanal, '_baslat'):
+            onbellek._kanal._abone = False
+            cache.set(ANAHTAR, 'yeni')
+            self.assertEqual(onbellek.coklu_oku([1]), {1: 'yeni'})
+            onbellek.coklu_yaz({1: 'son'})
+        self.assertIsNone(onbellek._yerel.al(ANAHTAR))
+
+    def test_yeniden_abonelikte_yerel_kopyalar_atilir(self):
+        onbellek = self.onbellek()
+        onbellek.coklu_yaz({1: 'deger'})
+        self.assertEqual(onbellek._yerel.al(ANAHTAR), 'deger')
+        abonelik = self.redis.aboneler[-1]
+        self.redis.kopar()
+        # Koptuktan sonra kaçan mesajlar bilinemez; yeniden abonelikte L1 boşaltılır
+        self.assertTrue(bekle(lambda: self.redis.aboneler and self.redis.aboneler[-1] is not abonelik))
+        self.assertTrue(bekle(onbellek._yerel_etkin))
+        self.assertIsNone(onbellek._yerel.al(ANAHTAR))
+
+
+class YerelOnbellekTest(SimpleTestCase):
+    def test_en_uzun_sure_kullanilmayan_atilir(self):
+        yerel = YerelOnbellek(2, 60)
+        yerel.koy('a', 1)
+        yerel.koy('b', 2)
+        yerel.al('a')
+        yerel.koy('c', 3)
+        self.assertEqual(yerel.coklu_al(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+    def test_suresi_dolan_girdi_donmez(self):
+        yerel = YerelOnbellek(2, 60)
+        with mock.patch('apps.core.yerel_onbellek.time.monotonic', return_value=1000.0):
+            yerel.koy('a', 1)
+        with mock.patch('apps.core.yerel_onbellek.time.monotonic', return_value=1060.0):
+            self.assertIsNone(yerel.al('a'))
+        self.assertEqual(len(yerel), 0)
+
+    def test_sifir_boyut_hicbir_sey_tutmaz(self):
+        yerel = YerelOnbellek(0, 60)
+        yerel.koy('a', 1)
+        self.assertIsNone(yerel.al('a'))
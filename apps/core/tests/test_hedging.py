@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.concurrency_limiter import NORMAL, YEDEK, AdaptiveConcurrencyLimiter
+from apps.core.hedging import HedgePolicy
+from apps.core.metrics import upstream_yedek
+
+_servisler = itertools.count()
+
+
+class Yanit:
+    def __init__(self, ad, status_code=200):
+        self.ad = ad
+        self.status_code = status_code
+        self.kapandi = threading.Event()
+
+    def close(self):
+        self.kapandi.set()
+
+    async def aclose(self):
+        self.kapandi.set()
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'hedge-test'}},
+    CONCURRENCY_LIMIT_LANES={NORMAL: (1.0, 0), YEDEK: (0.5, 0)},
+)
+class YedekIstekTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # Prometheus sayaçları süreç genelinde; her test kendi servis etiketini kullanır
+        self.servis = f'test-{next(_servisler)}'
+        self.limiter = AdaptiveConcurrencyLimiter(self.servis, initial_limit=4, min_limit=1, max_limit=4)
+        self.birak = threading.Event()
+        self.addCleanup(self.birak.set)
+        self.denemeler = []
+
+    def hedger(self, **kwargs):
+        ayarlar = {'enabled': True, 'delay': 0.05, 'budget_per_minute': 10}
+        ayarlar.update(kwargs)
+        return HedgePolicy(self.servis, 'detay', **ayarlar)
+
+    def sayac(self, sonuc):
+        return upstream_yedek.labels(self.servis, 'detay', sonuc)._value.get()
+
+    def butce(self):
+        dakika = int(time.time() // 60)
+        return sum(cache.get(f'hedge:{self.servis}:{d}', 0) for d in (dakika - 1, dakika))
+
+    def deneme(self):
+        """İlk deneme serbest bırakılana kadar bekler, sonrakiler hemen döner"""
+        sira = len(self.denemeler)
+        yanit = Yanit('ilk' if sira == 0 else 'yedek')
+        self.denemeler.append(yanit)
+        if sira == 0:
+            self.birak.wait(5)
+        return yanit
+
+    def gonder(self):
+        return self.limiter.call(self.deneme)
+
+
+class SenkronYedekTest(YedekIstekTestCase):
+    def test_ilk_deneme_esikten_once_biterse_yedek_gonderilmez(self):
+        self.birak.set()
+        yanit = self.hedger().call(self.gonder)
+        self.assertEqual(yanit.ad, 'ilk')
+        self.assertEqual(len(self.denemeler), 1)
+        self.assertEqual(self.butce(), 0)
+        self.assertEqual(self.sayac('gonderildi'), 0)
+
+    def test_yavas_denemede_yedek_kazanir_kaybeden_kapatilir(self):
+        yanit = self.hedger().call(self.gonder)
+        self.assertEqual(yanit.ad, 'yedek')
+        self.assertEqual(self.butce(), 1)
+        self.assertEqual(self.sayac('gonderildi'), 1)
+        self.assertEqual(self.sayac('kazandi'), 1)
+
+        self.birak.set()
+        self.assertTrue(self.denemeler[0].kapandi.wait(5))
+        self.assertFalse(yanit.kapandi.is_set())
+
+    def test_seritten_reddedilen_yedek_butceyi_iade_eder(self):
+        # YEDEK şeridinin payı tek slot; ilk deneme onu doldurur
+        self.limiter = AdaptiveConcurrencyLimiter(self.servis, initial_limit=2, min_limit=1, max_limit=2)
+        hedger = self.hedger()
+        sonuc = {}
+        cagri = threading.Thread(target=lambda: sonuc.update(yanit=hedger.call(self.gonder)))
+        cagri.start()
+        # Reddedilen yedek isteğin sayılmasını bekle, sonra ilk denemeyi bitir
+        for _ in range(100):
+            if self.sayac('serit_dolu'):
+                break
+            time.sleep(0.01)
+        self.birak.set()
+        cagri.join(5)
+
+        self.assertEqual(sonuc['yanit'].ad, 'ilk')
+        self.assertEqual(len(self.denemeler), 1)
+        self.assertEqual(self.sayac('serit_dolu'), 1)
+        self.assertEqual(self.sayac('gonderildi'), 0)
+        self.assertEqual(self.butce(), 0)
+
+    def test_butce_bitince_yedek_gonderilmez(self):
+        hedger = self.hedger(budget_per_minute=0)
+        cagri = threading.Thread(target=hedger.call, args=(self.gonder,))
+        cagri.start()
+        time.sleep(0.2)
+        self.birak.set()
+        cagri.join(5)
+        self.assertEqual(len(self.denemeler), 1)
+        self.assertEqual(self.sayac('butce_asildi'), 1)
+        self.assertEqual(self.sayac('gonderildi'), 0)
+
+    def test_yeterli_gozlem_yokken_yedek_gonderilmez(self):
+        hedger = self.hedger(delay=0)
+        self.assertIsNone(hedger.gecikme())
+        self.birak.set()
+        hedger.call(self.gonder)
+        self.assertEqual(len(self.denemeler), 1)
+
+
+class AsenkronYedekTest(YedekIstekTestCase):
+    def test_kaybeden_deneme_iptal_edilir(self):
+        iptal = []
+
+        async def deneme():
+            sira = len(self.denemeler)
+            self.denemeler.append(sira)
+            if sira == 0:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    iptal.append(sira)
+                    raise
+            return Yanit('ilk' if sira == 0 else 'yedek')
+
+        async def cagir():
+            yanit = await self.hedger().acall(lambda: self.limiter.acall(deneme))
+            # İptal edilen deneme slotunu thread'de bırakır; döngü kapanmadan beklenir
+            for _ in range(200):
+                if not cache.get_many(self.limiter._slot_keys):
+                    break
+                await asyncio.sleep(0.01)
+            return yanit
+
+        yanit = async_to_sync(cagir)()
+        self.assertEqual(yanit.ad, 'yedek')
+        self.assertEqual(iptal, [0])
+        self.assertEqual(self.butce(), 1)
+        self.assertEqual(self.sayac('gonderildi'), 1)
+        self.assertEqual(self.sayac('kazandi'), 1)
+        # İptal edilen denemenin slotu bırakıldı
+        self.assertEqual(len(cache.get_many(self.limiter._slot_keys)), 0)
@@ -0,0 +1,123 @@
+import base64
+import json
+
+from django.test import SimpleTestCase
+
+from apps.core.json_stream import JsonAkisHatasi, JsonAlanAkisi, JsonDiziAkisi
+from apps.tahsilat.belge_akisi import Base64Akisi, BelgeAkisi
+
+
+def _bolmeler(veri: bytes):
+    """Verinin tek parça, bayt bayt ve her noktadan ikiye bölünmüş halleri"""
+    yield [veri]
+    yield [veri[i:i + 1] for i in range(len(veri))]
+    for i in range(1, len(veri)):
+        yield [veri[:i], veri[i:]]
+
+
+def _dizi_cozumle(veri: bytes, parcalar) -> list:
+    tarayici = JsonDiziAkisi(('result', 'tahsilatListe'))
+    elemanlar = []
+    for parca in parcalar:
+        elemanlar.extend(tarayici.besle(parca))
+    tarayici.bitir()
+    return elemanlar
+
+
+def _alan_cozumle(parcalar) -> str:
+    tarayici = JsonAlanAkisi(('result', 'belge'))
+    cikti = ''.join(tarayici.besle(parca) for parca in parcalar)
+    tarayici.bitir()
+    return cikti
+
+
+class JsonDiziAkisiTest(SimpleTestCase):
+    def _dogrula(self, dizi: list):
+        veri = json.dumps({'success': True, 'result': {'tahsilatListe': dizi}}, ensure_ascii=False).encode()
+        for parcalar in _bolmeler(veri):
+            self.assertEqual(_dizi_cozumle(veri, parcalar), dizi, parcalar)
+
+    def test_ondalik_noktadan_bolunen_sayi(self):
+        self._dogrula([10.25])
+
+    def test_skalerler(self):
+        self._dogrula([0, -7, 10.25, 1e-05, 12345678901234, True, False, None, 'metin', -0.5])
+
+    def test_nesneler_ve_skalerler(self):
+        self._dogrula([{'tahsilatId': 1, 'tutar': 150.75, 'adi': 'Şükrü Çağ'}, 42, [1, 2.5], {'a': None}])
+
+    def test_bosluklu_dizi(self):
+        veri = b'{"result": {"tahsilatListe": [ 1 ,\n 2.5e3 ,\ttrue , {"x": "y"} ] }, "success": true}'
+        for parcalar in _bolmeler(veri):
+            tarayici = JsonDiziAkisi(('result', 'tahsilatListe'))
+            elemanlar = [eleman for parca in parcalar for eleman in tarayici.besle(parca)]
+            tarayici.bitir()
+            self.assertEqual(elemanlar, [1, 2500.0, True, {'x': 'y'}])
+            self.assertTrue(tarayici.deger('success'))
+
+    def test_yarim_kalan_dizi(self):
+        tarayici = JsonDiziAkisi(('result', 'tahsilatListe'))
+        self.assertEqual(tarayici.besle(b'{"result": {"tahsilatListe": [1, 10.'), [1])
+        with self.assertRaises(JsonAkisHatasi):
+            tarayici.bitir()
+
+
+class JsonAlanAkisiTest(SimpleTestCase):
+    def _dogrula(self, deger: str, ensure_ascii: bool):
+        veri = json.dumps({'result': {'belgeAdi': 'a.pdf', 'belge': deger}}, ensure_ascii=ensure_ascii).encode()
+        for parcalar in _bolmeler(veri):
+            self.assertEqual(_alan_cozumle(parcalar), deger, parcalar)
+
+    def test_bolunen_unicode_kacislari(self):
+        self._dogrula('ğüşıöç ĞÜŞİÖÇ "tırnak" \\ \n', ensure_ascii=True)
+
+    def test_vekil_cifti(self):
+        self._dogrula('a😀b', ensure_ascii=True)
+
+    def test_cok_baytli_utf8(self):
+        self._dogrula('ğüşıöç ĞÜŞİÖÇ 😀 €', ensure_ascii=False)
+
+    def test_diger_alanlar_toplanir(self):
+        veri = '{"success": false, "error": {"message": "Kayıt \\u00e7\\u00f6z\\u00fclemedi", "kod": -3.5}}'.encode()
+        for parcalar in _bolmeler(veri):
+            tarayici = JsonAlanAkisi(('result', 'belge'))
+            for parca in parcalar:
+                tarayici.besle(parca)
+            tarayici.bitir()
+            self.assertEqual(tarayici.deger('error', 'message'), 'Kayıt çözülemedi')
+            self.assertEqual(tarayici.deger('error', 'kod'), -3.5)
+            self.assertFalse(tarayici.hedef_basladi)
+
+    def test_yarim_kalan_utf8(self):
+        tarayici = JsonAlanAkisi(('result', 'belge'))
+        tarayici.besle('{"result": {"belge": "ğ'.encode()[:-1])
+        with self.assertRaises(UnicodeDecodeError):
+            tarayici.bitir()
+
+
+class Base64AkisiTest(SimpleTestCase):
+    def test_dolgu_ve_bosluk(self):
+        for icerik in (b'', b'a', b'ab', b'abc', b'abcd', bytes(range(256))):
+            metin = base64.encodebytes(icerik).decode()  # 76 karakterde satır sonu içerir
+            for kesim in range(len(metin) + 1):
+                for parcalar in ([metin[:kesim], metin[kesim:]], list(metin)):
+                    akis = Base64Akisi()
+                    cozulen = b''.join(akis.besle(parca) for parca in parcalar) + akis.bitir()
+                    self.assertEqual(cozulen, icerik, (icerik, kesim))
+
+    def test_dolgusuz_son(self):
+        akis = Base64Akisi()
+        self.assertEqual(akis.besle('YWJj' + 'ZA'), b'abc')
+        self.assertEqual(akis.bitir(), b'd')
+
+    def test_belge_akisi(self):
+        pdf = b'%PDF-1.4\n' + bytes(range(256)) * 3
+        veri = json.dumps({
+            'success': True,
+            'result': {'belgeAdi': 'makbuz.pdf', 'belge': base64.b64encode(pdf).decode()},
+        }).encode()
+        for parcalar in _bolmeler(veri):
+            akis = BelgeAkisi()
+            cozulen = b''.join(akis.besle(parca) for parca in parcalar) + akis.bitir()
+            self.assertEqual(cozulen, pdf)
+            self.assertEqual(akis.belge_adi('belge.pdf'), 'makbuz.pdf')
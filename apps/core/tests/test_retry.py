@@ -0,0 +1,133 @@
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from apps.core.deadline import DeadlineExceeded, sure_siniri
+from apps.core.retry import ASGARI_DENEME_SURESI, RetryPolicy
+
+
+class Yanit:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.kapandi = False
+
+    def close(self):
+        self.kapandi = True
+
+
+class SahteSaat:
+    """Beklemeleri uyumadan ilerleten saat"""
+
+    def __init__(self):
+        self.simdi = 1000.0
+        self.beklemeler = []
+
+    def monotonic(self):
+        return self.simdi
+
+    def sleep(self, saniye):
+        self.beklemeler.append(saniye)
+        self.simdi += saniye
+
+
+class RetryTestCase(SimpleTestCase):
+    def setUp(self):
+        self.saat = SahteSaat()
+        for yama in (
+            mock.patch('apps.core.retry.time', self.saat),
+            mock.patch('apps.core.deadline.time', self.saat),
+            # Jitter'ın üst sınırı: beklemeler belirli olsun
+            mock.patch('apps.core.retry.random.uniform', side_effect=lambda alt, ust: ust),
+        ):
+            yama.start()
+            self.addCleanup(yama.stop)
+        self.zaman_asimlari = []
+
+    def denemeler(self, *sonuclar, sure=0.0):
+        """Sırasıyla sonuçları döndüren (istisnaları fırlatan) deneme fonksiyonu"""
+        sonuclar = list(sonuclar)
+
+        def deneme(timeout):
+            self.zaman_asimlari.append(timeout)
+            self.saat.simdi += sure
+            sonuc = sonuclar.pop(0)
+            if isinstance(sonuc, BaseException):
+                raise sonuc
+            return sonuc
+        return deneme
+
+
+class YenidenDenemeTest(RetryTestCase):
+    def test_gecici_hata_tekrar_denenir(self):
+        politika = RetryPolicy('test', max_attempts=3, base_delay=0.2, max_delay=2.0)
+        yanit = politika.call(self.denemeler(requests.exceptions.ConnectionError(), Yanit(503), Yanit(200)))
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(self.saat.beklemeler, [0.2, 0.4])
+
+    def test_deneme_sayisi_dolunca_son_yanit_doner(self):
+        politika = RetryPolicy('test', max_attempts=2)
+        ilk, son = Yanit(502), Yanit(504)
+        self.assertIs(politika.call(self.denemeler(ilk, son)), son)
+        self.assertTrue(ilk.kapandi)
+        self.assertFalse(son.kapandi)
+
+    def test_tekrar_denenmeyen_durum_hemen_doner(self):
+        politika = RetryPolicy('test', max_attempts=3)
+        self.assertEqual(politika.call(self.denemeler(Yanit(500))).status_code, 500)
+        self.assertEqual(len(self.zaman_asimlari), 1)
+
+    def test_tek_denemelik_politika_tekrar_denemez(self):
+        politika = RetryPolicy('test', max_attempts=1)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            politika.call(self.denemeler(requests.exceptions.ConnectionError(), Yanit(200)))
+        self.assertEqual(politika.call(self.denemeler(Yanit(503), Yanit(200))).status_code, 503)
+        self.assertEqual(len(self.zaman_asimlari), 2)
+        self.assertEqual(self.saat.beklemeler, [])
+
+
+class RetryAfterTest(RetryTestCase):
+    def test_retry_after_beklenir(self):
+        politika = RetryPolicy('test', max_attempts=2, base_delay=0.2)
+        yanit = politika.call(self.denemeler(Yanit(503, {'Retry-After': '3'}), Yanit(200)))
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(self.saat.beklemeler, [3.0])
+
+    def test_butceyi_asan_retry_after_beklenmez(self):
+        politika = RetryPolicy('test', max_attempts=3, budget=5)
+        yanit = politika.call(self.denemeler(Yanit(503, {'Retry-After': '10'}), Yanit(200)))
+        self.assertEqual(yanit.status_code, 503)
+        self.assertEqual(self.saat.beklemeler, [])
+
+    def test_tarih_bicimindeki_retry_after_yok_sayilir(self):
+        politika = RetryPolicy('test', max_attempts=2, base_delay=0.2)
+        politika.call(self.denemeler(Yanit(503, {'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}), Yanit(200)))
+        self.assertEqual(self.saat.beklemeler, [0.2])
+
+
+class SureButcesiTest(RetryTestCase):
+    def test_denemeler_butceyi_asmaz(self):
+        politika = RetryPolicy('test', max_attempts=10, base_delay=1, max_delay=1, budget=5, attempt_timeout=30)
+        baslangic = self.saat.simdi
+        with self.assertRaises(requests.exceptions.Timeout):
+            politika.call(self.denemeler(*[requests.exceptions.Timeout()] * 10, sure=1.5))
+        self.assertLessEqual(self.saat.simdi - baslangic, 5)
+        self.assertEqual(len(self.zaman_asimlari), 2)
+        # Her denemenin zaman aşımı kalan bütçeyle sınırlanır
+        self.assertEqual(self.zaman_asimlari, [5, 2.5])
+
+    def test_istek_suresi_siniri_butceyi_kisaltir(self):
+        politika = RetryPolicy('test', max_attempts=10, base_delay=1, max_delay=1, budget=30)
+        with sure_siniri(3):
+            with self.assertRaises(requests.exceptions.Timeout):
+                politika.call(self.denemeler(*[requests.exceptions.Timeout()] * 10, sure=2))
+        self.assertEqual(len(self.zaman_asimlari), 1)
+        self.assertLessEqual(self.zaman_asimlari[0], 3)
+
+    def test_istek_suresi_dolmussa_deneme_yapilmaz(self):
+        politika = RetryPolicy('test')
+        with sure_siniri(ASGARI_DENEME_SURESI / 2):
+            with self.assertRaises(DeadlineExceeded):
+                politika.call(self.denemeler(Yanit(200)))
+        self.assertEqual(self.zaman_asimlari, [])
@@ -0,0 +1,68 @@
+import math
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from apps.core.tazelik import TazelikIstegi, yas_ekle
+
+
+class IstektenTest(SimpleTestCase):
+    def istek(self, cache_control=None, **parametreler):
+        basliklar = {'HTTP_CACHE_CONTROL': cache_control} if cache_control is not None else {}
+        return TazelikIstegi.istekten(RequestFactory().get('/', parametreler, **basliklar))
+
+    def assertTazelik(self, tazelik, max_age, max_stale):
+        self.assertEqual((tazelik.max_age, tazelik.max_stale), (max_age, max_stale))
+
+    def test_ipucu_yoksa_varsayilan_gecerli(self):
+        tazelik = self.istek()
+        self.assertFalse(tazelik.ipucu_var)
+        self.assertEqual(tazelik.sinir(60, 240), 300)
+
+    def test_max_age(self):
+        self.assertTazelik(self.istek('max-age=30'), 30, None)
+        self.assertTazelik(self.istek('MAX-AGE="15"'), 15, None)
+        self.assertEqual(self.istek('max-age=300').sinir(60, 240), 300)
+
+    def test_no_cache_max_agedan_once_gelir(self):
+        self.assertTazelik(self.istek('max-age=30, no-cache'), 0, None)
+        self.assertTazelik(self.istek('no-cache, max-age=30'), 0, None)
+
+    def test_max_stale(self):
+        self.assertTazelik(self.istek('max-stale=30'), None, 30)
+        self.assertTazelik(self.istek('max-stale'), None, math.inf)
+        self.assertEqual(self.istek('max-stale=30').sinir(60, 240), 90)
+        self.assertEqual(self.istek('max-stale').sinir(60, 240), math.inf)
+
+    def test_ikisi_birden_verilirse_daha_siki_gecerli(self):
+        self.assertEqual(self.istek('max-age=300, max-stale=30').sinir(60), 90)
+        self.assertEqual(self.istek('max-age=10, max-stale=30').sinir(60), 10)
+
+    def test_gecersiz_degerler_yok_sayilir(self):
+        self.assertTazelik(self.istek('max-age=abc, max-stale=-5'), None, None)
+        self.assertTazelik(self.istek(azami_yas='-1'), None, None)
+        self.assertTazelik(self.istek('private, must-revalidate'), None, None)
+
+    def test_azami_yas_parametresi(self):
+        self.assertTazelik(self.istek(azami_yas='45'), 45, None)
+        self.assertEqual(self.istek(azami_yas='0').sinir(60, 240), 0)
+
+    def test_azami_yas_basliktaki_max_agei_ezer(self):
+        self.assertTazelik(self.istek('max-age=30', azami_yas='120'), 120, None)
+        self.assertTazelik(self.istek('no-cache', azami_yas='120'), 120, None)
+        self.assertTazelik(self.istek('max-stale=30', azami_yas='10'), 10, 30)
+
+    def test_ayni_siniri_isteyenler_ayni_anahtari_paylasir(self):
+        self.assertEqual(self.istek('max-age=90').anahtar(60), self.istek('max-stale=30').anahtar(60))
+        self.assertEqual(self.istek('max-stale').anahtar(60), 'y')
+
+
+class YasEkleTest(SimpleTestCase):
+    def test_age_basligi_tam_saniye(self):
+        self.assertEqual(yas_ekle(HttpResponse(), 12.7)['Age'], '12')
+
+    def test_negatif_yas_sifir_olur(self):
+        self.assertEqual(yas_ekle(HttpResponse(), -0.5)['Age'], '0')
+
+    def test_yas_bilinmiyorsa_baslik_eklenmez(self):
+        self.assertNotIn('Age', yas_ekle(HttpResponse(), None))
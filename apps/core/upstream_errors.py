@@ -0,0 +1,46 @@
+"""
+Harici servis hata kodları
+
+Servis katmanı (success, data, error_message) döndürdüğü için makine tarafından
+okunabilir hata kodları mesajın başına "[KOD]" olarak eklenir. View'lar bu kodu
+uygun HTTP durumuna çevirir.
+"""
+import re
+from typing import Optional
+
+from rest_framework import status
+
+DEVRE_ACIK = 'DEVRE_ACIK'
+KAPASITE_DOLU = 'KAPASITE_DOLU'
+SURE_ASIMI = 'SURE_ASIMI'
+# Sunucuda saklanan sorgu sonucunun sayfalanması
+IMLEC_GECERSIZ = 'IMLEC_GECERSIZ'
+SONUC_SURESI_DOLDU = 'SONUC_SURESI_DOLDU'
+
+HTTP_DURUMLARI = {
+    DEVRE_ACIK: status.HTTP_503_SERVICE_UNAVAILABLE,
+    KAPASITE_DOLU: status.HTTP_503_SERVICE_UNAVAILABLE,
+    SURE_ASIMI: status.HTTP_504_GATEWAY_TIMEOUT,
+    IMLEC_GECERSIZ: status.HTTP_400_BAD_REQUEST,
+    SONUC_SURESI_DOLDU: status.HTTP_410_GONE,
+}
+
+_KOD_DESENI = re.compile(r'^\[([A-Z_]+)\] ')
+
+
+def hata_mesaji(kod: str, mesaj: str) -> str:
+    """Hata koduyla işaretlenmiş mesaj oluştur"""
+    return f"[{kod}] {mesaj}"
+
+
+def hata_kodu(mesaj: Optional[str]) -> Optional[str]:
+    """Mesajdaki hata kodunu döndür (yoksa None)"""
+    if not mesaj:
+        return None
+    eslesme = _KOD_DESENI.match(mesaj)
+    return eslesme.group(1) if eslesme else None
+
+
+def http_durumu(mesaj: Optional[str], varsayilan: int = status.HTTP_400_BAD_REQUEST) -> int:
+    """Hata mesajına karşılık gelen HTTP durum kodunu döndür"""
+    return HTTP_DURUMLARI.get(hata_kodu(mesaj), varsayilan)
@@ -0,0 +1,205 @@
+"""
+Birden fazla upstream adresi arasında sağlığa göre ağırlıklı seçim
+
+Servis birden fazla taban adresle (ör. yük dengeleyici arkasındaki düğümlerin
+doğrudan adresleri) yapılandırılabilir. Her deneme için iki rastgele aday
+arasından (power of two choices) daha sağlıklı olan seçilir: puan, adresin
+gözlenen gecikme ortalaması (EWMA) ile bu süreçteki açık istek sayısının
+çarpımıdır. Böylece yavaşlayan bir düğüm trafikten kendiliğinden daha az pay
+alır; tekrar denemeler de genellikle başka düğüme gider.
+
+Pasif dışlama: bir adres art arda UPSTREAM_EJECTION_THRESHOLD kez zaman aşımı,
+bağlantı hatası veya 5xx verirse UPSTREAM_EJECTION_TIME saniye boyunca
+seçilmez; her yeni dışlamada süre UPSTREAM_EJECTION_MAX_TIME'a kadar ikiye
+katlanır. Dışlama kaydı Django cache (Redis) üzerinden tüm worker'larla
+paylaşılır; gecikme ve ardışık hata sayıları süreç içinde tutulur. Tüm
+adresler dışlanmışsa (panik modu) dışlama yok sayılır ve hepsi kullanılır.
+
+Tek adres yapılandırıldığında seçim ve dışlama cache'e hiç gitmez.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Gecikme ortalamasında son gözlemin ağırlığı
+EWMA_AGIRLIGI = 0.3
+# Henüz gözlem yapılmamış adresin varsayılan gecikmesi (saniye); yeni adresler denensin diye düşük
+VARSAYILAN_GECIKME = 0.05
+# Başarısız denemede adresin gecikme ortalamasının çarpanı
+HATA_CEZASI = 2.0
+
+BAGLANTI_HATALARI = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+)
+
+
+class _Uye:
+    """Havuzdaki bir upstream adresi ve bu süreçte gözlenen sağlığı"""
+
+    def __init__(self, sira: int, url: str):
+        self.sira = sira
+        self.url = url
+        self.gecikme: Optional[float] = None
+        self.acik_istek = 0
+        self.ardisik_hata = 0
+
+    def puan(self) -> float:
+        return (self.gecikme if self.gecikme is not None else VARSAYILAN_GECIKME) * (self.acik_istek + 1)
+
+
+class UpstreamPool:
+    """Sağlık ağırlıklı seçim ve pasif dışlama yapan upstream adres havuzu"""
+
+    def __init__(self, name: str, urls: Sequence[str], ejection_threshold: int = None,
+                 ejection_time: int = None, max_ejection_time: int = None):
+        if not urls:
+            raise ValueError(f"Upstream havuzu için adres tanımlanmamış: {name}")
+        self.name = name
+        self.uyeler = [_Uye(sira, url.rstrip('/')) for sira, url in enumerate(urls)]
+        self.ejection_threshold = ejection_threshold or getattr(settings, 'UPSTREAM_EJECTION_THRESHOLD', 3)
+        self.ejection_time = ejection_time or getattr(settings, 'UPSTREAM_EJECTION_TIME', 30)
+        self.max_ejection_time = max_ejection_time or getattr(settings, 'UPSTREAM_EJECTION_MAX_TIME', 300)
+        self._prefix = f"upstream:{name}"
+        self._lock = threading.Lock()
+
+    def _ejected_key(self, uye: _Uye) -> str:
+        return f"{self._prefix}:{uye.sira}:disarida"
+
+    def _ejection_count_key(self, uye: _Uye) -> str:
+        return f"{self._prefix}:{uye.sira}:dislama_sayisi"
+
+    def saglikli_uyeler(self) -> List[_Uye]:
+        """Dışlanmamış adresler; hepsi dışlanmışsa tüm adresler (panik modu)"""
+        if len(self.uyeler) == 1:
+            return self.uyeler
+        try:
+            disarida = cache.get_many([self._ejected_key(uye) for uye in self.uyeler])
+        except Exception as e:
+            logger.warning(f"Upstream dışlama durumu okunamadı ({self.name}): {str(e)}")
+            return self.uyeler
+        saglikli = [uye for uye in self.uyeler if self._ejected_key(uye) not in disarida]
+        if not saglikli:
+            logger.warning(f"Tüm upstream adresleri dışlanmış, hepsi kullanılıyor ({self.name})")
+            return self.uyeler
+        return saglikli
+
+    def _sec(self, adaylar: List[_Uye]) -> _Uye:
+        if len(adaylar) == 1:
+            return adaylar[0]
+        birinci, ikinci = random.sample(adaylar, 2)
+        return birinci if birinci.puan() <= ikinci.puan() else ikinci
+
+    def sec(self) -> _Uye:
+        """Deneme için adres seç"""
+        return self._sec(self.saglikli_uyeler())
+
+    def _basla(self, uye: _Uye) -> float:
+        with self._lock:
+            uye.acik_istek += 1
+        return time.perf_counter()
+
+    def _bitir(self, uye: _Uye, baslangic: float, basarili: Optional[bool]) -> bool:
+        """Sonucu kaydet; adres dışlanmalıysa True"""
+        sure = time.perf_counter() - baslangic
+        with self._lock:
+            uye.acik_istek -= 1
+            if basarili is None:
+                return False
+            if basarili:
+                uye.ardisik_hata = 0
+                uye.gecikme = sure if uye.gecikme is None else (
+                    EWMA_AGIRLIGI * sure + (1 - EWMA_AGIRLIGI) * uye.gecikme
+                )
+                return False
+            # Hızlı dönen 5xx de seçimde geriye düşsün diye gecikme katlanarak cezalandırılır
+            uye.gecikme = max(sure, (uye.gecikme or VARSAYILAN_GECIKME) * HATA_CEZASI)
+            uye.ardisik_hata += 1
+            if uye.ardisik_hata < self.ejection_threshold or len(self.uyeler) == 1:
+                return False
+            # Dışlama bitince adres yeni bir adres gibi tekrar denensin
+            uye.ardisik_hata = 0
+            uye.gecikme = None
+            return True
+
+    def _disla(self, uye: _Uye, etiket: str = None) -> None:
+        """Adresi tüm worker'lar için bir süre seçim dışı bırak"""
+        try:
+            cache.add(self._ejection_count_key(uye), 0, timeout=self.max_ejection_time * 4)
+            sayi = cache.incr(self._ejection_count_key(uye))
+            sure = min(self.ejection_time * 2 ** (sayi - 1), self.max_ejection_time)
+            cache.set(self._ejected_key(uye), 1, timeout=sure)
+        except Exception as e:
+            logger.warning(f"Upstream adresi dışlanamadı ({self.name}): {str(e)}")
+            return
+        logger.error(f"{etiket or self.name} adresi {sure} sn dışlandı: {uye.url}")
+
+    @staticmethod
+    def _basarili_mi(response=None, hata: BaseException = None) -> Optional[bool]:
+        if hata is not None:
+            # Devre açık, kapasite dolu vb. istekler adrese ulaşmadı; sağlık hakkında bilgi vermez
+            return False if isinstance(hata, BAGLANTI_HATALARI) else None
+        return response.status_code < 500
+
+    def call(self, func: Callable[[str], requests.Response], etiket: str = None) -> requests.Response:
+        """
+        Seçilen adresle çağrı yap ve sonucu adresin sağlığına yansıt
+
+        Args:
+            func: Taban adresi alıp yanıt döndüren fonksiyon
+            etiket: Log mesajlarında (ve eşzamanlılık sınırlayıcının hata mesajında) kullanılacak ad
+        """
+        uye = self.sec()
+        baslangic = self._basla(uye)
+        try:
+            response = func(uye.url)
+        except BaseException as e:
+            if self._bitir(uye, baslangic, self._basarili_mi(hata=e)):
+                self._disla(uye, etiket)
+            raise
+        if self._bitir(uye, baslangic, self._basarili_mi(response)):
+            self._disla(uye, etiket)
+        return response
+
+    async def acall(self, func: Callable[[str], Awaitable], etiket: str = None):
+        """call() metodunun asenkron karşılığı"""
+        if len(self.uyeler) == 1:
+            uye = self.uyeler[0]
+        else:
+            uye = self._sec(await sync_to_async(self.saglikli_uyeler, thread_sensitive=False)())
+        baslangic = self._basla(uye)
+        try:
+            response = await func(uye.url)
+        except BaseException as e:
+            if self._bitir(uye, baslangic, self._basarili_mi(hata=e)):
+                await sync_to_async(self._disla, thread_sensitive=False)(uye, etiket)
+            raise
+        if self._bitir(uye, baslangic, self._basarili_mi(response)):
+            await sync_to_async(self._disla, thread_sensitive=False)(uye, etiket)
+        return response
+
+
+_pools: Dict[str, UpstreamPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, urls: Sequence[str]) -> UpstreamPool:
+    """İsimle upstream havuzu döndür (süreç başına tek örnek; adresler ilk çağrıda sabitlenir)"""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(name, UpstreamPool(name, urls))
+    return pool
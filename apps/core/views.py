@@ -1,21 +1,63 @@
+import hmac
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from apps.authentication.permissions import ExternalTokenPermission, ExternalTokenOrJWTPermission
+from .circuit_breaker import OPEN, get_breaker
+from .metrics import CONTENT_TYPE_LATEST, metrikleri_uret
+
+# Sağlık kontrolünde durumu raporlanan harici servis devre kesicileri
+DEVRE_KESICILER = ['dsi', 'kimlik']
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check_view(request):
     """Sistem sağlık kontrolü"""
+    devre_kesiciler = {name: get_breaker(name).state() for name in DEVRE_KESICILER}
+    
     return Response({
-        'status': 'OK',
+        'status': 'DEGRADED' if OPEN in devre_kesiciler.values() else 'OK',
         'message': 'DSI Mobil Backend API çalışıyor',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'devre_kesiciler': devre_kesiciler
     }, status=status.HTTP_200_OK)
 
 
+def _izinli_agdan_mi(request) -> bool:
+    """İstek METRICS_IZINLI_AGLAR'dan birinden mi geliyor (X-Forwarded-For dikkate alınmaz)"""
+    try:
+        adres = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(adres in ipaddress.ip_network(ag, strict=False)
+               for ag in getattr(settings, 'METRICS_IZINLI_AGLAR', ['127.0.0.1/32', '::1/128']))
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus metrikleri
+
+    Varsayılan olarak kapalıdır: METRICS_TOKEN tanımlıysa Bearer token,
+    tanımlı değilse isteğin METRICS_IZINLI_AGLAR'dan gelmesi gerekir.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        gelen = request.META.get('HTTP_AUTHORIZATION', '')
+        if not hmac.compare_digest(gelen.encode(), f"Bearer {token}".encode()):
+            return HttpResponse(status=401)
+    elif not _izinli_agdan_mi(request):
+        return HttpResponse(status=403)
+    return HttpResponse(metrikleri_uret(), content_type=CONTENT_TYPE_LATEST)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_info_view(request):
@@ -0,0 +1,87 @@
+"""
+Süreç içi LRU önbellek (L1)
+
+Sık okunan değerleri Redis'e (L2) gitmeden aynı süreçte tutar. Her worker'ın
+kendi kopyası olduğundan başka düğümlerdeki yazmalar apps.core.gecersizlik
+kanalıyla bildirilir ve ilgili anahtarlar silinir; kanal mesajı kaçırılsa bile
+girdiler ttl saniyeden uzun yaşamaz.
+
+L2'den okunan değer yerleştirilirken araya bir geçersiz kılma girmişse değer
+eski olabilir; bu yüzden koy() okumadan önce alınan surum ile çağrılır ve o
+arada silme yapıldıysa değer yerleştirilmez.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+class YerelOnbellek:
+    """Boyut ve süre sınırlı, thread-safe LRU önbellek"""
+
+    def __init__(self, boyut: int, ttl: float):
+        """
+        Args:
+            boyut: En fazla girdi sayısı; dolunca en uzun süredir kullanılmayan atılır
+            ttl: Girdinin en fazla yaşayacağı süre (saniye)
+        """
+        self.boyut = boyut
+        self.ttl = ttl
+        self._girdiler: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._kilit = threading.Lock()
+        self._surum = 0
+
+    @property
+    def surum(self) -> int:
+        """Her silme ve temizlemede artan sayaç"""
+        return self._surum
+
+    def al(self, anahtar: str) -> Optional[Any]:
+        with self._kilit:
+            girdi = self._girdiler.get(anahtar)
+            if girdi is None:
+                return None
+            if girdi[1] <= time.monotonic():
+                del self._girdiler[anahtar]
+                return None
+            self._girdiler.move_to_end(anahtar)
+            return girdi[0]
+
+    def coklu_al(self, anahtarlar: Iterable[str]) -> Dict[str, Any]:
+        sonuc = {}
+        for anahtar in anahtarlar:
+            deger = self.al(anahtar)
+            if deger is not None:
+                sonuc[anahtar] = deger
+        return sonuc
+
+    def koy(self, anahtar: str, deger: Any, surum: int = None) -> None:
+        """
+        Değeri yerleştir
+
+        Args:
+            surum: Değer L2'den okunmadan önceki surum; o arada silme yapıldıysa değer atılır
+        """
+        if self.boyut <= 0:
+            return
+        with self._kilit:
+            if surum is not None and surum != self._surum:
+                return
+            self._girdiler[anahtar] = (deger, time.monotonic() + self.ttl)
+            self._girdiler.move_to_end(anahtar)
+            while len(self._girdiler) > self.boyut:
+                self._girdiler.popitem(last=False)
+
+    def sil(self, anahtarlar: Iterable[str]) -> None:
+        with self._kilit:
+            self._surum += 1
+            for anahtar in anahtarlar:
+                self._girdiler.pop(anahtar, None)
+
+    def temizle(self) -> None:
+        with self._kilit:
+            self._surum += 1
+            self._girdiler.clear()
+
+    def __len__(self):
+        return len(self._girdiler)
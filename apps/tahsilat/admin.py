@@ -1,5 +1,21 @@
 from django.contrib import admin
-from .models import TahsilatKaydi, TahsilatSorgu, TahsilatOzeti
+from .models import TahsilatKaydi, TahsilatOdeme, TahsilatSorgu, TahsilatOzeti, TahsilatTaksit, TakipEdilenKimlik
+
+
+class TahsilatTaksitInline(admin.TabularInline):
+    model = TahsilatTaksit
+    extra = 0
+    can_delete = False
+    fields = ['sira', 'taksit_no', 'taksit_tutari', 'vade_tarihi', 'odeme_durumu', 'odeme_tarihi']
+    readonly_fields = fields
+
+
+class TahsilatOdemeInline(admin.TabularInline):
+    model = TahsilatOdeme
+    extra = 0
+    can_delete = False
+    fields = ['sira', 'odeme_tarihi', 'odeme_tutari', 'odeme_yontemi', 'referans_no']
+    readonly_fields = fields
 
 
 @admin.register(TahsilatKaydi)
@@ -10,8 +26,9 @@ class TahsilatKaydiAdmin(admin.ModelAdmin):
     ]
     list_filter = ['aktif', 'tahakkuk_donemi', 'kullanici']
     search_fields = ['tahakkuk_no', 'gelir_turu', 'borcun_konusu']
-    readonly_fields = ['tahsilat_id', 'harici_id', 'sorgu_tarihi', 'son_guncelleme']
+    readonly_fields = ['tahsilat_id', 'harici_id', 'sorgu_tarihi', 'son_guncelleme', 'detay_zamani']
     ordering = ['-tahakkuk_donemi']
+    inlines = [TahsilatTaksitInline, TahsilatOdemeInline]
     
     fieldsets = (
         ('Temel Bilgiler', {
@@ -24,7 +41,7 @@ class TahsilatKaydiAdmin(admin.ModelAdmin):
             'fields': ('cari_id', 'tahakkuk_donemi', 'harici_id', 'kullanici', 'aktif')
         }),
         ('Zaman Bilgileri', {
-            'fields': ('sorgu_tarihi', 'son_guncelleme'),
+            'fields': ('sorgu_tarihi', 'son_guncelleme', 'detay_zamani'),
             'classes': ('collapse',)
         })
     )
@@ -74,3 +91,24 @@ class TahsilatOzetiAdmin(admin.ModelAdmin):
             'fields': ('sonuc_kodu', 'sonuc_aciklamasi')
         })
     )
+
+
+@admin.register(TakipEdilenKimlik)
+class TakipEdilenKimlikAdmin(admin.ModelAdmin):
+    list_display = [
+        'kullanici', 'kimlik_tipi', 'kimlik_degeri', 'aktif',
+        'son_yenileme', 'son_basarili_yenileme'
+    ]
+    list_filter = ['aktif', 'kimlik_tipi', 'son_yenileme']
+    search_fields = ['kimlik_degeri', 'aciklama', 'son_hata']
+    readonly_fields = ['olusturma_tarihi', 'son_yenileme', 'son_basarili_yenileme', 'son_hata', 'son_sorgu']
+    ordering = ['-olusturma_tarihi']
+    
+    fieldsets = (
+        ('Kimlik Bilgileri', {
+            'fields': ('kullanici', 'kimlik_tipi', 'kimlik_degeri', 'aciklama', 'aktif')
+        }),
+        ('Son Yenileme', {
+            'fields': ('son_yenileme', 'son_basarili_yenileme', 'son_hata', 'son_sorgu', 'olusturma_tarihi')
+        })
+    )
@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import weakref
+from http.cookiejar import CookieJar
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+import httpx
+from django.conf import settings
+
+from apps.core.circuit_breaker import CircuitOpenError, get_breaker
+from apps.core.hedging import get_hedger
+from apps.core.http_transport import YapiskanlikCerezPolitikasi
+from apps.core.concurrency_limiter import ConcurrencyLimitError, get_limiter
+from apps.core.deadline import DeadlineExceeded, zaman_asimi_mesaji, zaman_asimlari
+from apps.core.metrics import upstream_olc_async, uygulama_hatasi_kaydet
+from apps.core.upstream_pool import get_pool
+from .belge_akisi import BELGE_PARCA_BOYUTU, belge_akisini_ac_async
+from .dsi_kayit import kaydederek_async, tekrar_transportu
+from .kayitlar import TahsilatDetayi, TahsilatListesi, kayda_cevir
+from .dsi_api_service import (
+    DSI_API_HEADERS, DEVRE_KESICI, ESZAMANLILIK_SINIRI, METRIK_SERVISI, UPSTREAM_HAVUZU, abp_sonucu, dsi_adresleri,
+    YEDEKLENEN_METODLAR, get_dsi_tahsilat_service, servis_yolu, yeniden_deneme_politikasi
+)
+
+logger = logging.getLogger(__name__)
+
+# Event loop başına paylaşılan istemciler (httpx.AsyncClient bir loop'a bağlıdır).
+# Loop toplandığında kaydı da düşer; id(loop) gibi yeniden kullanılabilen bir
+# anahtar ölü loop'un istemcisini yeni loop'a vermez.
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = weakref.WeakKeyDictionary()
+
+
+def _kapanan_looplari_birak() -> None:
+    """
+    Kapanmış loop'ların istemcilerini bırak
+
+    Havuzdaki açık bağlantılar loop'a başvurduğundan zayıf anahtar tek başına
+    yetmez: istemci tutuldukça loop da toplanamaz. async_to_sync gibi her
+    çağrıda yeni loop açan kullanımlarda istemciler böylece birikmez.
+    """
+    for loop in [loop for loop in list(_clients.keys()) if loop.is_closed()]:
+        _clients.pop(loop, None)
+
+
+class AsyncDSITahsilatAPIService:
+    """DSİ Tahsilat API entegrasyonu (asenkron, ASGI için)"""
+
+    def __init__(self):
+        self.timeout = getattr(settings, 'DSI_API_TIMEOUT', 30)
+        self.baglanti_timeout = getattr(settings, 'DSI_API_BAGLANTI_TIMEOUT', 5)
+        self.use_mock = getattr(settings, 'DSI_API_USE_MOCK', False)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Çalışan event loop'a ait, bağlantı havuzu paylaşılan istemci"""
+        loop = asyncio.get_running_loop()
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            _kapanan_looplari_birak()
+            client = httpx.AsyncClient(
+                verify=False,
+                limits=httpx.Limits(
+                    max_connections=getattr(settings, 'DSI_API_ASYNC_MAX_CONNECTIONS', 200),
+                    max_keepalive_connections=getattr(settings, 'DSI_API_POOL_MAXSIZE', 40),
+                ),
+                headers={'Accept-Encoding': 'gzip, deflate'},
+                # Yük dengeleyici yapışkanlık cookie'leri saklanmaz; adres seçimi upstream havuzunda
+                cookies=CookieJar(policy=YapiskanlikCerezPolitikasi()),
+                # DSI_TEKRAR_DOSYALARI tanımlıysa ağa çıkmadan kayıtlardan yanıt verilir
+                transport=tekrar_transportu(),
+            )
+            _clients[loop] = client
+        return client
+
+    @property
+    def breaker(self):
+        """DSİ altyapı servisi devre kesicisi (senkron servisle ortak)"""
+        return get_breaker(DEVRE_KESICI)
+
+    @property
+    def limiter(self):
+        """DSİ eşzamanlılık sınırlayıcısı (senkron servisle ortak)"""
+        return get_limiter(ESZAMANLILIK_SINIRI)
+
+    @property
+    def havuz(self):
+        """DSİ adres havuzu (senkron servisle aynı adresler)"""
+        return get_pool(UPSTREAM_HAVUZU, dsi_adresleri())
+
+    def _zaman_asimi(self, timeout: float) -> httpx.Timeout:
+        """Deneme zaman aşımını istek süre sınırına göre bağlantı/okuma olarak böl"""
+        baglanti, okuma = zaman_asimlari(timeout, self.baglanti_timeout, 'DSİ API')
+        return httpx.Timeout(okuma, connect=baglanti)
+
+    async def _deneme(self, endpoint: str, timeout: float, akis: bool = False, **istek) -> httpx.Response:
+        """Tek POST denemesi (eşzamanlılık slotu, adres seçimi, metrik ve gerekirse yedek istek ile)"""
+        def gonder():
+            return self.limiter.acall(
+                self.havuz.acall,
+                lambda adres: self._kaydederek(endpoint, akis, istek, lambda: upstream_olc_async(
+                    METRIK_SERVISI,
+                    endpoint,
+                    self.client.send,
+                    self.client.build_request('POST', f"{adres}{servis_yolu(endpoint)}",
+                                              timeout=self._zaman_asimi(timeout), **istek),
+                    stream=akis,
+                    akis=akis
+                )),
+                etiket='DSİ API',
+                uc=endpoint
+            )
+
+        if endpoint in YEDEKLENEN_METODLAR:
+            return await get_hedger(METRIK_SERVISI, endpoint).acall(gonder, etiket='DSİ API')
+        return await gonder()
+
+    async def _cagir(self, endpoint: str, etiket: str, akis: bool = False, **istek) -> httpx.Response:
+        """Servis metodunu devre kesici ve yeniden deneme politikasıyla çağır (tüm denemeler tek çağrı sayılır)"""
+        return await self.breaker.acall(
+            lambda: yeniden_deneme_politikasi(endpoint).acall(
+                lambda timeout: self._deneme(endpoint, timeout, akis=akis, **istek),
+                etiket=etiket,
+                retry_exceptions=(httpx.TransportError,)
+            ),
+            etiket=etiket,
+            failure_exceptions=(httpx.TransportError,)
+        )
+
+    @staticmethod
+    def _kaydederek(endpoint: str, akis: bool, istek: Dict, func):
+        """DSI_KAYIT_DIZINI tanımlıysa denemeyi kaydet (akış halindeki yanıtlar hariç)"""
+        if akis:
+            return func()
+        return kaydederek_async(endpoint, istek.get('params'), func)
+
+    async def _abp_post(self, endpoint: str, params: Dict, etiket: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        DSİ altyapı servisine asenkron POST isteği gönder ve ABP yanıtını çöz
+
+        Args:
+            endpoint: Servis metodu adı (ör. TahsilatListeleEDevlet)
+            params: Query parametreleri
+            etiket: Log mesajlarında kullanılacak API adı
+
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+        """
+        logger.info(f"{etiket} çağrısı (async): {servis_yolu(endpoint)} - Params: {params}")
+
+        try:
+            response = await self._cagir(endpoint, etiket, params=params, headers=DSI_API_HEADERS)
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"{etiket} isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
+        except httpx.TimeoutException:
+            logger.error(f"{etiket} zaman aşımı")
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except httpx.TransportError:
+            logger.error(f"{etiket} bağlantı hatası")
+            return False, None, "DSİ API bağlantı hatası"
+        except Exception as e:
+            logger.exception(f"Beklenmeyen {etiket} hatası: {e}")
+            return False, None, f"Beklenmeyen hata: {str(e)}"
+
+        logger.info(f"{etiket} Response Status: {response.status_code}")
+
+        try:
+            sonuc = abp_sonucu(response)
+            if response.status_code == 200 and not sonuc[0]:
+                uygulama_hatasi_kaydet(METRIK_SERVISI, endpoint)
+            return sonuc
+        except Exception as e:
+            logger.exception(f"Beklenmeyen {etiket} hatası: {e}")
+            return False, None, f"Beklenmeyen hata: {str(e)}"
+
+    async def tahsilat_listele(self, tckn: str = None, vkn: str = None,
+                               baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                               sadece_odenmemis: bool = False) -> Tuple[bool, Optional[TahsilatListesi], Optional[str]]:
+        """
+        DSİ Tahsilat Listele API'sini asenkron çağır
+
+        Returns:
+            Tuple[bool, Optional[TahsilatListesi], Optional[str]]: (success, data, error_message)
+        """
+        sync_service = get_dsi_tahsilat_service()
+        if self.use_mock:
+            logger.info("Mock data kullanılıyor")
+            return True, TahsilatListesi.dsi(sync_service.mock_tahsilat_listesi(
+                tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis
+            )), None
+
+        params = sync_service.liste_parametreleri(tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis)
+        return kayda_cevir(await self._abp_post('TahsilatListeleEDevlet', params, 'DSİ API'), TahsilatListesi)
+
+    async def tahsilat_detay_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[TahsilatDetayi], Optional[str]]:
+        """
+        Tahsilat detay bilgilerini asenkron getir
+
+        Returns:
+            Tuple[bool, Optional[TahsilatDetayi], Optional[str]]: (success, data, error_message)
+        """
+        if self.use_mock:
+            logger.info("Mock data kullanılıyor - Tahsilat Detay")
+            return True, TahsilatDetayi.dsi(get_dsi_tahsilat_service().mock_tahsilat_detayi(tahsilat_id)), None
+
+        return kayda_cevir(
+            await self._abp_post('VTahsilatDetayGetirEDevlet', {'tahsilatId': tahsilat_id}, 'DSİ Tahsilat Detay API'),
+            TahsilatDetayi
+        )
+
+    async def tahsilat_detaylari_getir(self, tahsilat_idleri: List[int],
+                                       max_eszamanli: int = None) -> Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]:
+        """
+        Birden fazla tahsilatın detayını eşzamanlı getir (asenkron)
+        
+        Returns:
+            Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]: tahsilat_id -> (success, data, error_message)
+        """
+        tahsilat_idleri = list(dict.fromkeys(tahsilat_idleri))
+        semafor = asyncio.Semaphore(max_eszamanli or getattr(settings, 'DSI_DETAY_TOPLU_ESZAMANLI', 40))
+        
+        async def getir(tahsilat_id):
+            async with semafor:
+                return await self.tahsilat_detay_getir(tahsilat_id)
+        
+        sonuclar = await asyncio.gather(*(getir(tahsilat_id) for tahsilat_id in tahsilat_idleri))
+        return dict(zip(tahsilat_idleri, sonuclar))
+    
+    async def tahsilat_belge_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Tahsilat detay belgesini asenkron getir (base64 formatında)
+
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+        """
+        if self.use_mock:
+            logger.info("Mock data kullanılıyor - Tahsilat Belge")
+            return True, get_dsi_tahsilat_service().mock_tahsilat_belgesi(tahsilat_id), None
+
+        return await self._abp_post('TahsilatBelgeGetirEDevlet', {'tahsilatId': tahsilat_id}, 'DSİ Tahsilat Belge API')
+
+
+    async def tahsilat_belge_akisi(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Tahsilat belgesini akış halinde asenkron getir
+
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, {'belgeAdi', 'icerik'}, error_message)
+            icerik PDF baytlarını parça parça üreten bir async iterator'dır
+        """
+        varsayilan_ad = f"tahsilat_{tahsilat_id}.pdf"
+
+        if self.use_mock:
+            logger.info("Mock data kullanılıyor - Tahsilat Belge (akış)")
+            govde = get_dsi_tahsilat_service().mock_tahsilat_belge_zarfi(tahsilat_id)
+
+            async def parcalar():
+                for i in range(0, len(govde), BELGE_PARCA_BOYUTU):
+                    yield govde[i:i + BELGE_PARCA_BOYUTU]
+
+            async def kapat():
+                pass
+
+            return await belge_akisini_ac_async(parcalar(), kapat, varsayilan_ad)
+
+        params = {'tahsilatId': tahsilat_id}
+        etiket = 'DSİ Tahsilat Belge API'
+
+        logger.info(f"{etiket} çağrısı (async, akış): {servis_yolu('TahsilatBelgeGetirEDevlet')} - Params: {params}")
+
+        try:
+            # Yalnızca yanıt başlıkları gelene kadar tekrar denenir
+            response = await self._cagir('TahsilatBelgeGetirEDevlet', etiket, akis=True,
+                                         params=params, headers=DSI_API_HEADERS)
+            logger.info(f"{etiket} Response Status: {response.status_code}")
+
+            if response.status_code != 200:
+                try:
+                    await response.aread()
+                    return abp_sonucu(response)
+                finally:
+                    await response.aclose()
+
+            sonuc = await belge_akisini_ac_async(
+                response.aiter_bytes(BELGE_PARCA_BOYUTU), response.aclose, varsayilan_ad
+            )
+            if not sonuc[0]:
+                uygulama_hatasi_kaydet(METRIK_SERVISI, 'TahsilatBelgeGetirEDevlet')
+            return sonuc
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"{etiket} isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
+        except httpx.TimeoutException:
+            logger.error(f"{etiket} zaman aşımı")
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except httpx.TransportError:
+            logger.error(f"{etiket} bağlantı hatası")
+            return False, None, "DSİ API bağlantı hatası"
+        except Exception as e:
+            logger.exception(f"Beklenmeyen {etiket} hatası: {e}")
+            return False, None, f"Beklenmeyen hata: {str(e)}"
+
+_service_instance: Optional[AsyncDSITahsilatAPIService] = None
+
+
+def get_async_dsi_tahsilat_service() -> AsyncDSITahsilatAPIService:
+    """
+    Süreç genelinde paylaşılan asenkron DSİ servis örneğini döndür
+
+    Returns:
+        AsyncDSITahsilatAPIService: Tekil servis örneği
+    """
+    global _service_instance
+    if _service_instance is None:
+        _service_instance = AsyncDSITahsilatAPIService()
+    return _service_instance
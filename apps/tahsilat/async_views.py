@@ -0,0 +1,231 @@
+"""
+Tahsilat view'larının asenkron (ASGI) sürümleri
+
+DSİ çağrıları event loop üzerinde beklenir; böylece tek bir süreç yüzlerce
+upstream isteğini aynı anda taşıyabilir. Veritabanı ve önbellek işlemleri
+sync_to_async ile thread havuzunda çalıştırılır. Yanıt formatları senkron
+view'larla aynıdır; sorgu adımları sorgu_islemi modülünde ortaktır.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.core.concurrency_limiter import ETKILESIMLI, oncelik
+from apps.core.single_flight import single_flight_async
+from apps.core.tazelik import TazelikIstegi, yas_ekle
+from apps.core.upstream_errors import http_durumu
+from .async_dsi_api_service import get_async_dsi_tahsilat_service
+from .belge_cache import belge_onbellegi
+from .cache import tahsilat_liste_onbellegi
+from .detay_cache import tahsilat_detay_onbellegi
+from .models import TahsilatKaydi
+from .sorgu_islemi import SorguIslemi
+from .serializers import (
+    TahsilatDetaySerializer, TahsilatSorguRequestSerializer, TahsilatDetayTopluRequestSerializer
+)
+from .views import _en_eski_yas, _toplu_detay_sonuclari
+
+logger = logging.getLogger(__name__)
+
+def _json_yanit(data, status_code=status.HTTP_200_OK):
+    return JsonResponse(data, status=status_code, json_dumps_params={'ensure_ascii': False})
+
+
+def _kullanici_dogrula(request):
+    """DRF authentication sınıflarıyla kullanıcıyı doğrula (senkron)"""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except exceptions.APIException:
+        return None
+    return user if user and user.is_authenticated else None
+
+
+async def _yetkisiz_yanit(request):
+    kullanici = await sync_to_async(_kullanici_dogrula)(request)
+    if kullanici is None:
+        return None, _json_yanit({
+            'detail': 'Kimlik doğrulama bilgileri sağlanmadı.'
+        }, status.HTTP_401_UNAUTHORIZED)
+    return kullanici, None
+
+
+async def tahsilat_sorgu_async_view(request):
+    """Tahsilat sorgusu yap (asenkron)"""
+    if request.method != 'POST':
+        return _json_yanit({'detail': f'"{request.method}" metoduna izin verilmiyor.'},
+                           status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    kullanici, hata_yaniti = await _yetkisiz_yanit(request)
+    if hata_yaniti:
+        return hata_yaniti
+
+    try:
+        istek_verisi = json.loads(request.body or b'{}')
+    except ValueError:
+        return _json_yanit({'detail': 'Geçersiz JSON'}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = TahsilatSorguRequestSerializer(data=istek_verisi)
+    if not serializer.is_valid():
+        return _json_yanit(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    islem = await sync_to_async(SorguIslemi)(kullanici, serializer.validated_data, TazelikIstegi.istekten(request))
+    try:
+        async def getir_ve_kaydet():
+            sonuc = await tahsilat_liste_onbellegi.tahsilat_listele_async(**islem.parametreler, tazelik=islem.tazelik)
+            return await sync_to_async(islem.kaydet)(sonuc)
+
+        # Kullanıcı beklediği için DSİ kapasitesinde arka plan işlerinden önceliklidir
+        with oncelik(ETKILESIMLI):
+            sonuc, lider = await single_flight_async(
+                islem.tek_ucus_anahtari, getir_ve_kaydet, **islem.tek_ucus_ayarlari()
+            )
+        govde, durum, yas = await sync_to_async(islem.yanit)(sonuc, lider)
+    except Exception as e:
+        govde, durum, yas = await sync_to_async(islem.hata)(e)
+
+    return yas_ekle(_json_yanit(govde, durum), yas)
+
+
+# Django 4.2'deki csrf_exempt async view'ları sarmaladığında coroutine döndürmüyor;
+# DRF view'larında olduğu gibi token tabanlı kimlik doğrulama için CSRF kapatılır.
+tahsilat_sorgu_async_view.csrf_exempt = True
+
+
+async def tahsilat_detay_getir_async_view(request, tahsilat_id):
+    """Tahsilat detay bilgilerini getir (asenkron)"""
+    if request.method != 'GET':
+        return _json_yanit({'detail': f'"{request.method}" metoduna izin verilmiyor.'},
+                           status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    kullanici, hata_yaniti = await _yetkisiz_yanit(request)
+    if hata_yaniti:
+        return hata_yaniti
+
+    try:
+        tahsilat_kaydi = await sync_to_async(
+            TahsilatKaydi.objects.select_related('kullanici').filter(
+                tahsilat_id=tahsilat_id, kullanici=kullanici
+            ).first
+        )()
+        if tahsilat_kaydi is None:
+            return _json_yanit({
+                'success': False,
+                'error': 'Tahsilat kaydı bulunamadı'
+            }, status.HTTP_404_NOT_FOUND)
+
+        success, data, error_message = await tahsilat_detay_onbellegi.tahsilat_detay_getir_async(
+            tahsilat_id, TazelikIstegi.istekten(request)
+        )
+
+        if not success:
+            return _json_yanit({
+                'success': False,
+                'error': f'DSİ API hatası: {error_message}'
+            }, http_durumu(error_message))
+
+        return yas_ekle(_json_yanit({
+            'success': True,
+            'tahsilat_kaydi': TahsilatDetaySerializer(tahsilat_kaydi).data,
+            'detay_bilgileri': data.sozluk(),
+            'message': 'Tahsilat detay bilgileri başarıyla getirildi'
+        }), data.yas())
+
+    except Exception as e:
+        logger.error(f"Tahsilat detay getirme hatası: {str(e)}")
+        return _json_yanit({
+            'success': False,
+            'error': f'Beklenmeyen hata: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def tahsilat_detay_toplu_async_view(request):
+    """Birden fazla tahsilatın detay bilgilerini eşzamanlı getir (asenkron)"""
+    if request.method != 'POST':
+        return _json_yanit({'detail': f'"{request.method}" metoduna izin verilmiyor.'},
+                           status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    kullanici, hata_yaniti = await _yetkisiz_yanit(request)
+    if hata_yaniti:
+        return hata_yaniti
+
+    try:
+        istek_verisi = json.loads(request.body or b'{}')
+    except ValueError:
+        return _json_yanit({'detail': 'Geçersiz JSON'}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = TahsilatDetayTopluRequestSerializer(data=istek_verisi)
+    if not serializer.is_valid():
+        return _json_yanit(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    tahsilat_idleri = list(dict.fromkeys(serializer.validated_data['tahsilat_idleri']))
+
+    try:
+        kayitlar = await sync_to_async(
+            TahsilatKaydi.objects.filter(kullanici=kullanici).select_related('kullanici').in_bulk
+        )(tahsilat_idleri, field_name='tahsilat_id')
+
+        detaylar = await tahsilat_detay_onbellegi.tahsilat_detaylari_getir_async([
+            tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id in kayitlar
+        ], TazelikIstegi.istekten(request))
+
+        return yas_ekle(_json_yanit(_toplu_detay_sonuclari(tahsilat_idleri, kayitlar, detaylar)),
+                        _en_eski_yas(detaylar))
+
+    except Exception as e:
+        logger.error(f"Toplu tahsilat detay getirme hatası: {str(e)}")
+        return _json_yanit({
+            'success': False,
+            'error': f'Beklenmeyen hata: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+tahsilat_detay_toplu_async_view.csrf_exempt = True
+
+
+async def tahsilat_belge_getir_async_view(request, tahsilat_id):
+    """Tahsilat detay belgesini PDF olarak getir (asenkron, public endpoint)"""
+    if request.method != 'GET':
+        return _json_yanit({'detail': f'"{request.method}" metoduna izin verilmiyor.'},
+                           status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    try:
+        onbellek_yaniti = await sync_to_async(belge_onbellegi.yanit, thread_sensitive=False)(
+            request, tahsilat_id, asenkron=True
+        )
+        if onbellek_yaniti is not None:
+            return onbellek_yaniti
+
+        success, data, error_message = await get_async_dsi_tahsilat_service().tahsilat_belge_akisi(tahsilat_id)
+
+        if not success:
+            return _json_yanit({
+                'success': False,
+                'error': f'DSİ API hatası: {error_message}'
+            }, http_durumu(error_message))
+
+        response = StreamingHttpResponse(
+            belge_onbellegi.kaydederek_async(tahsilat_id, data['belgeAdi'], data['icerik']),
+            content_type='application/pdf'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{data["belgeAdi"]}"'
+
+        return response
+
+    except Exception as e:
+        logger.error(f"Tahsilat belge getirme hatası: {str(e)}")
+        return _json_yanit({
+            'success': False,
+            'error': f'Beklenmeyen hata: {str(e)}'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+tahsilat_belge_getir_async_view.sure_butcesi = getattr(settings, 'BELGE_SURE_BUTCESI', 30)
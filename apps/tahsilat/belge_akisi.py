@@ -0,0 +1,158 @@
+"""
+DSİ tahsilat belgesinin akış halinde (streaming) çözülmesi
+
+Belge yanıtı ABP zarfı içinde base64 bir PDF'tir. Yanıt parça parça okunur,
+"result.belge" alanı 4 karakterlik bloklar halinde çözülür ve PDF baytları
+doğrudan istemciye aktarılır; böylece belge boyutundan bağımsız olarak bellekte
+yalnızca bir okuma parçası tutulur.
+"""
+import base64
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from apps.core.json_stream import JsonAlanAkisi
+
+logger = logging.getLogger(__name__)
+
+# Upstream'den okuma parçası boyutu (bayt)
+BELGE_PARCA_BOYUTU = 64 * 1024
+
+
+class Base64Akisi:
+    """Parça parça gelen base64 metnini 4 karakterlik bloklar halinde çözer"""
+
+    def __init__(self):
+        self._kalan = ''
+
+    def besle(self, metin: str) -> bytes:
+        if not metin:
+            return b''
+        metin = self._kalan + ''.join(metin.split())
+        kesim = len(metin) - len(metin) % 4
+        self._kalan = metin[kesim:]
+        return base64.b64decode(metin[:kesim]) if kesim else b''
+
+    def bitir(self) -> bytes:
+        kalan, self._kalan = self._kalan, ''
+        if not kalan:
+            return b''
+        return base64.b64decode(kalan + '=' * (-len(kalan) % 4))
+
+
+class BelgeAkisi:
+    """ABP zarfındaki belge alanını PDF baytlarına çeviren akış çözücü"""
+
+    def __init__(self):
+        self.tarayici = JsonAlanAkisi(('result', 'belge'))
+        self.base64 = Base64Akisi()
+
+    @property
+    def belge_basladi(self) -> bool:
+        return self.tarayici.hedef_basladi
+
+    def besle(self, veri: bytes) -> bytes:
+        return self.base64.besle(self.tarayici.besle(veri))
+
+    def bitir(self) -> bytes:
+        self.tarayici.bitir()
+        return self.base64.bitir()
+
+    def belge_adi(self, varsayilan: str) -> str:
+        """Belge alanından önce gelmişse DSİ'nin verdiği dosya adı"""
+        return self.tarayici.deger('result', 'belgeAdi') or varsayilan
+
+    def hata_mesaji(self) -> str:
+        """Belge içermeyen yanıt için hata mesajı"""
+        if self.tarayici.deger('success'):
+            return "DSİ API Hatası: Belge bulunamadı"
+        return f"DSİ API Hatası: {self.tarayici.deger('error', 'message', varsayilan='Bilinmeyen hata')}"
+
+
+def belge_akisini_ac(parcalar: Iterator[bytes], kapat: Callable[[], None],
+                     varsayilan_ad: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    """
+    Belge alanının başına kadar oku ve kalan içeriği akıtan üreteci döndür
+
+    Args:
+        parcalar: Upstream yanıt gövdesi parçaları
+        kapat: Yanıt bağlantısını kapatan fonksiyon
+        varsayilan_ad: DSİ dosya adı vermezse kullanılacak ad
+
+    Returns:
+        Tuple[bool, Optional[Dict], Optional[str]]: (success, {'belgeAdi', 'icerik'}, error_message)
+    """
+    akis = BelgeAkisi()
+    parcalar = iter(parcalar)
+    ilk = b''
+    try:
+        for parca in parcalar:
+            ilk += akis.besle(parca)
+            if akis.belge_basladi:
+                break
+        else:
+            akis.bitir()
+            kapat()
+            return False, None, akis.hata_mesaji()
+    except Exception:
+        kapat()
+        raise
+
+    def icerik():
+        try:
+            if ilk:
+                yield ilk
+            for parca in parcalar:
+                veri = akis.besle(parca)
+                if veri:
+                    yield veri
+            son = akis.bitir()
+            if son:
+                yield son
+        except Exception as e:
+            # Yanıt başlıkları gönderildi; bağlantının kesilmesi için hatayı yükselt
+            logger.error(f"Tahsilat belge akışı yarıda kesildi: {str(e)}")
+            raise
+        finally:
+            kapat()
+
+    return True, {'belgeAdi': akis.belge_adi(varsayilan_ad), 'icerik': icerik()}, None
+
+
+async def belge_akisini_ac_async(parcalar: AsyncIterator[bytes], kapat: Callable[[], Awaitable[None]],
+                                 varsayilan_ad: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    """belge_akisini_ac() fonksiyonunun asenkron karşılığı (icerik bir async üreteçtir)"""
+    akis = BelgeAkisi()
+    ilk = b''
+    belge_var = False
+    try:
+        async for parca in parcalar:
+            ilk += akis.besle(parca)
+            if akis.belge_basladi:
+                belge_var = True
+                break
+        if not belge_var:
+            akis.bitir()
+            await kapat()
+            return False, None, akis.hata_mesaji()
+    except Exception:
+        await kapat()
+        raise
+
+    async def icerik():
+        try:
+            if ilk:
+                yield ilk
+            async for parca in parcalar:
+                veri = akis.besle(parca)
+                if veri:
+                    yield veri
+            son = akis.bitir()
+            if son:
+                yield son
+        except Exception as e:
+            logger.error(f"Tahsilat belge akışı yarıda kesildi: {str(e)}")
+            raise
+        finally:
+            await kapat()
+
+    return True, {'belgeAdi': akis.belge_adi(varsayilan_ad), 'icerik': icerik()}, None
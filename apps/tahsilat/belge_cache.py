@@ -0,0 +1,311 @@
+"""
+Tahsilat belgeleri için içerik adresli disk önbelleği
+
+Çözülmüş PDF'ler SHA-256 özetleriyle adreslenen dosyalarda tutulur; her
+tahsilat_id için küçük bir referans dosyası hangi içeriğin geçerli olduğunu
+gösterir:
+
+    <BELGE_CACHE_DIR>/nesneler/ab/abcdef....pdf        (içerik)
+    <BELGE_CACHE_DIR>/referanslar/<tahsilat_id>.json   (sha256, belgeAdi, zaman)
+
+Aynı PDF'i döndüren tahsilatlar tek dosyayı paylaşır. Toplam boyut
+BELGE_CACHE_MAKS_BOYUT ile sınırlıdır; aşıldığında en uzun süredir
+kullanılmayan (mtime) dosyalar silinir. Dizin birden fazla worker/container
+arasında paylaşılabilir; tüm yazmalar geçici dosya + os.replace ile atomiktir.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+
+from .belge_akisi import BELGE_PARCA_BOYUTU
+
+logger = logging.getLogger(__name__)
+
+
+class BelgeOnbellegi:
+    """tahsilat_id -> içerik özeti -> PDF dosyası"""
+
+    @property
+    def dizin(self) -> Path:
+        return Path(getattr(settings, 'BELGE_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'belge_cache'))
+
+    @property
+    def maks_boyut(self) -> int:
+        """Toplam boyut sınırı (bayt); 0 önbelleği kapatır"""
+        return getattr(settings, 'BELGE_CACHE_MAKS_BOYUT', 512) * 1024 * 1024
+
+    @property
+    def ttl(self) -> int:
+        """Referansın upstream'e sorulmadan kullanılacağı süre (saniye)"""
+        return getattr(settings, 'BELGE_CACHE_TTL', 86400)
+
+    @property
+    def aktif(self) -> bool:
+        return self.maks_boyut > 0
+
+    def _nesne_yolu(self, ozet: str) -> Path:
+        return self.dizin / 'nesneler' / ozet[:2] / f"{ozet}.pdf"
+
+    def _referans_yolu(self, tahsilat_id: int) -> Path:
+        return self.dizin / 'referanslar' / f"{int(tahsilat_id)}.json"
+
+    def _gecici_yol(self) -> Path:
+        gecici = self.dizin / 'gecici'
+        gecici.mkdir(parents=True, exist_ok=True)
+        return gecici / f"{uuid.uuid4().hex}.part"
+
+    def oku(self, tahsilat_id: int) -> Optional[Dict]:
+        """
+        Geçerli önbellek kaydını döndür
+
+        Returns:
+            Optional[Dict]: {'sha256', 'belgeAdi', 'boyut', 'zaman', 'yol'} veya None
+        """
+        if not self.aktif:
+            return None
+        referans_yolu = self._referans_yolu(tahsilat_id)
+        try:
+            with open(referans_yolu, encoding='utf-8') as f:
+                kayit = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Belge önbellek referansı okunamadı ({tahsilat_id}): {str(e)}")
+            return None
+
+        if time.time() - kayit.get('zaman', 0) > self.ttl:
+            return None
+
+        yol = self._nesne_yolu(kayit['sha256'])
+        try:
+            # LRU: kullanılan dosyanın mtime'ı güncellenir
+            os.utime(yol)
+        except FileNotFoundError:
+            # İçerik boyut sınırı nedeniyle silinmiş
+            self._sil(referans_yolu)
+            return None
+        except OSError:
+            pass
+        kayit['yol'] = yol
+        return kayit
+
+    def yanit(self, request, tahsilat_id: int, asenkron: bool = False):
+        """
+        Önbellekteki belge için HTTP yanıtı oluştur
+
+        If-None-Match başlığı içerik özetiyle eşleşiyorsa 304 döner.
+
+        Args:
+            request: Django isteği
+            tahsilat_id: Tahsilat ID
+            asenkron: ASGI altında dosyayı async iterator ile akıt
+
+        Returns:
+            Yanıt veya önbellekte yoksa None
+        """
+        kayit = self.oku(tahsilat_id)
+        if kayit is None:
+            return None
+
+        etag = quote_etag(kayit['sha256'])
+        istenen = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if '*' in istenen or etag in istenen:
+            response = HttpResponseNotModified()
+        else:
+            try:
+                if asenkron:
+                    response = StreamingHttpResponse(
+                        self._dosya_parcalari_async(kayit['yol']), content_type='application/pdf'
+                    )
+                    response['Content-Length'] = os.path.getsize(kayit['yol'])
+                    response['Content-Disposition'] = f'attachment; filename="{kayit["belgeAdi"]}"'
+                else:
+                    response = FileResponse(
+                        open(kayit['yol'], 'rb'), as_attachment=True,
+                        filename=kayit['belgeAdi'], content_type='application/pdf'
+                    )
+            except FileNotFoundError:
+                return None
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    async def _dosya_parcalari_async(self, yol: Path) -> AsyncIterator[bytes]:
+        # Yerel diskten okunan küçük parçalar event loop'u kayda değer bloklamaz
+        with open(yol, 'rb') as f:
+            while True:
+                parca = f.read(BELGE_PARCA_BOYUTU)
+                if not parca:
+                    break
+                yield parca
+
+    def kaydederek(self, tahsilat_id: int, belge_adi: str, icerik: Iterator[bytes]) -> Iterator[bytes]:
+        """
+        PDF akışını istemciye aktarırken diske de yaz
+
+        Akış sonuna kadar okunursa içerik önbelleğe alınır; istemci bağlantıyı
+        keser veya upstream hata verirse yarım dosya silinir.
+        """
+        if not self.aktif:
+            yield from icerik
+            return
+
+        yazici = _BelgeYazici(self, tahsilat_id, belge_adi)
+        try:
+            for parca in icerik:
+                yazici.yaz(parca)
+                yield parca
+            yazici.tamamla()
+        finally:
+            yazici.temizle()
+
+    async def kaydederek_async(self, tahsilat_id: int, belge_adi: str,
+                               icerik: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """kaydederek() metodunun async iterator karşılığı"""
+        if not self.aktif:
+            async for parca in icerik:
+                yield parca
+            return
+
+        yazici = _BelgeYazici(self, tahsilat_id, belge_adi)
+        try:
+            async for parca in icerik:
+                yazici.yaz(parca)
+                yield parca
+            yazici.tamamla()
+        finally:
+            yazici.temizle()
+
+    def _referans_yaz(self, tahsilat_id: int, kayit: Dict) -> None:
+        referans_yolu = self._referans_yolu(tahsilat_id)
+        referans_yolu.parent.mkdir(parents=True, exist_ok=True)
+        gecici = self._gecici_yol()
+        with open(gecici, 'w', encoding='utf-8') as f:
+            json.dump(kayit, f, ensure_ascii=False)
+        os.replace(gecici, referans_yolu)
+
+    def _sil(self, yol: Path) -> None:
+        try:
+            os.remove(yol)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Belge önbellek dosyası silinemedi ({yol}): {str(e)}")
+
+    def temizle(self) -> int:
+        """
+        Boyut sınırı aşıldıysa en uzun süredir kullanılmayan içerikleri sil
+
+        Sınırın %90'ına inilene kadar silinir ki her yazmada tarama yapılmasın.
+
+        Returns:
+            int: Silinen dosya sayısı
+        """
+        nesneler = self.dizin / 'nesneler'
+        dosyalar = []
+        toplam = 0
+        try:
+            for alt_dizin in os.scandir(nesneler):
+                if not alt_dizin.is_dir():
+                    continue
+                for dosya in os.scandir(alt_dizin.path):
+                    try:
+                        bilgi = dosya.stat()
+                    except FileNotFoundError:
+                        continue
+                    dosyalar.append((bilgi.st_mtime, bilgi.st_size, dosya.path))
+                    toplam += bilgi.st_size
+        except FileNotFoundError:
+            return 0
+
+        if toplam <= self.maks_boyut:
+            return 0
+
+        hedef = self.maks_boyut * 0.9
+        silinen = 0
+        for _, boyut, yol in sorted(dosyalar):
+            if toplam <= hedef:
+                break
+            self._sil(Path(yol))
+            toplam -= boyut
+            silinen += 1
+
+        logger.info(f"Belge önbelleğinden {silinen} dosya silindi")
+        return silinen
+
+
+class _BelgeYazici:
+    """Akış sırasında geçici dosyaya yazar ve özet hesaplar"""
+
+    def __init__(self, onbellek: BelgeOnbellegi, tahsilat_id: int, belge_adi: str):
+        self.onbellek = onbellek
+        self.tahsilat_id = tahsilat_id
+        self.belge_adi = belge_adi
+        self.ozet = hashlib.sha256()
+        self.boyut = 0
+        self.dosya = None
+        self.gecici = None
+        try:
+            self.gecici = onbellek._gecici_yol()
+            self.dosya = open(self.gecici, 'wb')
+        except OSError as e:
+            logger.warning(f"Belge önbelleğe yazılamıyor: {str(e)}")
+
+    def yaz(self, parca: bytes) -> None:
+        if self.dosya is None:
+            return
+        self.boyut += len(parca)
+        if self.boyut > self.onbellek.maks_boyut:
+            # Tek başına sınırı aşan belge önbelleğe alınmaz
+            self.temizle()
+            return
+        try:
+            self.dosya.write(parca)
+            self.ozet.update(parca)
+        except OSError as e:
+            logger.warning(f"Belge önbelleğe yazılamadı: {str(e)}")
+            self.temizle()
+
+    def tamamla(self) -> None:
+        if self.dosya is None:
+            return
+        try:
+            self.dosya.close()
+            self.dosya = None
+            ozet = self.ozet.hexdigest()
+            nesne_yolu = self.onbellek._nesne_yolu(ozet)
+            if nesne_yolu.exists():
+                os.utime(nesne_yolu)
+            else:
+                nesne_yolu.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self.gecici, nesne_yolu)
+            self.onbellek._referans_yaz(self.tahsilat_id, {
+                'sha256': ozet,
+                'belgeAdi': self.belge_adi,
+                'boyut': self.boyut,
+                'zaman': time.time(),
+            })
+            self.onbellek.temizle()
+        except OSError as e:
+            logger.warning(f"Belge önbelleğe kaydedilemedi ({self.tahsilat_id}): {str(e)}")
+
+    def temizle(self) -> None:
+        if self.dosya is not None:
+            self.dosya.close()
+            self.dosya = None
+        if self.gecici is not None:
+            self.onbellek._sil(self.gecici)
+            self.gecici = None
+
+
+belge_onbellegi = BelgeOnbellegi()
@@ -0,0 +1,197 @@
+"""
+DSİ tahsilat listesi yanıt önbelleği
+
+Başarılı tahsilat_listele yanıtları kimlik + normalize edilmiş filtreler ile
+Redis'te saklanır. TTL dolduktan sonra kayıt bir süre daha "bayat" olarak
+sunulur ve arka planda tek bir yenileme tetiklenir (stale-while-revalidate).
+İstemci Cache-Control: max-age / max-stale ile (apps.core.tazelik) kabul ettiği
+yaşı bildirirse sınırı aşan kayıt sunulmaz, DSİ'ye gidilir.
+Anahtarlarda TCKN/VKN düz metin olarak yer almaz, HMAC ile özetlenir.
+"""
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.concurrency_limiter import ARKA_PLAN, oncelik
+from apps.core.tazelik import TazelikIstegi
+from .dsi_api_service import get_dsi_tahsilat_service
+from .kayitlar import TahsilatListesi
+from .async_dsi_api_service import get_async_dsi_tahsilat_service
+
+logger = logging.getLogger(__name__)
+
+# v3: değer DSİ'den alınma anını taşıyan TahsilatListesi kaydıdır
+ANAHTAR_ON_EKI = 'tahsilat:liste:v3'
+
+
+def kimlik_hash(tckn: str = None, vkn: str = None) -> str:
+    """
+    TCKN/VKN değerini geri döndürülemez şekilde özetle
+
+    Args:
+        tckn: TC Kimlik No
+        vkn: Vergi Kimlik No
+
+    Returns:
+        str: HMAC-SHA256 özeti (hex)
+    """
+    kimlik = f"TCKN:{tckn}" if tckn else f"VKN:{vkn}"
+    return hmac.new(settings.SECRET_KEY.encode(), kimlik.encode(), hashlib.sha256).hexdigest()
+
+
+def _tarih_normalize(tarih: Optional[datetime]) -> str:
+    if not tarih:
+        return ''
+    return tarih.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def liste_anahtari(tckn: str = None, vkn: str = None, baslangic_tarihi: datetime = None,
+                   bitis_tarihi: datetime = None, sadece_odenmemis: bool = False) -> str:
+    """Sorgu parametrelerinden önbellek anahtarı üret"""
+    # Tarihler DSİ'ye gönderilen formatla aynı şekilde normalize edilir
+    filtreler = '|'.join([
+        kimlik_hash(tckn, vkn),
+        _tarih_normalize(baslangic_tarihi),
+        _tarih_normalize(bitis_tarihi),
+        '1' if sadece_odenmemis else '0',
+    ])
+    return f"{ANAHTAR_ON_EKI}:{hashlib.sha256(filtreler.encode()).hexdigest()}"
+
+
+class TahsilatListeOnbellegi:
+    """tahsilat_listele için stale-while-revalidate önbelleği"""
+
+    @property
+    def ttl(self) -> int:
+        """Kaydın taze sayıldığı süre (saniye)"""
+        return getattr(settings, 'DSI_LISTE_CACHE_TTL', 60)
+
+    @property
+    def stale_ttl(self) -> int:
+        """TTL sonrası bayat kaydın sunulabileceği ek süre (saniye)"""
+        return getattr(settings, 'DSI_LISTE_CACHE_STALE_TTL', 300)
+
+    def oku(self, anahtar: str) -> Optional[Dict]:
+        """Önbellek girdisini oku ({'veri': ..., 'zaman': ...})"""
+        try:
+            return cache.get(anahtar)
+        except Exception as e:
+            logger.warning(f"Tahsilat önbelleği okunamadı: {str(e)}")
+            return None
+
+    def yaz(self, anahtar: str, veri: TahsilatListesi) -> None:
+        """Başarılı yanıtı önbelleğe yaz"""
+        try:
+            cache.set(anahtar, {'veri': veri, 'zaman': time.time()}, timeout=self.ttl + self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"Tahsilat önbelleğine yazılamadı: {str(e)}")
+
+    def _sunulabilir(self, girdi: Dict, tazelik: Optional[TazelikIstegi]) -> bool:
+        """Kayıt istemcinin kabul ettiği yaşı aşmıyor mu"""
+        return time.time() - girdi['zaman'] <= (tazelik or TazelikIstegi()).sinir(self.ttl, self.stale_ttl)
+
+    def _arka_planda_yenile(self, anahtar: str, sorgu: Dict) -> None:
+        """Bayat kayıt için tek bir arka plan yenilemesi başlat"""
+        kilit = f"{anahtar}:yenileniyor"
+        try:
+            # cache.add atomiktir; tüm worker'lar arasında sadece biri yenileme yapar
+            if not cache.add(kilit, 1, timeout=max(getattr(settings, 'DSI_API_SURE_BUTCESI', 30), 1)):
+                return
+        except Exception as e:
+            logger.warning(f"Tahsilat önbellek kilidi alınamadı: {str(e)}")
+            return
+
+        def yenile():
+            try:
+                # Yanıt kullanıcıya zaten döndü; yenileme DSİ kapasitesinde arka plan şeridini kullanır
+                with oncelik(ARKA_PLAN):
+                    success, data, error_message = get_dsi_tahsilat_service().tahsilat_listele(**sorgu)
+                if success and data is not None:
+                    self.yaz(anahtar, data)
+                else:
+                    logger.warning(f"Tahsilat önbelleği yenilenemedi: {error_message}")
+            except Exception as e:
+                logger.error(f"Tahsilat önbelleği yenileme hatası: {str(e)}")
+            finally:
+                try:
+                    cache.delete(kilit)
+                except Exception:
+                    pass
+
+        threading.Thread(target=yenile, name='tahsilat-cache-yenile', daemon=True).start()
+
+    def tahsilat_listele(self, tckn: str = None, vkn: str = None,
+                         baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                         sadece_odenmemis: bool = False,
+                         tazelik: TazelikIstegi = None) -> Tuple[bool, Optional[TahsilatListesi], Optional[str]]:
+        """
+        Önbellekten veya DSİ API'den tahsilat listesini getir
+
+        Args:
+            tazelik: İstemcinin kabul ettiği veri yaşı; yoksa TTL + bayat süre içindeki kayıt sunulur
+
+        Returns:
+            Tuple[bool, Optional[TahsilatListesi], Optional[str]]: (success, data, error_message)
+        """
+        sorgu = {
+            'tckn': tckn,
+            'vkn': vkn,
+            'baslangic_tarihi': baslangic_tarihi,
+            'bitis_tarihi': bitis_tarihi,
+            'sadece_odenmemis': sadece_odenmemis,
+        }
+        anahtar = liste_anahtari(**sorgu)
+
+        girdi = self.oku(anahtar)
+        if girdi is not None and self._sunulabilir(girdi, tazelik):
+            if time.time() - girdi['zaman'] >= self.ttl:
+                logger.info(f"Tahsilat önbelleği bayat ({time.time() - girdi['zaman']:.0f} sn), arka planda yenileniyor")
+                self._arka_planda_yenile(anahtar, sorgu)
+            return True, girdi['veri'], None
+
+        success, data, error_message = get_dsi_tahsilat_service().tahsilat_listele(**sorgu)
+        if success and data is not None:
+            self.yaz(anahtar, data)
+        return success, data, error_message
+
+    async def tahsilat_listele_async(self, tckn: str = None, vkn: str = None,
+                                     baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                                     sadece_odenmemis: bool = False,
+                                     tazelik: TazelikIstegi = None) -> Tuple[bool, Optional[TahsilatListesi], Optional[str]]:
+        """
+        tahsilat_listele() metodunun asenkron karşılığı
+
+        Returns:
+            Tuple[bool, Optional[TahsilatListesi], Optional[str]]: (success, data, error_message)
+        """
+        sorgu = {
+            'tckn': tckn,
+            'vkn': vkn,
+            'baslangic_tarihi': baslangic_tarihi,
+            'bitis_tarihi': bitis_tarihi,
+            'sadece_odenmemis': sadece_odenmemis,
+        }
+        anahtar = liste_anahtari(**sorgu)
+
+        girdi = await sync_to_async(self.oku, thread_sensitive=False)(anahtar)
+        if girdi is not None and self._sunulabilir(girdi, tazelik):
+            if time.time() - girdi['zaman'] >= self.ttl:
+                logger.info(f"Tahsilat önbelleği bayat ({time.time() - girdi['zaman']:.0f} sn), arka planda yenileniyor")
+                await sync_to_async(self._arka_planda_yenile, thread_sensitive=False)(anahtar, sorgu)
+            return True, girdi['veri'], None
+
+        success, data, error_message = await get_async_dsi_tahsilat_service().tahsilat_listele(**sorgu)
+        if success and data is not None:
+            await sync_to_async(self.yaz, thread_sensitive=False)(anahtar, data)
+        return success, data, error_message
+
+
+tahsilat_liste_onbellegi = TahsilatListeOnbellegi()
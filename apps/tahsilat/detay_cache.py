@@ -0,0 +1,276 @@
+"""
+DSİ tahsilat detayı önbelleği
+
+Başarılı tahsilat_detay_getir yanıtları tahsilat ID ile Redis'te
+DSI_DETAY_CACHE_TTL saniye saklanır. İpucu göndermeyen istemcilere en fazla
+DSI_DETAY_YEREL_TTL saniyelik detay DSİ'ye gidilmeden sunulur; istemci
+Cache-Control: max-age / max-stale veya ?azami_yas ile (apps.core.tazelik)
+bu sınırı daraltabilir (ör. ödeme öncesi no-cache) veya genişletebilir.
+DSİ'den alınan her detay önbelleğe yazılır; böylece canlı istekler de
+sonraki istekleri besler.
+Verinin yaşı TahsilatDetayi.yas() ile hesaplanır.
+
+Redis'in (L2) önünde her süreçte DSI_DETAY_L1_BOYUTU kayıtlık bir LRU (L1)
+bulunur; sık istenen detaylar ağ gidiş-dönüşü olmadan sunulur. Yazan süreç
+kendi L1'ini günceller ve anahtarı Redis pub/sub ile yayınlar, diğer tüm
+worker'lar kendi kopyalarını atar (apps.core.gecersizlik). Kanal dinlenemiyorsa
+L1 devre dışı kalır, okumalar doğrudan L2'ye gider.
+
+Önbellekte uygun yaşta bulunmayan detaylar DSİ'ye gitmeden önce yerel taksit
+ve ödeme satırlarından (yerel_detay) kurulur; canlı alınan her detay bu
+satırlara da toplu yazılır. Redis'te süresi dolmuş detaylar da böylece
+sonraki isteklere veritabanından sunulabilir.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.gecersizlik import get_kanal
+from apps.core.metrics import onbellek_okuma
+from apps.core.tazelik import TazelikIstegi
+from apps.core.yerel_onbellek import YerelOnbellek
+from .dsi_api_service import get_dsi_tahsilat_service
+from .kayitlar import TahsilatDetayi
+from .yerel_detay import detaylari_kaydet, detaylari_oku
+from .async_dsi_api_service import get_async_dsi_tahsilat_service
+
+logger = logging.getLogger(__name__)
+
+ANAHTAR_ON_EKI = 'tahsilat:detay:v1'
+
+
+def detay_anahtari(tahsilat_id: int) -> str:
+    return f"{ANAHTAR_ON_EKI}:{tahsilat_id}"
+
+
+class TahsilatDetayOnbellegi:
+    """tahsilat_detay_getir için istemci ipucuna bağlı iki katmanlı önbellek"""
+
+    @property
+    def ttl(self) -> int:
+        """Detayın saklandığı (ipucuyla sunulabildiği) süre (saniye)"""
+        return getattr(settings, 'DSI_DETAY_CACHE_TTL', 300)
+
+    @property
+    def yerel_ttl(self) -> int:
+        """İpucu göndermeyen isteklere DSİ'ye gitmeden sunulan detayın en büyük yaşı (saniye)"""
+        return getattr(settings, 'DSI_DETAY_YEREL_TTL', 60)
+
+    def __init__(self):
+        self._yerel = YerelOnbellek(
+            getattr(settings, 'DSI_DETAY_L1_BOYUTU', 1024),
+            min(getattr(settings, 'DSI_DETAY_L1_TTL', 60), self.ttl)
+        )
+        self._kanal = get_kanal('tahsilat-detay')
+        self._kanal.abone_ol(self._yerel_gecersiz_kil)
+
+    def _yerel_gecersiz_kil(self, anahtarlar: Optional[List[str]]) -> None:
+        if anahtarlar is None:
+            self._yerel.temizle()
+        else:
+            self._yerel.sil(anahtarlar)
+
+    def _yerel_etkin(self) -> bool:
+        """L1 yalnızca geçersiz kılma kanalı dinlenirken kullanılır"""
+        return self._yerel.boyut > 0 and self._kanal.etkin()
+
+    def _sinir(self, tazelik: Optional[TazelikIstegi]) -> float:
+        # İpucu yoksa sunucunun varsayılanı; max-stale bu sürenin üzerine eklenir
+        return (tazelik or TazelikIstegi()).sinir(self.yerel_ttl)
+
+    def _yerelden_oku(self, anahtarlar: Iterable[str]) -> Dict[str, TahsilatDetayi]:
+        bulunanlar = self._yerel.coklu_al(anahtarlar) if self._yerel_etkin() else {}
+        onbellek_okuma.labels('tahsilat_detay', 'l1').inc(len(bulunanlar))
+        return bulunanlar
+
+    def _uzaktan_oku(self, anahtarlar: List[str]) -> Dict[str, TahsilatDetayi]:
+        """L2'den tek round-trip'te oku ve L1'e yerleştir"""
+        if not anahtarlar:
+            return {}
+        # L2 okunurken gelen geçersiz kılmadan sonra eski değer L1'e yerleşmesin
+        surum = self._yerel.surum
+        try:
+            bulunanlar = cache.get_many(anahtarlar)
+        except Exception as e:
+            logger.warning(f"Tahsilat detay önbelleği okunamadı: {str(e)}")
+            bulunanlar = {}
+        if self._yerel_etkin():
+            for anahtar, detay in bulunanlar.items():
+                self._yerel.koy(anahtar, detay, surum)
+        onbellek_okuma.labels('tahsilat_detay', 'l2').inc(len(bulunanlar))
+        onbellek_okuma.labels('tahsilat_detay', 'miss').inc(len(anahtarlar) - len(bulunanlar))
+        return bulunanlar
+
+    def coklu_oku(self, tahsilat_idleri: Iterable[int]) -> Dict[int, TahsilatDetayi]:
+        """Detayları önce L1'den, kalanları L2'den oku"""
+        anahtarlar = {detay_anahtari(tahsilat_id): tahsilat_id for tahsilat_id in tahsilat_idleri}
+        bulunanlar = self._yerelden_oku(anahtarlar)
+        bulunanlar.update(self._uzaktan_oku([anahtar for anahtar in anahtarlar if anahtar not in bulunanlar]))
+        return {anahtarlar[anahtar]: detay for anahtar, detay in bulunanlar.items()}
+
+    async def coklu_oku_async(self, tahsilat_idleri: Iterable[int]) -> Dict[int, TahsilatDetayi]:
+        """coklu_oku() metodunun asenkron karşılığı; L1 okuması thread'e devredilmez"""
+        anahtarlar = {detay_anahtari(tahsilat_id): tahsilat_id for tahsilat_id in tahsilat_idleri}
+        bulunanlar = self._yerelden_oku(anahtarlar)
+        eksikler = [anahtar for anahtar in anahtarlar if anahtar not in bulunanlar]
+        if eksikler:
+            bulunanlar.update(await sync_to_async(self._uzaktan_oku, thread_sensitive=False)(eksikler))
+        return {anahtarlar[anahtar]: detay for anahtar, detay in bulunanlar.items()}
+
+    def coklu_yaz(self, detaylar: Dict[int, TahsilatDetayi]) -> None:
+        """Detayları L2'ye yaz, diğer süreçlerin L1 kopyalarını geçersiz kıl"""
+        if not detaylar:
+            return
+        degerler = {detay_anahtari(tahsilat_id): detay for tahsilat_id, detay in detaylar.items()}
+        # Eşzamanlı bir L2 okuması eski değeri bu yazmadan sonra L1'e koyamasın
+        self._yerel.sil(degerler)
+        try:
+            cache.set_many(degerler, timeout=self.ttl)
+        except Exception as e:
+            # L2 eski değeri tutuyor olabilir; diğer süreçlerin kopyaları da atılır
+            logger.warning(f"Tahsilat detay önbelleğine yazılamadı: {str(e)}")
+        else:
+            if self._yerel_etkin():
+                for anahtar, detay in degerler.items():
+                    self._yerel.koy(anahtar, detay)
+        self._kanal.yayinla(list(degerler))
+
+    def _sunulacaklar(self, detaylar: Dict[int, TahsilatDetayi], tazelik: Optional[TazelikIstegi]) -> Dict[int, TahsilatDetayi]:
+        """İstemcinin kabul ettiği yaşı aşmayan detaylar"""
+        sinir = self._sinir(tazelik)
+        return {tahsilat_id: detay for tahsilat_id, detay in detaylar.items() if detay.yas() <= sinir}
+
+    def _yerel_kayitlardan(self, tahsilat_idleri: List[int], tazelik: Optional[TazelikIstegi]) -> Dict[int, TahsilatDetayi]:
+        """Uygun yaştaki detayları yerel taksit/ödeme satırlarından kur"""
+        if not tahsilat_idleri:
+            return {}
+        try:
+            return detaylari_oku(tahsilat_idleri, self._sinir(tazelik))
+        except Exception as e:
+            logger.warning(f"Tahsilat detayı yerel kayıtlardan okunamadı: {str(e)}")
+            return {}
+
+    def _hazir_detaylar(self, tahsilat_idleri: List[int], tazelik: Optional[TazelikIstegi]) -> Dict[int, TahsilatDetayi]:
+        """DSİ'ye gitmeden sunulabilecek detaylar (L1, L2, yerel satırlar)"""
+        if self._sinir(tazelik) <= 0:
+            return {}
+        bulunanlar = self._sunulacaklar(self.coklu_oku(tahsilat_idleri), tazelik)
+        bulunanlar.update(self._yerel_kayitlardan(
+            [tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id not in bulunanlar], tazelik
+        ))
+        return bulunanlar
+
+    async def _hazir_detaylar_async(self, tahsilat_idleri: List[int],
+                                    tazelik: Optional[TazelikIstegi]) -> Dict[int, TahsilatDetayi]:
+        if self._sinir(tazelik) <= 0:
+            return {}
+        bulunanlar = self._sunulacaklar(await self.coklu_oku_async(tahsilat_idleri), tazelik)
+        eksikler = [tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id not in bulunanlar]
+        if eksikler:
+            bulunanlar.update(await sync_to_async(self._yerel_kayitlardan)(eksikler, tazelik))
+        return bulunanlar
+
+    def _yerel_kaydet(self, detaylar: Dict[int, TahsilatDetayi]) -> None:
+        try:
+            detaylari_kaydet(detaylar)
+        except Exception as e:
+            logger.warning(f"Tahsilat detayı yerel kayıtlara yazılamadı: {str(e)}")
+
+    def _canli_kaydet(self, detaylar: Dict[int, TahsilatDetayi]) -> None:
+        """DSİ'den alınan detayları önbelleğe ve yerel satırlara yaz"""
+        self.coklu_yaz(detaylar)
+        self._yerel_kaydet(detaylar)
+
+    async def _canli_kaydet_async(self, detaylar: Dict[int, TahsilatDetayi]) -> None:
+        await sync_to_async(self.coklu_yaz, thread_sensitive=False)(detaylar)
+        await sync_to_async(self._yerel_kaydet)(detaylar)
+
+    @staticmethod
+    def _basarililar(sonuclar: Dict[int, Tuple]) -> Dict[int, TahsilatDetayi]:
+        return {
+            tahsilat_id: data
+            for tahsilat_id, (success, data, _) in sonuclar.items()
+            if success and data is not None
+        }
+
+    def tahsilat_detay_getir(self, tahsilat_id: int,
+                             tazelik: TazelikIstegi = None) -> Tuple[bool, Optional[TahsilatDetayi], Optional[str]]:
+        """
+        İstemcinin kabul ettiği yaştaki önbellek/yerel kaydı veya DSİ'den canlı detayı getir
+
+        Args:
+            tahsilat_id: Tahsilat ID
+            tazelik: İstemcinin kabul ettiği veri yaşı; yoksa DSI_DETAY_YEREL_TTL
+
+        Returns:
+            Tuple[bool, Optional[TahsilatDetayi], Optional[str]]: (success, data, error_message)
+        """
+        detay = self._hazir_detaylar([tahsilat_id], tazelik).get(tahsilat_id)
+        if detay is not None:
+            return True, detay, None
+
+        success, data, error_message = get_dsi_tahsilat_service().tahsilat_detay_getir(tahsilat_id)
+        if success and data is not None:
+            self._canli_kaydet({tahsilat_id: data})
+        return success, data, error_message
+
+    def tahsilat_detaylari_getir(self, tahsilat_idleri: List[int],
+                                 tazelik: TazelikIstegi = None) -> Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]:
+        """
+        Birden fazla detayı getir; önbellekte veya yerelde uygun olanlar toplu okunur, kalanlar DSİ'den eşzamanlı
+
+        Returns:
+            Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]: tahsilat_id -> (success, data, error_message)
+        """
+        sonuclar = {
+            tahsilat_id: (True, detay, None)
+            for tahsilat_id, detay in self._hazir_detaylar(tahsilat_idleri, tazelik).items()
+        }
+        eksikler = [tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id not in sonuclar]
+        if eksikler:
+            canli = get_dsi_tahsilat_service().tahsilat_detaylari_getir(eksikler)
+            self._canli_kaydet(self._basarililar(canli))
+            sonuclar.update(canli)
+        return sonuclar
+
+    async def tahsilat_detay_getir_async(self, tahsilat_id: int,
+                                         tazelik: TazelikIstegi = None) -> Tuple[bool, Optional[TahsilatDetayi], Optional[str]]:
+        """
+        tahsilat_detay_getir() metodunun asenkron karşılığı
+
+        Returns:
+            Tuple[bool, Optional[TahsilatDetayi], Optional[str]]: (success, data, error_message)
+        """
+        detay = (await self._hazir_detaylar_async([tahsilat_id], tazelik)).get(tahsilat_id)
+        if detay is not None:
+            return True, detay, None
+
+        success, data, error_message = await get_async_dsi_tahsilat_service().tahsilat_detay_getir(tahsilat_id)
+        if success and data is not None:
+            await self._canli_kaydet_async({tahsilat_id: data})
+        return success, data, error_message
+
+    async def tahsilat_detaylari_getir_async(self, tahsilat_idleri: List[int],
+                                             tazelik: TazelikIstegi = None) -> Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]:
+        """
+        tahsilat_detaylari_getir() metodunun asenkron karşılığı
+
+        Returns:
+            Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]: tahsilat_id -> (success, data, error_message)
+        """
+        sonuclar = {
+            tahsilat_id: (True, detay, None)
+            for tahsilat_id, detay in (await self._hazir_detaylar_async(tahsilat_idleri, tazelik)).items()
+        }
+        eksikler = [tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id not in sonuclar]
+        if eksikler:
+            canli = await get_async_dsi_tahsilat_service().tahsilat_detaylari_getir(eksikler)
+            await self._canli_kaydet_async(self._basarililar(canli))
+            sonuclar.update(canli)
+        return sonuclar
+
+
+tahsilat_detay_onbellegi = TahsilatDetayOnbellegi()
@@ -1,25 +1,325 @@
 import requests
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime
 import json
-from .mock_data import MOCK_ABP_RESPONSE
+from apps.core import http_transport
+from apps.core.circuit_breaker import CircuitOpenError, get_breaker
+from apps.core.concurrency_limiter import ConcurrencyLimitError, get_limiter
+from apps.core.deadline import DeadlineExceeded, zaman_asimi_mesaji, zaman_asimlari
+from apps.core.hedging import get_hedger
+from apps.core.upstream_pool import get_pool
+from apps.core.metrics import upstream_olc, uygulama_hatasi_kaydet
+from apps.core.retry import RetryPolicy
+from .belge_akisi import BELGE_PARCA_BOYUTU, belge_akisini_ac
+from .dsi_kayit import kaydederek, tekrar_adapteri
+from .kayitlar import TahsilatDetayi, TahsilatListesi, kayda_cevir
+from .sentetik_veri import kimlik_anahtari, varsayilan_uretec
 
 logger = logging.getLogger(__name__)
 
+# DSİ altyapı servisinin beklediği tarayıcı benzeri header'lar
+DSI_API_HEADERS = {
+    'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Authorization': 'null',
+    'Connection': 'keep-alive',
+    'Content-Length': '0',
+    'Origin': 'https://altayapi.dsi.gov.tr',
+    'Referer': 'https://altayapi.dsi.gov.tr/swagger/index.html',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin',
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
+    'accept': 'text/plain',
+    'sec-ch-ua': '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"'
+}
+
+TRANSPORT_PROFILI = 'dsi'
+DEVRE_KESICI = 'dsi'
+ESZAMANLILIK_SINIRI = 'dsi'
+UPSTREAM_HAVUZU = 'dsi'
+METRIK_SERVISI = 'dsi'
+
+# Akış halinde okunan liste yanıtları için parça boyutu (bayt)
+LISTE_PARCA_BOYUTU = 64 * 1024
+
+# Yan etkili olduğu için hiçbir koşulda tekrar denenmeyen servis metodları
+TEKRARLANMAYAN_METODLAR = frozenset({'TahsilatOdemeYap'})
+# İdempotent ve kuyruk gecikmesi yüksek okumalar; yavaş denemede yedek istek gönderilir (hedging.py)
+YEDEKLENEN_METODLAR = frozenset({'VTahsilatDetayGetirEDevlet', 'TahsilatBelgeGetirEDevlet'})
+
+# Bağlantı hatası sayılan istisnalar (gövde okunurken kopan bağlantı dahil)
+BAGLANTI_HATALARI = (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+
+def _dsi_session_hazirla(session: requests.Session) -> None:
+    """DSİ session'ına cookie ve SSL ayarlarını uygula"""
+    # Yük dengeleyici istekleri tek düğüme sabitlemesin; düğüm seçimi upstream havuzunda yapılır
+    session.cookies.set_policy(http_transport.YapiskanlikCerezPolitikasi())
+    # SSL doğrulamasını atla
+    session.verify = False
+    # DSI_TEKRAR_DOSYALARI tanımlıysa ağa çıkmadan kayıtlardan yanıt ver
+    tekrar = tekrar_adapteri()
+    if tekrar is not None:
+        session.mount('https://', tekrar)
+        session.mount('http://', tekrar)
+
+
+def dsi_adresleri() -> List[str]:
+    """DSİ taban adresleri (DSI_API_BASE_URLS boşsa yalnızca DSI_API_BASE_URL)"""
+    adresler = getattr(settings, 'DSI_API_BASE_URLS', None) or [
+        getattr(settings, 'DSI_API_BASE_URL', 'https://altayapi.dsi.gov.tr')
+    ]
+    return [adres.rstrip('/') for adres in adresler]
+
+
+def servis_yolu(endpoint: str) -> str:
+    """Servis metodunun taban adrese göre yolu"""
+    return f"/api/services/app/Tahsilat/{endpoint}"
+
+
+def yeniden_deneme_politikasi(endpoint: str) -> RetryPolicy:
+    """
+    Servis metodunun yeniden deneme politikası
+    
+    Okuma metodları idempotent olduğundan geçici hatalarda tekrar denenir;
+    TEKRARLANMAYAN_METODLAR tek denemeyle sınırlıdır. Tüm denemeler
+    DSI_API_SURE_BUTCESI içinde kalır.
+    """
+    return RetryPolicy(
+        f"dsi:{endpoint}",
+        max_attempts=1 if endpoint in TEKRARLANMAYAN_METODLAR else getattr(settings, 'DSI_API_RETRY_DENEME', 3),
+        base_delay=getattr(settings, 'DSI_API_RETRY_BEKLEME', 0.2),
+        max_delay=getattr(settings, 'DSI_API_RETRY_MAKS_BEKLEME', 2.0),
+        budget=getattr(settings, 'DSI_API_SURE_BUTCESI', 30),
+        attempt_timeout=getattr(settings, 'DSI_API_TIMEOUT', 30),
+    )
+
+
+def abp_sonucu(response) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    """
+    DSİ ABP yanıt zarfını çöz
+    
+    Args:
+        response: requests veya httpx yanıtı (status_code, json(), text)
+        
+    Returns:
+        Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+    """
+    if response.status_code == 200:
+        data = response.json()
+        
+        # ABP response formatını kontrol et
+        if data.get('success', False):
+            result = data.get('result', {})
+            return True, result, None
+        else:
+            error_msg = (data.get('error') or {}).get('message', 'Bilinmeyen hata')
+            return False, None, f"DSİ API Hatası: {error_msg}"
+    else:
+        return False, None, f"DSİ API HTTP Hatası: {response.status_code} - {response.text[:200]}"
+
+
+def abp_zarfi(result: Dict) -> bytes:
+    """Sonucu DSİ'nin döndürdüğü ABP yanıt zarfına koy (mock akışlar için)"""
+    return json.dumps({
+        'result': result,
+        'targetUrl': None,
+        'success': True,
+        'error': None,
+        'unAuthorizedRequest': False,
+        '__abp': True
+    }).encode('utf-8')
+
 
 class DSITahsilatAPIService:
     """DSİ Tahsilat API entegrasyonu"""
     
     def __init__(self):
-        self.base_url = getattr(settings, 'DSI_API_BASE_URL', 'https://altayapi.dsi.gov.tr')
         self.timeout = getattr(settings, 'DSI_API_TIMEOUT', 30)
+        self.baglanti_timeout = getattr(settings, 'DSI_API_BAGLANTI_TIMEOUT', 5)
         self.use_mock = getattr(settings, 'DSI_API_USE_MOCK', False)  # Gerçek API kullan
+        
+        # Süreç genelinde paylaşılan bağlantı havuzu
+        http_transport.configure(
+            TRANSPORT_PROFILI,
+            pool_connections=getattr(settings, 'DSI_API_POOL_CONNECTIONS', 4),
+            pool_maxsize=getattr(settings, 'DSI_API_POOL_MAXSIZE', 40),
+            max_retries=getattr(settings, 'DSI_API_MAX_RETRIES', 2),
+            tcp_keepalive=getattr(settings, 'DSI_API_TCP_KEEPALIVE', True),
+            session_hook=_dsi_session_hazirla,
+        )
+    
+    @property
+    def session(self) -> requests.Session:
+        """Çağıran thread'e ait, havuzu paylaşan session"""
+        return http_transport.get_session(TRANSPORT_PROFILI)
+    
+    @property
+    def breaker(self):
+        """DSİ altyapı servisi devre kesicisi"""
+        return get_breaker(DEVRE_KESICI)
+    
+    @property
+    def limiter(self):
+        """DSİ'ye giden eşzamanlı istekleri sınırlayan, tüm worker'larda ortak sınırlayıcı"""
+        return get_limiter(ESZAMANLILIK_SINIRI)
+    
+    @property
+    def havuz(self):
+        """DSİ adres havuzu (sağlığa göre seçim ve pasif dışlama)"""
+        return get_pool(UPSTREAM_HAVUZU, dsi_adresleri())
+    
+    def _deneme(self, endpoint: str, timeout: float, akis: bool = False, **istek) -> requests.Response:
+        """
+        Tek POST denemesi
+        
+        Eşzamanlılık slotu alınır, havuzdan adres seçilir ve istek metrikle
+        gönderilir. YEDEKLENEN_METODLAR'da deneme yavaş kalırsa yedek istek
+        gönderilir.
+        """
+        if akis:
+            istek['stream'] = True
+        
+        def gonder():
+            return self.limiter.call(
+                self.havuz.call,
+                lambda adres: self._kaydederek(endpoint, akis, istek, lambda: upstream_olc(
+                    METRIK_SERVISI,
+                    endpoint,
+                    self.session.post,
+                    f"{adres}{servis_yolu(endpoint)}",
+                    timeout=zaman_asimlari(timeout, self.baglanti_timeout, 'DSİ API'),
+                    akis=akis,
+                    **istek
+                )),
+                etiket='DSİ API',
+                uc=endpoint
+            )
+        
+        if endpoint in YEDEKLENEN_METODLAR:
+            return get_hedger(METRIK_SERVISI, endpoint).call(gonder, etiket='DSİ API')
+        return gonder()
+    
+    def _cagir(self, endpoint: str, etiket: str, akis: bool = False, **istek) -> requests.Response:
+        """
+        Servis metodunu devre kesici ve yeniden deneme politikasıyla çağır
+        
+        Devre kesici yeniden denemelerin dışındadır; tüm denemeler tek çağrı
+        olarak sayılır.
+        """
+        return self.breaker.call(
+            lambda: yeniden_deneme_politikasi(endpoint).call(
+                lambda timeout: self._deneme(endpoint, timeout, akis=akis, **istek),
+                etiket=etiket
+            ),
+            etiket=etiket
+        )
+    
+    @staticmethod
+    def _kaydederek(endpoint: str, akis: bool, istek: Dict, func):
+        """DSI_KAYIT_DIZINI tanımlıysa denemeyi kaydet (akış halindeki yanıtlar hariç)"""
+        if akis:
+            return func()
+        return kaydederek(endpoint, istek.get('params'), func)
+    
+    def _abp_post(self, endpoint: str, params: Dict, etiket: str,
+                  govde_logla: bool = True) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        DSİ altyapı servisine POST isteği gönder ve ABP yanıtını çöz
+        
+        Args:
+            endpoint: Servis metodu adı (ör. TahsilatListeleEDevlet)
+            params: Query parametreleri
+            etiket: Log mesajlarında kullanılacak API adı
+            govde_logla: Yanıt gövdesinin başı loglansın mı (belge gibi büyük yanıtlarda False)
+            
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+        """
+        logger.info(f"{etiket} çağrısı: {servis_yolu(endpoint)} - Params: {params}")
+        
+        # POST metodu kullan (her deneme ayrı adres seçer)
+        response = self._cagir(endpoint, etiket, params=params, headers=DSI_API_HEADERS)
+        
+        logger.info(f"{etiket} Response Status: {response.status_code}")
+        if govde_logla:
+            logger.info(f"{etiket} Response: {response.text[:500]}...")
+        
+        sonuc = abp_sonucu(response)
+        if response.status_code == 200 and not sonuc[0]:
+            uygulama_hatasi_kaydet(METRIK_SERVISI, endpoint)
+        return sonuc
+    
+    def _abp_akis(self, endpoint: str, params: Dict, etiket: str) -> Tuple[bool, Optional[requests.Response], Optional[str]]:
+        """
+        DSİ altyapı servisine POST isteği gönder ve yanıtı akış halinde döndür
+        
+        Gövde okunmadan döner; çağıran iter_content ile okuyup response.close() etmelidir.
+        
+        Returns:
+            Tuple[bool, Optional[requests.Response], Optional[str]]: (success, response, error_message)
+        """
+        logger.info(f"{etiket} çağrısı (akış): {servis_yolu(endpoint)} - Params: {params}")
+        
+        # Yalnızca yanıt başlıkları gelene kadar tekrar denenir; gövde akışı başladıktan sonra denenmez
+        response = self._cagir(endpoint, etiket, akis=True, params=params, headers=DSI_API_HEADERS)
+        
+        logger.info(f"{etiket} Response Status: {response.status_code}")
+        
+        if response.status_code != 200:
+            try:
+                return abp_sonucu(response)
+            finally:
+                response.close()
+        
+        return True, response, None
+    
+    def liste_parametreleri(self, tckn: str = None, vkn: str = None,
+                            baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                            sadece_odenmemis: bool = False) -> Dict:
+        """TahsilatListeleEDevlet query parametrelerini hazırla"""
+        params = {}
+        if tckn:
+            params['TCKN'] = tckn
+        if vkn:
+            params['VKN'] = vkn
+        if baslangic_tarihi:
+            params['BaslangicTarihi'] = baslangic_tarihi.strftime('%Y-%m-%dT%H:%M:%S')
+        if bitis_tarihi:
+            params['BitisTarihi'] = bitis_tarihi.strftime('%Y-%m-%dT%H:%M:%S')
+        if sadece_odenmemis is not None:
+            params['SadeceOdenmemisKayitlarMi'] = str(sadece_odenmemis).lower()
+        return params
+    
+    def mock_tahsilat_listesi(self, tckn: str = None, vkn: str = None, baslangic_tarihi: datetime = None,
+                              bitis_tarihi: datetime = None, sadece_odenmemis: bool = False) -> Dict:
+        """Mock modda dönecek tahsilat listesi (kimliğe göre deterministik sentetik veri)"""
+        return varsayilan_uretec().tahsilat_listesi(
+            kimlik_anahtari(tckn, vkn), baslangic_tarihi, bitis_tarihi, sadece_odenmemis
+        )
+    
+    def mock_tahsilat_detayi(self, tahsilat_id: int) -> Dict:
+        """Mock modda dönecek tahsilat detayı (listedeki kayıtla tutarlı)"""
+        return varsayilan_uretec().tahsilat_detayi(tahsilat_id)
+    
+    def mock_tahsilat_belgesi(self, tahsilat_id: int) -> Dict:
+        """Mock modda dönecek tahsilat belgesi"""
+        return varsayilan_uretec().tahsilat_belgesi(tahsilat_id)
+    
+    def mock_tahsilat_belge_zarfi(self, tahsilat_id: int) -> bytes:
+        """Mock belgenin DSİ'nin döndüreceği ABP zarfı içindeki hali"""
+        return abp_zarfi(self.mock_tahsilat_belgesi(tahsilat_id))
     
     def tahsilat_listele(self, tckn: str = None, vkn: str = None, 
                         baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
-                        sadece_odenmemis: bool = False) -> Tuple[bool, Optional[Dict], Optional[str]]:
+                        sadece_odenmemis: bool = False) -> Tuple[bool, Optional[TahsilatListesi], Optional[str]]:
         """
         DSİ Tahsilat Listele API'sini çağır
         
@@ -31,161 +331,34 @@ class DSITahsilatAPIService:
             sadece_odenmemis: Sadece ödenmemiş kayıtlar mı
             
         Returns:
-            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+            Tuple[bool, Optional[TahsilatListesi], Optional[str]]: (success, data, error_message)
         """
         try:
             # Mock data kullan
             if self.use_mock:
                 logger.info("Mock data kullanılıyor")
-                data = MOCK_ABP_RESPONSE.copy()
-                
-                # Sadece ödenmemiş kayıtlar filtresi uygula
-                if sadece_odenmemis:
-                    data['result']['tahsilatListe'] = [
-                        item for item in data['result']['tahsilatListe'] 
-                        if item['kalanAnaparaBorc'] > 0
-                    ]
-                
-                # Tarih filtresi uygula (basit)
-                if baslangic_tarihi or bitis_tarihi:
-                    filtered_list = []
-                    for item in data['result']['tahsilatListe']:
-                        item_date = datetime.fromisoformat(item['tahakkukDonemi'].replace('Z', '+00:00'))
-                        if baslangic_tarihi and item_date < baslangic_tarihi:
-                            continue
-                        if bitis_tarihi and item_date > bitis_tarihi:
-                            continue
-                        filtered_list.append(item)
-                    data['result']['tahsilatListe'] = filtered_list
-                
-                # Özet bilgilerini yeniden hesapla
-                tahsilat_liste = data['result']['tahsilatListe']
-                data['result']['anaParaBorc'] = sum(item['anaParaBorc'] for item in tahsilat_liste)
-                data['result']['yapilanToplamTahsilat'] = sum(item['yapilanToplamTahsilat'] for item in tahsilat_liste)
-                data['result']['toplamKalanAnaparaBorc'] = sum(item['kalanAnaparaBorc'] for item in tahsilat_liste)
-                
-                return True, data['result'], None
+                return True, TahsilatListesi.dsi(
+                    self.mock_tahsilat_listesi(tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis)
+                ), None
             
             # Gerçek API çağrısı
-            url = f"{self.base_url}/api/services/app/Tahsilat/TahsilatListeleEDevlet"
-            
-            # Parametreleri hazırla
-            params = {}
-            if tckn:
-                params['TCKN'] = tckn
-            if vkn:
-                params['VKN'] = vkn
-            if baslangic_tarihi:
-                params['BaslangicTarihi'] = baslangic_tarihi.strftime('%Y-%m-%dT%H:%M:%S')
-            if bitis_tarihi:
-                params['BitisTarihi'] = bitis_tarihi.strftime('%Y-%m-%dT%H:%M:%S')
-            if sadece_odenmemis is not None:
-                params['SadeceOdenmemisKayitlarMi'] = str(sadece_odenmemis).lower()
-            
-            headers = {
-                'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Authorization': 'null',
-                'Connection': 'keep-alive',
-                'Content-Length': '0',
-                'Origin': 'https://altayapi.dsi.gov.tr',
-                'Referer': 'https://altayapi.dsi.gov.tr/swagger/index.html',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-                'accept': 'text/plain',
-                'sec-ch-ua': '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
-                'sec-ch-ua-mobile': '?0',
-                'sec-ch-ua-platform': '"macOS"'
-            }
-            
-            logger.info(f"DSİ API çağrısı: {url} - Params: {params}")
-            
-            # Session kullan ve cookie ekle
-            session = requests.Session()
-            session.cookies.set('BIGipServeraltayapi_https_pool', '2751991980.47873.0000')
-            
-            # SSL doğrulamasını atla
-            session.verify = False
-            
-            # POST metodu kullan
-            response = session.post(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.timeout
-            )
+            params = self.liste_parametreleri(tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis)
             
-            logger.info(f"DSİ API Response Status: {response.status_code}")
-            logger.info(f"DSİ API Response: {response.text[:500]}...")
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # ABP response formatını kontrol et
-                if data.get('success', False):
-                    result = data.get('result', {})
-                    return True, result, None
-                else:
-                    error_msg = data.get('error', {}).get('message', 'Bilinmeyen hata')
-                    return False, None, f"DSİ API Hatası: {error_msg}"
-            else:
-                return False, None, f"DSİ API HTTP Hatası: {response.status_code} - {response.text[:200]}"
+            return kayda_cevir(self._abp_post('TahsilatListeleEDevlet', params, 'DSİ API'), TahsilatListesi)
                 
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"DSİ API isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except requests.exceptions.Timeout:
             logger.error("DSİ API zaman aşımı")
-            return False, None, "DSİ API zaman aşımı"
-        except requests.exceptions.ConnectionError:
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except BAGLANTI_HATALARI:
             logger.error("DSİ API bağlantı hatası")
             return False, None, "DSİ API bağlantı hatası"
         except Exception as e:
             logger.error(f"DSİ API beklenmeyen hata: {str(e)}")
             return False, None, f"Beklenmeyen hata: {str(e)}"
     
-    def tahsilat_detay_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
-        """
-        Belirli bir tahsilat kaydının detayını getir
-        
-        Args:
-            tahsilat_id: Tahsilat ID
-            
-        Returns:
-            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
-        """
-        try:
-            url = f"{self.base_url}/api/services/app/Tahsilat/TahsilatDetayGetir"
-            
-            params = {
-                'TahsilatId': tahsilat_id
-            }
-            
-            headers = {
-                'accept': 'application/json',
-                'content-type': 'application/json',
-                'user-agent': 'DSI-Mobil-Backend/1.0'
-            }
-            
-            response = requests.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success', False):
-                    return True, data.get('result'), None
-                else:
-                    error_msg = data.get('error', {}).get('message', 'Bilinmeyen hata')
-                    return False, None, f"DSİ API Hatası: {error_msg}"
-            else:
-                return False, None, f"DSİ API HTTP Hatası: {response.status_code}"
-                
-        except Exception as e:
-            logger.error(f"Tahsilat detay getirme hatası: {str(e)}")
-            return False, None, f"Beklenmeyen hata: {str(e)}"
-    
     def tahsilat_odeme_yap(self, tahsilat_id: int, odeme_tutari: float, 
                           odeme_tarihi: datetime = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
@@ -200,8 +373,6 @@ class DSITahsilatAPIService:
             Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
         """
         try:
-            url = f"{self.base_url}/api/services/app/Tahsilat/TahsilatOdemeYap"
-            
             payload = {
                 'TahsilatId': tahsilat_id,
                 'OdemeTutari': odeme_tutari,
@@ -214,12 +385,8 @@ class DSITahsilatAPIService:
                 'user-agent': 'DSI-Mobil-Backend/1.0'
             }
             
-            response = requests.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=self.timeout
-            )
+            # Ödeme yan etkili olduğundan tek deneme yapılır
+            response = self._cagir('TahsilatOdemeYap', 'DSİ Tahsilat Ödeme API', json=payload, headers=headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -231,11 +398,14 @@ class DSITahsilatAPIService:
             else:
                 return False, None, f"DSİ API HTTP Hatası: {response.status_code}"
                 
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"Tahsilat ödeme isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except Exception as e:
             logger.error(f"Tahsilat ödeme hatası: {str(e)}")
             return False, None, f"Beklenmeyen hata: {str(e)}"
     
-    def tahsilat_detay_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    def tahsilat_detay_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[TahsilatDetayi], Optional[str]]:
         """
         Tahsilat detay bilgilerini getir
         
@@ -243,118 +413,71 @@ class DSITahsilatAPIService:
             tahsilat_id: Tahsilat ID
             
         Returns:
-            Tuple[bool, Optional[Dict], Optional[str]]: (success, data, error_message)
+            Tuple[bool, Optional[TahsilatDetayi], Optional[str]]: (success, data, error_message)
         """
         try:
             # Mock data kullan
             if self.use_mock:
                 logger.info("Mock data kullanılıyor - Tahsilat Detay")
-                # Mock detay verisi
-                mock_detail = {
-                    "tahsilatId": tahsilat_id,
-                    "tahakkukNo": f"202111808000000{tahsilat_id}",
-                    "gelirTuru": "08 - İçme Kullanma ve Endüstri Suyu Tesislerine İlişkin Yatırım Bedeli Geri Ödeme Gelirleri",
-                    "borcunKonusu": f"Test tahsilat detayı - ID: {tahsilat_id}",
-                    "cariId": 1792,
-                    "anaParaBorc": 100000.00,
-                    "yapilanToplamTahsilat": 50000.00,
-                    "kalanAnaparaBorc": 50000.00,
-                    "tahakkukDonemi": "2024-01-31T00:00:00",
-                    "taksitler": [
-                        {
-                            "taksitNo": 1,
-                            "taksitTutari": 25000.00,
-                            "vadeTarihi": "2024-02-28T00:00:00",
-                            "odemeDurumu": "Ödendi",
-                            "odemeTarihi": "2024-02-15T00:00:00"
-                        },
-                        {
-                            "taksitNo": 2,
-                            "taksitTutari": 25000.00,
-                            "vadeTarihi": "2024-03-31T00:00:00",
-                            "odemeDurumu": "Beklemede",
-                            "odemeTarihi": None
-                        }
-                    ],
-                    "odemeGecmisi": [
-                        {
-                            "odemeTarihi": "2024-02-15T00:00:00",
-                            "odemeTutari": 25000.00,
-                            "odemeYontemi": "Banka Havalesi",
-                            "referansNo": "REF001"
-                        }
-                    ]
-                }
-                return True, mock_detail, None
+                return True, TahsilatDetayi.dsi(self.mock_tahsilat_detayi(tahsilat_id)), None
             
             # Gerçek API çağrısı
-            url = f"{self.base_url}/api/services/app/Tahsilat/VTahsilatDetayGetirEDevlet"
-            
             # Parametreleri hazırla
             params = {
                 'tahsilatId': tahsilat_id
             }
             
-            headers = {
-                'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Authorization': 'null',
-                'Connection': 'keep-alive',
-                'Content-Length': '0',
-                'Origin': 'https://altayapi.dsi.gov.tr',
-                'Referer': 'https://altayapi.dsi.gov.tr/swagger/index.html',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-                'accept': 'text/plain',
-                'sec-ch-ua': '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
-                'sec-ch-ua-mobile': '?0',
-                'sec-ch-ua-platform': '"macOS"'
-            }
-            
-            logger.info(f"DSİ Tahsilat Detay API çağrısı: {url} - Params: {params}")
-            
-            # Session kullan ve cookie ekle
-            session = requests.Session()
-            session.cookies.set('BIGipServeraltayapi_https_pool', '2751991980.47873.0000')
-            
-            # SSL doğrulamasını atla
-            session.verify = False
-            
-            # POST metodu kullan
-            response = session.post(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.timeout
+            return kayda_cevir(
+                self._abp_post('VTahsilatDetayGetirEDevlet', params, 'DSİ Tahsilat Detay API'), TahsilatDetayi
             )
-            
-            logger.info(f"DSİ Tahsilat Detay API Response Status: {response.status_code}")
-            logger.info(f"DSİ Tahsilat Detay API Response: {response.text[:500]}...")
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # ABP response formatını kontrol et
-                if data.get('success', False):
-                    result = data.get('result', {})
-                    return True, result, None
-                else:
-                    error_msg = data.get('error', {}).get('message', 'Bilinmeyen hata')
-                    return False, None, f"DSİ API Hatası: {error_msg}"
-            else:
-                return False, None, f"DSİ API HTTP Hatası: {response.status_code} - {response.text[:200]}"
                 
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"DSİ Tahsilat Detay API isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except requests.exceptions.Timeout:
             logger.error("DSİ Tahsilat Detay API zaman aşımı")
-            return False, None, "DSİ API zaman aşımı"
-        except requests.exceptions.ConnectionError:
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except BAGLANTI_HATALARI:
             logger.error("DSİ Tahsilat Detay API bağlantı hatası")
             return False, None, "DSİ API bağlantı hatası"
         except Exception as e:
             logger.exception(f"Beklenmeyen DSİ Tahsilat Detay API hatası: {e}")
             return False, None, f"Beklenmeyen hata: {str(e)}"
     
+    def tahsilat_detaylari_getir(self, tahsilat_idleri: List[int],
+                                 max_eszamanli: int = None) -> Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]:
+        """
+        Birden fazla tahsilatın detayını eşzamanlı getir
+        
+        Her kayıt tahsilat_detay_getir ile ayrı ayrı çekilir; hatalar kayıt
+        bazında döner, bir kaydın hatası diğerlerini etkilemez.
+        
+        Args:
+            tahsilat_idleri: Tahsilat ID listesi
+            max_eszamanli: Aynı anda yapılacak en fazla DSİ çağrısı
+            
+        Returns:
+            Dict[int, Tuple[bool, Optional[TahsilatDetayi], Optional[str]]]: tahsilat_id -> (success, data, error_message)
+        """
+        tahsilat_idleri = list(dict.fromkeys(tahsilat_idleri))
+        if not tahsilat_idleri:
+            return {}
+        
+        max_eszamanli = max_eszamanli or getattr(settings, 'DSI_DETAY_TOPLU_ESZAMANLI', 40)
+        # Bağlantı havuzundan fazla thread açmak beklemeden başka bir şey getirmez
+        max_eszamanli = min(max_eszamanli, getattr(settings, 'DSI_API_POOL_MAXSIZE', 40), len(tahsilat_idleri))
+        
+        if max_eszamanli <= 1:
+            return {tahsilat_id: self.tahsilat_detay_getir(tahsilat_id) for tahsilat_id in tahsilat_idleri}
+        
+        # Thread'ler çağıranın bağlamını (ör. öncelik şeridi) devralmaz; her iş bağlamın kopyasında çalışır
+        baglam = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max_eszamanli, thread_name_prefix='dsi-detay') as executor:
+            sonuclar = executor.map(
+                lambda tahsilat_id: baglam.copy().run(self.tahsilat_detay_getir, tahsilat_id), tahsilat_idleri
+            )
+            return dict(zip(tahsilat_idleri, sonuclar))
+    
     def tahsilat_belge_getir(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
         Tahsilat detay belgesini PDF olarak getir (base64 formatında)
@@ -369,86 +492,140 @@ class DSITahsilatAPIService:
             # Mock data kullan
             if self.use_mock:
                 logger.info("Mock data kullanılıyor - Tahsilat Belge")
-                # Mock PDF belge verisi (base64)
-                mock_pdf_base64 = "JVBERi0xLjQKJcOkw7zDtsO8CjIgMCBvYmoKPDwKL0xlbmd0aCAzIDAgUgovVHlwZSAvUGFnZQovUmVzb3VyY2VzIDw8Ci9Gb250IDw8Ci9GMSAKPDwKL1R5cGUgL0ZvbnQKL1N1YnR5cGUgL1R5cGUxCi9CYXNlRm9udCAvSGVsdmV0aWNhCj4+Cj4+Cj4+Ci9QYXJlbnQgMSAwIFIKPj4KZW5kb2JqCjMgMCBvYmoKNDQKZW5kb2JqCjEgMCBvYmoKPDwKL1R5cGUgL1BhZ2VzCi9LaWRzIFsyIDAgUl0KL0NvdW50IDEKL01lZGlhQm94IFswIDAgNTk1IDg0Ml0KPj4KZW5kb2JqCjQgMCBvYmoKPDwKL1R5cGUgL0NhdGFsb2cKL1BhZ2VzIDEgMCBSCj4+CmVuZG9iagp4cmVmCjAgNQowMDAwMDAwMDAwIDY1NTM1IGYKMDAwMDAwMDAwOSAwMDAwMCBuCjAwMDAwMDAwNTggMDAwMDAgbgowMDAwMDAwMTE1IDAwMDAwIG4KMDAwMDAwMDI2MiAwMDAwMCBuCnRyYWlsZXIKPDwKL1NpemUgNQovUm9vdCA0IDAgUgo+PgpzdGFydHhyZWYKMzIxCiUlRU9G"
-                
-                mock_belge = {
-                    "tahsilatId": tahsilat_id,
-                    "belgeAdi": f"Tahsilat_Detay_{tahsilat_id}.pdf",
-                    "belge": mock_pdf_base64,
-                    "belgeBoyutu": len(mock_pdf_base64),
-                    "olusturmaTarihi": "2025-01-19T12:00:00Z",
-                    "sonucBilgisi": {
-                        "sonucKodu": "001",
-                        "sonucAciklamasi": "Belge başarıyla oluşturuldu."
-                    }
-                }
-                return True, mock_belge, None
+                return True, self.mock_tahsilat_belgesi(tahsilat_id), None
             
             # Gerçek API çağrısı
-            url = f"{self.base_url}/api/services/app/Tahsilat/TahsilatBelgeGetirEDevlet"
-            
             # Parametreleri hazırla
             params = {
                 'tahsilatId': tahsilat_id
             }
             
-            headers = {
-                'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Authorization': 'null',
-                'Connection': 'keep-alive',
-                'Content-Length': '0',
-                'Origin': 'https://altayapi.dsi.gov.tr',
-                'Referer': 'https://altayapi.dsi.gov.tr/swagger/index.html',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-                'accept': 'text/plain',
-                'sec-ch-ua': '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
-                'sec-ch-ua-mobile': '?0',
-                'sec-ch-ua-platform': '"macOS"'
-            }
+            return self._abp_post('TahsilatBelgeGetirEDevlet', params, 'DSİ Tahsilat Belge API', govde_logla=False)
+                
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"DSİ Tahsilat Belge API isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
+        except requests.exceptions.Timeout:
+            logger.error("DSİ Tahsilat Belge API zaman aşımı")
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except BAGLANTI_HATALARI:
+            logger.error("DSİ Tahsilat Belge API bağlantı hatası")
+            return False, None, "DSİ API bağlantı hatası"
+        except Exception as e:
+            logger.exception(f"Beklenmeyen DSİ Tahsilat Belge API hatası: {e}")
+            return False, None, f"Beklenmeyen hata: {str(e)}"
+
+    
+    def tahsilat_belge_akisi(self, tahsilat_id: int) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        Tahsilat belgesini akış halinde getir
+        
+        ABP zarfı parça parça okunur ve belge alanı çözülerek PDF baytları
+        üretilir; yanıtın tamamı hiçbir zaman bellekte tutulmaz.
+        
+        Args:
+            tahsilat_id: Tahsilat ID
             
-            logger.info(f"DSİ Tahsilat Belge API çağrısı: {url} - Params: {params}")
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, {'belgeAdi', 'icerik'}, error_message)
+            icerik PDF baytlarını parça parça üreten bir iterator'dır
+        """
+        varsayilan_ad = f"tahsilat_{tahsilat_id}.pdf"
+        try:
+            # Mock data kullan
+            if self.use_mock:
+                logger.info("Mock data kullanılıyor - Tahsilat Belge (akış)")
+                govde = self.mock_tahsilat_belge_zarfi(tahsilat_id)
+                parcalar = (govde[i:i + BELGE_PARCA_BOYUTU] for i in range(0, len(govde), BELGE_PARCA_BOYUTU))
+                return belge_akisini_ac(parcalar, lambda: None, varsayilan_ad)
             
-            # Session kullan ve cookie ekle
-            session = requests.Session()
-            session.cookies.set('BIGipServeraltayapi_https_pool', '2751991980.47873.0000')
+            params = {
+                'tahsilatId': tahsilat_id
+            }
             
-            # SSL doğrulamasını atla
-            session.verify = False
+            success, response, error_message = self._abp_akis('TahsilatBelgeGetirEDevlet', params, 'DSİ Tahsilat Belge API')
+            if not success:
+                return False, None, error_message
             
-            # POST metodu kullan
-            response = session.post(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.timeout
+            sonuc = belge_akisini_ac(
+                response.iter_content(chunk_size=BELGE_PARCA_BOYUTU), response.close, varsayilan_ad
             )
-            
-            logger.info(f"DSİ Tahsilat Belge API Response Status: {response.status_code}")
-            logger.info(f"DSİ Tahsilat Belge API Response: {response.text[:500]}...")
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # ABP response formatını kontrol et
-                if data.get('success', False):
-                    result = data.get('result', {})
-                    return True, result, None
-                else:
-                    error_msg = data.get('error', {}).get('message', 'Bilinmeyen hata')
-                    return False, None, f"DSİ API Hatası: {error_msg}"
-            else:
-                return False, None, f"DSİ API HTTP Hatası: {response.status_code} - {response.text[:200]}"
+            if not sonuc[0]:
+                uygulama_hatasi_kaydet(METRIK_SERVISI, 'TahsilatBelgeGetirEDevlet')
+            return sonuc
                 
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"DSİ Tahsilat Belge API isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
         except requests.exceptions.Timeout:
             logger.error("DSİ Tahsilat Belge API zaman aşımı")
-            return False, None, "DSİ API zaman aşımı"
-        except requests.exceptions.ConnectionError:
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except BAGLANTI_HATALARI:
             logger.error("DSİ Tahsilat Belge API bağlantı hatası")
             return False, None, "DSİ API bağlantı hatası"
         except Exception as e:
             logger.exception(f"Beklenmeyen DSİ Tahsilat Belge API hatası: {e}")
             return False, None, f"Beklenmeyen hata: {str(e)}"
+    
+    def tahsilat_listele_akisi(self, tckn: str = None, vkn: str = None,
+                               baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                               sadece_odenmemis: bool = False) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        DSİ Tahsilat Listele API yanıtını ayrıştırmadan akış halinde getir
+        
+        Büyük listelerin ingest.tahsilat_listesi_ice_aktar ile içe aktarılması içindir.
+        
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, {'parcalar', 'kapat'}, error_message)
+            parcalar yanıt gövdesi parçalarını üreten bir iterator'dır; kapat() ile bağlantı bırakılır
+        """
+        try:
+            if self.use_mock:
+                logger.info("Mock data kullanılıyor (akış)")
+                govde = abp_zarfi(self.mock_tahsilat_listesi(tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis))
+                return True, {
+                    'parcalar': (govde[i:i + LISTE_PARCA_BOYUTU] for i in range(0, len(govde), LISTE_PARCA_BOYUTU)),
+                    'kapat': lambda: None
+                }, None
+            
+            params = self.liste_parametreleri(tckn, vkn, baslangic_tarihi, bitis_tarihi, sadece_odenmemis)
+            success, response, error_message = self._abp_akis('TahsilatListeleEDevlet', params, 'DSİ API')
+            if not success:
+                return False, None, error_message
+            
+            return True, {
+                'parcalar': response.iter_content(chunk_size=LISTE_PARCA_BOYUTU),
+                'kapat': response.close
+            }, None
+            
+        except (CircuitOpenError, ConcurrencyLimitError, DeadlineExceeded) as e:
+            logger.warning(f"DSİ API isteği gönderilmedi: {str(e)}")
+            return False, None, str(e)
+        except requests.exceptions.Timeout:
+            logger.error("DSİ API zaman aşımı")
+            return False, None, zaman_asimi_mesaji("DSİ API zaman aşımı", 'DSİ API')
+        except BAGLANTI_HATALARI:
+            logger.error("DSİ API bağlantı hatası")
+            return False, None, "DSİ API bağlantı hatası"
+        except Exception as e:
+            logger.exception(f"Beklenmeyen DSİ API hatası: {e}")
+            return False, None, f"Beklenmeyen hata: {str(e)}"
+
+
+_service_instance: Optional[DSITahsilatAPIService] = None
+_service_lock = threading.Lock()
+
+
+def get_dsi_tahsilat_service() -> DSITahsilatAPIService:
+    """
+    Süreç genelinde paylaşılan DSİ servis örneğini döndür
+    
+    Returns:
+        DSITahsilatAPIService: Tekil servis örneği
+    """
+    global _service_instance
+    if _service_instance is None:
+        with _service_lock:
+            if _service_instance is None:
+                _service_instance = DSITahsilatAPIService()
+    return _service_instance
@@ -0,0 +1,398 @@
+"""
+DSİ yanıtlarının kaydı ve tekrar oynatılması
+
+Kayıt (DSI_KAYIT_DIZINI tanımlıysa): okuma metodlarının her denemesi istek
+parametreleri, HTTP durumu, süresi ve yanıt gövdesiyle birlikte gzip'li JSONL
+dosyalarına yazılır. Dosyalar süreç ve saat başına ayrıdır
+(dsi-YYYYMMDDHH-<pid>.jsonl.gz). Kişisel veriler yazılmadan önce temizlenir:
+
+- TCKN/VKN gibi kimlik alanları ve metinlerde geçen 10-11 haneli sayılar aynı
+  uzunlukta takma ada çevrilir (SECRET_KEY ile HMAC; aynı kimlik her kayıtta
+  aynı takma adı alır, listeler ve detaylar birbirine bağlı kalır)
+- Ad, unvan, adres gibi serbest metin alanları uzunluğu korunarak maskelenir
+- Belge (base64 PDF) içeriği aynı uzunlukta dolguyla değiştirilir
+
+Sıkıştırma ve temizleme istek thread'inde değil arka plandaki yazıcı
+thread'inde yapılır; kuyruk dolarsa kayıt atlanır, istek hiçbir zaman beklemez.
+Akış halinde okunan yanıtlar (belge akışı, toplu içe aktarma) kaydedilmez.
+
+Tekrar oynatma (DSI_TEKRAR_DOSYALARI tanımlıysa): DSİ servisleri ağa çıkmadan
+kayıtlardan yanıt verir. Aynı metod ve parametrelerle kaydedilmiş yanıt varsa
+o, yoksa aynı metodun kayıtları sırayla döner; her yanıt kaydedildiği süre
+kadar (DSI_TEKRAR_HIZI ile ölçeklenerek) bekletilir, zaman aşımına uğramış
+kayıtlar yine zaman aşımı olarak oynatılır.
+"""
+import asyncio
+import glob
+import gzip
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+logger = logging.getLogger(__name__)
+
+# Kaydedilen (idempotent okuma) servis metodları; ödeme gibi yan etkili çağrılar kaydedilmez
+KAYDEDILEN_METODLAR = frozenset({'TahsilatListeleEDevlet', 'VTahsilatDetayGetirEDevlet', 'TahsilatBelgeGetirEDevlet'})
+
+# Alan adları küçük harfle karşılaştırılır
+KIMLIK_ALANLARI = frozenset({'tckn', 'vkn', 'tckimlikno', 'vergino', 'vergikimlikno', 'kimlikno'})
+METIN_ALANLARI = frozenset({
+    'ad', 'soyad', 'adsoyad', 'adisoyadi', 'unvan', 'unvani', 'borclu', 'borcluadi', 'adres', 'telefon',
+    'ceptelefonu', 'eposta', 'email',
+    # Serbest metin; kişi adı geçebilir
+    'borcunkonusu', 'aciklama'
+})
+BELGE_ALANLARI = frozenset({'belge'})
+
+# Metin içinde geçen TCKN (11) ve VKN (10) haneli sayılar
+_KIMLIK_DESENI = re.compile(r'(?<!\d)\d{10,11}(?!\d)')
+
+# Yazıcı kuyruğunda bekleyebilecek en fazla kayıt
+KUYRUK_BOYUTU = 1000
+
+_BITTI = object()
+
+
+def takma_ad(deger: str) -> str:
+    """Kimlik numarasını aynı uzunlukta, tekrarlanabilir bir takma ada çevir"""
+    ozet = hmac.new(settings.SECRET_KEY.encode('utf-8'), deger.encode('utf-8'), hashlib.sha256).hexdigest()
+    return str(int(ozet, 16))[:len(deger)]
+
+
+def _maskele(metin: str) -> str:
+    return re.sub(r'\w', lambda m: '0' if m.group().isdigit() else 'x', metin)
+
+
+def temizle(veri: Any, alan: str = None) -> Any:
+    """JSON uyumlu veriden kişisel bilgileri temizle (yapı, tipler ve uzunluklar korunur)"""
+    anahtar = (alan or '').lower()
+    if isinstance(veri, dict):
+        return {k: temizle(v, k) for k, v in veri.items()}
+    if isinstance(veri, list):
+        return [temizle(v, alan) for v in veri]
+    if anahtar in KIMLIK_ALANLARI and veri is not None:
+        return type(veri)(takma_ad(str(veri))) if isinstance(veri, (int, str)) else veri
+    if not isinstance(veri, str):
+        return veri
+    if anahtar in BELGE_ALANLARI:
+        return 'A' * len(veri)
+    if anahtar in METIN_ALANLARI:
+        return _maskele(veri)
+    return _KIMLIK_DESENI.sub(lambda m: takma_ad(m.group()), veri)
+
+
+def _parametre_anahtari(params: Optional[Dict]) -> str:
+    return json.dumps({k: str(v) for k, v in (params or {}).items()}, sort_keys=True)
+
+
+class DSIKaydedici:
+    """DSİ yanıtlarını arka planda temizleyip gzip'li JSONL dosyalarına yazan kaydedici"""
+
+    def __init__(self, dizin: str, oran: float = 1.0):
+        self.dizin = dizin
+        self.oran = oran
+        self._kuyruk: queue.Queue = queue.Queue(maxsize=KUYRUK_BOYUTU)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def kaydet(self, endpoint: str, params: Optional[Dict], response=None, sure: float = 0.0,
+               hata: BaseException = None) -> None:
+        """Denemeyi yazılmak üzere kuyruğa al (orana göre örneklenir, hiçbir zaman beklemez)"""
+        if endpoint not in KAYDEDILEN_METODLAR:
+            return
+        if self.oran < 1 and random.random() >= self.oran:
+            return
+        kayit = {
+            'zaman': datetime.now().isoformat(timespec='milliseconds'),
+            'endpoint': endpoint,
+            'params': params,
+            'status': response.status_code if response is not None else None,
+            'sure': round(sure, 4),
+            'hata': type(hata).__name__ if hata is not None else None,
+        }
+        govde = response.content if response is not None else None
+        self._baslat()
+        try:
+            self._kuyruk.put_nowait((kayit, govde))
+        except queue.Full:
+            logger.warning("DSİ kayıt kuyruğu dolu, kayıt atlandı")
+
+    def _baslat(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(self.dizin, exist_ok=True)
+                self._thread = threading.Thread(target=self._yaz, name='dsi-kayit', daemon=True)
+                self._thread.start()
+
+    def _dosya_adi(self, saat: str) -> str:
+        return os.path.join(self.dizin, f"dsi-{saat}-{os.getpid()}.jsonl.gz")
+
+    def _satir(self, kayit: Dict, govde: Optional[bytes]) -> bytes:
+        kayit['params'] = temizle(kayit['params'])
+        kayit['govde'] = None
+        if govde is not None:
+            kayit['boyut'] = len(govde)
+            try:
+                kayit['govde'] = json.dumps(temizle(json.loads(govde)), ensure_ascii=False)
+            except ValueError:
+                # JSON olmayan gövde kişisel veri içerebilir; yalnızca boyutu tutulur
+                pass
+        return json.dumps(kayit, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    def _yaz(self) -> None:
+        dosya, saat = None, None
+        while True:
+            oge = self._kuyruk.get()
+            try:
+                if oge is _BITTI:
+                    break
+                simdi = datetime.now().strftime('%Y%m%d%H')
+                if simdi != saat:
+                    if dosya is not None:
+                        dosya.close()
+                    dosya, saat = gzip.open(self._dosya_adi(simdi), 'ab'), simdi
+                dosya.write(self._satir(*oge))
+                if self._kuyruk.empty():
+                    # Yazılanlar süreç çökse de okunabilsin
+                    dosya.flush()
+            except Exception as e:
+                logger.warning(f"DSİ kaydı yazılamadı: {str(e)}")
+        if dosya is not None:
+            dosya.close()
+
+    def kapat(self, bekle: float = 5.0) -> None:
+        """Kuyruktakileri yazıp dosyayı kapat"""
+        if self._thread is None:
+            return
+        self._kuyruk.put(_BITTI)
+        self._thread.join(bekle)
+        self._thread = None
+
+
+def kayitlari_oku(yollar: Iterable[str]) -> Iterator[Dict]:
+    """
+    Kayıt dosyalarını sırayla oku
+
+    Args:
+        yollar: Dosya yolları veya glob desenleri (ör. /var/kayit/dsi-*.jsonl.gz)
+    """
+    for desen in yollar:
+        for yol in sorted(glob.glob(desen)) or [desen]:
+            try:
+                with gzip.open(yol, 'rt', encoding='utf-8') as dosya:
+                    for satir in dosya:
+                        yield json.loads(satir)
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                # Süreç kapanmadan kopyalanan dosyanın sonu eksik olabilir; okunabilen kısım kullanılır
+                logger.warning(f"Kayıt dosyasının sonu okunamadı: {yol}")
+            except json.JSONDecodeError:
+                logger.warning(f"Kayıt dosyasında yarım satır: {yol}")
+
+
+class _KayitDeposu:
+    """Kayıtları metod ve parametrelere göre sıralı dönen depo"""
+
+    def __init__(self, yollar: Iterable[str], hiz: float = 1.0):
+        self.hiz = hiz if hiz > 0 else 1.0
+        tam: Dict[Tuple[str, str], List[Dict]] = defaultdict(list)
+        metod: Dict[str, List[Dict]] = defaultdict(list)
+        sayi = 0
+        for kayit in kayitlari_oku(yollar):
+            tam[(kayit['endpoint'], _parametre_anahtari(kayit['params']))].append(kayit)
+            metod[kayit['endpoint']].append(kayit)
+            sayi += 1
+        if not sayi:
+            raise ValueError(f"Tekrar oynatılacak kayıt bulunamadı: {', '.join(yollar)}")
+        self._tam = {anahtar: itertools.cycle(kayitlar) for anahtar, kayitlar in tam.items()}
+        self._metod = {anahtar: itertools.cycle(kayitlar) for anahtar, kayitlar in metod.items()}
+        self._lock = threading.Lock()
+        logger.info(f"{sayi} DSİ kaydı tekrar oynatma için yüklendi")
+
+    def bul(self, url: str) -> Tuple[Optional[Dict], float]:
+        """URL'ye karşılık gelen kayıt ve bekletilecek süre"""
+        adres = urlsplit(url)
+        endpoint = adres.path.rsplit('/', 1)[-1]
+        params = temizle(dict(parse_qsl(adres.query)))
+        with self._lock:
+            kayitlar = self._tam.get((endpoint, _parametre_anahtari(params))) or self._metod.get(endpoint)
+            kayit = next(kayitlar) if kayitlar else None
+        return kayit, (kayit['sure'] / self.hiz if kayit else 0.0)
+
+    @staticmethod
+    def govde(kayit: Optional[Dict]) -> bytes:
+        if kayit is None:
+            return json.dumps({'success': False, 'error': {'message': 'Kayıt bulunamadı'}}).encode('utf-8')
+        return (kayit.get('govde') or '').encode('utf-8')
+
+    @staticmethod
+    def durum(kayit: Optional[Dict]) -> int:
+        return kayit['status'] if kayit else 404
+
+
+class KayitTekrarAdapter(_KayitDeposu, BaseAdapter):
+    """Kayıtlardan yanıt veren requests transport adapter'ı"""
+
+    def __init__(self, yollar: Iterable[str], hiz: float = 1.0):
+        BaseAdapter.__init__(self)
+        _KayitDeposu.__init__(self, list(yollar), hiz)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        kayit, bekleme = self.bul(request.url)
+        okuma = timeout[1] if isinstance(timeout, tuple) else timeout
+        if okuma is not None and bekleme > okuma:
+            time.sleep(okuma)
+            raise requests.exceptions.ReadTimeout(f"Kayıt {bekleme:.2f} sn sürmüş", request=request)
+        time.sleep(bekleme)
+        if kayit is not None and kayit['hata']:
+            if 'Timeout' in kayit['hata']:
+                raise requests.exceptions.ReadTimeout(kayit['hata'], request=request)
+            raise requests.exceptions.ConnectionError(kayit['hata'], request=request)
+
+        govde = self.govde(kayit)
+        response = requests.Response()
+        response.status_code = self.durum(kayit)
+        response.headers = CaseInsensitiveDict({
+            'Content-Type': 'application/json; charset=utf-8', 'Content-Length': str(len(govde))
+        })
+        response.raw = HTTPResponse(body=io.BytesIO(govde), headers=dict(response.headers),
+                                    status=response.status_code, preload_content=False)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class KayitTekrarTransport(_KayitDeposu, httpx.AsyncBaseTransport):
+    """Kayıtlardan yanıt veren httpx asenkron transport'u"""
+
+    def __init__(self, yollar: Iterable[str], hiz: float = 1.0):
+        _KayitDeposu.__init__(self, list(yollar), hiz)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        kayit, bekleme = self.bul(str(request.url))
+        okuma = request.extensions.get('timeout', {}).get('read')
+        if okuma is not None and bekleme > okuma:
+            await asyncio.sleep(okuma)
+            raise httpx.ReadTimeout(f"Kayıt {bekleme:.2f} sn sürmüş", request=request)
+        await asyncio.sleep(bekleme)
+        if kayit is not None and kayit['hata']:
+            if 'Timeout' in kayit['hata']:
+                raise httpx.ReadTimeout(kayit['hata'], request=request)
+            raise httpx.ConnectError(kayit['hata'], request=request)
+        return httpx.Response(
+            self.durum(kayit), headers={'Content-Type': 'application/json; charset=utf-8'},
+            content=self.govde(kayit), request=request
+        )
+
+
+_kaydedici: Optional[DSIKaydedici] = None
+_tekrar: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_kaydedici() -> Optional[DSIKaydedici]:
+    """Süreç genelinde paylaşılan kaydedici (DSI_KAYIT_DIZINI boşsa None)"""
+    global _kaydedici
+    dizin = getattr(settings, 'DSI_KAYIT_DIZINI', '')
+    if not dizin:
+        return None
+    if _kaydedici is None:
+        with _lock:
+            if _kaydedici is None:
+                _kaydedici = DSIKaydedici(dizin, getattr(settings, 'DSI_KAYIT_ORANI', 1.0))
+    return _kaydedici
+
+
+def kaydederek(endpoint: str, params: Optional[Dict], func: Callable[[], requests.Response]) -> requests.Response:
+    """Denemeyi yap ve kaydedici açıksa sonucunu kaydet"""
+    kaydedici = get_kaydedici()
+    if kaydedici is None:
+        return func()
+    baslangic = time.perf_counter()
+    try:
+        response = func()
+    except (requests.exceptions.RequestException, httpx.TransportError) as e:
+        kaydedici.kaydet(endpoint, params, sure=time.perf_counter() - baslangic, hata=e)
+        raise
+    kaydedici.kaydet(endpoint, params, response, time.perf_counter() - baslangic)
+    return response
+
+
+async def kaydederek_async(endpoint: str, params: Optional[Dict], func: Callable[[], Any]):
+    """kaydederek() fonksiyonunun asenkron karşılığı (yazma kuyruğu beklemediğinden event loop'u bloklamaz)"""
+    kaydedici = get_kaydedici()
+    if kaydedici is None:
+        return await func()
+    baslangic = time.perf_counter()
+    try:
+        response = await func()
+    except httpx.TransportError as e:
+        kaydedici.kaydet(endpoint, params, sure=time.perf_counter() - baslangic, hata=e)
+        raise
+    kaydedici.kaydet(endpoint, params, response, time.perf_counter() - baslangic)
+    return response
+
+
+def _tekrar_dosyalari() -> List[str]:
+    return getattr(settings, 'DSI_TEKRAR_DOSYALARI', None) or []
+
+
+def tekrar_adapteri() -> Optional[KayitTekrarAdapter]:
+    """DSI_TEKRAR_DOSYALARI tanımlıysa paylaşılan requests adapter'ı"""
+    return _tekrar_ornegi('adapter', KayitTekrarAdapter)
+
+
+def tekrar_transportu() -> Optional[KayitTekrarTransport]:
+    """DSI_TEKRAR_DOSYALARI tanımlıysa paylaşılan httpx transport'u"""
+    return _tekrar_ornegi('transport', KayitTekrarTransport)
+
+
+def _tekrar_ornegi(tur: str, sinif):
+    yollar = _tekrar_dosyalari()
+    if not yollar:
+        return None
+    ornek = _tekrar.get(tur)
+    if ornek is None:
+        with _lock:
+            ornek = _tekrar.get(tur)
+            if ornek is None:
+                ornek = _tekrar[tur] = sinif(yollar, getattr(settings, 'DSI_TEKRAR_HIZI', 1.0))
+    return ornek
+
+
+def _fork_sonrasi() -> None:
+    # Yazıcı thread'i çocuk sürece geçmez; her süreç kendi dosyasına yazar
+    global _kaydedici, _lock
+    _kaydedici = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_fork_sonrasi)
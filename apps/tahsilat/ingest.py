@@ -0,0 +1,391 @@
+"""
+Büyük tahsilat listelerinin akış halinde içe aktarılması
+
+DSİ'nin TahsilatListeleEDevlet yanıtı parça parça okunur; "result.tahsilatListe"
+dizisinin elemanları tamamlandıkça sabit boyutlu partilere toplanır ve tek bir
+transaction içinde toplu yazılır. Bellekte aynı anda yalnızca bir okuma
+parçası ve bir parti tutulur; sonuç boyutundan bağımsızdır.
+
+Dizi elemanları çözüldükleri anda TahsilatKalemi kayıtlarına çevrilir; yazma
+tarafı sözlük anahtarı yerine kayıt niteliklerini kullanır.
+
+Kayıtlar içerik özetiyle (icerik_hash) saklanır; sadece yeni ve değişen
+satırlar yazılır. Filtresiz bir sorgunun yanıtında artık yer almayan kayıtlar
+kimlik özeti (kimlik_hash) üzerinden bulunup pasifleştirilir.
+
+Kimlik başına son uygulanan listenin DSİ'den alındığı an (KimlikSenkronu)
+tek satırda tutulur ve senkronizasyon boyunca kilitlenir. Önbellekten sunulan
+veya yavaş biten bir liste, kimliğe kendisinden sonra alınmış bir liste
+uygulanmışsa mevcut satırları ezmez ve pasifleştirmez; değişmeyen satırlara
+hiç yazılmaz.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.json_stream import JsonDiziAkisi
+from .kayitlar import ListeOzeti, TahsilatKalemi
+from .models import KimlikSenkronu, TahsilatKaydi
+
+logger = logging.getLogger(__name__)
+
+# Kalemin TahsilatKaydi'ye yazılan değerleri (MODEL_ALANLARI sırasıyla)
+_model_degerleri = attrgetter(*TahsilatKalemi.MODEL_ALANLARI)
+
+# Kalem değerlerinin karşılaştırmada çevrildiği model alanları
+_MODEL_ALANLARI = [TahsilatKaydi._meta.get_field(alan) for alan in TahsilatKalemi.MODEL_ALANLARI]
+
+
+def parti_boyutu() -> int:
+    return getattr(settings, 'TAHSILAT_INGEST_PARTI_BOYUTU', 500)
+
+
+def icerik_hash(degerler: Tuple) -> str:
+    """Kalemin saklanan alan değerlerinin özeti (değişiklik tespiti için)"""
+    return hashlib.blake2b(
+        json.dumps(degerler, default=str, separators=(',', ':')).encode(), digest_size=16
+    ).hexdigest()
+
+
+class SenkronFarki:
+    """Bir senkronizasyonda eklenen, güncellenen ve pasifleştirilen tahsilat_id'ler"""
+
+    def __init__(self):
+        self.eklenen: List[int] = []
+        self.guncellenen: List[int] = []
+        self.pasiflestirilen: List[int] = []
+        self.degismeyen = 0
+
+    @property
+    def toplam(self) -> int:
+        """DSİ'den gelen tekil kayıt sayısı"""
+        return len(self.eklenen) + len(self.guncellenen) + self.degismeyen
+
+    def sozluk(self) -> Dict:
+        return {
+            'eklenen': self.eklenen,
+            'guncellenen': self.guncellenen,
+            'pasiflestirilen': self.pasiflestirilen,
+            'degismeyen': self.degismeyen,
+        }
+
+
+def _tarih(deger):
+    """DSİ tarihini (saat dilimsiz ISO metni) varsayılan saat dilimine göre çöz"""
+    if not isinstance(deger, str):
+        return deger
+    tarih = parse_datetime(deger)
+    if tarih is not None and settings.USE_TZ and timezone.is_naive(tarih):
+        tarih = timezone.make_aware(tarih)
+    return tarih
+
+
+def _alanlari_ata(kayit: TahsilatKaydi, degerler: Tuple, ozet: str, kimlik: Optional[str]) -> TahsilatKaydi:
+    for alan, deger in zip(TahsilatKalemi.MODEL_ALANLARI, degerler):
+        setattr(kayit, alan, deger)
+    # Satır başına naive datetime uyarısı üretilmesini önle
+    kayit.tahakkuk_donemi = _tarih(kayit.tahakkuk_donemi)
+    kayit.icerik_hash = ozet
+    if kimlik:
+        kayit.kimlik_hash = kimlik
+    kayit.aktif = True
+    return kayit
+
+
+def _degisenleri_ata(kayit: TahsilatKaydi, degerler: Tuple, ozet: str, kimlik: Optional[str]) -> Tuple[str, ...]:
+    """
+    Kalemin kayıttan farklı olan değerlerini kayda ata
+
+    Returns:
+        Tuple[str, ...]: Değişen alanlar (değişiklik yoksa boş)
+    """
+    alanlar = []
+    if kayit.icerik_hash != ozet:
+        for alan, deger in zip(_MODEL_ALANLARI, degerler):
+            if alan.name == 'tahakkuk_donemi':
+                deger = _tarih(deger)
+            # DSİ'nin float tutarları DecimalField'ın Decimal'ına çevrilerek karşılaştırılır
+            deger = alan.to_python(deger)
+            if getattr(kayit, alan.attname) != deger:
+                setattr(kayit, alan.attname, deger)
+                alanlar.append(alan.name)
+        kayit.icerik_hash = ozet
+        alanlar.append('icerik_hash')
+    if kimlik and kayit.kimlik_hash != kimlik:
+        kayit.kimlik_hash = kimlik
+        alanlar.append('kimlik_hash')
+    if not kayit.aktif:
+        kayit.aktif = True
+        alanlar.append('aktif')
+    return tuple(alanlar)
+
+
+def _guncelle(degisenler: Dict[Tuple[str, ...], List[TahsilatKaydi]], simdi: datetime,
+              fark: SenkronFarki) -> None:
+    """Değişen kayıtları, aynı alanları değişenler bir arada, yalnızca o alanlarla yaz"""
+    for alanlar, kayitlar in degisenler.items():
+        for kayit in kayitlar:
+            kayit.son_guncelleme = simdi
+        TahsilatKaydi.objects.bulk_update(kayitlar, list(alanlar) + ['son_guncelleme'])
+        fark.guncellenen.extend(kayit.tahsilat_id for kayit in kayitlar)
+
+
+def partiyi_yaz(items: List[TahsilatKalemi], kullanici, geri_oku: bool = True, kimlik: str = None,
+                fark: SenkronFarki = None, zaman: datetime = None, guncel: bool = True) -> List[TahsilatKaydi]:
+    """
+    Bir partiyi mevcut kayıtlarla karşılaştırarak yaz
+
+    Mevcut kayıtlar tek SELECT ile okunur. Yeni kayıtlar tek INSERT ile eklenir;
+    içerik özeti, kimliği veya aktifliği değişen kayıtlar yalnızca değişen
+    alanlarıyla bulk UPDATE edilir; değişmeyen kayıtlara yazılmaz.
+    Aynı partide tekrar eden tahsilat_id'ler için sonuncusu geçerlidir.
+
+    Eşzamanlı başka bir senkronizasyonun araya girerek eklediği kayıtlar, o
+    kaydın kimliğine daha yeni bir liste uygulanmışsa ezilmez.
+
+    Args:
+        items: Tahsilat kalemleri
+        kullanici: Yeni kayıtların sahibi
+        geri_oku: Kayıtlar pk'larıyla birlikte döndürülsün mü
+        kimlik: Sorgulanan TCKN/VKN'nin özeti (cache.kimlik_hash)
+        fark: Değişikliklerin ekleneceği SenkronFarki
+        zaman: Listenin DSİ'den alındığı an (varsayılan: şimdi)
+        guncel: False ise kimliğe daha yeni bir liste uygulanmıştır; yalnızca
+            eksik kayıtlar eklenir, mevcutlar değişmeyen sayılır
+
+    Returns:
+        List[TahsilatKaydi]: Partideki kayıtlar (gelen sırayla; geri_oku False ise boş)
+    """
+    if not items:
+        return []
+    if fark is None:
+        fark = SenkronFarki()
+    simdi = timezone.now()
+    zaman = zaman or simdi
+    tekil = {item.tahsilat_id: item for item in items}
+    mevcut = TahsilatKaydi.objects.in_bulk(list(tekil), field_name='tahsilat_id')
+
+    yeniler = {}
+    degisenler: Dict[Tuple[str, ...], List[TahsilatKaydi]] = {}
+    for tahsilat_id, item in tekil.items():
+        degerler = _model_degerleri(item)
+        ozet = icerik_hash(degerler)
+        kayit = mevcut.get(tahsilat_id)
+        if kayit is None:
+            yeniler[tahsilat_id] = (degerler, ozet)
+            continue
+        alanlar = _degisenleri_ata(kayit, degerler, ozet, kimlik) if guncel else ()
+        if alanlar:
+            degisenler.setdefault(alanlar, []).append(kayit)
+        else:
+            fark.degismeyen += 1
+
+    if yeniler:
+        # Eşzamanlı başka bir senkronizasyon aynı kaydı eklemiş olabilir; çakışan
+        # kayıtlar geri okunup diğerleri gibi karşılaştırılır
+        TahsilatKaydi.objects.bulk_create([
+            _alanlari_ata(TahsilatKaydi(tahsilat_id=tahsilat_id, kullanici=kullanici), degerler, ozet, kimlik)
+            for tahsilat_id, (degerler, ozet) in yeniler.items()
+        ], ignore_conflicts=True)
+        eklenenler = TahsilatKaydi.objects.in_bulk(list(yeniler), field_name='tahsilat_id')
+        mevcut.update(eklenenler)
+        cakisanlar = [
+            kayit for kayit in eklenenler.values()
+            if (kayit.icerik_hash, kayit.kimlik_hash) != (yeniler[kayit.tahsilat_id][1], kimlik or kayit.kimlik_hash)
+        ]
+        daha_yeni = set(KimlikSenkronu.objects.filter(
+            kimlik_hash__in={kayit.kimlik_hash for kayit in cakisanlar}, liste_zamani__gte=zaman
+        ).values_list('kimlik_hash', flat=True)) if cakisanlar else set()
+        for kayit in cakisanlar:
+            alanlar = () if kayit.kimlik_hash in daha_yeni else _degisenleri_ata(
+                kayit, *yeniler[kayit.tahsilat_id], kimlik
+            )
+            if alanlar:
+                degisenler.setdefault(alanlar, []).append(kayit)
+            else:
+                fark.degismeyen += 1
+        cakisan_idler = {kayit.tahsilat_id for kayit in cakisanlar}
+        fark.eklenen.extend(tahsilat_id for tahsilat_id in yeniler if tahsilat_id not in cakisan_idler)
+    if degisenler:
+        _guncelle(degisenler, simdi, fark)
+
+    if not geri_oku:
+        return []
+    return [mevcut[item.tahsilat_id] for item in items]
+
+
+def kaybolanlari_pasiflestir(kimlik: str, gorulen: Set[int], fark: SenkronFarki, boyut: int = None) -> None:
+    """
+    Kimliğin DSİ'nin artık döndürmediği aktif kayıtlarını pasifleştir
+
+    Sadece filtresiz (tüm kayıtları içeren) ve kimliğe uygulanmış listelerin en
+    yenisi olan bir yanıttan sonra çağrılmalıdır (bkz. kayitlari_yaz).
+    """
+    simdi = timezone.now()
+    kaybolan = [
+        tahsilat_id for tahsilat_id in TahsilatKaydi.objects.filter(
+            kimlik_hash=kimlik, aktif=True
+        ).values_list('tahsilat_id', flat=True).iterator()
+        if tahsilat_id not in gorulen
+    ]
+    for parti in partilere_bol(kaybolan, boyut or parti_boyutu()):
+        TahsilatKaydi.objects.filter(tahsilat_id__in=parti).update(aktif=False, son_guncelleme=simdi)
+    fark.pasiflestirilen.extend(kaybolan)
+
+
+def kimlik_senkronu(kimlik: str, zaman: datetime) -> Tuple[Optional[KimlikSenkronu], bool]:
+    """
+    Kimliğin senkron satırını kilitle ve listenin en yeni liste olup olmadığını bildir
+
+    Aynı kimliğin senkronizasyonları transaction sonuna kadar sıraya girer.
+    Çağıran transaction.atomic() içinde olmalıdır.
+
+    Returns:
+        Tuple[Optional[KimlikSenkronu], bool]: (satır, zaman kimliğe uygulanmış listelerden yeni mi)
+    """
+    if not kimlik:
+        return None, True
+    senkron, _ = KimlikSenkronu.objects.select_for_update().get_or_create(kimlik_hash=kimlik)
+    return senkron, senkron.liste_zamani is None or zaman > senkron.liste_zamani
+
+
+def partilere_bol(items: Iterable, boyut: int) -> Iterator[List]:
+    parti = []
+    for item in items:
+        parti.append(item)
+        if len(parti) >= boyut:
+            yield parti
+            parti = []
+    if parti:
+        yield parti
+
+
+def kayitlari_yaz(items: Iterable[TahsilatKalemi], kullanici, boyut: int = None,
+                  parti_sonrasi: Callable[[List[TahsilatKaydi]], Any] = None,
+                  kimlik: str = None, tam_liste: bool = False, zaman: datetime = None) -> SenkronFarki:
+    """
+    Tahsilat kayıtlarını sabit boyutlu partiler halinde tek transaction içinde senkronize et
+
+    Args:
+        items: Tahsilat kalemleri (iterator olabilir)
+        kullanici: Yeni kayıtların sahibi
+        boyut: Parti boyutu
+        parti_sonrasi: Her parti yazıldıktan sonra kayıtlarla çağrılır
+        kimlik: Sorgulanan TCKN/VKN'nin özeti; kayıtlar bu kimlikle işaretlenir
+        tam_liste: items kimliğin tüm kayıtlarıysa True; listede olmayan aktif kayıtlar pasifleştirilir
+        zaman: Listenin DSİ'den alındığı an (önbellekten sunulan listelerde ilk alınma anı)
+
+    Returns:
+        SenkronFarki: Yapılan değişiklikler
+    """
+    fark = SenkronFarki()
+    gorulen: Set[int] = set()
+    boyut = boyut or parti_boyutu()
+    zaman = zaman or timezone.now()
+    with transaction.atomic():
+        senkron, guncel = kimlik_senkronu(kimlik, zaman)
+        for parti in partilere_bol(items, boyut):
+            kayitlar = partiyi_yaz(parti, kullanici, geri_oku=parti_sonrasi is not None, kimlik=kimlik, fark=fark,
+                                   zaman=zaman, guncel=guncel)
+            if tam_liste:
+                gorulen.update(item.tahsilat_id for item in parti)
+            if parti_sonrasi:
+                parti_sonrasi(kayitlar)
+        if senkron is not None and guncel:
+            if tam_liste:
+                kaybolanlari_pasiflestir(kimlik, gorulen, fark, boyut)
+            senkron.liste_zamani = zaman
+            senkron.save(update_fields=['liste_zamani'])
+    return fark
+
+
+def _ic_ice(degerler: Dict[Tuple, Any], onek: Tuple) -> Dict:
+    """Yol bazında toplanan skaler değerlerden iç içe sözlük oluştur"""
+    sonuc: Dict = {}
+    for yol, deger in degerler.items():
+        if yol[:len(onek)] != onek or len(yol) == len(onek):
+            continue
+        hedef = sonuc
+        for anahtar in yol[len(onek):-1]:
+            hedef = hedef.setdefault(anahtar, {})
+        hedef[yol[-1]] = deger
+    return sonuc
+
+
+class TahsilatListeAkisi:
+    """ABP zarfındaki tahsilatListe dizisini eleman eleman TahsilatKalemi olarak çözen akış"""
+
+    def __init__(self, parcalar: Iterable[bytes]):
+        self._parcalar = parcalar
+        self.tarayici = JsonDiziAkisi(('result', 'tahsilatListe'))
+        self.kayit_sayisi = 0
+        self.bitti = False
+
+    def __iter__(self) -> Iterator[TahsilatKalemi]:
+        for parca in self._parcalar:
+            for item in self.tarayici.besle(parca):
+                self.kayit_sayisi += 1
+                yield TahsilatKalemi.dsi(item)
+        self.tarayici.bitir()
+        self.bitti = True
+
+    @property
+    def basarili(self) -> bool:
+        return bool(self.tarayici.deger('success'))
+
+    def hata_mesaji(self) -> str:
+        return f"DSİ API Hatası: {self.tarayici.deger('error', 'message', varsayilan='Bilinmeyen hata')}"
+
+    def ozet(self) -> ListeOzeti:
+        """tahsilatListe dışındaki result alanları (anaParaBorc, sonucBilgisi, ...)"""
+        return ListeOzeti.dsi(_ic_ice(self.tarayici.degerler, ('result',)))
+
+
+def tahsilat_listesi_ice_aktar(parcalar: Iterable[bytes], kullanici, boyut: int = None,
+                               parti_sonrasi: Callable[[List[TahsilatKaydi]], Any] = None,
+                               kapat: Optional[Callable[[], None]] = None, kimlik: str = None,
+                               tam_liste: bool = False) -> Tuple[bool, Optional[Dict], Optional[str]]:
+    """
+    DSİ tahsilat listesi yanıtını akış halinde veritabanına aktar
+
+    Args:
+        parcalar: Upstream yanıt gövdesi parçaları
+        kullanici: Yeni kayıtların sahibi
+        boyut: Parti boyutu
+        parti_sonrasi: Her parti yazıldıktan sonra kayıtlarla çağrılır
+        kapat: Bittiğinde yanıt bağlantısını kapatan fonksiyon
+        kimlik: Sorgulanan TCKN/VKN'nin özeti (cache.kimlik_hash)
+        tam_liste: Yanıt filtresizse True; listede olmayan aktif kayıtlar pasifleştirilir
+
+    Returns:
+        Tuple[bool, Optional[Dict], Optional[str]]: (success, {'ozet', 'kayit_sayisi', 'fark'}, error_message)
+        DSİ hata döndürürse transaction geri alınır
+    """
+    # Yanıt bu çağrıdan hemen önce açıldı
+    zaman = timezone.now()
+    akis = TahsilatListeAkisi(parcalar)
+    try:
+        with transaction.atomic():
+            fark = kayitlari_yaz(akis, kullanici, boyut, parti_sonrasi, kimlik=kimlik, tam_liste=tam_liste, zaman=zaman)
+            if not akis.basarili:
+                # success alanı listeden sonra gelebilir; hata varsa yazılanları geri al
+                transaction.set_rollback(True)
+                return False, None, akis.hata_mesaji()
+    finally:
+        if kapat:
+            kapat()
+
+    logger.info(
+        f"Tahsilat listesi içe aktarıldı: {akis.kayit_sayisi} kayıt ({len(fark.eklenen)} yeni, "
+        f"{len(fark.guncellenen)} güncellenen, {fark.degismeyen} değişmeyen, "
+        f"{len(fark.pasiflestirilen)} pasifleştirilen)"
+    )
+    return True, {'ozet': akis.ozet(), 'kayit_sayisi': akis.kayit_sayisi, 'fark': fark}, None
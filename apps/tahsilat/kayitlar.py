@@ -0,0 +1,251 @@
+"""
+DSİ tahsilat yanıt elemanları için tipli kayıtlar
+
+Upstream satırları camelCase sözlük olarak taşınmaz; yanıt çözülürken bir
+kez __slots__ tabanlı kayıtlara çevrilir ve ingest, özet ve serileştirme
+kodu doğrudan nitelikleri kullanır. Sözlüğe göre satır başına bellek
+belirgin biçimde azalır, anahtar çevirisi tek noktada yapılır. Kurumsal
+sorgularda on binlerce satır bellekte tutulduğunda fark önemlidir.
+
+Liste kalemleri yalnızca bilinen alanları taşır. İstemciye aynen dönen detay
+kayıtları ise tanımadıkları alanları "ek" niteliğinde saklar; sozluk() DSİ'nin
+alan adlarıyla yanıtın tamamını yeniden üretir. Liste ve detay sonuçları
+DSİ'den alındıkları anı (zaman) taşır; önbellekten veya tek uçuş liderinden
+gelse de verinin yaşı buradan hesaplanır.
+Değerler DSİ'den geldiği haliyle saklanır (tarihler ISO metni), içerik
+özetinin (ingest.icerik_hash) kararlı kalması için dönüşüm yazarken yapılır.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# Tanınmayan DSİ alanlarının saklandığı nitelik (yalnızca __slots__'unda olan kayıtlarda)
+EK = 'ek'
+
+
+def _nitelikler(alanlar: Tuple[Tuple[str, str], ...]) -> Tuple[str, ...]:
+    return tuple(nitelik for _, nitelik in alanlar)
+
+
+class DSIKaydi:
+    """DSİ yanıt elemanı için __slots__ tabanlı kayıt"""
+
+    __slots__ = ()
+    # (DSİ alan adı, nitelik adı) çiftleri; nitelikler __slots__ ile aynı sırada
+    ALANLAR: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, *degerler):
+        for nitelik, deger in zip(self.__slots__, degerler):
+            setattr(self, nitelik, deger)
+
+    @classmethod
+    def dsi(cls, item: Dict) -> 'DSIKaydi':
+        """DSİ yanıtındaki sözlükten kayıt oluştur (eksik alanlar None)"""
+        degerler = [item.get(dsi_alani) for dsi_alani, _ in cls.ALANLAR]
+        if EK in cls.__slots__:
+            bilinen = {dsi_alani for dsi_alani, _ in cls.ALANLAR}
+            degerler.append({alan: deger for alan, deger in item.items() if alan not in bilinen} or None)
+        return cls(*degerler)
+
+    def degerler(self) -> Tuple:
+        return tuple(getattr(self, nitelik) for nitelik in self.__slots__)
+
+    def sozluk(self) -> Dict:
+        """DSİ alan adlarıyla JSON'a uygun sözlük"""
+        sonuc = {dsi_alani: getattr(self, nitelik) for dsi_alani, nitelik in self.ALANLAR}
+        if EK in self.__slots__ and self.ek:
+            sonuc.update(self.ek)
+        return sonuc
+
+    def __reduce__(self):
+        # Önbellek ve tek uçuş sonuçları pickle edilir; nitelik adları her satırda tekrar yazılmaz
+        return self.__class__, self.degerler()
+
+    def __eq__(self, diger):
+        return type(diger) is type(self) and diger.degerler() == self.degerler()
+
+    def __repr__(self):
+        alanlar = ', '.join(f"{nitelik}={getattr(self, nitelik)!r}" for nitelik in self.__slots__)
+        return f"{self.__class__.__name__}({alanlar})"
+
+
+class ZamanliKayit(DSIKaydi):
+    """DSİ'den alındığı anı (time.time()) "zaman" niteliğinde taşıyan kayıt"""
+
+    __slots__ = ()
+
+    def yas(self) -> float:
+        """Verinin DSİ'den alınmasından bu yana geçen süre (saniye)"""
+        return max(0.0, time.time() - self.zaman)
+
+    def alinma_ani(self) -> datetime:
+        """Verinin DSİ'den alındığı an (UTC)"""
+        return datetime.fromtimestamp(self.zaman, tz=timezone.utc)
+
+
+class TahsilatKalemi(DSIKaydi):
+    """TahsilatListeleEDevlet tahsilatListe elemanı"""
+
+    ALANLAR = (
+        ('tahsilatId', 'tahsilat_id'),
+        ('tahakkukNo', 'tahakkuk_no'),
+        ('gelirTuru', 'gelir_turu'),
+        ('borcunKonusu', 'borcun_konusu'),
+        ('cariId', 'cari_id'),
+        ('anaParaBorc', 'ana_para_borc'),
+        ('yapilanToplamTahsilat', 'yapilan_toplam_tahsilat'),
+        ('kalanAnaparaBorc', 'kalan_anapara_borc'),
+        ('tahakkukDonemi', 'tahakkuk_donemi'),
+        ('id', 'harici_id'),
+    )
+    __slots__ = _nitelikler(ALANLAR)
+
+    # TahsilatKaydi'ye aynı adla yazılan alanlar (tahsilat_id anahtar olduğundan hariç)
+    MODEL_ALANLARI = __slots__[1:]
+
+    @classmethod
+    def dsi(cls, item: Dict) -> 'TahsilatKalemi':
+        kayit = super().dsi(item)
+        if kayit.tahsilat_id is None:
+            raise KeyError('tahsilatId')
+        return kayit
+
+
+class TaksitKalemi(DSIKaydi):
+    """VTahsilatDetayGetirEDevlet taksitler elemanı"""
+
+    ALANLAR = (
+        ('taksitNo', 'taksit_no'),
+        ('taksitTutari', 'taksit_tutari'),
+        ('vadeTarihi', 'vade_tarihi'),
+        ('odemeDurumu', 'odeme_durumu'),
+        ('odemeTarihi', 'odeme_tarihi'),
+    )
+    __slots__ = _nitelikler(ALANLAR) + (EK,)
+
+
+class OdemeKalemi(DSIKaydi):
+    """VTahsilatDetayGetirEDevlet odemeGecmisi elemanı"""
+
+    ALANLAR = (
+        ('odemeTarihi', 'odeme_tarihi'),
+        ('odemeTutari', 'odeme_tutari'),
+        ('odemeYontemi', 'odeme_yontemi'),
+        ('referansNo', 'referans_no'),
+    )
+    __slots__ = _nitelikler(ALANLAR) + (EK,)
+
+
+def _kayitlar(tip, items: Optional[Iterable[Dict]]) -> Optional[Tuple]:
+    return None if items is None else tuple(tip.dsi(item) for item in items)
+
+
+class TahsilatDetayi(ZamanliKayit):
+    """VTahsilatDetayGetirEDevlet sonucu (taksitler ve ödeme geçmişiyle)"""
+
+    ALANLAR = TahsilatKalemi.ALANLAR[:-1] + (
+        ('taksitler', 'taksitler'),
+        ('odemeGecmisi', 'odeme_gecmisi'),
+    )
+    __slots__ = _nitelikler(ALANLAR) + (EK, 'zaman')
+
+    @classmethod
+    def dsi(cls, item: Dict) -> 'TahsilatDetayi':
+        kayit = super().dsi(item)
+        kayit.zaman = time.time()
+        kayit.taksitler = _kayitlar(TaksitKalemi, kayit.taksitler)
+        kayit.odeme_gecmisi = _kayitlar(OdemeKalemi, kayit.odeme_gecmisi)
+        return kayit
+
+    @classmethod
+    def yerelden(cls, alanlar: Dict, taksitler: Optional[Tuple], odeme_gecmisi: Optional[Tuple],
+                 zaman: float) -> 'TahsilatDetayi':
+        """Yerelde saklanan alanlardan (ust_alanlar()) ve kalemlerden kayıt oluştur"""
+        kayit = super().dsi(alanlar)
+        kayit.taksitler = taksitler
+        kayit.odeme_gecmisi = odeme_gecmisi
+        kayit.zaman = zaman
+        return kayit
+
+    def ust_alanlar(self) -> Dict:
+        """Taksit ve ödeme listeleri dışındaki alanlar (DSİ adlarıyla)"""
+        sonuc = super().sozluk()
+        del sonuc['taksitler'], sonuc['odemeGecmisi']
+        return sonuc
+
+    def sozluk(self) -> Dict:
+        sonuc = super().sozluk()
+        for dsi_alani, kalemler in (('taksitler', self.taksitler), ('odemeGecmisi', self.odeme_gecmisi)):
+            if kalemler is None:
+                # DSİ göndermediyse yanıta eklenmez
+                del sonuc[dsi_alani]
+            else:
+                sonuc[dsi_alani] = [kalem.sozluk() for kalem in kalemler]
+        return sonuc
+
+
+class ListeOzeti(DSIKaydi):
+    """Liste yanıtındaki toplamlar ve sonuç bilgisi (TahsilatOzeti alanlarıyla aynı adlar)"""
+
+    ALANLAR = (
+        ('anaParaBorc', 'ana_para_borc'),
+        ('yapilanToplamTahsilat', 'yapilan_toplam_tahsilat'),
+        ('toplamKalanAnaparaBorc', 'toplam_kalan_anapara_borc'),
+        ('sonucKodu', 'sonuc_kodu'),
+        ('sonucAciklamasi', 'sonuc_aciklamasi'),
+    )
+    __slots__ = _nitelikler(ALANLAR)
+
+    @classmethod
+    def dsi(cls, item: Dict) -> 'ListeOzeti':
+        sonuc_bilgisi = item.get('sonucBilgisi') or {}
+        return cls(
+            item.get('anaParaBorc', 0),
+            item.get('yapilanToplamTahsilat', 0),
+            item.get('toplamKalanAnaparaBorc', 0),
+            sonuc_bilgisi.get('sonucKodu', ''),
+            sonuc_bilgisi.get('sonucAciklamasi', ''),
+        )
+
+    def sozluk(self) -> Dict:
+        return {
+            'anaParaBorc': self.ana_para_borc,
+            'yapilanToplamTahsilat': self.yapilan_toplam_tahsilat,
+            'toplamKalanAnaparaBorc': self.toplam_kalan_anapara_borc,
+            'sonucBilgisi': {
+                'sonucKodu': self.sonuc_kodu,
+                'sonucAciklamasi': self.sonuc_aciklamasi,
+            },
+        }
+
+    def model_alanlari(self) -> Dict:
+        """TahsilatOzeti alanları"""
+        return dict(zip(self.__slots__, self.degerler()))
+
+
+class TahsilatListesi(ZamanliKayit):
+    """TahsilatListeleEDevlet sonucu: özet ve tahsilat kalemleri"""
+
+    __slots__ = ('ozet', 'kalemler', 'zaman')
+
+    @classmethod
+    def dsi(cls, item: Dict) -> 'TahsilatListesi':
+        return cls(
+            ListeOzeti.dsi(item),
+            [TahsilatKalemi.dsi(kalem) for kalem in item.get('tahsilatListe') or ()],
+            time.time(),
+        )
+
+    def sozluk(self) -> Dict:
+        sonuc = self.ozet.sozluk()
+        sonuc['tahsilatListe'] = [kalem.sozluk() for kalem in self.kalemler]
+        return sonuc
+
+
+def kayda_cevir(sonuc: Tuple[bool, Optional[Dict], Optional[str]], tip) -> Tuple[bool, Optional[DSIKaydi], Optional[str]]:
+    """(success, data, error_message) sonucundaki DSİ sözlüğünü kayda çevir"""
+    success, data, error_message = sonuc
+    if success and data is not None:
+        data = tip.dsi(data)
+    return success, data, error_message
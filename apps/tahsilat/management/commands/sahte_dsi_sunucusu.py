@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tahsilat.sahte_dsi import GecikmeDagilimi, SahteDSIAyarlari, SahteDSISunucusu, UC_NOKTALARI
+from apps.tahsilat.sentetik_veri import KIMLIK_BLOK_BOYUTU
+
+
+def _oran(deger: str) -> float:
+    oran = float(deger)
+    if not 0 <= oran <= 1:
+        raise ValueError(deger)
+    return oran
+
+
+class Command(BaseCommand):
+    help = ('DSİ altyapı servisinin tahsilat uçlarını gecikme ve hata enjeksiyonuyla taklit eden '
+            'yerel sunucuyu başlatır (DSI_API_BASE_URL=http://<host>:<port> ile kullanın)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Dinlenecek adres')
+        parser.add_argument('--port', type=int, default=8090, help='Dinlenecek port')
+        parser.add_argument('--gecikme', default='sabit:0',
+                            help='Tüm uçlar için gecikme dağılımı (ms): sabit:50, uniform:20,200, '
+                                 'normal:100,30, lognormal:P50,P99')
+        for uc in UC_NOKTALARI.values():
+            parser.add_argument(f'--gecikme-{uc}', default=None, help=f'Yalnızca {uc} ucu için gecikme dağılımı')
+        parser.add_argument('--hata-orani', type=_oran, default=0.0, help='HTTP hata kodu dönen istek oranı (0-1)')
+        parser.add_argument('--hata-kodlari', default='500',
+                            help='Hata durumunda rastgele seçilecek HTTP kodları (ör. 500,502,503)')
+        parser.add_argument('--abp-hata-orani', type=_oran, default=0.0,
+                            help='HTTP 200 ile success=false dönen istek oranı (0-1)')
+        parser.add_argument('--zaman-asimi-orani', type=_oran, default=0.0,
+                            help='--asili-kalma süresi boyunca yanıt vermeyen istek oranı (0-1)')
+        parser.add_argument('--asili-kalma', type=float, default=120.0,
+                            help='Zaman aşımı senaryosunda bekleme süresi (sn)')
+        parser.add_argument('--kopma-orani', type=_oran, default=0.0,
+                            help='Gövdesi yarıda kesilip bağlantısı kapatılan istek oranı (0-1)')
+        parser.add_argument('--liste-satir', type=int, default=0,
+                            help='Her kimlik için liste yanıtındaki kayıt sayısı (0: kimliğe göre 1-40)')
+        parser.add_argument('--belge-kb', type=int, default=0, help='Sentetik PDF boyutu (KB; 0: dolgusuz)')
+        parser.add_argument('--hiz', type=int, default=0, help='Gövde yazma hızı (KB/sn; 0: sınırsız)')
+        parser.add_argument('--tohum', type=int, default=None,
+                            help='Tekrarlanabilir senaryolar için rastgele tohum (veri üreteci de bu tohumu kullanır)')
+        parser.add_argument('--sessiz', action='store_true', help='İstek bazında log yazma')
+
+    def handle(self, *args, **options):
+        try:
+            gecikmeler = {
+                uc: GecikmeDagilimi.coz(options[f'gecikme_{uc}'] or options['gecikme'])
+                for uc in UC_NOKTALARI.values()
+            }
+            hata_kodlari = tuple(int(kod) for kod in options['hata_kodlari'].split(','))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not 0 <= options['liste_satir'] < KIMLIK_BLOK_BOYUTU:
+            raise CommandError(f"--liste-satir 0-{KIMLIK_BLOK_BOYUTU - 1} arasında olmalıdır")
+
+        oranlar = (options['hata_orani'] + options['abp_hata_orani']
+                   + options['zaman_asimi_orani'] + options['kopma_orani'])
+        if oranlar > 1:
+            raise CommandError(f"Hata oranlarının toplamı 1'i geçemez: {oranlar:g}")
+
+        ayarlar = SahteDSIAyarlari(
+            gecikmeler=gecikmeler,
+            hata_orani=options['hata_orani'],
+            hata_kodlari=hata_kodlari,
+            abp_hata_orani=options['abp_hata_orani'],
+            zaman_asimi_orani=options['zaman_asimi_orani'],
+            asili_kalma=options['asili_kalma'],
+            kopma_orani=options['kopma_orani'],
+            liste_satir=options['liste_satir'],
+            belge_kb=options['belge_kb'],
+            hiz=options['hiz'] * 1024,
+            tohum=options['tohum'],
+        )
+
+        try:
+            sunucu = SahteDSISunucusu((options['host'], options['port']), ayarlar, sessiz=options['sessiz'])
+        except OSError as e:
+            raise CommandError(f"Sunucu başlatılamadı: {str(e)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sahte DSİ sunucusu http://{options['host']}:{options['port']} adresinde çalışıyor"
+        ))
+        for uc, gecikme in gecikmeler.items():
+            self.stdout.write(f"  {uc}: gecikme {gecikme}")
+        self.stdout.write(
+            f"  hata {ayarlar.hata_orani:g} {hata_kodlari}, abp hata {ayarlar.abp_hata_orani:g}, "
+            f"zaman aşımı {ayarlar.zaman_asimi_orani:g} ({ayarlar.asili_kalma:g} sn), "
+            f"kopma {ayarlar.kopma_orani:g}"
+        )
+
+        try:
+            sunucu.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sunucu.server_close()
+            self.stdout.write('\n' + sunucu.ozet())
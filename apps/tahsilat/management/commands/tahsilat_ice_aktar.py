@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from apps.core.concurrency_limiter import TOPLU, oncelik
+from apps.tahsilat.cache import kimlik_hash
+from apps.tahsilat.dsi_api_service import get_dsi_tahsilat_service
+from apps.tahsilat.ingest import tahsilat_listesi_ice_aktar
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bir TCKN/VKN için DSİ tahsilat listesini akış halinde veritabanına aktarır'
+
+    def add_arguments(self, parser):
+        kimlik = parser.add_mutually_exclusive_group(required=True)
+        kimlik.add_argument('--tckn', help='TC Kimlik No')
+        kimlik.add_argument('--vkn', help='Vergi Kimlik No')
+        parser.add_argument('--kullanici', required=True, help='Yeni kayıtların sahibi (e-posta)')
+        parser.add_argument('--sadece-odenmemis', action='store_true', help='Sadece ödenmemiş kayıtlar')
+        parser.add_argument('--parti', type=int, default=None, help='Parti boyutu')
+
+    def handle(self, *args, **options):
+        try:
+            kullanici = User.objects.get(email=options['kullanici'])
+        except User.DoesNotExist:
+            raise CommandError(f"Kullanıcı bulunamadı: {options['kullanici']}")
+
+        # Toplu iş: DSİ kapasitesini kullanıcı sorgularına bırakır
+        with oncelik(TOPLU):
+            success, akis, error_message = get_dsi_tahsilat_service().tahsilat_listele_akisi(
+                tckn=options['tckn'], vkn=options['vkn'], sadece_odenmemis=options['sadece_odenmemis']
+            )
+        if not success:
+            raise CommandError(error_message)
+
+        success, data, error_message = tahsilat_listesi_ice_aktar(
+            akis['parcalar'], kullanici, boyut=options['parti'], kapat=akis['kapat'],
+            kimlik=kimlik_hash(options['tckn'], options['vkn']), tam_liste=not options['sadece_odenmemis']
+        )
+        if not success:
+            raise CommandError(error_message)
+
+        fark = data['fark']
+        self.stdout.write(self.style.SUCCESS(
+            f"{data['kayit_sayisi']} tahsilat kaydı içe aktarıldı: {len(fark.eklenen)} yeni, "
+            f"{len(fark.guncellenen)} güncellenen, {fark.degismeyen} değişmeyen, "
+            f"{len(fark.pasiflestirilen)} pasifleştirilen"
+        ))
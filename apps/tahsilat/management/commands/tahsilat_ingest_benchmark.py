@@ -0,0 +1,127 @@
+import json
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.tahsilat.dsi_kayit import kayitlari_oku
+from apps.tahsilat.ingest import tahsilat_listesi_ice_aktar
+from apps.tahsilat.models import TahsilatKaydi
+from apps.tahsilat.sahte_dsi import sentetik_yanit
+from apps.tahsilat.sentetik_veri import KIMLIK_BLOK_BOYUTU
+
+User = get_user_model()
+
+
+class _GeriAl(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Sentetik veya kaydedilmiş (dsi_kayit) tahsilat listeleriyle içe aktarma süresini ve bellek '
+            'kullanımını ölçer (veritabanı değişiklikleri geri alınır)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--satir', type=int, default=50000, help='Sentetik kayıt sayısı')
+        parser.add_argument('--parti', type=int, default=None, help='Parti boyutu')
+        parser.add_argument('--parca', type=int, default=64 * 1024, help='Okuma parçası boyutu (bayt)')
+        parser.add_argument('--eski', action='store_true',
+                            help='Karşılaştırma için eski yöntemi de ölç (json.loads + satır başına get_or_create)')
+        parser.add_argument('--kayit', nargs='+', default=None,
+                            help='Sentetik yanıt yerine DSİ kayıt dosyalarındaki liste yanıtlarını kullan (dosya/glob)')
+
+    def handle(self, *args, **options):
+        if options['kayit']:
+            return self._kayitlarla(options)
+        satir = options['satir']
+        if not 0 < satir < KIMLIK_BLOK_BOYUTU:
+            raise CommandError(f"--satir 1-{KIMLIK_BLOK_BOYUTU - 1} arasında olmalıdır")
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                "DEBUG açık: Django çalıştırılan SQL'leri bellekte tuttuğu için tepe bellek "
+                "satır sayısıyla artar; gerçekçi ölçüm için DEBUG=False kullanın"
+            ))
+        self.stdout.write(f"{satir} satırlık sentetik yanıt ile ölçüm yapılıyor...")
+
+        islemler = [('Akış halinde içe aktarma', lambda kullanici: tahsilat_listesi_ice_aktar(
+            sentetik_yanit(satir, options['parca']), kullanici, boyut=options['parti']
+        ))]
+        if options['eski']:
+            islemler.append(('Eski yöntem', lambda kullanici: self._eski_yontem(
+                b''.join(sentetik_yanit(satir, options['parca'])), kullanici
+            )))
+
+        for baslik, islem in islemler:
+            # tracemalloc işlemi belirgin şekilde yavaşlattığı için süre ve bellek ayrı turlarda ölçülür
+            sure = self._olc(islem)
+            tepe = self._olc(islem, bellek=True)
+            self.stdout.write(self.style.SUCCESS(
+                f"{baslik}: {sure:.2f} sn, {satir / sure:,.0f} satır/sn, tepe bellek {tepe / 1024 / 1024:.1f} MB"
+            ))
+
+    def _kayitlarla(self, options):
+        """Kaydedilmiş liste yanıtlarını sırayla içe aktararak ölç"""
+        govdeler = [
+            kayit['govde'].encode('utf-8') for kayit in kayitlari_oku(options['kayit'])
+            if kayit['endpoint'] == 'TahsilatListeleEDevlet' and kayit['status'] == 200 and kayit.get('govde')
+        ]
+        if not govdeler:
+            raise CommandError("Kayıtlarda başarılı TahsilatListeleEDevlet yanıtı bulunamadı")
+        satir = sum(len(json.loads(govde)['result']['tahsilatListe']) for govde in govdeler)
+        self.stdout.write(f"{len(govdeler)} kayıtlı yanıt ({satir} satır) ile ölçüm yapılıyor...")
+
+        parca = options['parca']
+
+        def islem(kullanici):
+            for govde in govdeler:
+                tahsilat_listesi_ice_aktar(
+                    (govde[i:i + parca] for i in range(0, len(govde), parca)), kullanici, boyut=options['parti']
+                )
+
+        sure = self._olc(islem)
+        tepe = self._olc(islem, bellek=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Kayıtlardan içe aktarma: {sure:.2f} sn, {satir / sure:,.0f} satır/sn, "
+            f"tepe bellek {tepe / 1024 / 1024:.1f} MB"
+        ))
+
+    def _olc(self, islem, bellek=False):
+        """İşlemi geri alınan bir transaction içinde çalıştır; süreyi veya tepe belleği döndür"""
+        if bellek:
+            tracemalloc.start()
+        baslangic = time.perf_counter()
+        try:
+            with transaction.atomic():
+                kullanici = User.objects.create_user(
+                    username='ingest-benchmark', email='ingest-benchmark@example.invalid'
+                )
+                islem(kullanici)
+                sonuc = tracemalloc.get_traced_memory()[1] if bellek else time.perf_counter() - baslangic
+                raise _GeriAl()
+        except _GeriAl:
+            pass
+        finally:
+            if bellek:
+                tracemalloc.stop()
+        return sonuc
+
+    def _eski_yontem(self, govde, kullanici):
+        for item in json.loads(govde)['result']['tahsilatListe']:
+            TahsilatKaydi.objects.get_or_create(
+                tahsilat_id=item['tahsilatId'],
+                defaults={
+                    'tahakkuk_no': item['tahakkukNo'],
+                    'gelir_turu': item['gelirTuru'],
+                    'borcun_konusu': item['borcunKonusu'],
+                    'cari_id': item['cariId'],
+                    'ana_para_borc': item['anaParaBorc'],
+                    'yapilan_toplam_tahsilat': item['yapilanToplamTahsilat'],
+                    'kalan_anapara_borc': item['kalanAnaparaBorc'],
+                    'tahakkuk_donemi': item['tahakkukDonemi'],
+                    'harici_id': item['id'],
+                    'kullanici': kullanici
+                }
+            )
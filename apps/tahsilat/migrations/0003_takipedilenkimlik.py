@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tahsilat', '0002_alter_tahsilatkaydi_tahakkuk_donemi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TakipEdilenKimlik',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kimlik_tipi', models.CharField(choices=[('TCKN', 'TC Kimlik No'), ('VKN', 'Vergi Kimlik No')], max_length=4)),
+                ('kimlik_degeri', models.CharField(help_text='TCKN veya VKN', max_length=20)),
+                ('aciklama', models.CharField(blank=True, help_text='Kullanıcının verdiği ad', max_length=100)),
+                ('aktif', models.BooleanField(default=True, help_text='Arka plan yenilemesine dahil mi')),
+                ('olusturma_tarihi', models.DateTimeField(default=django.utils.timezone.now)),
+                ('son_yenileme', models.DateTimeField(blank=True, help_text='Son yenileme denemesi', null=True)),
+                ('son_basarili_yenileme', models.DateTimeField(blank=True, null=True)),
+                ('son_hata', models.TextField(blank=True, null=True)),
+                ('kullanici', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='takip_edilen_kimlikler', to=settings.AUTH_USER_MODEL)),
+                ('son_sorgu', models.ForeignKey(blank=True, help_text='Son başarılı yenilemenin sorgu kaydı (özet bu kayda bağlıdır)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tahsilat.tahsilatsorgu')),
+            ],
+            options={
+                'verbose_name': 'Takip Edilen Kimlik',
+                'verbose_name_plural': 'Takip Edilen Kimlikler',
+                'ordering': ['-olusturma_tarihi'],
+                'indexes': [models.Index(fields=['aktif', 'son_yenileme'], name='tahsilat_ta_aktif_b0c315_idx'), models.Index(fields=['kimlik_tipi', 'kimlik_degeri'], name='tahsilat_ta_kimlik__88cecc_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='takipedilenkimlik',
+            constraint=models.UniqueConstraint(fields=('kullanici', 'kimlik_tipi', 'kimlik_degeri'), name='takip_kullanici_kimlik_tekil'),
+        ),
+    ]
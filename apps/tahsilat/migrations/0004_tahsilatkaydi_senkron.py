@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tahsilat', '0003_takipedilenkimlik'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='icerik_hash',
+            field=models.CharField(blank=True, default='', help_text='DSİ alanlarının özeti', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='kimlik_hash',
+            field=models.CharField(blank=True, default='', help_text="Sorgulanan TCKN/VKN'nin özeti", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='tahsilatkaydi',
+            index=models.Index(fields=['kimlik_hash', 'aktif'], name='tahsilat_ta_kimlik__f82eda_idx'),
+        ),
+    ]
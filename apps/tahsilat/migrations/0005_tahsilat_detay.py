@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tahsilat', '0004_tahsilatkaydi_senkron'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='detay_alanlari',
+            field=models.JSONField(blank=True, help_text='Taksit ve ödeme listeleri dışındaki detay alanları (DSİ adlarıyla)', null=True),
+        ),
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='detay_hash',
+            field=models.CharField(blank=True, default='', help_text='Detay alanlarının özeti', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='detay_zamani',
+            field=models.DateTimeField(blank=True, help_text="Detayın DSİ'den alındığı an", null=True),
+        ),
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='odeme_sayisi',
+            field=models.PositiveIntegerField(blank=True, help_text='DSİ ödeme geçmişi göndermediyse boş', null=True),
+        ),
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='taksit_sayisi',
+            field=models.PositiveIntegerField(blank=True, help_text='DSİ taksit listesi göndermediyse boş', null=True),
+        ),
+        migrations.CreateModel(
+            name='TahsilatTaksit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sira', models.PositiveIntegerField(help_text='DSİ yanıtındaki sıra')),
+                ('taksit_no', models.IntegerField(blank=True, null=True)),
+                ('taksit_tutari', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('vade_tarihi', models.DateTimeField(blank=True, null=True)),
+                ('odeme_durumu', models.CharField(blank=True, max_length=50, null=True)),
+                ('odeme_tarihi', models.DateTimeField(blank=True, null=True)),
+                ('ek', models.JSONField(blank=True, help_text='Tanınmayan DSİ alanları', null=True)),
+                ('tahsilat_kaydi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taksitler', to='tahsilat.tahsilatkaydi')),
+            ],
+            options={
+                'verbose_name': 'Tahsilat Taksiti',
+                'verbose_name_plural': 'Tahsilat Taksitleri',
+                'ordering': ['tahsilat_kaydi', 'sira'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TahsilatOdeme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sira', models.PositiveIntegerField(help_text='DSİ yanıtındaki sıra')),
+                ('odeme_tarihi', models.DateTimeField(blank=True, null=True)),
+                ('odeme_tutari', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('odeme_yontemi', models.CharField(blank=True, max_length=50, null=True)),
+                ('referans_no', models.CharField(blank=True, max_length=100, null=True)),
+                ('ek', models.JSONField(blank=True, help_text='Tanınmayan DSİ alanları', null=True)),
+                ('tahsilat_kaydi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='odemeler', to='tahsilat.tahsilatkaydi')),
+            ],
+            options={
+                'verbose_name': 'Tahsilat Ödemesi',
+                'verbose_name_plural': 'Tahsilat Ödemeleri',
+                'ordering': ['tahsilat_kaydi', 'sira'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tahsilattaksit',
+            constraint=models.UniqueConstraint(fields=('tahsilat_kaydi', 'sira'), name='tahsilat_taksit_sira_tekil'),
+        ),
+        migrations.AddConstraint(
+            model_name='tahsilatodeme',
+            constraint=models.UniqueConstraint(fields=('tahsilat_kaydi', 'sira'), name='tahsilat_odeme_sira_tekil'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tahsilat', '0005_tahsilat_detay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tahsilatkaydi',
+            name='liste_zamani',
+            field=models.DateTimeField(blank=True, help_text="Kaydı son yazan listenin DSİ'den alındığı an", null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tahsilat', '0006_tahsilatkaydi_liste_zamani'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KimlikSenkronu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kimlik_hash', models.CharField(help_text="Sorgulanan TCKN/VKN'nin özeti", max_length=64, unique=True)),
+                ('liste_zamani', models.DateTimeField(blank=True, help_text="Kimliğe son uygulanan listenin DSİ'den alındığı an", null=True)),
+            ],
+            options={
+                'verbose_name': 'Kimlik Senkronu',
+                'verbose_name_plural': 'Kimlik Senkronları',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='tahsilatkaydi',
+            name='liste_zamani',
+        ),
+    ]
@@ -26,6 +26,19 @@ class TahsilatKaydi(models.Model):
     son_guncelleme = models.DateTimeField(auto_now=True)
     aktif = models.BooleanField(default=True, help_text="Kayıt aktif mi")
     
+    # Senkronizasyon alanları
+    icerik_hash = models.CharField(max_length=32, blank=True, default='', help_text="DSİ alanlarının özeti")
+    kimlik_hash = models.CharField(max_length=64, blank=True, default='', help_text="Sorgulanan TCKN/VKN'nin özeti")
+    
+    # Detay senkronizasyonu (taksitler ve ödeme geçmişi TahsilatTaksit/TahsilatOdeme'de)
+    detay_zamani = models.DateTimeField(null=True, blank=True, help_text="Detayın DSİ'den alındığı an")
+    detay_hash = models.CharField(max_length=32, blank=True, default='', help_text="Detay alanlarının özeti")
+    detay_alanlari = models.JSONField(
+        null=True, blank=True, help_text="Taksit ve ödeme listeleri dışındaki detay alanları (DSİ adlarıyla)"
+    )
+    taksit_sayisi = models.PositiveIntegerField(null=True, blank=True, help_text="DSİ taksit listesi göndermediyse boş")
+    odeme_sayisi = models.PositiveIntegerField(null=True, blank=True, help_text="DSİ ödeme geçmişi göndermediyse boş")
+    
     class Meta:
         verbose_name = 'Tahsilat Kaydı'
         verbose_name_plural = 'Tahsilat Kayıtları'
@@ -34,6 +47,7 @@ class TahsilatKaydi(models.Model):
             models.Index(fields=['tahsilat_id']),
             models.Index(fields=['tahakkuk_no']),
             models.Index(fields=['kullanici', 'tahakkuk_donemi']),
+            models.Index(fields=['kimlik_hash', 'aktif']),
         ]
     
     def __str__(self):
@@ -50,6 +64,69 @@ class TahsilatKaydi(models.Model):
             return "Ödenmedi"
 
 
+class KimlikSenkronu(models.Model):
+    """Kimliğin (TCKN/VKN) kayıtlarına son uygulanan tahsilat listesi"""
+    
+    kimlik_hash = models.CharField(max_length=64, unique=True, help_text="Sorgulanan TCKN/VKN'nin özeti")
+    liste_zamani = models.DateTimeField(
+        null=True, blank=True, help_text="Kimliğe son uygulanan listenin DSİ'den alındığı an"
+    )
+    
+    class Meta:
+        verbose_name = 'Kimlik Senkronu'
+        verbose_name_plural = 'Kimlik Senkronları'
+    
+    def __str__(self):
+        return f"{self.kimlik_hash[:12]} - {self.liste_zamani}"
+
+
+class TahsilatTaksit(models.Model):
+    """Tahsilat kaydının taksit planı (VTahsilatDetayGetirEDevlet taksitler)"""
+    
+    tahsilat_kaydi = models.ForeignKey(TahsilatKaydi, on_delete=models.CASCADE, related_name='taksitler')
+    sira = models.PositiveIntegerField(help_text="DSİ yanıtındaki sıra")
+    taksit_no = models.IntegerField(null=True, blank=True)
+    taksit_tutari = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    vade_tarihi = models.DateTimeField(null=True, blank=True)
+    odeme_durumu = models.CharField(max_length=50, null=True, blank=True)
+    odeme_tarihi = models.DateTimeField(null=True, blank=True)
+    ek = models.JSONField(null=True, blank=True, help_text="Tanınmayan DSİ alanları")
+    
+    class Meta:
+        verbose_name = 'Tahsilat Taksiti'
+        verbose_name_plural = 'Tahsilat Taksitleri'
+        ordering = ['tahsilat_kaydi', 'sira']
+        constraints = [
+            models.UniqueConstraint(fields=['tahsilat_kaydi', 'sira'], name='tahsilat_taksit_sira_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tahsilat_kaydi_id} - {self.taksit_no}. taksit"
+
+
+class TahsilatOdeme(models.Model):
+    """Tahsilat kaydının ödeme geçmişi (VTahsilatDetayGetirEDevlet odemeGecmisi)"""
+    
+    tahsilat_kaydi = models.ForeignKey(TahsilatKaydi, on_delete=models.CASCADE, related_name='odemeler')
+    sira = models.PositiveIntegerField(help_text="DSİ yanıtındaki sıra")
+    odeme_tarihi = models.DateTimeField(null=True, blank=True)
+    odeme_tutari = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    odeme_yontemi = models.CharField(max_length=50, null=True, blank=True)
+    referans_no = models.CharField(max_length=100, null=True, blank=True)
+    ek = models.JSONField(null=True, blank=True, help_text="Tanınmayan DSİ alanları")
+    
+    class Meta:
+        verbose_name = 'Tahsilat Ödemesi'
+        verbose_name_plural = 'Tahsilat Ödemeleri'
+        ordering = ['tahsilat_kaydi', 'sira']
+        constraints = [
+            models.UniqueConstraint(fields=['tahsilat_kaydi', 'sira'], name='tahsilat_odeme_sira_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tahsilat_kaydi_id} - {self.odeme_tarihi} {self.odeme_tutari}"
+
+
 class TahsilatSorgu(models.Model):
     """Tahsilat sorgu geçmişi"""
     
@@ -76,6 +153,11 @@ class TahsilatSorgu(models.Model):
     
     def __str__(self):
         return f"{self.sorgu_tipi}: {self.sorgu_degeri} - {self.sorgu_tarihi.strftime('%d.%m.%Y %H:%M')}"
+    
+    @property
+    def tam_liste(self):
+        """Filtresiz (kimliğin tüm kayıtlarını döndüren) sorgu mu"""
+        return not (self.sadece_odenmemis or self.baslangic_tarihi or self.bitis_tarihi)
 
 
 class TahsilatOzeti(models.Model):
@@ -94,3 +176,43 @@ class TahsilatOzeti(models.Model):
     
     def __str__(self):
         return f"Özet - {self.tahsilat_sorgu.sorgu_degeri}"
+
+
+class TakipEdilenKimlik(models.Model):
+    """Kullanıcının takip ettiği ve arka planda düzenli yenilenen TCKN/VKN"""
+    
+    KIMLIK_TIPI_CHOICES = TahsilatSorgu.SORGU_TIPI_CHOICES
+    
+    kullanici = models.ForeignKey(User, on_delete=models.CASCADE, related_name='takip_edilen_kimlikler')
+    kimlik_tipi = models.CharField(max_length=4, choices=KIMLIK_TIPI_CHOICES)
+    kimlik_degeri = models.CharField(max_length=20, help_text="TCKN veya VKN")
+    aciklama = models.CharField(max_length=100, blank=True, help_text="Kullanıcının verdiği ad")
+    aktif = models.BooleanField(default=True, help_text="Arka plan yenilemesine dahil mi")
+    olusturma_tarihi = models.DateTimeField(default=timezone.now)
+    
+    # Son arka plan yenilemesinin sonucu
+    son_yenileme = models.DateTimeField(null=True, blank=True, help_text="Son yenileme denemesi")
+    son_basarili_yenileme = models.DateTimeField(null=True, blank=True)
+    son_hata = models.TextField(blank=True, null=True)
+    son_sorgu = models.ForeignKey(
+        TahsilatSorgu, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text="Son başarılı yenilemenin sorgu kaydı (özet bu kayda bağlıdır)"
+    )
+    
+    class Meta:
+        verbose_name = 'Takip Edilen Kimlik'
+        verbose_name_plural = 'Takip Edilen Kimlikler'
+        ordering = ['-olusturma_tarihi']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kullanici', 'kimlik_tipi', 'kimlik_degeri'],
+                name='takip_kullanici_kimlik_tekil'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['aktif', 'son_yenileme']),
+            models.Index(fields=['kimlik_tipi', 'kimlik_degeri']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kimlik_tipi}: {self.kimlik_degeri} ({self.kullanici})"
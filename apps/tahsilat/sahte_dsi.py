@@ -0,0 +1,312 @@
+"""
+Yerel sahte DSİ altyapı sunucusu
+
+TahsilatListeleEDevlet, VTahsilatDetayGetirEDevlet ve TahsilatBelgeGetirEDevlet
+uçlarını sentetik_veri.py üretecinin verisiyle ABP zarfı formatında sunar
+(mock modla aynı tohum aynı veriyi verir). DSI_API_BASE_URL bu
+sunucuya yönlendirildiğinde istemcinin gerçek HTTP yolu (bağlantı havuzu,
+zaman aşımları, devre kesici, akış halinde okuma) uçtan uca çalıştırılabilir.
+
+Gecikme dağılımı, hata/zaman aşımı/bağlantı kopma oranları, yanıt boyutu ve
+bant genişliği ayarlanabilir; böylece üretimdeki yavaşlamalar yerelde
+tekrarlanabilir.
+"""
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .dsi_api_service import abp_zarfi
+from .sentetik_veri import SentetikDSIVerisi, kimlik_anahtari
+
+logger = logging.getLogger(__name__)
+
+UC_NOKTASI_ONEKI = '/api/services/app/Tahsilat/'
+
+# DSİ servis metodu -> kısa ad (gecikme ve istatistik anahtarları)
+UC_NOKTALARI = {
+    'TahsilatListeleEDevlet': 'liste',
+    'VTahsilatDetayGetirEDevlet': 'detay',
+    'TahsilatBelgeGetirEDevlet': 'belge',
+}
+
+# Yanıt gövdesinin sokete yazıldığı parça boyutu (bayt)
+YAZMA_PARCA_BOYUTU = 64 * 1024
+
+# Standart normal dağılımın %99'luk değeri (lognormal p50/p99 -> sigma)
+_Z_99 = 2.3263
+
+
+def sentetik_yanit(satir: int, parca_boyutu: int, kimlik: str = 'SENTETIK',
+                   uretec: SentetikDSIVerisi = None) -> Iterator[bytes]:
+    """ABP zarfı içinde sentetik tahsilat listesi; belleğe almadan parça parça üretir"""
+    uretec = uretec or SentetikDSIVerisi()
+    toplamlar = {'anaParaBorc': 0.0, 'yapilanToplamTahsilat': 0.0, 'toplamKalanAnaparaBorc': 0.0}
+    tampon = b'{"result":{"tahsilatListe":['
+    for sira, item in enumerate(uretec.kayitlar(kimlik, satir)):
+        tampon += (b',' if sira else b'') + json.dumps(item).encode('utf-8')
+        toplamlar['anaParaBorc'] += item['anaParaBorc']
+        toplamlar['yapilanToplamTahsilat'] += item['yapilanToplamTahsilat']
+        toplamlar['toplamKalanAnaparaBorc'] += item['kalanAnaparaBorc']
+        if len(tampon) >= parca_boyutu:
+            yield tampon
+            tampon = b''
+    ozet = ''.join(f'"{alan}":{round(deger, 2)},' for alan, deger in toplamlar.items())
+    tampon += (b'],' + ozet.encode('utf-8')
+               + b'"sonucBilgisi":{"sonucKodu":"001","sonucAciklamasi":"Sentetik"}},'
+               b'"targetUrl":null,"success":true,"error":null,"unAuthorizedRequest":false,"__abp":true}')
+    yield tampon
+
+
+def abp_hata_zarfi(mesaj: str) -> bytes:
+    """ABP'nin hata durumunda döndürdüğü zarf"""
+    return json.dumps({
+        'result': None,
+        'targetUrl': None,
+        'success': False,
+        'error': {'code': 0, 'message': mesaj, 'details': None, 'validationErrors': None},
+        'unAuthorizedRequest': False,
+        '__abp': True
+    }).encode('utf-8')
+
+
+class GecikmeDagilimi:
+    """
+    Yanıt gecikmesi dağılımı (milisaniye)
+
+    Tanım biçimleri:
+        sabit:50            her istekte 50 ms
+        uniform:20,200      20-200 ms arası eşit dağılım
+        normal:100,30       ortalama 100 ms, standart sapma 30 ms (negatifler 0)
+        lognormal:80,1500   p50 80 ms, p99 1500 ms olan uzun kuyruklu dağılım
+    """
+
+    TURLER = {'sabit': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+
+    def __init__(self, tur: str, parametreler: Tuple[float, ...]):
+        self.tur = tur
+        self.parametreler = parametreler
+
+    @classmethod
+    def coz(cls, tanim: str) -> 'GecikmeDagilimi':
+        tur, _, degerler = tanim.partition(':')
+        tur = tur.strip().lower()
+        if tur not in cls.TURLER:
+            raise ValueError(f"Bilinmeyen gecikme dağılımı: {tur} ({', '.join(cls.TURLER)})")
+        try:
+            parametreler = tuple(float(deger) for deger in degerler.split(','))
+        except ValueError:
+            raise ValueError(f"Geçersiz gecikme tanımı: {tanim}")
+        if len(parametreler) != cls.TURLER[tur] or any(p < 0 for p in parametreler):
+            raise ValueError(f"Geçersiz gecikme tanımı: {tanim}")
+        if tur == 'lognormal' and not 0 < parametreler[0] <= parametreler[1]:
+            raise ValueError(f"lognormal için 0 < p50 <= p99 olmalı: {tanim}")
+        return cls(tur, parametreler)
+
+    def ornekle(self, rastgele: random.Random) -> float:
+        """Bir gecikme örneği (saniye)"""
+        p = self.parametreler
+        if self.tur == 'sabit':
+            ms = p[0]
+        elif self.tur == 'uniform':
+            ms = rastgele.uniform(p[0], p[1])
+        elif self.tur == 'normal':
+            ms = max(0.0, rastgele.gauss(p[0], p[1]))
+        else:
+            sigma = math.log(p[1] / p[0]) / _Z_99
+            ms = rastgele.lognormvariate(math.log(p[0]), sigma)
+        return ms / 1000
+
+    def __str__(self):
+        return f"{self.tur}:{','.join(f'{p:g}' for p in self.parametreler)}"
+
+
+class SahteDSIAyarlari:
+    """Sahte sunucunun davranış ayarları; oranlar 0-1 arası olasılıktır"""
+
+    def __init__(self, gecikmeler: Dict[str, GecikmeDagilimi] = None,
+                 hata_orani: float = 0.0, hata_kodlari: Tuple[int, ...] = (500,),
+                 abp_hata_orani: float = 0.0, zaman_asimi_orani: float = 0.0,
+                 asili_kalma: float = 120.0, kopma_orani: float = 0.0,
+                 liste_satir: int = 0, belge_kb: int = 0, hiz: int = 0,
+                 tohum: Optional[int] = None):
+        sifir = GecikmeDagilimi('sabit', (0.0,))
+        self.gecikmeler = {ad: (gecikmeler or {}).get(ad, sifir) for ad in UC_NOKTALARI.values()}
+        self.hata_orani = hata_orani
+        self.hata_kodlari = tuple(hata_kodlari) or (500,)
+        self.abp_hata_orani = abp_hata_orani
+        self.zaman_asimi_orani = zaman_asimi_orani
+        self.asili_kalma = asili_kalma
+        self.kopma_orani = kopma_orani
+        # 0: kimliğe göre 1-40 kayıt; >0: her kimlik için bu kadar kayıt
+        self.liste_satir = liste_satir
+        # 0: sadece kayıt özetini içeren küçük PDF; >0: dolguyla bu boyutta (KB) PDF
+        self.belge_kb = belge_kb
+        # Yanıt gövdesi yazma hızı (bayt/sn); 0 sınırsız
+        self.hiz = hiz
+        self.tohum = tohum
+
+
+class SahteDSISunucusu(ThreadingHTTPServer):
+    """Her isteği ayrı thread'de işleyen sahte DSİ sunucusu"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, adres: Tuple[str, int], ayarlar: SahteDSIAyarlari, sessiz: bool = False):
+        self.ayarlar = ayarlar
+        self.sessiz = sessiz
+        self.uretec = SentetikDSIVerisi(tohum=ayarlar.tohum or 0, kayit_sayisi=ayarlar.liste_satir)
+        self.istatistik = Counter()
+        self._kilit = threading.Lock()
+        self._rastgele = random.Random(ayarlar.tohum)
+        super().__init__(adres, _SahteDSIIstegi)
+
+    def rastgele(self, islem):
+        """Paylaşılan üreteçle (tohum verildiyse tekrarlanabilir) örnek al"""
+        with self._kilit:
+            return islem(self._rastgele)
+
+    def say(self, uc: str, sonuc: str) -> None:
+        with self._kilit:
+            self.istatistik[(uc, sonuc)] += 1
+
+    def liste_govdesi(self, params: Dict[str, str]) -> bytes:
+        tarihler = [
+            datetime.fromisoformat(params[alan]) if params.get(alan) else None
+            for alan in ('BaslangicTarihi', 'BitisTarihi')
+        ]
+        return _liste_govdesi(
+            self.uretec, kimlik_anahtari(params.get('TCKN'), params.get('VKN')), *tarihler,
+            params.get('SadeceOdenmemisKayitlarMi', '').lower() == 'true'
+        )
+
+    def detay_govdesi(self, tahsilat_id: int) -> bytes:
+        return abp_zarfi(self.uretec.tahsilat_detayi(tahsilat_id))
+
+    def belge_govdesi(self, tahsilat_id: int) -> bytes:
+        return abp_zarfi(self.uretec.tahsilat_belgesi(tahsilat_id, self.ayarlar.belge_kb))
+
+    def ozet(self) -> str:
+        """Uç nokta ve sonuç bazında istek sayıları"""
+        with self._kilit:
+            satirlar = [f"{uc:<6} {sonuc:<28} {adet}" for (uc, sonuc), adet in sorted(self.istatistik.items())]
+        return '\n'.join(satirlar) or 'İstek alınmadı'
+
+
+@lru_cache(maxsize=32)
+def _liste_govdesi(uretec: SentetikDSIVerisi, kimlik: str, baslangic_tarihi: Optional[datetime],
+                   bitis_tarihi: Optional[datetime], sadece_odenmemis: bool) -> bytes:
+    """Büyük listeler her istekte yeniden üretilmesin; veri deterministik olduğundan önbelleklenebilir"""
+    return abp_zarfi(uretec.tahsilat_listesi(kimlik, baslangic_tarihi, bitis_tarihi, sadece_odenmemis))
+
+
+class _SahteDSIIstegi(BaseHTTPRequestHandler):
+    # Keep-alive: istemcinin bağlantı havuzu gerçekçi şekilde yeniden kullanılır
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SahteDSI/1.0'
+
+    def do_POST(self):
+        baslangic = time.monotonic()
+        uzunluk = int(self.headers.get('Content-Length') or 0)
+        if uzunluk:
+            self.rfile.read(uzunluk)
+
+        adres = urlsplit(self.path)
+        metod = adres.path[len(UC_NOKTASI_ONEKI):] if adres.path.startswith(UC_NOKTASI_ONEKI) else None
+        uc = UC_NOKTALARI.get(metod)
+        if uc is None:
+            self._yanitla(404, abp_hata_zarfi(f"Bilinmeyen servis metodu: {adres.path}"))
+            return
+        params = {anahtar: degerler[-1] for anahtar, degerler in parse_qs(adres.query).items()}
+
+        ayarlar = self.server.ayarlar
+        gecikme, zar = self.server.rastgele(
+            lambda r: (ayarlar.gecikmeler[uc].ornekle(r), r.random())
+        )
+        time.sleep(gecikme)
+
+        # Tek zar ile hata türleri birbirini dışlar; oranlar toplanarak uygulanır
+        esik = 0.0
+        for oran, sonuc in ((ayarlar.zaman_asimi_orani, 'zaman_asimi'),
+                            (ayarlar.hata_orani, 'http_hata'),
+                            (ayarlar.abp_hata_orani, 'abp_hata'),
+                            (ayarlar.kopma_orani, 'kopma')):
+            esik += oran
+            if zar < esik:
+                break
+        else:
+            sonuc = 'basarili'
+
+        try:
+            if sonuc == 'zaman_asimi':
+                # Upstream takılmış gibi bekle; istemci zaman aşımıyla çoktan ayrılmış olabilir
+                time.sleep(ayarlar.asili_kalma)
+                self._yanitla(504, abp_hata_zarfi('Gateway Timeout'))
+            elif sonuc == 'http_hata':
+                kod = self.server.rastgele(lambda r: r.choice(ayarlar.hata_kodlari))
+                self._yanitla(kod, abp_hata_zarfi('An internal error occurred during your request!'))
+            elif sonuc == 'abp_hata':
+                self._yanitla(200, abp_hata_zarfi('Sahte DSİ: kayıt bulunamadı'))
+            else:
+                govde = self._govde(uc, params)
+                if govde is None:
+                    sonuc = 'gecersiz'
+                    self._yanitla(200, abp_hata_zarfi('tahsilatId parametresi gerekli'))
+                elif sonuc == 'kopma':
+                    # Başlıklar tam uzunlukla gönderilir, gövde yarıda kesilir
+                    kesim = self.server.rastgele(lambda r: r.randint(0, max(0, len(govde) - 1)))
+                    self._yanitla(200, govde, kes=kesim)
+                else:
+                    self._yanitla(200, govde)
+        except (BrokenPipeError, ConnectionResetError):
+            sonuc += '/istemci_ayrildi'
+            self.close_connection = True
+
+        self.server.say(uc, sonuc)
+        if not self.server.sessiz:
+            sure = (time.monotonic() - baslangic) * 1000
+            logger.info(f"{metod} {params} -> {sonuc} ({sure:.0f} ms)")
+
+    def _govde(self, uc: str, params: Dict[str, str]) -> Optional[bytes]:
+        if uc == 'liste':
+            return self.server.liste_govdesi(params)
+        try:
+            tahsilat_id = int(params['tahsilatId'])
+        except (KeyError, ValueError):
+            return None
+        if uc == 'detay':
+            return self.server.detay_govdesi(tahsilat_id)
+        return self.server.belge_govdesi(tahsilat_id)
+
+    def _yanitla(self, kod: int, govde: bytes, kes: Optional[int] = None) -> None:
+        self.send_response(kod)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(govde)))
+        if kes is not None:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+
+        gonderilecek = govde if kes is None else govde[:kes]
+        hiz = self.server.ayarlar.hiz
+        for i in range(0, len(gonderilecek), YAZMA_PARCA_BOYUTU):
+            parca = gonderilecek[i:i + YAZMA_PARCA_BOYUTU]
+            self.wfile.write(parca)
+            if hiz:
+                time.sleep(len(parca) / hiz)
+
+        if kes is not None:
+            self.wfile.flush()
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Erişim logu do_POST içinde sonuçla birlikte yazılır
+        pass
@@ -0,0 +1,121 @@
+"""
+Tahsilat sorgu sonuçlarında sunucu tarafı imleçli sayfalama
+
+Kurumsal sorgular on binlerce satır döndürebilir; hepsini tek yanıtta göndermek
+yavaş bağlantıdaki istemcinin megabaytlarca JSON indirip ayrıştırmasını
+gerektirir. Sorgu sonucu (TahsilatKaydi pk'ları, DSİ'nin döndürdüğü sırayla)
+sorgu kimliği altında Django cache'te (Redis) TAHSILAT_SAYFA_TTL saniye tutulur.
+/sorgu/ yanıtı özet ve ilk sayfayı taşır; sonraki sayfalar /sorgu/sayfa/
+uç noktasından opak imleçle istenir.
+
+İmleç sorgu kimliği, konum ve sayfa boyutunu imzalı taşır (django.core.signing);
+istemci değiştiremez, başka kullanıcının sorgusu için kullanılamaz. Sonucun
+süresi dolduysa [SONUC_SURESI_DOLDU] ile HTTP 410 döner ve sorgu tekrarlanır.
+Satırlar her sayfada veritabanından okunur; arka plan yenilemesiyle değişen
+tutarlar sonraki sayfalarda güncel gelir.
+"""
+import logging
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from apps.core.upstream_errors import IMLEC_GECERSIZ, SONUC_SURESI_DOLDU, hata_mesaji
+from .models import TahsilatKaydi
+from .serializers import TahsilatKaydiSerializer
+
+logger = logging.getLogger(__name__)
+
+ANAHTAR_ON_EKI = 'tahsilat:sayfa:v1'
+IMZA_TUZU = 'tahsilat.sorgu.sayfa'
+
+
+class SorguSayfalari:
+    """Sorgu sonuçlarını saklayıp imleçle sayfa sayfa sunan yardımcı"""
+
+    @property
+    def ttl(self) -> int:
+        """Sorgu sonucunun sayfalanabildiği süre (saniye)"""
+        return getattr(settings, 'TAHSILAT_SAYFA_TTL', 1800)
+
+    def sayfa_boyutu(self, istenen: Optional[int] = None) -> int:
+        """İstenen sayfa boyutunu TAHSILAT_SAYFA_MAKS_BOYUTU ile sınırla"""
+        boyut = istenen or getattr(settings, 'TAHSILAT_SAYFA_BOYUTU', 20)
+        return max(1, min(boyut, getattr(settings, 'TAHSILAT_SAYFA_MAKS_BOYUTU', 200)))
+
+    def _anahtar(self, sorgu_id: int) -> str:
+        return f"{ANAHTAR_ON_EKI}:{sorgu_id}"
+
+    def kaydet(self, sorgu_id: int, kullanici_id: int, kayit_idleri: Sequence[int]) -> bool:
+        """Sorgu sonucunu sakla; satır başına 8 bayt (pk dizisi)"""
+        try:
+            cache.set(self._anahtar(sorgu_id), {
+                'kullanici': kullanici_id,
+                'kayitlar': array('q', kayit_idleri).tobytes(),
+            }, timeout=self.ttl)
+            return True
+        except Exception as e:
+            logger.warning(f"Sorgu sonucu sayfalama için saklanamadı: {str(e)}")
+            return False
+
+    def imlec(self, sorgu_id: int, konum: int, boyut: int) -> str:
+        return signing.dumps([sorgu_id, konum, boyut], salt=IMZA_TUZU)
+
+    def sayfa(self, sorgu_id: int, kayit_idleri: Sequence[int], konum: int, boyut: int) -> Dict:
+        """kayit_idleri[konum:konum + boyut] satırlarını tek sorguda oku ve serileştir"""
+        idler = list(kayit_idleri[konum:konum + boyut])
+        mevcut = TahsilatKaydi.objects.in_bulk(idler)
+        sonraki = konum + boyut
+        return {
+            # Sorgudan sonra silinmiş satırlar atlanır
+            'tahsilat_kayitlari': TahsilatKaydiSerializer(
+                [mevcut[pk] for pk in idler if pk in mevcut], many=True
+            ).data,
+            'toplam_kayit': len(kayit_idleri),
+            'sayfa_boyutu': boyut,
+            'sonraki_imlec': self.imlec(sorgu_id, sonraki, boyut) if sonraki < len(kayit_idleri) else None,
+        }
+
+    def ilk_sayfa(self, sorgu, kayit_idleri: Sequence[int], boyut: int = None) -> Dict:
+        """Sorgu sonucunu sakla ve ilk sayfayı döndür"""
+        boyut = self.sayfa_boyutu(boyut)
+        if len(kayit_idleri) > boyut and not self.kaydet(sorgu.id, sorgu.kullanici_id, kayit_idleri):
+            # Sonraki sayfalar sunulamayacağından sonucun tamamı döner
+            boyut = len(kayit_idleri)
+        return self.sayfa(sorgu.id, kayit_idleri, 0, boyut)
+
+    def imlecten(self, imlec: str, kullanici, boyut: int = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """
+        İmlecin gösterdiği sayfayı getir
+
+        Args:
+            imlec: Önceki yanıttaki sonraki_imlec
+            kullanici: İsteği yapan kullanıcı (sorgunun sahibi olmalı)
+            boyut: Sayfa boyutu; verilmezse imleçteki boyut kullanılır
+
+        Returns:
+            Tuple[bool, Optional[Dict], Optional[str]]: (success, sayfa, error_message)
+        """
+        try:
+            sorgu_id, konum, imlec_boyutu = signing.loads(imlec, salt=IMZA_TUZU)
+        except (signing.BadSignature, ValueError, TypeError):
+            return False, None, hata_mesaji(IMLEC_GECERSIZ, "Geçersiz imleç")
+
+        try:
+            girdi = cache.get(self._anahtar(sorgu_id))
+        except Exception as e:
+            logger.warning(f"Sayfalanan sorgu sonucu okunamadı: {str(e)}")
+            girdi = None
+        if girdi is None:
+            return False, None, hata_mesaji(SONUC_SURESI_DOLDU, "Sorgu sonucunun süresi doldu, sorguyu tekrarlayın")
+        if girdi['kullanici'] != kullanici.id:
+            return False, None, hata_mesaji(IMLEC_GECERSIZ, "Geçersiz imleç")
+
+        kayit_idleri = array('q')
+        kayit_idleri.frombytes(girdi['kayitlar'])
+        return True, self.sayfa(sorgu_id, kayit_idleri, konum, self.sayfa_boyutu(boyut or imlec_boyutu)), None
+
+
+sorgu_sayfalari = SorguSayfalari()
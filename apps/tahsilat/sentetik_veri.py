@@ -0,0 +1,309 @@
+"""
+DSİ tahsilat servisleri için tohumlu (deterministik) sentetik veri üreteci
+
+Mock mod ve sahte DSİ sunucusu liste, detay ve belge yanıtlarını buradan alır.
+Aynı tohum ve kimlik için her çağrı birebir aynı veriyi üretir; her çağrı
+yeni nesneler döndürdüğünden paylaşılan durum hiçbir zaman değişmez.
+
+Her kimliğe (TCKN/VKN) KIMLIK_BLOK_BOYUTU genişliğinde bir tahsilatId bloğu
+düşer; kaydın içeriği yalnızca tohum ve tahsilatId'den türetilir. Böylece
+detay ve belge yanıtları, kimlik bilinmeden listedeki kayıtla tutarlı üretilir.
+Farklı kimliklerin bloğu nadiren çakışabilir (tahsilat_id 32 bit sınırı).
+"""
+import base64
+import calendar
+import hashlib
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+# Kimlik başına en fazla kayıt; tahsilatId = blok * KIMLIK_BLOK_BOYUTU + sıra
+KIMLIK_BLOK_BOYUTU = 100000
+# tahsilatId PostgreSQL integer sütununa sığmalı
+_BLOK_SAYISI = (2 ** 31 - 1) // KIMLIK_BLOK_BOYUTU - 1
+
+GELIR_TURLERI = [
+    '01 - Sulama Tesisleri Yatırım Bedeli Geri Ödeme Gelirleri',
+    '02 - Sulama Tesisleri İşletme ve Bakım Ücreti Gelirleri',
+    '03 - Taşkın Koruma Tesisleri Yatırım Bedeli Geri Ödeme Gelirleri',
+    '04 - Hidroelektrik Santral Su Kullanım Hakkı Bedeli',
+    '05 - Kiralama ve İrtifak Hakkı Gelirleri',
+    '06 - Kamulaştırma Bedeli İadeleri',
+    '07 - İdari Para Cezaları',
+    '08 - İçme Kullanma ve Endüstri Suyu Tesislerine İlişkin Yatırım Bedeli Geri Ödeme Gelirleri',
+    '09 - Yeraltı Suyu Belge ve Ruhsat Harçları',
+    '10 - Laboratuvar Analiz Ücretleri',
+    '11 - Makine ve Ekipman Kira Gelirleri',
+    '12 - İhale Doküman Satış Gelirleri',
+    '13 - Gecikme Zammı ve Faiz Gelirleri',
+    '14 - Arazi Toplulaştırma Bedeli Geri Ödeme Gelirleri',
+]
+
+TESISLER = [
+    'Kırsal İçmesuyu Tesisi', 'Sulama Göleti', 'Arsenik Arıtma Tesisi', 'Cazibeli Sulama Kanalı',
+    'Basınçlı Borulu Sulama Şebekesi', 'Taşkın Koruma Duvarı', 'Sondaj Kuyusu', 'Terfi İstasyonu',
+    'Regülatör', 'İsale Hattı', 'Su Deposu', 'Drenaj Kanalı',
+]
+
+YERLER = [
+    'İhsaniye-Gazlıgöl', 'Sandıklı', 'Bolvadin', 'Çay', 'Emirdağ', 'Şuhut', 'Dinar', 'Dazkırı',
+    'Sinanpaşa', 'İscehisar', 'Sultandağı', 'Hocalar', 'Başmakçı', 'Kızılören', 'Evciler',
+]
+
+KONU_KALIPLARI = [
+    '{yer} {tesis} yatırım geri ödemesi',
+    '{yer} {tesis} ({asama}.Aşama) yatırım geri ödemesi',
+    '{yer} {tesis} {yil} yılı Taksidi',
+    '{yer} {tesis} {yil} yılı Taksidi Ek tahakkuku',
+    '{no} nolu {tesis} yatırım geri ödemesi',
+    '{yer} {tesis} işletme ve bakım ücreti',
+]
+
+ODEME_YONTEMLERI = ['Banka Havalesi', 'EFT', 'Kredi Kartı', 'e-Devlet', 'Vezne', 'Mahsup']
+
+# Tip 1 (WinAnsi) yazı tipinde olmayan Türkçe harfler
+_ASCII_TABLOSU = str.maketrans('çÇğĞıİöÖşŞüÜ', 'cCgGiIoOsSuU')
+
+
+def _tohum(*parcalar) -> int:
+    """Parçalardan platform ve süreçten bağımsız tohum üret (hash() rastgeleleştirilir)"""
+    ozet = hashlib.blake2b(':'.join(str(parca) for parca in parcalar).encode(), digest_size=8).digest()
+    return int.from_bytes(ozet, 'big')
+
+
+def _ay_sonu(yil: int, ay: int) -> date:
+    return date(yil, ay, calendar.monthrange(yil, ay)[1])
+
+
+def _ay_ekle(gun: date, ay: int) -> date:
+    toplam = gun.month - 1 + ay
+    return _ay_sonu(gun.year + toplam // 12, toplam % 12 + 1)
+
+
+def _iso(gun: date) -> str:
+    return f"{gun.isoformat()}T00:00:00"
+
+
+def _naive(tarih: datetime) -> datetime:
+    """Filtre tarihini DSİ tarihleri gibi saat dilimsiz yerel saate çevir"""
+    return timezone.make_naive(tarih) if timezone.is_aware(tarih) else tarih
+
+
+class SentetikDSIVerisi:
+    """Tohuma göre deterministik DSİ tahsilat liste/detay/belge verisi"""
+
+    def __init__(self, tohum: int = 0, kayit_sayisi: int = 0):
+        """
+        Args:
+            tohum: Üreteç tohumu; aynı tohum aynı veriyi üretir
+            kayit_sayisi: Her kimlik için kayıt sayısı (0: kimliğe göre 1-40 arası)
+        """
+        self.tohum = tohum
+        self.kayit_sayisi = kayit_sayisi
+
+    def kimlik_blogu(self, kimlik: str) -> int:
+        """Kimliğin tahsilatId bloğu (1.._BLOK_SAYISI)"""
+        return 1 + _tohum(self.tohum, 'kimlik', kimlik) % _BLOK_SAYISI
+
+    def kimlik_kayit_sayisi(self, kimlik: str) -> int:
+        if self.kayit_sayisi:
+            return self.kayit_sayisi
+        return 1 + _tohum(self.tohum, 'adet', kimlik) % 40
+
+    def kayit(self, tahsilat_id: int) -> Dict:
+        """tahsilatId'den türetilen liste kaydı"""
+        r = random.Random(_tohum(self.tohum, 'kayit', tahsilat_id))
+        blok = tahsilat_id // KIMLIK_BLOK_BOYUTU
+
+        donem = _ay_sonu(r.randint(2010, 2025), r.randint(1, 12))
+        gelir_turu = r.choice(GELIR_TURLERI)
+        ana_para = round(max(250.0, math.exp(r.gauss(10.2, 1.4))), 2)
+        durum = r.random()
+        if durum < 0.3:
+            # Tamamen ödenmiş
+            yapilan = ana_para
+        elif durum < 0.65:
+            yapilan = round(ana_para * r.uniform(0.05, 0.95), 2)
+        else:
+            yapilan = 0.0
+
+        return {
+            'tahsilatId': tahsilat_id,
+            'tahakkukNo': f"{donem.year}118{gelir_turu[:2]}{tahsilat_id % 10 ** 8:08d}",
+            'gelirTuru': gelir_turu,
+            'borcunKonusu': r.choice(KONU_KALIPLARI).format(
+                yer=r.choice(YERLER), tesis=r.choice(TESISLER), asama=r.randint(1, 4),
+                yil=donem.year, no=r.randint(10000, 99999)
+            ),
+            'cariId': 1000 + blok,
+            'anaParaBorc': ana_para,
+            'yapilanToplamTahsilat': yapilan,
+            'kalanAnaparaBorc': round(ana_para - yapilan, 2),
+            'tahakkukDonemi': _iso(donem),
+            'id': r.randint(10000, 2 ** 31 - 1),
+        }
+
+    def kayitlar(self, kimlik: str, adet: int = None) -> Iterator[Dict]:
+        """Kimliğin tüm kayıtları (filtresiz, tahsilatId sırasıyla)"""
+        adet = self.kimlik_kayit_sayisi(kimlik) if adet is None else adet
+        if adet >= KIMLIK_BLOK_BOYUTU:
+            raise ValueError(f"Kimlik başına en fazla {KIMLIK_BLOK_BOYUTU - 1} kayıt üretilebilir")
+        taban = self.kimlik_blogu(kimlik) * KIMLIK_BLOK_BOYUTU
+        for sira in range(1, adet + 1):
+            yield self.kayit(taban + sira)
+
+    def tahsilat_listesi(self, kimlik: str, baslangic_tarihi: datetime = None, bitis_tarihi: datetime = None,
+                         sadece_odenmemis: bool = False, adet: int = None) -> Dict:
+        """TahsilatListeleEDevlet result nesnesi"""
+        baslangic = _naive(baslangic_tarihi) if baslangic_tarihi else None
+        bitis = _naive(bitis_tarihi) if bitis_tarihi else None
+
+        liste = []
+        for item in self.kayitlar(kimlik, adet):
+            if sadece_odenmemis and item['kalanAnaparaBorc'] <= 0:
+                continue
+            donem = datetime.fromisoformat(item['tahakkukDonemi'])
+            if (baslangic and donem < baslangic) or (bitis and donem > bitis):
+                continue
+            liste.append(item)
+
+        return {
+            'tahsilatListe': liste,
+            'anaParaBorc': round(sum(item['anaParaBorc'] for item in liste), 2),
+            'yapilanToplamTahsilat': round(sum(item['yapilanToplamTahsilat'] for item in liste), 2),
+            'toplamKalanAnaparaBorc': round(sum(item['kalanAnaparaBorc'] for item in liste), 2),
+            'sonucBilgisi': {
+                'sonucKodu': '001',
+                'sonucAciklamasi': 'İşlem başarılıdır.'
+            },
+            'id': 0
+        }
+
+    def tahsilat_detayi(self, tahsilat_id: int) -> Dict:
+        """VTahsilatDetayGetirEDevlet result nesnesi (taksitler ve ödeme geçmişiyle)"""
+        detay = self.kayit(tahsilat_id)
+        r = random.Random(_tohum(self.tohum, 'detay', tahsilat_id))
+        donem = date.fromisoformat(detay['tahakkukDonemi'][:10])
+
+        taksit_sayisi = r.choice([1, 2, 3, 4, 6, 12])
+        aralik = 12 // taksit_sayisi
+        ana_para = detay['anaParaBorc']
+        taksit_tutari = round(ana_para / taksit_sayisi, 2)
+        kalan_odeme = detay['yapilanToplamTahsilat']
+
+        taksitler: List[Dict] = []
+        odemeler: List[Dict] = []
+        for no in range(1, taksit_sayisi + 1):
+            # Yuvarlama farkı son taksitte kapanır
+            tutar = taksit_tutari if no < taksit_sayisi else round(ana_para - taksit_tutari * (taksit_sayisi - 1), 2)
+            vade = _ay_ekle(donem, no * aralik)
+            odenen = round(min(tutar, kalan_odeme), 2)
+            kalan_odeme = round(kalan_odeme - odenen, 2)
+
+            odeme_tarihi = None
+            if odenen > 0:
+                odeme_tarihi = _iso(vade - timedelta(days=r.randint(0, 25)))
+                odemeler.append({
+                    'odemeTarihi': odeme_tarihi,
+                    'odemeTutari': odenen,
+                    'odemeYontemi': r.choice(ODEME_YONTEMLERI),
+                    'referansNo': f"REF{tahsilat_id}{no:02d}"
+                })
+            taksitler.append({
+                'taksitNo': no,
+                'taksitTutari': tutar,
+                'vadeTarihi': _iso(vade),
+                'odemeDurumu': 'Ödendi' if odenen >= tutar else ('Kısmi Ödendi' if odenen > 0 else 'Beklemede'),
+                'odemeTarihi': odeme_tarihi
+            })
+
+        detay.pop('id')
+        detay['taksitler'] = taksitler
+        detay['odemeGecmisi'] = odemeler
+        return detay
+
+    def tahsilat_belgesi(self, tahsilat_id: int, boyut_kb: int = 0) -> Dict:
+        """TahsilatBelgeGetirEDevlet result nesnesi (base64 PDF)"""
+        belge = base64.b64encode(self.pdf(tahsilat_id, boyut_kb)).decode('ascii')
+        donem = date.fromisoformat(self.kayit(tahsilat_id)['tahakkukDonemi'][:10])
+        return {
+            'tahsilatId': tahsilat_id,
+            'belgeAdi': f"Tahsilat_Detay_{tahsilat_id}.pdf",
+            'belge': belge,
+            'belgeBoyutu': len(belge),
+            'olusturmaTarihi': f"{_ay_ekle(donem, 1).isoformat()}T12:00:00Z",
+            'sonucBilgisi': {
+                'sonucKodu': '001',
+                'sonucAciklamasi': 'Belge başarıyla oluşturuldu.'
+            }
+        }
+
+    def pdf(self, tahsilat_id: int, boyut_kb: int = 0) -> bytes:
+        """
+        Kaydın özetini içeren tek sayfalık geçerli PDF
+
+        Args:
+            boyut_kb: 0'dan büyükse belge sıkıştırılamaz dolguyla yaklaşık bu boyuta getirilir
+        """
+        detay = self.tahsilat_detayi(tahsilat_id)
+        satirlar = [
+            'DSI Tahsilat Detay Belgesi',
+            f"Tahsilat No: {tahsilat_id}",
+            f"Tahakkuk No: {detay['tahakkukNo']}",
+            f"Gelir Turu: {detay['gelirTuru'][:80]}",
+            f"Konu: {detay['borcunKonusu'][:80]}",
+            f"Ana Para: {detay['anaParaBorc']:.2f} TL",
+            f"Yapilan Tahsilat: {detay['yapilanToplamTahsilat']:.2f} TL",
+            f"Kalan: {detay['kalanAnaparaBorc']:.2f} TL",
+        ] + [
+            f"{taksit['taksitNo']}. taksit {taksit['vadeTarihi'][:10]} {taksit['taksitTutari']:.2f} TL "
+            f"{taksit['odemeDurumu']}"
+            for taksit in detay['taksitler']
+        ]
+        metin = ''.join(
+            f"({satir.translate(_ASCII_TABLOSU).replace(chr(92), '').replace('(', '[').replace(')', ']')}) Tj T* "
+            for satir in satirlar
+        )
+        icerik = f"BT /F1 11 Tf 14 TL 50 800 Td {metin}ET".encode('latin-1', 'replace')
+
+        nesneler = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R '
+            b'/Resources << /Font << /F1 5 0 R >> >> >>',
+            b'<< /Length %d >>\nstream\n' % len(icerik) + icerik + b'\nendstream',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        ]
+        govde = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        if boyut_kb:
+            # Dolgu, xref konumları hesaplanmadan önce yorum satırı olarak eklenir
+            dolgu = max(0, boyut_kb * 1024 - 1200)
+            ham = random.Random(_tohum(self.tohum, 'pdf', tahsilat_id)).randbytes(dolgu)
+            govde += b'%' + ham.replace(b'\n', b' ').replace(b'\r', b' ') + b'\n'
+
+        konumlar = []
+        for no, nesne in enumerate(nesneler, start=1):
+            konumlar.append(len(govde))
+            govde += b'%d 0 obj\n' % no + nesne + b'\nendobj\n'
+        xref = len(govde)
+        govde += b'xref\n0 %d\n0000000000 65535 f \n' % (len(nesneler) + 1)
+        govde += b''.join(b'%010d 00000 n \n' % konum for konum in konumlar)
+        govde += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(nesneler) + 1, xref)
+        return bytes(govde)
+
+
+def varsayilan_uretec() -> SentetikDSIVerisi:
+    """Ayarlardaki tohum ve kayıt sayısıyla üreteç"""
+    return SentetikDSIVerisi(
+        tohum=getattr(settings, 'DSI_MOCK_TOHUM', 0),
+        kayit_sayisi=getattr(settings, 'DSI_MOCK_KAYIT_SAYISI', 0),
+    )
+
+
+def kimlik_anahtari(tckn: Optional[str] = None, vkn: Optional[str] = None) -> str:
+    """Üretecin kimlik anahtarı (TCKN ve VKN aynı numarayla farklı veri üretir)"""
+    return f"TCKN:{tckn}" if tckn else f"VKN:{vkn}"
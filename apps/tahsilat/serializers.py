@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import TahsilatKaydi, TahsilatSorgu, TahsilatOzeti
+from .models import TahsilatKaydi, TahsilatSorgu, TahsilatOzeti, TakipEdilenKimlik
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from datetime import datetime
 
@@ -50,6 +51,10 @@ class TahsilatSorguRequestSerializer(serializers.Serializer):
     baslangic_tarihi = serializers.DateTimeField(required=False, help_text="Başlangıç tarihi")
     bitis_tarihi = serializers.DateTimeField(required=False, help_text="Bitiş tarihi")
     sadece_odenmemis = serializers.BooleanField(default=False, help_text="Sadece ödenmemiş kayıtlar")
+    sayfa_boyutu = serializers.IntegerField(
+        required=False, min_value=1, max_value=getattr(settings, 'TAHSILAT_SAYFA_MAKS_BOYUTU', 200),
+        help_text="İlk yanıtta dönecek kayıt sayısı"
+    )
     
     def validate(self, attrs):
         """Sorgu parametrelerini doğrula"""
@@ -82,6 +87,71 @@ class TahsilatSorguRequestSerializer(serializers.Serializer):
         return attrs
 
 
+class TahsilatSorguSayfaRequestSerializer(serializers.Serializer):
+    """Sorgu sonucunun sonraki sayfası isteği serializer"""
+    imlec = serializers.CharField(help_text="Önceki yanıttaki sonraki_imlec")
+    sayfa_boyutu = serializers.IntegerField(
+        required=False, min_value=1, max_value=getattr(settings, 'TAHSILAT_SAYFA_MAKS_BOYUTU', 200),
+        help_text="Sayfadaki kayıt sayısı (verilmezse imleçteki boyut)"
+    )
+
+
+class TahsilatDetayTopluRequestSerializer(serializers.Serializer):
+    """Toplu tahsilat detay isteği serializer"""
+    tahsilat_idleri = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=getattr(settings, 'DSI_DETAY_TOPLU_MAKS_KAYIT', 100),
+        help_text="Detayı getirilecek tahsilat ID'leri"
+    )
+
+
+class TakipEdilenKimlikSerializer(serializers.ModelSerializer):
+    """Takip edilen kimlik serializer (son arka plan yenilemesinin özetiyle)"""
+    ozet = TahsilatOzetiSerializer(source='son_sorgu.ozet', read_only=True, default=None)
+    
+    class Meta:
+        model = TakipEdilenKimlik
+        fields = [
+            'id', 'kimlik_tipi', 'kimlik_degeri', 'aciklama', 'aktif', 'olusturma_tarihi',
+            'son_yenileme', 'son_basarili_yenileme', 'son_hata', 'ozet'
+        ]
+        read_only_fields = [
+            'id', 'olusturma_tarihi', 'son_yenileme', 'son_basarili_yenileme', 'son_hata', 'ozet'
+        ]
+    
+    def validate(self, attrs):
+        """Kimlik formatını ve tekrar eden kaydı doğrula"""
+        if self.instance is not None:
+            # Güncellemede sadece açıklama ve aktiflik değiştirilebilir
+            for alan in ('kimlik_tipi', 'kimlik_degeri'):
+                if alan in attrs and attrs[alan] != getattr(self.instance, alan):
+                    raise serializers.ValidationError("Kimlik bilgisi değiştirilemez")
+            return attrs
+        
+        kimlik_tipi = attrs.get('kimlik_tipi')
+        kimlik_degeri = attrs.get('kimlik_degeri', '')
+        
+        # TCKN format kontrolü
+        if kimlik_tipi == 'TCKN' and (not kimlik_degeri.isdigit() or len(kimlik_degeri) != 11):
+            raise serializers.ValidationError("TCKN 11 haneli sayı olmalıdır")
+        
+        # VKN format kontrolü
+        if kimlik_tipi == 'VKN' and (not kimlik_degeri.isdigit() or len(kimlik_degeri) != 10):
+            raise serializers.ValidationError("VKN 10 haneli sayı olmalıdır")
+        
+        kullanici = self.context['request'].user
+        takipler = TakipEdilenKimlik.objects.filter(kullanici=kullanici)
+        if takipler.filter(kimlik_tipi=kimlik_tipi, kimlik_degeri=kimlik_degeri).exists():
+            raise serializers.ValidationError("Bu kimlik zaten takip ediliyor")
+        
+        maks = getattr(settings, 'TAKIP_MAKS_KIMLIK', 20)
+        if takipler.count() >= maks:
+            raise serializers.ValidationError(f"En fazla {maks} kimlik takip edilebilir")
+        
+        return attrs
+
+
 class DSITahsilatResponseSerializer(serializers.Serializer):
     """DSİ API'den dönen tahsilat listesi serializer"""
     tahsilat_id = serializers.IntegerField()
@@ -0,0 +1,185 @@
+"""
+Tahsilat sorgusunun senkron ve asenkron view'larca paylaşılan adımları
+
+Sorgu kaydının oluşturulması, tek uçuş (single-flight) anahtarı, liderin
+kayıtları yazması, takipçilerin yazılmış kayıtları okuması, özet ve ilk
+sayfanın hazırlanması burada tek yerde tutulur. View'lar yalnızca DSİ/önbellek
+çağrısını ve single_flight'ı kendi modellerinde (senkron veya event loop
+üzerinde) bekler; buradaki adımlar senkrondur, asenkron view bunları
+sync_to_async ile çağırır.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from rest_framework import status
+
+from apps.core.tazelik import TazelikIstegi
+from apps.core.upstream_errors import http_durumu
+from .cache import kimlik_hash, liste_anahtari, tahsilat_liste_onbellegi
+from .ingest import kayitlari_yaz
+from .models import TahsilatKaydi, TahsilatOzeti, TahsilatSorgu
+from .sayfalama import sorgu_sayfalari
+from .serializers import TahsilatOzetiSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class SorguIslemi:
+    """Tek bir /sorgu/ isteğinin durumu ve adımları"""
+
+    def __init__(self, kullanici, validated_data: Dict, tazelik: TazelikIstegi):
+        self.kullanici = kullanici
+        self.tazelik = tazelik
+        self.sayfa_boyutu = validated_data.get('sayfa_boyutu')
+        self.parametreler = {
+            'tckn': validated_data.get('tckn'),
+            'vkn': validated_data.get('vkn'),
+            'baslangic_tarihi': validated_data.get('baslangic_tarihi'),
+            'bitis_tarihi': validated_data.get('bitis_tarihi'),
+            'sadece_odenmemis': validated_data.get('sadece_odenmemis', False)
+        }
+        # Sorgu kaydını oluştur
+        self.sorgu = TahsilatSorgu.objects.create(
+            kullanici=kullanici,
+            sorgu_tipi='TCKN' if self.parametreler['tckn'] else 'VKN',
+            sorgu_degeri=self.parametreler['tckn'] or self.parametreler['vkn'],
+            baslangic_tarihi=self.parametreler['baslangic_tarihi'],
+            bitis_tarihi=self.parametreler['bitis_tarihi'],
+            sadece_odenmemis=self.parametreler['sadece_odenmemis']
+        )
+        self.lider_kayitlari: List[int] = []
+        self.lider_farki = None
+
+    @property
+    def tek_ucus_anahtari(self) -> str:
+        """Aynı sorgu için eşzamanlı istekleri tüm worker'lar arasında birleştiren anahtar"""
+        anahtar = f"{liste_anahtari(**self.parametreler)}:tek-ucus"
+        if self.tazelik.ipucu_var:
+            # Farklı yaş sınırı isteyenler birbirinin sonucunu paylaşmaz
+            anahtar += f":{self.tazelik.anahtar(tahsilat_liste_onbellegi.ttl, tahsilat_liste_onbellegi.stale_ttl)}"
+        return anahtar
+
+    @staticmethod
+    def tek_ucus_ayarlari() -> Dict[str, Any]:
+        """single_flight / single_flight_async bekleme ve kilit süreleri"""
+        return {
+            'wait_timeout': getattr(settings, 'DSI_TEK_UCUS_BEKLEME', 15),
+            'lock_timeout': getattr(settings, 'DSI_API_SURE_BUTCESI', 30) + 10,
+        }
+
+    def kaydet(self, sonuc: Tuple) -> Tuple:
+        """
+        Lider: DSİ'den (önbellek üzerinden) gelen listenin kayıtlarını yaz
+
+        Returns:
+            Tuple: sonuc (single_flight takipçilerine aynen iletilir)
+        """
+        if sonuc[0] and sonuc[1]:
+            self.lider_kayitlari, self.lider_farki = kayitlari_kaydet(
+                sonuc[1].kalemler, self.kullanici, self.sorgu, tam_liste=self.sorgu.tam_liste,
+                zaman=sonuc[1].alinma_ani()
+            )
+        return sonuc
+
+    def yanit(self, sonuc: Tuple, lider: bool) -> Tuple[Dict, int, Optional[float]]:
+        """
+        Sorgu sonucunu kaydet ve yanıtı hazırla
+
+        Returns:
+            Tuple[Dict, int, Optional[float]]: (yanıt gövdesi, HTTP durumu, verinin yaşı)
+        """
+        success, data, error_message = sonuc
+        sorgu = self.sorgu
+        if not (success and data):
+            sorgu.basarili = False
+            sorgu.hata_mesaji = error_message or "Bilinmeyen hata"
+            sorgu.save()
+            return {
+                'sorgu_id': sorgu.id,
+                'basarili': False,
+                'hata': error_message or "Bilinmeyen hata"
+            }, http_durumu(error_message), None
+
+        sorgu.basarili = True
+        sorgu.donen_kayit_sayisi = len(data.kalemler)
+        sorgu.save()
+
+        # Kayıtlar lider tarafından yazıldı; takipçiler sadece okur
+        if lider:
+            kayit_idleri = self.lider_kayitlari
+        else:
+            kayit_idleri = kayitlari_getir(data, self.kullanici, sorgu)
+
+        ozet = ozet_kaydet(data, sorgu)
+        return {
+            'sorgu_id': sorgu.id,
+            'basarili': True,
+            # İlk sayfa; devamı sonraki_imlec ile /sorgu/sayfa/ üzerinden
+            **sorgu_sayfalari.ilk_sayfa(sorgu, kayit_idleri, self.sayfa_boyutu),
+            'ozet': TahsilatOzetiSerializer(ozet).data if ozet else None,
+            # Kayıtları bu istek yazdıysa yerel veriye göre değişiklikler
+            'degisiklikler': self.lider_farki.sozluk() if self.lider_farki else None,
+            'mesaj': f"{sorgu.donen_kayit_sayisi} adet tahsilat kaydı bulundu"
+        }, status.HTTP_200_OK, data.yas()
+
+    def hata(self, hata: Exception) -> Tuple[Dict, int, None]:
+        """Beklenmeyen hatayı sorguya işle ve yanıtı hazırla"""
+        logger.error(f"Tahsilat sorgu hatası: {str(hata)}")
+        self.sorgu.basarili = False
+        self.sorgu.hata_mesaji = str(hata)
+        self.sorgu.save()
+        return {
+            'sorgu_id': self.sorgu.id,
+            'basarili': False,
+            'hata': f"Beklenmeyen hata: {str(hata)}"
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR, None
+
+
+def kayitlari_kaydet(tahsilat_listesi, kullanici, sorgu, tam_liste=False, zaman=None):
+    """
+    Tahsilat kayıtlarını partiler halinde tek transaction içinde senkronize et
+
+    tam_liste True ise sorgulanan kimliğin listede olmayan aktif kayıtları pasifleştirilir.
+    zaman listenin DSİ'den alındığı andır; önbellekten gelen eski bir liste daha
+    sonra alınmış listelerin yazdığı kayıtları ezmez.
+    Kayıtların pk'larını (gelen sırayla) ve SenkronFarki'ni döndürür.
+    """
+    kayit_idleri = []
+    fark = kayitlari_yaz(
+        tahsilat_listesi, kullanici,
+        parti_sonrasi=lambda kayitlar: kayit_idleri.extend(kayit.pk for kayit in kayitlar),
+        kimlik=kimlik_hash(**{sorgu.sorgu_tipi.lower(): sorgu.sorgu_degeri}), tam_liste=tam_liste,
+        zaman=zaman
+    )
+    return kayit_idleri, fark
+
+
+def kayitlari_getir(data, kullanici, sorgu):
+    """Başka bir istek tarafından yazılmış kayıtların pk'larını tek sorguda oku"""
+    tahsilat_listesi = data.kalemler
+    mevcut = {
+        tahsilat_id: kayit.pk for tahsilat_id, kayit in TahsilatKaydi.objects.only('tahsilat_id').in_bulk(
+            [item.tahsilat_id for item in tahsilat_listesi],
+            field_name='tahsilat_id'
+        ).items()
+    }
+    eksik = [item for item in tahsilat_listesi if item.tahsilat_id not in mevcut]
+    if eksik:
+        # Lider yazmayı tamamlayamadıysa eksik kayıtları burada yaz
+        kayit_idleri = kayitlari_kaydet(eksik, kullanici, sorgu, zaman=data.alinma_ani())[0]
+        mevcut.update(zip((item.tahsilat_id for item in eksik), kayit_idleri))
+    return [mevcut[item.tahsilat_id] for item in tahsilat_listesi]
+
+
+def ozet_kaydet(data, sorgu):
+    """Özet bilgilerini kaydet"""
+    try:
+        ozet, created = TahsilatOzeti.objects.get_or_create(
+            tahsilat_sorgu=sorgu,
+            defaults=data.ozet.model_alanlari()
+        )
+        return ozet
+    except Exception as e:
+        logger.error(f"Özet kaydetme hatası: {str(e)}")
+        return None
@@ -0,0 +1,146 @@
+"""
+Takip edilen TCKN/VKN'lerin arka planda yenilenmesi
+
+Celery beat yoğun olmayan saatte takip_listesini_yenile görevini tetikler. Görev
+yenilenme zamanı gelmiş kimlikleri en eskiden başlayarak seçer ve sabit
+boyutlu partiler halinde, partiler arasında sabit aralık bırakarak kuyruğa
+atar; böylece DSİ'ye giden istek hızı worker sayısından bağımsız olarak
+sınırlı kalır. Yenileme penceresine sığmayan kimlikler sonraki çalışmaya kalır.
+
+Aynı kimliği takip eden kullanıcılar için DSİ tek kez çağrılır. Mesajlarda
+TCKN/VKN yerine takip kayıtlarının id'leri taşınır.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.concurrency_limiter import ARKA_PLAN, oncelik
+from apps.core.upstream_errors import http_durumu
+from .cache import kimlik_hash
+from .dsi_api_service import get_dsi_tahsilat_service
+from .ingest import tahsilat_listesi_ice_aktar
+from .models import TahsilatOzeti, TahsilatSorgu, TakipEdilenKimlik
+
+logger = logging.getLogger(__name__)
+
+
+def _ayar(ad: str, varsayilan):
+    return getattr(settings, ad, varsayilan)
+
+
+@shared_task(ignore_result=True)
+def takip_listesini_yenile() -> int:
+    """
+    Yenilenme zamanı gelmiş takip kayıtlarını hız sınırlı partiler halinde kuyruğa at
+
+    Returns:
+        int: Kuyruğa atılan tekil kimlik sayısı
+    """
+    parti = max(1, _ayar('TAKIP_YENILEME_PARTI', 20))
+    aralik = max(1, _ayar('TAKIP_YENILEME_PARTI_ARALIGI', 60))
+    pencere = _ayar('TAKIP_YENILEME_PENCERESI', 4) * 3600
+    esik = timezone.now() - timedelta(hours=_ayar('TAKIP_YENILEME_ESIGI', 12))
+    # Pencere içinde başlatılabilecek en fazla parti
+    maks_kimlik = max(1, pencere // aralik) * parti
+
+    takipler = TakipEdilenKimlik.objects.filter(
+        aktif=True
+    ).exclude(
+        son_yenileme__gte=esik
+    ).order_by(
+        F('son_yenileme').asc(nulls_first=True), 'id'
+    ).values_list('id', 'kimlik_tipi', 'kimlik_degeri')
+
+    # Aynı kimliği takip eden kayıtlar tek DSİ çağrısında birleştirilir
+    kimlikler: Dict[tuple, List[int]] = {}
+    for takip_id, kimlik_tipi, kimlik_degeri in takipler.iterator():
+        anahtar = (kimlik_tipi, kimlik_degeri)
+        if anahtar not in kimlikler and len(kimlikler) >= maks_kimlik:
+            continue
+        kimlikler.setdefault(anahtar, []).append(takip_id)
+
+    bitis = timezone.now() + timedelta(seconds=pencere)
+    for sira, takip_idleri in enumerate(kimlikler.values()):
+        # Pencere dışına taşan (worker yetişemediği için bekleyen) işler yoğun saatte çalışmasın
+        kimlik_yenile.apply_async(args=[takip_idleri], countdown=(sira // parti) * aralik, expires=bitis)
+
+    logger.info(
+        f"Takip yenilemesi planlandı: {len(kimlikler)} kimlik, "
+        f"{(len(kimlikler) + parti - 1) // parti} parti ({aralik} sn arayla)"
+    )
+    return len(kimlikler)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=2, default_retry_delay=300)
+def kimlik_yenile(self, takip_idleri: List[int]) -> None:
+    """
+    Aynı TCKN/VKN'yi takip eden kayıtlar için tahsilat listesini DSİ'den yenile
+
+    Kayıtlar akış halinde TahsilatKaydi tablosuna yazılır; her takipçi için
+    bir TahsilatSorgu ve TahsilatOzeti oluşturulur.
+    """
+    takipler = list(
+        TakipEdilenKimlik.objects.filter(id__in=takip_idleri, aktif=True)
+        .select_related('kullanici').order_by('olusturma_tarihi', 'id')
+    )
+    gruplar: Dict[tuple, List[TakipEdilenKimlik]] = {}
+    for takip in takipler:
+        gruplar.setdefault((takip.kimlik_tipi, takip.kimlik_degeri), []).append(takip)
+    for (kimlik_tipi, kimlik_degeri), grup in gruplar.items():
+        _kimligi_yenile(self, kimlik_tipi, kimlik_degeri, grup)
+
+
+def _kimligi_yenile(task, kimlik_tipi: str, kimlik_degeri: str, takipler: List[TakipEdilenKimlik]) -> None:
+    kimlik = {'tckn': kimlik_degeri} if kimlik_tipi == 'TCKN' else {'vkn': kimlik_degeri}
+    # Yeni kayıtlar ilk takipçiye yazılır (mevcut kayıtların sahibi değişmez)
+    sahip = takipler[0].kullanici
+
+    try:
+        with oncelik(ARKA_PLAN):
+            success, akis, error_message = get_dsi_tahsilat_service().tahsilat_listele_akisi(**kimlik)
+        if success:
+            success, data, error_message = tahsilat_listesi_ice_aktar(
+                akis['parcalar'], sahip, kapat=akis['kapat'], kimlik=kimlik_hash(**kimlik), tam_liste=True
+            )
+    except Exception as e:
+        # Gövde okunurken bağlantı koparsa içe aktarma geri alınır
+        logger.exception(f"Takip edilen kimlik içe aktarma hatası: {e}")
+        success, error_message = False, f"Beklenmeyen hata: {str(e)}"
+
+    simdi = timezone.now()
+    takip_idleri = [takip.id for takip in takipler]
+    if not success:
+        TakipEdilenKimlik.objects.filter(id__in=takip_idleri).update(son_yenileme=simdi, son_hata=error_message)
+        logger.warning(f"Takip edilen kimlik yenilenemedi ({len(takipler)} takipçi): {error_message}")
+        if http_durumu(error_message) >= 500 and task.request.retries < task.max_retries:
+            # Devre açık veya kapasite doluyken (geçici hatalar zaten RetryPolicy ile denendi)
+            # bir süre sonra tekrar dene
+            raise task.retry()
+        return
+
+    with transaction.atomic():
+        for takip in takipler:
+            sorgu = TahsilatSorgu.objects.create(
+                kullanici=takip.kullanici,
+                sorgu_tipi=kimlik_tipi,
+                sorgu_degeri=kimlik_degeri,
+                basarili=True,
+                donen_kayit_sayisi=data['kayit_sayisi'],
+            )
+            TahsilatOzeti.objects.create(tahsilat_sorgu=sorgu, **data['ozet'].model_alanlari())
+            TakipEdilenKimlik.objects.filter(id=takip.id).update(
+                son_yenileme=simdi, son_basarili_yenileme=simdi, son_hata=None, son_sorgu=sorgu
+            )
+
+    fark = data['fark']
+    logger.info(
+        f"Takip edilen kimlik yenilendi: {data['kayit_sayisi']} kayıt ({len(fark.eklenen)} yeni, "
+        f"{len(fark.guncellenen)} güncellenen, {len(fark.pasiflestirilen)} pasifleştirilen), "
+        f"{len(takipler)} takipçi"
+    )
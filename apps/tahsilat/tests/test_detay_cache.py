@@ -0,0 +1,107 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.tahsilat.dsi_api_service import DSITahsilatAPIService
+from apps.tahsilat.kayitlar import TahsilatDetayi
+from apps.tahsilat.models import TahsilatKaydi
+
+TAHSILAT_ID = 1008400001
+URL = f'/api/v1/tahsilat/detay-getir/{TAHSILAT_ID}/'
+
+
+@override_settings(DSI_DETAY_YEREL_TTL=60)
+class DetayYerelTtlTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = get_user_model().objects.create_user(
+            email='detay@example.com', username='detay', password='x'
+        )
+        TahsilatKaydi.objects.create(
+            tahsilat_id=TAHSILAT_ID, kullanici=cls.kullanici, tahakkuk_no='T1', gelir_turu='Sulama',
+            borcun_konusu='Konu', cari_id=7, ana_para_borc=100, yapilan_toplam_tahsilat=0,
+            kalan_anapara_borc=100, harici_id=1
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.kullanici)
+        servis = mock.Mock()
+        servis.tahsilat_detay_getir.side_effect = lambda tahsilat_id: (
+            True, TahsilatDetayi.dsi(DSITahsilatAPIService.mock_tahsilat_detayi(None, tahsilat_id)), None
+        )
+        patcher = mock.patch('apps.tahsilat.detay_cache.get_dsi_tahsilat_service', return_value=servis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dsi = servis.tahsilat_detay_getir
+
+    def getir(self, **basliklar):
+        yanit = self.client.get(URL, **basliklar)
+        self.assertEqual(yanit.status_code, 200, yanit.content)
+        return yanit
+
+    def test_ikinci_istek_dsiye_gitmez(self):
+        ilk = self.getir()
+        ikinci = self.getir()
+        self.assertEqual(self.dsi.call_count, 1)
+        self.assertEqual(ikinci.json()['detay_bilgileri'], ilk.json()['detay_bilgileri'])
+        self.assertIn('Age', ikinci)
+
+    def test_onbellek_yoksa_yerel_satirlardan_sunulur(self):
+        ilk = self.getir()
+        cache.clear()
+        ikinci = self.getir()
+        self.assertEqual(self.dsi.call_count, 1)
+        self.assertEqual(ikinci.json()['detay_bilgileri'], ilk.json()['detay_bilgileri'])
+        self.assertTrue(TahsilatKaydi.objects.get(tahsilat_id=TAHSILAT_ID).taksitler.exists())
+
+    def test_ipucu_siniri_daraltir(self):
+        self.getir()
+        self.getir(HTTP_CACHE_CONTROL='no-cache')
+        self.getir(HTTP_CACHE_CONTROL='max-age=0')
+        self.assertEqual(self.dsi.call_count, 3)
+
+    def yaslandir(self, saniye):
+        """Önbelleği boşalt, yerel satırlardaki detayı saniye kadar eskit"""
+        cache.clear()
+        TahsilatKaydi.objects.filter(tahsilat_id=TAHSILAT_ID).update(
+            detay_zamani=timezone.now() - timedelta(seconds=saniye)
+        )
+
+    def test_ttl_asilinca_dsiye_gidilir(self):
+        self.getir()
+        self.yaslandir(61)
+        self.getir()
+        self.assertEqual(self.dsi.call_count, 2)
+
+    def test_ipucu_siniri_genisletir(self):
+        self.getir()
+        self.yaslandir(120)
+        yanit = self.getir(HTTP_CACHE_CONTROL='max-age=300')
+        self.assertEqual(self.dsi.call_count, 1)
+        self.assertGreaterEqual(int(yanit['Age']), 120)
+        self.getir(HTTP_CACHE_CONTROL='max-stale=30')
+        self.assertEqual(self.dsi.call_count, 2)
+
+    @override_settings(DSI_DETAY_YEREL_TTL=0)
+    def test_sifir_ttl_her_zaman_canli(self):
+        self.getir()
+        self.getir()
+        self.assertEqual(self.dsi.call_count, 2)
+
+    def test_azami_yas_parametresi_ve_age_basligi(self):
+        self.getir()
+        self.yaslandir(30)
+        yanit = self.getir()
+        self.assertGreaterEqual(int(yanit['Age']), 30)
+        self.client.get(URL, {'azami_yas': 10})
+        self.assertEqual(self.dsi.call_count, 2)
+        yanit = self.client.get(URL, {'azami_yas': 10})
+        self.assertEqual(self.dsi.call_count, 2)
+        self.assertLess(int(yanit['Age']), 10)
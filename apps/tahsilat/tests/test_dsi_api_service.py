@@ -0,0 +1,38 @@
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.tahsilat.dsi_api_service import DSITahsilatAPIService
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'dsi-servis-test'}},
+    DSI_API_RETRY_DENEME=3,
+)
+class YenidenDenemeTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        uyku = mock.patch('apps.core.retry.time.sleep')
+        uyku.start()
+        self.addCleanup(uyku.stop)
+        self.servis = DSITahsilatAPIService()
+
+    def cagir(self, endpoint, *sonuclar):
+        with mock.patch.object(DSITahsilatAPIService, '_deneme', side_effect=sonuclar) as deneme:
+            try:
+                self.servis._cagir(endpoint, 'DSİ API', json={})
+            except requests.exceptions.RequestException:
+                pass
+        return deneme.call_count
+
+    def test_odeme_hicbir_kosulda_tekrar_denenmez(self):
+        self.assertEqual(self.cagir('TahsilatOdemeYap', requests.exceptions.ConnectionError(), None), 1)
+        self.assertEqual(self.cagir('TahsilatOdemeYap', requests.exceptions.ReadTimeout(), None), 1)
+        yanit = mock.Mock(status_code=503, headers={})
+        self.assertEqual(self.cagir('TahsilatOdemeYap', yanit, None), 1)
+
+    def test_okumalar_gecici_hatada_tekrar_denenir(self):
+        hatalar = [requests.exceptions.ConnectionError()] * 3
+        self.assertEqual(self.cagir('VTahsilatDetayGetirEDevlet', *hatalar), 3)
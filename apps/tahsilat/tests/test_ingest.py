@@ -0,0 +1,160 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.tahsilat.ingest import kayitlari_yaz, partiyi_yaz
+from apps.tahsilat.kayitlar import TahsilatKalemi
+from apps.tahsilat.models import KimlikSenkronu, TahsilatKaydi
+
+KIMLIK = 'a' * 64
+
+
+def kalem(tahsilat_id, kalan=100.0, **alanlar):
+    return TahsilatKalemi.dsi({
+        'tahsilatId': tahsilat_id,
+        'tahakkukNo': f'T{tahsilat_id}',
+        'gelirTuru': 'Sulama',
+        'borcunKonusu': 'Konu',
+        'cariId': 7,
+        'anaParaBorc': 150.25,
+        'yapilanToplamTahsilat': 50.25,
+        'kalanAnaparaBorc': kalan,
+        'tahakkukDonemi': '2024-01-31T00:00:00',
+        'id': tahsilat_id * 10,
+        **alanlar,
+    })
+
+
+class IngestTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = get_user_model().objects.create_user(
+            email='ingest@example.com', username='ingest', password='x'
+        )
+
+    def setUp(self):
+        self.t0 = timezone.now()
+        self.items = [kalem(1), kalem(2), kalem(3)]
+        self.ilk = kayitlari_yaz(self.items, self.kullanici, kimlik=KIMLIK, tam_liste=True, zaman=self.t0)
+
+    def kayit(self, tahsilat_id):
+        return TahsilatKaydi.objects.get(tahsilat_id=tahsilat_id)
+
+
+class PartiyiYazTest(IngestTestCase):
+    def test_ilk_senkron_farki(self):
+        self.assertEqual(self.ilk.sozluk(), {'eklenen': [1, 2, 3], 'guncellenen': [], 'pasiflestirilen': [], 'degismeyen': 0})
+        self.assertEqual(self.kayit(1).kalan_anapara_borc, Decimal('100.00'))
+        self.assertEqual(KimlikSenkronu.objects.get(kimlik_hash=KIMLIK).liste_zamani, self.t0)
+
+    def test_degismeyen_parti_yazmaz(self):
+        # Yalnızca mevcut kayıtları okuyan tek SELECT
+        with self.assertNumQueries(1):
+            kayitlar = partiyi_yaz(self.items, self.kullanici, kimlik=KIMLIK, zaman=self.t0 + timedelta(seconds=1))
+        self.assertEqual([kayit.tahsilat_id for kayit in kayitlar], [1, 2, 3])
+
+    def test_degisen_kayit_yalnizca_degisen_alanlari_yazar(self):
+        onceki = self.kayit(2).son_guncelleme
+        with CaptureQueriesContext(connection) as sorgular:
+            fark = kayitlari_yaz([kalem(1), kalem(2, kalan=75.5), kalem(3)], self.kullanici, kimlik=KIMLIK,
+                                 tam_liste=True, zaman=self.t0 + timedelta(seconds=1))
+        self.assertEqual(fark.sozluk(), {'eklenen': [], 'guncellenen': [2], 'pasiflestirilen': [], 'degismeyen': 2})
+
+        guncellemeler = [sorgu['sql'] for sorgu in sorgular.captured_queries
+                         if sorgu['sql'].startswith('UPDATE "tahsilat_tahsilatkaydi"')]
+        self.assertEqual(len(guncellemeler), 1)
+        sql = guncellemeler[0].split(' WHERE ')[0]
+        for alan in ('kalan_anapara_borc', 'icerik_hash', 'son_guncelleme'):
+            self.assertIn(f'"{alan}"', sql)
+        for alan in ('ana_para_borc', 'tahakkuk_no', 'borcun_konusu', 'kimlik_hash', 'aktif'):
+            self.assertNotIn(f'"{alan}" =', sql)
+
+        kayit = self.kayit(2)
+        self.assertEqual(kayit.kalan_anapara_borc, Decimal('75.50'))
+        self.assertGreater(kayit.son_guncelleme, onceki)
+
+    def test_kaybolan_kayit_pasiflesir_ve_geri_doner(self):
+        fark = kayitlari_yaz(self.items[:2], self.kullanici, kimlik=KIMLIK, tam_liste=True,
+                             zaman=self.t0 + timedelta(seconds=1))
+        self.assertEqual(fark.sozluk(), {'eklenen': [], 'guncellenen': [], 'pasiflestirilen': [3], 'degismeyen': 2})
+        self.assertFalse(self.kayit(3).aktif)
+
+        fark = kayitlari_yaz(self.items, self.kullanici, kimlik=KIMLIK, tam_liste=True,
+                             zaman=self.t0 + timedelta(seconds=2))
+        self.assertEqual(fark.guncellenen, [3])
+        self.assertTrue(self.kayit(3).aktif)
+
+    def test_filtreli_liste_pasiflestirmez(self):
+        fark = kayitlari_yaz(self.items[:1], self.kullanici, kimlik=KIMLIK, zaman=self.t0 + timedelta(seconds=1))
+        self.assertEqual(fark.pasiflestirilen, [])
+        self.assertEqual(TahsilatKaydi.objects.filter(aktif=True).count(), 3)
+
+
+class EskiListeTest(IngestTestCase):
+    def setUp(self):
+        super().setUp()
+        # Daha yeni liste: 2 değişti, 3 kayboldu
+        kayitlari_yaz([kalem(1), kalem(2, kalan=10.0)], self.kullanici, kimlik=KIMLIK, tam_liste=True,
+                      zaman=self.t0 + timedelta(seconds=10))
+
+    def test_eski_liste_yeni_listeyi_ezmez(self):
+        # Önbellekten sunulan, daha önce alınmış liste
+        with CaptureQueriesContext(connection) as sorgular:
+            fark = kayitlari_yaz(self.items + [kalem(4)], self.kullanici, kimlik=KIMLIK, tam_liste=True,
+                                 zaman=self.t0 + timedelta(seconds=5))
+        self.assertEqual(fark.sozluk(), {'eklenen': [4], 'guncellenen': [], 'pasiflestirilen': [], 'degismeyen': 3})
+        self.assertFalse(any(sorgu['sql'].startswith('UPDATE') for sorgu in sorgular.captured_queries))
+
+        self.assertEqual(self.kayit(2).kalan_anapara_borc, Decimal('10.00'))
+        self.assertFalse(self.kayit(3).aktif)
+        self.assertEqual(KimlikSenkronu.objects.get(kimlik_hash=KIMLIK).liste_zamani, self.t0 + timedelta(seconds=10))
+
+    def test_eski_liste_pasiflestirmez(self):
+        kayitlari_yaz([kalem(2, kalan=10.0)], self.kullanici, kimlik=KIMLIK, tam_liste=True,
+                      zaman=self.t0 + timedelta(seconds=5))
+        self.assertTrue(self.kayit(1).aktif)
+
+    def test_eszamanli_eklenen_yeni_kayit_ezilmez(self):
+        # Başka bir kimliğin daha yeni senkronu, kayıt okunduktan sonra aynı kaydı ekler
+        diger = 'b' * 64
+        KimlikSenkronu.objects.create(kimlik_hash=diger, liste_zamani=self.t0 + timedelta(seconds=20))
+        bulk_create = TahsilatKaydi.objects.bulk_create
+
+        def araya_gir(kayitlar, **kwargs):
+            bulk_create([TahsilatKaydi(
+                tahsilat_id=5, kullanici=self.kullanici, tahakkuk_no='T5', gelir_turu='Sulama',
+                borcun_konusu='Konu', cari_id=7, ana_para_borc=1, yapilan_toplam_tahsilat=1,
+                kalan_anapara_borc=1, harici_id=50, icerik_hash='yeni', kimlik_hash=diger
+            )])
+            return bulk_create(kayitlar, **kwargs)
+
+        with mock.patch.object(TahsilatKaydi.objects, 'bulk_create', side_effect=araya_gir):
+            fark = kayitlari_yaz([kalem(5, kalan=99.0), kalem(6)], self.kullanici, kimlik=KIMLIK, zaman=self.t0 + timedelta(seconds=15))
+        self.assertEqual(fark.sozluk(), {'eklenen': [6], 'guncellenen': [], 'pasiflestirilen': [], 'degismeyen': 1})
+        self.assertEqual(self.kayit(5).kalan_anapara_borc, Decimal('1.00'))
+        self.assertEqual(self.kayit(5).kimlik_hash, diger)
+
+    def test_eszamanli_eklenen_eski_kayit_guncellenir(self):
+        bulk_create = TahsilatKaydi.objects.bulk_create
+
+        def araya_gir(kayitlar, **kwargs):
+            bulk_create([TahsilatKaydi(
+                tahsilat_id=5, kullanici=self.kullanici, tahakkuk_no='T5', gelir_turu='Sulama',
+                borcun_konusu='Konu', cari_id=7, ana_para_borc=1, yapilan_toplam_tahsilat=1,
+                kalan_anapara_borc=1, harici_id=50, icerik_hash='eski', kimlik_hash=''
+            )])
+            return bulk_create(kayitlar, **kwargs)
+
+        with mock.patch.object(TahsilatKaydi.objects, 'bulk_create', side_effect=araya_gir):
+            fark = kayitlari_yaz([kalem(5, kalan=99.0)], self.kullanici, kimlik=KIMLIK, zaman=self.t0 + timedelta(seconds=15))
+        self.assertEqual(fark.guncellenen, [5])
+        kayit = self.kayit(5)
+        self.assertEqual((kayit.kalan_anapara_borc, kayit.ana_para_borc), (Decimal('99.00'), Decimal('150.25')))
+        self.assertEqual(kayit.kimlik_hash, KIMLIK)
+
@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.core.upstream_errors import IMLEC_GECERSIZ, SONUC_SURESI_DOLDU
+from apps.tahsilat.models import TahsilatKaydi, TahsilatSorgu
+from apps.tahsilat.sayfalama import SorguSayfalari
+
+URL = '/api/v1/tahsilat/sorgu/sayfa/'
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sayfa-test'}},
+    TAHSILAT_SAYFA_MAKS_BOYUTU=3,
+)
+class SayfalamaTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        kullanicilar = get_user_model().objects
+        cls.kullanici = kullanicilar.create_user(email='sayfa@example.com', username='sayfa', password='x')
+        cls.diger = kullanicilar.create_user(email='diger@example.com', username='diger', password='x')
+        cls.sorgu = TahsilatSorgu.objects.create(kullanici=cls.kullanici, sorgu_tipi='TCKN', sorgu_degeri='1')
+        # DSİ'nin döndürdüğü sıra pk sırasından farklı
+        cls.kayit_idleri = [
+            TahsilatKaydi.objects.create(
+                tahsilat_id=tahsilat_id, kullanici=cls.kullanici, tahakkuk_no=f'T{tahsilat_id}',
+                gelir_turu='Sulama', borcun_konusu='Konu', cari_id=7, ana_para_borc=100,
+                yapilan_toplam_tahsilat=0, kalan_anapara_borc=100, harici_id=tahsilat_id
+            ).pk
+            for tahsilat_id in range(1, 6)
+        ][::-1]
+
+    def setUp(self):
+        cache.clear()
+        self.sayfalar = SorguSayfalari()
+
+    def tahsilat_idleri(self, sayfa):
+        return [kayit['tahsilat_id'] for kayit in sayfa['tahsilat_kayitlari']]
+
+
+class SayfaSinirlariTest(SayfalamaTestCase):
+    def test_sayfalar_sirayla_gezilir(self):
+        sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri, 2)
+        sayfalar = [self.tahsilat_idleri(sayfa)]
+        while sayfa['sonraki_imlec']:
+            basarili, sayfa, hata = self.sayfalar.imlecten(sayfa['sonraki_imlec'], self.kullanici)
+            self.assertTrue(basarili, hata)
+            self.assertEqual(sayfa['toplam_kayit'], 5)
+            sayfalar.append(self.tahsilat_idleri(sayfa))
+        self.assertEqual(sayfalar, [[5, 4], [3, 2], [1]])
+
+    def test_tam_bolunen_sonucun_son_sayfasinda_imlec_yok(self):
+        sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri[:4], 2)
+        basarili, sayfa, _ = self.sayfalar.imlecten(sayfa['sonraki_imlec'], self.kullanici)
+        self.assertTrue(basarili)
+        self.assertEqual(self.tahsilat_idleri(sayfa), [3, 2])
+        self.assertIsNone(sayfa['sonraki_imlec'])
+
+    def test_tek_sayfalik_sonuc_saklanmaz(self):
+        sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri[:2], 2)
+        self.assertIsNone(sayfa['sonraki_imlec'])
+        self.assertIsNone(cache.get(self.sayfalar._anahtar(self.sorgu.id)))
+
+    def test_sayfa_boyutu_degistirilebilir_ve_sinirlanir(self):
+        sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri, 1)
+        _, sayfa, _ = self.sayfalar.imlecten(sayfa['sonraki_imlec'], self.kullanici, 50)
+        self.assertEqual(self.tahsilat_idleri(sayfa), [4, 3, 2])
+        self.assertEqual(sayfa['sayfa_boyutu'], 3)
+
+    def test_silinen_satirlar_atlanir(self):
+        sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri, 2)
+        TahsilatKaydi.objects.filter(tahsilat_id=3).delete()
+        _, sayfa, _ = self.sayfalar.imlecten(sayfa['sonraki_imlec'], self.kullanici)
+        self.assertEqual(self.tahsilat_idleri(sayfa), [2])
+        self.assertIsNotNone(sayfa['sonraki_imlec'])
+
+    def test_saklanamayan_sonucun_tamami_doner(self):
+        with mock.patch('apps.tahsilat.sayfalama.cache.set', side_effect=ConnectionError('redis yok')):
+            sayfa = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri, 2)
+        self.assertEqual(self.tahsilat_idleri(sayfa), [5, 4, 3, 2, 1])
+        self.assertIsNone(sayfa['sonraki_imlec'])
+
+
+class ImlecDogrulamaTest(SayfalamaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.imlec = self.sayfalar.ilk_sayfa(self.sorgu, self.kayit_idleri, 2)['sonraki_imlec']
+
+    def assertHata(self, imlec, kod, kullanici=None):
+        basarili, sayfa, hata = self.sayfalar.imlecten(imlec, kullanici or self.kullanici)
+        self.assertFalse(basarili)
+        self.assertIsNone(sayfa)
+        self.assertTrue(hata.startswith(f'[{kod}]'), hata)
+
+    def test_degistirilmis_imlec_reddedilir(self):
+        veri, imza = self.imlec.rsplit(':', 1)
+        sahte = signing.dumps([self.sorgu.id, 0, 200], salt='tahsilat.sorgu.sayfa').rsplit(':', 1)[0]
+        self.assertHata(f'{sahte}:{imza}', IMLEC_GECERSIZ)
+        self.assertHata(f'{veri}:{imza[:-1]}x', IMLEC_GECERSIZ)
+        self.assertHata('imlec', IMLEC_GECERSIZ)
+        self.assertHata(signing.dumps([self.sorgu.id, 2, 2]), IMLEC_GECERSIZ)
+
+    def test_baska_kullanicinin_imleci_reddedilir(self):
+        self.assertHata(self.imlec, IMLEC_GECERSIZ, self.diger)
+
+    def test_suresi_dolan_sonuc(self):
+        cache.delete(self.sayfalar._anahtar(self.sorgu.id))
+        self.assertHata(self.imlec, SONUC_SURESI_DOLDU)
+
+    def test_uc_nokta_hata_durumlari(self):
+        istemci = APIClient()
+        istemci.force_authenticate(self.diger)
+        self.assertEqual(istemci.get(URL, {'imlec': self.imlec}).status_code, 400)
+
+        istemci.force_authenticate(self.kullanici)
+        yanit = istemci.get(URL, {'imlec': self.imlec})
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(yanit.data['toplam_kayit'], 5)
+
+        cache.clear()
+        yanit = istemci.get(URL, {'imlec': self.imlec})
+        self.assertEqual(yanit.status_code, 410)
+        self.assertTrue(yanit.data['hata'].startswith(f'[{SONUC_SURESI_DOLDU}]'))
@@ -1,15 +1,35 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if getattr(settings, 'ASGI_PROFILE', False):
+    # ASGI profilinde DSİ'ye giden view'ların asenkron sürümleri kullanılır
+    from . import async_views
+    sorgu_view = async_views.tahsilat_sorgu_async_view
+    detay_getir_view = async_views.tahsilat_detay_getir_async_view
+    detay_toplu_view = async_views.tahsilat_detay_toplu_async_view
+    belge_getir_view = async_views.tahsilat_belge_getir_async_view
+else:
+    sorgu_view = views.TahsilatSorguView.as_view()
+    detay_getir_view = views.tahsilat_detay_getir_view
+    detay_toplu_view = views.tahsilat_detay_toplu_view
+    belge_getir_view = views.tahsilat_belge_getir_view
+
 urlpatterns = [
     # Tahsilat sorgu ve listeleme
-    path('sorgu/', views.TahsilatSorguView.as_view(), name='tahsilat_sorgu'),
+    path('sorgu/', sorgu_view, name='tahsilat_sorgu'),
+    path('sorgu/sayfa/', views.tahsilat_sorgu_sayfa_view, name='tahsilat_sorgu_sayfa'),
     path('liste/', views.TahsilatListeView.as_view(), name='tahsilat_liste'),
     path('detay/<int:pk>/', views.TahsilatDetayView.as_view(), name='tahsilat_detay'),
-    path('detay-getir/<int:tahsilat_id>/', views.tahsilat_detay_getir_view, name='tahsilat_detay_getir'),
-    path('belge-getir/<int:tahsilat_id>/', views.tahsilat_belge_getir_view, name='tahsilat_belge_getir'),
+    path('detay-getir/<int:tahsilat_id>/', detay_getir_view, name='tahsilat_detay_getir'),
+    path('detay-toplu/', detay_toplu_view, name='tahsilat_detay_toplu'),
+    path('belge-getir/<int:tahsilat_id>/', belge_getir_view, name='tahsilat_belge_getir'),
     path('sorgu-gecmisi/', views.TahsilatSorguGecmisiView.as_view(), name='tahsilat_sorgu_gecmisi'),
     
+    # Arka planda yenilenen takip listesi
+    path('takip/', views.TakipEdilenKimlikListeView.as_view(), name='tahsilat_takip_liste'),
+    path('takip/<int:pk>/', views.TakipEdilenKimlikDetayView.as_view(), name='tahsilat_takip_detay'),
+    
     # İstatistikler ve işlemler
     path('istatistikler/', views.tahsilat_istatistikleri_view, name='tahsilat_istatistikleri'),
     path('yenile/<int:tahsilat_id>/', views.tahsilat_yenile_view, name='tahsilat_yenile'),
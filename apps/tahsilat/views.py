@@ -2,15 +2,27 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction, models
 from django.shortcuts import get_object_or_404
-from .models import TahsilatKaydi, TahsilatSorgu, TahsilatOzeti
+from .models import TahsilatKaydi, TahsilatSorgu, TakipEdilenKimlik
 from .serializers import (
-    TahsilatKaydiSerializer, TahsilatSorguSerializer, TahsilatOzetiSerializer,
-    TahsilatSorguRequestSerializer, TahsilatDetaySerializer
+    TahsilatSorguSerializer,
+    TahsilatSorguRequestSerializer, TahsilatDetaySerializer, TahsilatDetayTopluRequestSerializer,
+    TahsilatSorguSayfaRequestSerializer, TakipEdilenKimlikSerializer
 )
-from .dsi_api_service import DSITahsilatAPIService
+from .dsi_api_service import get_dsi_tahsilat_service
+from .cache import tahsilat_liste_onbellegi
+from .belge_cache import belge_onbellegi
+from .detay_cache import tahsilat_detay_onbellegi
+from .sayfalama import sorgu_sayfalari
+from .sorgu_islemi import SorguIslemi
+from apps.core.concurrency_limiter import ETKILESIMLI, oncelik
+from apps.core.single_flight import single_flight
+from apps.core.tazelik import TazelikIstegi, yas_ekle
+from apps.core.upstream_errors import http_durumu
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,129 +39,44 @@ class TahsilatSorguView(generics.CreateAPIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        validated_data = serializer.validated_data
-        
-        # Sorgu kaydını oluştur
-        sorgu = TahsilatSorgu.objects.create(
-            kullanici=request.user,
-            sorgu_tipi='TCKN' if validated_data.get('tckn') else 'VKN',
-            sorgu_degeri=validated_data.get('tckn') or validated_data.get('vkn'),
-            baslangic_tarihi=validated_data.get('baslangic_tarihi'),
-            bitis_tarihi=validated_data.get('bitis_tarihi'),
-            sadece_odenmemis=validated_data.get('sadece_odenmemis', False)
-        )
-        
+        islem = SorguIslemi(request.user, serializer.validated_data, TazelikIstegi.istekten(request))
         try:
-            # DSİ API'yi çağır
-            dsi_service = DSITahsilatAPIService()
-            success, data, error_message = dsi_service.tahsilat_listele(
-                tckn=validated_data.get('tckn'),
-                vkn=validated_data.get('vkn'),
-                baslangic_tarihi=validated_data.get('baslangic_tarihi'),
-                bitis_tarihi=validated_data.get('bitis_tarihi'),
-                sadece_odenmemis=validated_data.get('sadece_odenmemis', False)
-            )
+            def getir_ve_kaydet():
+                # DSİ API'yi çağır (önbellek üzerinden) ve kayıtları yaz
+                return islem.kaydet(tahsilat_liste_onbellegi.tahsilat_listele(
+                    **islem.parametreler, tazelik=islem.tazelik
+                ))
             
-            if success and data:
-                # Başarılı sorgu
-                sorgu.basarili = True
-                sorgu.donen_kayit_sayisi = len(data.get('tahsilatListe', []))
-                sorgu.save()
-                
-                # Tahsilat kayıtlarını kaydet
-                tahsilat_kayitlari = self._kayitlari_kaydet(data.get('tahsilatListe', []), request.user, sorgu)
-                
-                # Özet bilgilerini kaydet
-                ozet = self._ozet_kaydet(data, sorgu)
-                
-                return Response({
-                    'sorgu_id': sorgu.id,
-                    'basarili': True,
-                    'tahsilat_kayitlari': TahsilatKaydiSerializer(tahsilat_kayitlari, many=True).data,
-                    'ozet': TahsilatOzetiSerializer(ozet).data if ozet else None,
-                    'mesaj': f"{sorgu.donen_kayit_sayisi} adet tahsilat kaydı bulundu"
-                }, status=status.HTTP_200_OK)
-            else:
-                # Hatalı sorgu
-                sorgu.basarili = False
-                sorgu.hata_mesaji = error_message or "Bilinmeyen hata"
-                sorgu.save()
-                
-                return Response({
-                    'sorgu_id': sorgu.id,
-                    'basarili': False,
-                    'hata': error_message or "Bilinmeyen hata"
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
+            # Aynı sorgu için eşzamanlı istekleri tüm worker'lar arasında birleştir;
+            # kullanıcı beklediği için DSİ kapasitesinde arka plan işlerinden önceliklidir
+            with oncelik(ETKILESIMLI):
+                sonuc, lider = single_flight(
+                    islem.tek_ucus_anahtari, getir_ve_kaydet, **islem.tek_ucus_ayarlari()
+                )
+            govde, durum, yas = islem.yanit(sonuc, lider)
         except Exception as e:
-            logger.error(f"Tahsilat sorgu hatası: {str(e)}")
-            sorgu.basarili = False
-            sorgu.hata_mesaji = str(e)
-            sorgu.save()
-            
-            return Response({
-                'sorgu_id': sorgu.id,
-                'basarili': False,
-                'hata': f"Beklenmeyen hata: {str(e)}"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    def _kayitlari_kaydet(self, tahsilat_listesi, kullanici, sorgu):
-        """Tahsilat kayıtlarını veritabanına kaydet"""
-        kayitlar = []
+            govde, durum, yas = islem.hata(e)
         
-        for item in tahsilat_listesi:
-            # Mevcut kaydı kontrol et
-            tahsilat_kaydi, created = TahsilatKaydi.objects.get_or_create(
-                tahsilat_id=item['tahsilatId'],
-                defaults={
-                    'tahakkuk_no': item['tahakkukNo'],
-                    'gelir_turu': item['gelirTuru'],
-                    'borcun_konusu': item['borcunKonusu'],
-                    'cari_id': item['cariId'],
-                    'ana_para_borc': item['anaParaBorc'],
-                    'yapilan_toplam_tahsilat': item['yapilanToplamTahsilat'],
-                    'kalan_anapara_borc': item['kalanAnaparaBorc'],
-                    'tahakkuk_donemi': item['tahakkukDonemi'],
-                    'harici_id': item['id'],
-                    'kullanici': kullanici
-                }
-            )
-            
-            # Kayıt güncellenmişse güncelle
-            if not created:
-                tahsilat_kaydi.tahakkuk_no = item['tahakkukNo']
-                tahsilat_kaydi.gelir_turu = item['gelirTuru']
-                tahsilat_kaydi.borcun_konusu = item['borcunKonusu']
-                tahsilat_kaydi.cari_id = item['cariId']
-                tahsilat_kaydi.ana_para_borc = item['anaParaBorc']
-                tahsilat_kaydi.yapilan_toplam_tahsilat = item['yapilanToplamTahsilat']
-                tahsilat_kaydi.kalan_anapara_borc = item['kalanAnaparaBorc']
-                tahsilat_kaydi.tahakkuk_donemi = item['tahakkukDonemi']
-                tahsilat_kaydi.harici_id = item['id']
-                tahsilat_kaydi.aktif = True
-                tahsilat_kaydi.save()
-            
-            kayitlar.append(tahsilat_kaydi)
-        
-        return kayitlar
+        return yas_ekle(Response(govde, status=durum), yas)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tahsilat_sorgu_sayfa_view(request):
+    """Sorgu sonucunun imleçle gösterilen sonraki sayfasını getir"""
+    serializer = TahsilatSorguSayfaRequestSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
     
-    def _ozet_kaydet(self, data, sorgu):
-        """Özet bilgilerini kaydet"""
-        try:
-            ozet, created = TahsilatOzeti.objects.get_or_create(
-                tahsilat_sorgu=sorgu,
-                defaults={
-                    'ana_para_borc': data.get('anaParaBorc', 0),
-                    'yapilan_toplam_tahsilat': data.get('yapilanToplamTahsilat', 0),
-                    'toplam_kalan_anapara_borc': data.get('toplamKalanAnaparaBorc', 0),
-                    'sonuc_kodu': data.get('sonucBilgisi', {}).get('sonucKodu', ''),
-                    'sonuc_aciklamasi': data.get('sonucBilgisi', {}).get('sonucAciklamasi', '')
-                }
-            )
-            return ozet
-        except Exception as e:
-            logger.error(f"Özet kaydetme hatası: {str(e)}")
-            return None
+    success, sayfa, error_message = sorgu_sayfalari.imlecten(
+        serializer.validated_data['imlec'], request.user, serializer.validated_data.get('sayfa_boyutu')
+    )
+    if not success:
+        return Response({
+            'basarili': False,
+            'hata': error_message
+        }, status=http_durumu(error_message))
+    
+    return Response({'basarili': True, **sayfa}, status=status.HTTP_200_OK)
 
 
 class TahsilatListeView(generics.ListAPIView):
@@ -190,6 +117,33 @@ class TahsilatSorguGecmisiView(generics.ListAPIView):
         ).order_by('-sorgu_tarihi')
 
 
+class TakipEdilenKimlikListeView(generics.ListCreateAPIView):
+    """Takip edilen TCKN/VKN listesi ve yeni kimlik ekleme"""
+    serializer_class = TakipEdilenKimlikSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Kullanıcının takip ettiği kimlikleri getir"""
+        return TakipEdilenKimlik.objects.filter(
+            kullanici=self.request.user
+        ).select_related('son_sorgu__ozet')
+    
+    def perform_create(self, serializer):
+        serializer.save(kullanici=self.request.user)
+
+
+class TakipEdilenKimlikDetayView(generics.RetrieveUpdateDestroyAPIView):
+    """Takip edilen kimlik detayı, güncelleme ve takipten çıkarma"""
+    serializer_class = TakipEdilenKimlikSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Kullanıcının takip ettiği kimlikleri getir"""
+        return TakipEdilenKimlik.objects.filter(
+            kullanici=self.request.user
+        ).select_related('son_sorgu__ozet')
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def tahsilat_istatistikleri_view(request):
@@ -259,25 +213,26 @@ def tahsilat_detay_getir_view(request, tahsilat_id):
         # Önce yerel veritabanından tahsilat kaydını kontrol et
         tahsilat_kaydi = get_object_or_404(TahsilatKaydi, tahsilat_id=tahsilat_id, kullanici=request.user)
         
-        # DSİ API'den detay bilgilerini çek
-        dsi_service = DSITahsilatAPIService()
-        success, data, error_message = dsi_service.tahsilat_detay_getir(tahsilat_id)
+        # Kabul edilen yaştaysa önbellekten / yerel satırlardan, değilse DSİ API'den detay bilgilerini çek
+        success, data, error_message = tahsilat_detay_onbellegi.tahsilat_detay_getir(
+            tahsilat_id, TazelikIstegi.istekten(request)
+        )
         
         if not success:
             return Response({
                 'success': False,
                 'error': f'DSİ API hatası: {error_message}'
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=http_durumu(error_message))
         
         # Yerel kayıt bilgilerini de ekle
         tahsilat_serializer = TahsilatDetaySerializer(tahsilat_kaydi)
         
-        return Response({
+        return yas_ekle(Response({
             'success': True,
             'tahsilat_kaydi': tahsilat_serializer.data,
-            'detay_bilgileri': data,
+            'detay_bilgileri': data.sozluk(),
             'message': 'Tahsilat detay bilgileri başarıyla getirildi'
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK), data.yas())
         
     except TahsilatKaydi.DoesNotExist:
         return Response({
@@ -292,31 +247,104 @@ def tahsilat_detay_getir_view(request, tahsilat_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _en_eski_yas(detaylar):
+    """Toplu yanıttaki en eski detayın yaşı (Age başlığı için)"""
+    return max((data.yas() for success, data, _ in detaylar.values() if success and data is not None), default=None)
+
+
+def _toplu_detay_sonuclari(tahsilat_idleri, kayitlar, detaylar):
+    """Toplu detay yanıtındaki kayıt bazlı sonuçları oluştur"""
+    sonuclar = []
+    for tahsilat_id in tahsilat_idleri:
+        tahsilat_kaydi = kayitlar.get(tahsilat_id)
+        if tahsilat_kaydi is None:
+            sonuclar.append({
+                'tahsilat_id': tahsilat_id,
+                'success': False,
+                'error': 'Tahsilat kaydı bulunamadı'
+            })
+            continue
+        
+        success, data, error_message = detaylar[tahsilat_id]
+        if success:
+            sonuclar.append({
+                'tahsilat_id': tahsilat_id,
+                'success': True,
+                'tahsilat_kaydi': TahsilatDetaySerializer(tahsilat_kaydi).data,
+                'detay_bilgileri': data.sozluk()
+            })
+        else:
+            sonuclar.append({
+                'tahsilat_id': tahsilat_id,
+                'success': False,
+                'error': f'DSİ API hatası: {error_message}'
+            })
+    
+    basarili = sum(1 for sonuc in sonuclar if sonuc['success'])
+    return {
+        'success': basarili > 0,
+        'sonuclar': sonuclar,
+        'message': f'{basarili}/{len(sonuclar)} tahsilat detayı getirildi'
+    }
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tahsilat_detay_toplu_view(request):
+    """Birden fazla tahsilatın detay bilgilerini eşzamanlı getir"""
+    serializer = TahsilatDetayTopluRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    tahsilat_idleri = list(dict.fromkeys(serializer.validated_data['tahsilat_idleri']))
+    
+    try:
+        # Sahiplik kontrolü tek sorguda
+        kayitlar = TahsilatKaydi.objects.filter(
+            kullanici=request.user
+        ).select_related('kullanici').in_bulk(tahsilat_idleri, field_name='tahsilat_id')
+        
+        detaylar = tahsilat_detay_onbellegi.tahsilat_detaylari_getir([
+            tahsilat_id for tahsilat_id in tahsilat_idleri if tahsilat_id in kayitlar
+        ], TazelikIstegi.istekten(request))
+        
+        return yas_ekle(Response(
+            _toplu_detay_sonuclari(tahsilat_idleri, kayitlar, detaylar),
+            status=status.HTTP_200_OK
+        ), _en_eski_yas(detaylar))
+        
+    except Exception as e:
+        logger.error(f"Toplu tahsilat detay getirme hatası: {str(e)}")
+        return Response({
+            'success': False,
+            'error': f'Beklenmeyen hata: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([])
 def tahsilat_belge_getir_view(request, tahsilat_id):
     """Tahsilat detay belgesini PDF olarak getir (public endpoint - authentication gerektirmez)"""
     try:
-        import base64
-        from django.http import HttpResponse
+        # Önbellekte varsa upstream'e gitmeden dosyadan sun (ETag eşleşirse 304)
+        onbellek_yaniti = belge_onbellegi.yanit(request, tahsilat_id)
+        if onbellek_yaniti is not None:
+            return onbellek_yaniti
         
-        # DSİ API'den belge bilgilerini çek (kullanıcı kontrolü yok)
-        dsi_service = DSITahsilatAPIService()
-        success, data, error_message = dsi_service.tahsilat_belge_getir(tahsilat_id)
+        # DSİ API'den belgeyi akış halinde çek (kullanıcı kontrolü yok)
+        dsi_service = get_dsi_tahsilat_service()
+        success, data, error_message = dsi_service.tahsilat_belge_akisi(tahsilat_id)
         
         if not success:
             return Response({
                 'success': False,
                 'error': f'DSİ API hatası: {error_message}'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Base64'ü decode et
-        pdf_content = base64.b64decode(data.get('belge', ''))
+            }, status=http_durumu(error_message))
         
-        # PDF response oluştur
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{data.get("belgeAdi", f"tahsilat_{tahsilat_id}.pdf")}"'
-        response['Content-Length'] = len(pdf_content)
+        # PDF baytları base64 çözüldükçe istemciye aktarılır ve önbelleğe yazılır
+        response = StreamingHttpResponse(
+            belge_onbellegi.kaydederek(tahsilat_id, data['belgeAdi'], data['icerik']),
+            content_type='application/pdf'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{data["belgeAdi"]}"'
         
         return response
         
@@ -328,6 +356,10 @@ def tahsilat_belge_getir_view(request, tahsilat_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Public belge bağlantıları mobil uygulama dışında da (tarayıcı) açıldığından süre sınırı daha uzundur
+tahsilat_belge_getir_view.sure_butcesi = getattr(settings, 'BELGE_SURE_BUTCESI', 30)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def tahsilat_yenile_view(request, tahsilat_id):
@@ -339,15 +371,16 @@ def tahsilat_yenile_view(request, tahsilat_id):
             aktif=True
         )
         
-        # DSİ API'den güncel veriyi al
-        dsi_service = DSITahsilatAPIService()
-        success, data, error_message = dsi_service.tahsilat_detay_getir(tahsilat_kaydi.tahsilat_id)
+        # DSİ API'den güncel veriyi al (yenileme her zaman canlıdır; sonuç detay önbelleğine de yazılır)
+        success, data, error_message = tahsilat_detay_onbellegi.tahsilat_detay_getir(
+            tahsilat_kaydi.tahsilat_id, TazelikIstegi(max_age=0)
+        )
         
         if success and data:
             # Kaydı güncelle
-            tahsilat_kaydi.ana_para_borc = data.get('anaParaBorc', tahsilat_kaydi.ana_para_borc)
-            tahsilat_kaydi.yapilan_toplam_tahsilat = data.get('yapilanToplamTahsilat', tahsilat_kaydi.yapilan_toplam_tahsilat)
-            tahsilat_kaydi.kalan_anapara_borc = data.get('kalanAnaparaBorc', tahsilat_kaydi.kalan_anapara_borc)
+            for alan in ('ana_para_borc', 'yapilan_toplam_tahsilat', 'kalan_anapara_borc'):
+                if getattr(data, alan) is not None:
+                    setattr(tahsilat_kaydi, alan, getattr(data, alan))
             tahsilat_kaydi.save()
             
             return Response({
@@ -359,7 +392,7 @@ def tahsilat_yenile_view(request, tahsilat_id):
             return Response({
                 'basarili': False,
                 'hata': error_message or "Güncelleme başarısız"
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=http_durumu(error_message))
             
     except TahsilatKaydi.DoesNotExist:
         return Response({
@@ -0,0 +1,162 @@
+"""
+Tahsilat detaylarının (taksitler ve ödeme geçmişi) yerel kopyası
+
+DSİ'den başarıyla alınan her detay TahsilatKaydi'ye bağlı TahsilatTaksit ve
+TahsilatOdeme satırlarına toplu yazılır; liste dışındaki detay alanları
+TahsilatKaydi.detay_alanlari'nda, alınma anı detay_zamani'nda tutulur. İçerik
+özeti (detay_hash) değişmediyse satırlara dokunulmaz, yalnızca detay_zamani
+ilerletilir.
+
+İstemcinin kabul ettiği yaşı aşmayan detaylar satırlardan yeniden kurulur:
+kayıtlar tahsilat_id ile, taksit ve ödemeler (tahsilat_kaydi, sira) tekil
+indeksiyle tek sorguda okunur. Tarih ve tutarlar DSİ'nin biçimine (saat
+dilimsiz ISO metni, sayı) geri çevrilir.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .ingest import _tarih, icerik_hash, parti_boyutu
+from .kayitlar import OdemeKalemi, TahsilatDetayi, TaksitKalemi
+from .models import TahsilatKaydi, TahsilatOdeme, TahsilatTaksit
+
+
+class KalemTablosu(NamedTuple):
+    """Detaydaki bir kalem listesinin saklandığı tablo"""
+    nitelik: str     # TahsilatDetayi niteliği
+    iliski: str      # TahsilatKaydi üzerindeki related_name
+    sayac: str       # Kalem sayısının tutulduğu TahsilatKaydi alanı (liste gelmediyse boş)
+    tip: type        # Kayıt tipi; nitelikleri model alanlarıyla aynı adlı
+    model: type
+    tarihler: Tuple[str, ...]
+    tutarlar: Tuple[str, ...]
+
+
+KALEMLER = (
+    KalemTablosu('taksitler', 'taksitler', 'taksit_sayisi', TaksitKalemi, TahsilatTaksit,
+                 ('vade_tarihi', 'odeme_tarihi'), ('taksit_tutari',)),
+    KalemTablosu('odeme_gecmisi', 'odemeler', 'odeme_sayisi', OdemeKalemi, TahsilatOdeme,
+                 ('odeme_tarihi',), ('odeme_tutari',)),
+)
+
+DETAY_ALANLARI = ['detay_zamani', 'detay_hash', 'detay_alanlari'] + [tablo.sayac for tablo in KALEMLER]
+
+
+def detay_hash(detay: TahsilatDetayi) -> str:
+    """Detayın saklanan değerlerinin özeti (değişiklik tespiti için)"""
+    return icerik_hash((detay.ust_alanlar(),) + tuple(
+        None if kalemler is None else [kalem.degerler() for kalem in kalemler]
+        for kalemler in (getattr(detay, tablo.nitelik) for tablo in KALEMLER)
+    ))
+
+
+def _dsi_tarihi(tarih: Optional[datetime]) -> Optional[str]:
+    if tarih is None:
+        return None
+    if timezone.is_aware(tarih):
+        tarih = timezone.localtime(tarih).replace(tzinfo=None)
+    return tarih.isoformat()
+
+
+def _satirlar(tablo: KalemTablosu, kayit: TahsilatKaydi, kalemler: Optional[Tuple]) -> List:
+    satirlar = []
+    for sira, kalem in enumerate(kalemler or ()):
+        satir = tablo.model(tahsilat_kaydi=kayit, sira=sira, **dict(zip(tablo.tip.__slots__, kalem.degerler())))
+        for alan in tablo.tarihler:
+            setattr(satir, alan, _tarih(getattr(satir, alan)))
+        satirlar.append(satir)
+    return satirlar
+
+
+def _kalemler(tablo: KalemTablosu, satirlar: Iterable) -> Tuple:
+    kalemler = []
+    for satir in satirlar:
+        degerler = []
+        for nitelik in tablo.tip.__slots__:
+            deger = getattr(satir, nitelik)
+            if nitelik in tablo.tarihler:
+                deger = _dsi_tarihi(deger)
+            elif nitelik in tablo.tutarlar and deger is not None:
+                deger = float(deger)
+            degerler.append(deger)
+        kalemler.append(tablo.tip(*degerler))
+    return tuple(kalemler)
+
+
+def detaylari_kaydet(detaylar: Dict[int, TahsilatDetayi]) -> int:
+    """
+    Detayları tahsilat_id'leriyle eşleşen TahsilatKaydi'lere yaz
+
+    Returns:
+        int: Taksit/ödeme satırları yeniden yazılan kayıt sayısı
+    """
+    if not detaylar:
+        return 0
+    with transaction.atomic():
+        # Aynı kaydın eşzamanlı yazımları sıraya girer; sira tekilliği çakışmaz
+        kayitlar = list(TahsilatKaydi.objects.select_for_update().filter(
+            tahsilat_id__in=list(detaylar)
+        ).only('id', 'tahsilat_id', 'detay_zamani', 'detay_hash'))
+
+        degisenler, ayni_kalanlar = [], []
+        for kayit in kayitlar:
+            detay = detaylar[kayit.tahsilat_id]
+            zaman = detay.alinma_ani()
+            if kayit.detay_zamani and kayit.detay_zamani >= zaman:
+                # Daha yeni bir detay zaten yazılmış
+                continue
+            kayit.detay_zamani = zaman
+            ozet = detay_hash(detay)
+            if ozet == kayit.detay_hash:
+                ayni_kalanlar.append(kayit)
+                continue
+            kayit.detay_hash = ozet
+            kayit.detay_alanlari = detay.ust_alanlar()
+            for tablo in KALEMLER:
+                kalemler = getattr(detay, tablo.nitelik)
+                setattr(kayit, tablo.sayac, None if kalemler is None else len(kalemler))
+            degisenler.append(kayit)
+
+        if degisenler:
+            for tablo in KALEMLER:
+                tablo.model.objects.filter(tahsilat_kaydi__in=degisenler).delete()
+                tablo.model.objects.bulk_create([
+                    satir
+                    for kayit in degisenler
+                    for satir in _satirlar(tablo, kayit, getattr(detaylar[kayit.tahsilat_id], tablo.nitelik))
+                ], batch_size=parti_boyutu())
+            TahsilatKaydi.objects.bulk_update(degisenler, DETAY_ALANLARI, batch_size=parti_boyutu())
+        if ayni_kalanlar:
+            TahsilatKaydi.objects.bulk_update(ayni_kalanlar, ['detay_zamani'], batch_size=parti_boyutu())
+    return len(degisenler)
+
+
+def detaylari_oku(tahsilat_idleri: Iterable[int], azami_yas: float) -> Dict[int, TahsilatDetayi]:
+    """
+    En fazla azami_yas saniye önce alınmış detayları yerel satırlardan kur
+
+    Returns:
+        Dict[int, TahsilatDetayi]: tahsilat_id -> detay (bulunmayanlar yer almaz)
+    """
+    filtre = {'tahsilat_id__in': list(tahsilat_idleri), 'detay_zamani__isnull': False}
+    if azami_yas != math.inf:
+        filtre['detay_zamani__gte'] = timezone.now() - timedelta(seconds=azami_yas)
+    kayitlar = TahsilatKaydi.objects.filter(**filtre).only(
+        'id', 'tahsilat_id', *DETAY_ALANLARI
+    ).prefetch_related(*(tablo.iliski for tablo in KALEMLER))
+
+    return {
+        kayit.tahsilat_id: TahsilatDetayi.yerelden(
+            kayit.detay_alanlari or {},
+            zaman=kayit.detay_zamani.timestamp(),
+            **{
+                tablo.nitelik: None if getattr(kayit, tablo.sayac) is None
+                else _kalemler(tablo, getattr(kayit, tablo.iliski).all())
+                for tablo in KALEMLER
+            }
+        )
+        for kayit in kayitlar
+    }
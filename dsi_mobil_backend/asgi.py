@@ -9,3 +9,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dsi_mobil_backend.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.ASGI_PROFILE:
+    # WhiteNoise yerine statik dosyaları ASGI uyumlu handler ile sun
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+    application = ASGIStaticFilesHandler(application)
@@ -4,6 +4,7 @@ Django settings for dsi_mobil_backend project.
 
 from pathlib import Path
 from decouple import config
+from celery.schedules import crontab
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -15,6 +16,9 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-produc
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
 
+# ASGI dağıtım profili (uvicorn worker + asenkron tahsilat view'ları)
+ASGI_PROFILE = config('ASGI_PROFILE', default=False, cast=bool)
+
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1,0.0.0.0,172.16.9.92', cast=lambda v: [s.strip() for s in v.split(',')])
 
 # Application definition
@@ -48,6 +52,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.core.deadline.DeadlineMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -58,6 +63,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if ASGI_PROFILE:
+    # WhiteNoise sadece senkron çalışır ve her isteği thread'e taşır;
+    # ASGI profilinde statik dosyalar asgi.py içinde sunulur.
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'dsi_mobil_backend.urls'
 
 TEMPLATES = [
@@ -165,6 +175,11 @@ CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only in development
 
+# Tahsilat tazelik ipucu (Cache-Control) ve verinin yaşı (Age) tarayıcı istemcilerinde de kullanılabilsin
+from corsheaders.defaults import default_headers
+CORS_ALLOW_HEADERS = (*default_headers, 'cache-control')
+CORS_EXPOSE_HEADERS = ['Age']
+
 # JWT Settings
 from datetime import timedelta
 
@@ -202,14 +217,165 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Takip edilen TCKN/VKN'lerin arka plan yenilemesi: her gün TAKIP_YENILEME_SAATI'nde başlar,
+# TAKIP_YENILEME_PARTI kimlik TAKIP_YENILEME_PARTI_ARALIGI (sn) arayla kuyruğa atılır ve
+# TAKIP_YENILEME_PENCERESI (saat) dolunca kalanlar ertesi güne bırakılır.
+TAKIP_YENILEME_SAATI = config('TAKIP_YENILEME_SAATI', default=3, cast=int)
+TAKIP_YENILEME_PARTI = config('TAKIP_YENILEME_PARTI', default=20, cast=int)
+TAKIP_YENILEME_PARTI_ARALIGI = config('TAKIP_YENILEME_PARTI_ARALIGI', default=60, cast=int)
+TAKIP_YENILEME_PENCERESI = config('TAKIP_YENILEME_PENCERESI', default=4, cast=int)
+# Son TAKIP_YENILEME_ESIGI saat içinde yenilenmiş kimlikler atlanır
+TAKIP_YENILEME_ESIGI = config('TAKIP_YENILEME_ESIGI', default=12, cast=int)
+# Kullanıcı başına en fazla takip edilen kimlik
+TAKIP_MAKS_KIMLIK = config('TAKIP_MAKS_KIMLIK', default=20, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    'takip-listesini-yenile': {
+        'task': 'apps.tahsilat.tasks.takip_listesini_yenile',
+        'schedule': crontab(hour=TAKIP_YENILEME_SAATI, minute=0),
+    },
+}
+
+# Cache (Redis)
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/1')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'dsi_mobil',
+    }
+}
+
+# Harici servis devre kesicisi (durum Redis'te paylaşılır). WINDOW saniyelik pencerede en az
+# MIN_REQUESTS mantıksal çağrı yapılmış ve hata oranı FAILURE_RATE'e ulaşmışsa devre açılır.
+CIRCUIT_BREAKER_FAILURE_RATE = config('CIRCUIT_BREAKER_FAILURE_RATE', default=0.5, cast=float)
+CIRCUIT_BREAKER_MIN_REQUESTS = config('CIRCUIT_BREAKER_MIN_REQUESTS', default=20, cast=int)
+CIRCUIT_BREAKER_WINDOW = config('CIRCUIT_BREAKER_WINDOW', default=30, cast=int)
+CIRCUIT_BREAKER_RESET_TIMEOUT = config('CIRCUIT_BREAKER_RESET_TIMEOUT', default=30, cast=int)
+
+# Harici servislere giden eşzamanlı istek sınırı (slotlar Redis'te paylaşılır). Sınır
+# CONCURRENCY_LIMIT_MIN ile _MAX arasında AIMD ile ayarlanır: olağan sürede biten başarılı çağrılar
+# artırır; zaman aşımı, 429/5xx ve uç noktanın ortalama gecikmesinin _LATENCY_TOLERANCE katını aşan
+# yanıtlar _DECREASE_FACTOR ile çarpar (en fazla _DECREASE_INTERVAL saniyede bir).
+CONCURRENCY_LIMIT_INITIAL = config('CONCURRENCY_LIMIT_INITIAL', default=16, cast=int)
+CONCURRENCY_LIMIT_MIN = config('CONCURRENCY_LIMIT_MIN', default=2, cast=int)
+CONCURRENCY_LIMIT_MAX = config('CONCURRENCY_LIMIT_MAX', default=64, cast=int)
+CONCURRENCY_LIMIT_LATENCY_TOLERANCE = config('CONCURRENCY_LIMIT_LATENCY_TOLERANCE', default=2.0, cast=float)
+CONCURRENCY_LIMIT_DECREASE_INTERVAL = config('CONCURRENCY_LIMIT_DECREASE_INTERVAL', default=2.0, cast=float)
+CONCURRENCY_LIMIT_DECREASE_FACTOR = config('CONCURRENCY_LIMIT_DECREASE_FACTOR', default=0.7, cast=float)
+# Öncelik şeridi -> (sınırdan kullanabileceği pay, slot için en fazla bekleme (saniye))
+CONCURRENCY_LIMIT_LANES = {
+    'etkilesimli': (1.0, 2),
+    'normal': (0.8, 5),
+    'arka_plan': (0.5, 20),
+    'toplu': (0.3, 20),
+    'yedek': (0.5, 0),
+}
+
+# İdempotent okumalarda yedek (hedged) istek: ilk deneme HEDGE_DELAY saniyede (0 ise gözlenen
+# HEDGE_PERCENTILE. yüzdelikte) dönmezse ikinci istek gönderilir, önce dönen kullanılır. Ek yük
+# servis başına dakikada HEDGE_BUDGET_PER_MINUTE yedek istekle sınırlıdır.
+HEDGE_ENABLED = config('HEDGE_ENABLED', default=False, cast=bool)
+HEDGE_DELAY = config('HEDGE_DELAY', default=0, cast=float)
+HEDGE_PERCENTILE = config('HEDGE_PERCENTILE', default=95, cast=float)
+HEDGE_BUDGET_PER_MINUTE = config('HEDGE_BUDGET_PER_MINUTE', default=60, cast=int)
+# Senkron yedekli denemeleri çalıştıran thread sayısı (süreç başına)
+HEDGE_MAX_THREADS = config('HEDGE_MAX_THREADS', default=32, cast=int)
+
+# İstek süre sınırı (saniye): harici servis çağrılarının zaman aşımları kalan süreye göre kısalır,
+# süre dolunca upstream'e gidilmeden 504 döner. Mobil istemci ~15 sn sonra vazgeçer; istemci
+# X-Request-Timeout ile daha kısa süre isteyebilir. Public belge uçları BELGE_SURE_BUTCESI kullanır.
+ISTEK_SURE_BUTCESI = config('ISTEK_SURE_BUTCESI', default=14, cast=float)
+BELGE_SURE_BUTCESI = config('BELGE_SURE_BUTCESI', default=30, cast=float)
+
+# /metrics (Prometheus) için Bearer token; boşsa yalnızca METRICS_IZINLI_AGLAR'dan
+# (REMOTE_ADDR; varsayılan yalnızca loopback) gelen isteklere açıktır
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_IZINLI_AGLAR = config('METRICS_IZINLI_AGLAR', default='127.0.0.1/32,::1/128', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
 # Harici Kimlik Yönetim Servisi Ayarları
 EXTERNAL_AUTH_BASE_URL = config('EXTERNAL_AUTH_BASE_URL', default='https://yenikysdevapi.dsi.gov.tr')
 EXTERNAL_AUTH_APP_ID = config('EXTERNAL_AUTH_APP_ID', default='1021')
 EXTERNAL_AUTH_TIMEOUT = config('EXTERNAL_AUTH_TIMEOUT', default=30, cast=int)
+EXTERNAL_AUTH_BAGLANTI_TIMEOUT = config('EXTERNAL_AUTH_BAGLANTI_TIMEOUT', default=5, cast=float)
 
 # DSİ API Ayarları
 DSI_API_BASE_URL = config('DSI_API_BASE_URL', default='https://altayapi.dsi.gov.tr')
+# Birden fazla DSİ düğümü (virgülle ayrılmış); boşsa yalnızca DSI_API_BASE_URL kullanılır
+DSI_API_BASE_URLS = config('DSI_API_BASE_URLS', default='', cast=lambda v: [s.strip().rstrip('/') for s in v.split(',') if s.strip()])
+# DSI_API_TIMEOUT yanıt okuma, DSI_API_BAGLANTI_TIMEOUT TCP/TLS bağlantı kurma zaman aşımıdır (saniye)
 DSI_API_TIMEOUT = config('DSI_API_TIMEOUT', default=30, cast=int)
+DSI_API_BAGLANTI_TIMEOUT = config('DSI_API_BAGLANTI_TIMEOUT', default=5, cast=float)
+
+# Mock mod: DSİ'ye gitmeden sentetik_veri.py üretecinin verisi döner. Aynı DSI_MOCK_TOHUM aynı
+# veriyi üretir; DSI_MOCK_KAYIT_SAYISI 0 ise her kimlik için 1-40 arası kayıt döner.
+DSI_API_USE_MOCK = config('DSI_API_USE_MOCK', default=False, cast=bool)
+DSI_MOCK_TOHUM = config('DSI_MOCK_TOHUM', default=0, cast=int)
+DSI_MOCK_KAYIT_SAYISI = config('DSI_MOCK_KAYIT_SAYISI', default=0, cast=int)
+
+# DSİ yanıt kaydı (dsi_kayit.py): DSI_KAYIT_DIZINI tanımlıysa okuma çağrıları kişisel veriler temizlenerek
+# gzip'li JSONL olarak yazılır (DSI_KAYIT_ORANI: kaydedilecek çağrı oranı). DSI_TEKRAR_DOSYALARI (virgülle
+# ayrılmış dosya/glob) tanımlıysa DSİ'ye gidilmez, kayıtlar özgün süreleriyle (DSI_TEKRAR_HIZI katı hızda) oynatılır.
+DSI_KAYIT_DIZINI = config('DSI_KAYIT_DIZINI', default='')
+DSI_KAYIT_ORANI = config('DSI_KAYIT_ORANI', default=1.0, cast=float)
+DSI_TEKRAR_DOSYALARI = config('DSI_TEKRAR_DOSYALARI', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+DSI_TEKRAR_HIZI = config('DSI_TEKRAR_HIZI', default=1.0, cast=float)
+
+# DSİ API bağlantı havuzu (süreç başına paylaşılır)
+DSI_API_POOL_CONNECTIONS = config('DSI_API_POOL_CONNECTIONS', default=4, cast=int)
+DSI_API_POOL_MAXSIZE = config('DSI_API_POOL_MAXSIZE', default=40, cast=int)
+DSI_API_MAX_RETRIES = config('DSI_API_MAX_RETRIES', default=2, cast=int)
+DSI_API_TCP_KEEPALIVE = config('DSI_API_TCP_KEEPALIVE', default=True, cast=bool)
+# Asenkron istemcide event loop başına en fazla eşzamanlı bağlantı
+DSI_API_ASYNC_MAX_CONNECTIONS = config('DSI_API_ASYNC_MAX_CONNECTIONS', default=200, cast=int)
+
+# Upstream adres havuzu: art arda UPSTREAM_EJECTION_THRESHOLD hata veren adres UPSTREAM_EJECTION_TIME
+# saniye seçilmez; tekrar eden dışlamalarda süre UPSTREAM_EJECTION_MAX_TIME'a kadar ikiye katlanır
+UPSTREAM_EJECTION_THRESHOLD = config('UPSTREAM_EJECTION_THRESHOLD', default=3, cast=int)
+UPSTREAM_EJECTION_TIME = config('UPSTREAM_EJECTION_TIME', default=30, cast=int)
+UPSTREAM_EJECTION_MAX_TIME = config('UPSTREAM_EJECTION_MAX_TIME', default=300, cast=int)
+
+# DSİ okuma çağrılarında geçici hatalar (bağlantı kopması, 502/503/504) için yeniden deneme.
+# Denemeler ve aradaki jitter'lı üstel beklemeler (saniye) DSI_API_SURE_BUTCESI içinde kalır;
+# her denemenin zaman aşımı DSI_API_TIMEOUT ile kalan bütçenin küçüğüdür.
+DSI_API_RETRY_DENEME = config('DSI_API_RETRY_DENEME', default=3, cast=int)
+DSI_API_RETRY_BEKLEME = config('DSI_API_RETRY_BEKLEME', default=0.2, cast=float)
+DSI_API_RETRY_MAKS_BEKLEME = config('DSI_API_RETRY_MAKS_BEKLEME', default=2.0, cast=float)
+DSI_API_SURE_BUTCESI = config('DSI_API_SURE_BUTCESI', default=30, cast=int)
+
+# Tahsilat listesi yanıt önbelleği (saniye)
+DSI_LISTE_CACHE_TTL = config('DSI_LISTE_CACHE_TTL', default=60, cast=int)
+DSI_LISTE_CACHE_STALE_TTL = config('DSI_LISTE_CACHE_STALE_TTL', default=300, cast=int)
+
+# Tahsilat detayı önbelleği (saniye); Cache-Control / azami_yas ile eski veri kabul eden isteklere sunulur
+DSI_DETAY_CACHE_TTL = config('DSI_DETAY_CACHE_TTL', default=300, cast=int)
+# İpucu göndermeyen detay isteklerine önbellekten / yerel satırlardan sunulan en büyük yaş (saniye; 0 her zaman canlı)
+DSI_DETAY_YEREL_TTL = config('DSI_DETAY_YEREL_TTL', default=60, cast=int)
+# Redis önündeki süreç içi LRU: kayıt sayısı (0 kapatır) ve en uzun yaşam süresi (saniye).
+# Başka worker'ların yazmaları Redis pub/sub ile bildirilir; kanal dinlenemezken LRU kullanılmaz.
+DSI_DETAY_L1_BOYUTU = config('DSI_DETAY_L1_BOYUTU', default=1024, cast=int)
+DSI_DETAY_L1_TTL = config('DSI_DETAY_L1_TTL', default=60, cast=int)
+
+# Aynı sorgu için eşzamanlı isteklerin lider sonucunu bekleme süresi (saniye)
+DSI_TEK_UCUS_BEKLEME = config('DSI_TEK_UCUS_BEKLEME', default=15, cast=int)
+
+# /sorgu/ sonucunun imleçle sayfalanması: varsayılan/en büyük sayfa boyutu ve sonucun saklanma süresi (saniye)
+TAHSILAT_SAYFA_BOYUTU = config('TAHSILAT_SAYFA_BOYUTU', default=20, cast=int)
+TAHSILAT_SAYFA_MAKS_BOYUTU = config('TAHSILAT_SAYFA_MAKS_BOYUTU', default=200, cast=int)
+TAHSILAT_SAYFA_TTL = config('TAHSILAT_SAYFA_TTL', default=1800, cast=int)
+
+# Toplu tahsilat detayı: istek başına en fazla kayıt ve eşzamanlı DSİ çağrısı
+DSI_DETAY_TOPLU_MAKS_KAYIT = config('DSI_DETAY_TOPLU_MAKS_KAYIT', default=100, cast=int)
+DSI_DETAY_TOPLU_ESZAMANLI = config('DSI_DETAY_TOPLU_ESZAMANLI', default=40, cast=int)
+
+# Tahsilat listesi içe aktarılırken tek INSERT ile yazılan kayıt sayısı
+TAHSILAT_INGEST_PARTI_BOYUTU = config('TAHSILAT_INGEST_PARTI_BOYUTU', default=500, cast=int)
+
+# Tahsilat belgesi (PDF) disk önbelleği; BELGE_CACHE_MAKS_BOYUT (MB) 0 ise kapalı
+BELGE_CACHE_DIR = config('BELGE_CACHE_DIR', default=str(MEDIA_ROOT / 'belge_cache'))
+BELGE_CACHE_MAKS_BOYUT = config('BELGE_CACHE_MAKS_BOYUT', default=512, cast=int)
+BELGE_CACHE_TTL = config('BELGE_CACHE_TTL', default=86400, cast=int)
 
 # Logging
 import os
@@ -9,6 +9,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from apps.core.views import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="DSI Mobil Backend API",
@@ -30,6 +32,9 @@ urlpatterns = [
     path('api/v1/tahsilat/', include('apps.tahsilat.urls')),
     path('api/v1/duyurular/', include('duyurular.urls')),
     
+    # Prometheus metrikleri
+    path('metrics', metrics_view, name='metrics'),
+    
     # API Documentation
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
@@ -0,0 +1,36 @@
+"""
+Gunicorn yapılandırması
+
+Gunicorn çalışma dizinindeki bu dosyayı otomatik olarak yükler.
+"""
+import glob
+import os
+
+# Prometheus çok süreçli modu: her worker metriklerini bu dizindeki dosyalara yazar,
+# /metrics hepsini toplar. prometheus_client import edilmeden önce tanımlanmalıdır.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/dsi_prometheus')
+
+
+def on_starting(server):
+    """Önceki çalıştırmadan kalan metrik dosyalarını temizle"""
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    for dosya in glob.glob(os.path.join(PROMETHEUS_MULTIPROC_DIR, '*.db')):
+        os.remove(dosya)
+
+
+def post_fork(server, worker):
+    """Worker fork edildikten sonra devralınan HTTP bağlantı havuzlarını sıfırla"""
+    from apps.core import http_transport
+    http_transport.reset_after_fork()
+
+
+def worker_exit(server, worker):
+    """Worker kapanırken açık HTTP bağlantılarını kapat"""
+    from apps.core import http_transport
+    http_transport.close_all()
+
+
+def child_exit(server, worker):
+    """Sonlanan worker'ın canlı gauge değerlerini metriklerden çıkar"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)